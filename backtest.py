@@ -0,0 +1,82 @@
+"""
+Backtest equal-weight top-N strategies over a parameter grid.
+
+    python backtest.py --start-date 2015-01-01 --end-date 2024-12-31 \\
+        --top-n 50 100 --rebalance daily monthly --buffer 0 10 --turnover-cap none 20 --workers 4
+
+Every combination of the listed values is one variant. Results are stored in
+backtest_results under a new run id and the best variants by Sharpe ratio are
+printed. DuckDB allows one writer per file, so stop the API before running
+this against its database.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+from migrations.migration_runner import MigrationRunner
+from src.constants import DEFAULT_REBALANCE_COST_BPS
+from src.repositories.base_repository import BaseRepository
+from src.repositories.backtest_repository import BacktestRepository
+from src.services.backtest_engine import parameter_grid
+from src.services.backtest_service import BacktestService
+
+
+def _turnover_cap(value: str):
+    return None if value.lower() == "none" else float(value)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--start-date", type=date.fromisoformat, required=True)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--top-n", type=int, nargs="+", default=[100])
+    parser.add_argument("--rebalance", choices=["daily", "weekly", "monthly"], nargs="+", default=["daily"])
+    parser.add_argument("--buffer", type=int, nargs="+", default=[0])
+    parser.add_argument("--turnover-cap", type=_turnover_cap, nargs="+", default=[None],
+                        help="percent of top-n names replaceable per rebalance, or 'none'")
+    parser.add_argument("--cost-bps", type=float, default=DEFAULT_REBALANCE_COST_BPS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--db-path", default=os.getenv("DUCKDB_PATH", "data/hedgineer.db"))
+    parser.add_argument("--show", type=int, default=20, help="number of variants to print")
+    return parser.parse_args(argv)
+
+
+def format_results(run, limit: int) -> str:
+    header = f"{'top_n':>5} {'rebalance':>9} {'buffer':>6} {'cap%':>5} {'ann.ret%':>9} {'vol%':>6} {'sharpe':>6} {'maxdd%':>7} {'turn%/yr':>8} {'cost%':>6}"
+    lines = [header]
+    ranked = sorted(run.results, key=lambda result: -(result.sharpe_ratio if result.sharpe_ratio is not None else float("-inf")))
+    for result in ranked[:limit]:
+        cap = "-" if result.turnover_cap_percent is None else f"{result.turnover_cap_percent:g}"
+        lines.append(
+            f"{result.top_n:>5} {result.rebalance:>9} {result.buffer:>6} {cap:>5} "
+            f"{result.annualized_return_percent:>9.2f} {result.annualized_volatility_percent or 0:>6.2f} "
+            f"{result.sharpe_ratio or 0:>6.2f} {result.max_drawdown_percent:>7.2f} "
+            f"{result.annual_turnover_percent:>8.1f} {result.total_cost_percent:>6.2f}"
+        )
+    return "\n".join(lines)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    grid = parameter_grid(args.top_n, args.rebalance, args.buffer, args.turnover_cap)
+    await MigrationRunner(db_path=args.db_path).run_migrations()
+    base_repository = BaseRepository(db_path=args.db_path)
+    try:
+        service = BacktestService(BacktestRepository(base_repository))
+        run = await service.run(args.start_date, args.end_date, grid, args.cost_bps, args.workers)
+    finally:
+        base_repository.close()
+
+    if run is None:
+        print(f"No stock data between {args.start_date} and {args.end_date}")
+        sys.exit(1)
+    print(
+        f"Run {run.run_id}: {run.variants_count} variants over {run.days_count} days x {run.symbols_count} symbols "
+        f"in {run.elapsed_seconds:.2f}s ({run.variants_per_second:.1f} variants/s, {run.workers} workers)"
+    )
+    print(format_results(run, args.show))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Measure the Parquet archive tier: database size and read latency before and after.
+
+Loads ``--years`` of daily rows for ``--symbols`` stocks, times the top-N query
+for random recent and old dates and a one-year composition-changes range,
+archives every month before the hot window, then repeats the reads against
+hot + archived data and reports the space the database still uses.
+
+    python benchmarks/archive_benchmark.py --years 10 --symbols 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from migrations.migration_runner import MigrationRunner
+from src.repositories.base_repository import BaseRepository
+from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
+
+TODAY = date(2025, 1, 2)
+
+
+def load(db_path: str, years: int, symbols: int, members: int) -> int:
+    connection = duckdb.connect(db_path)
+    connection.execute(f"""
+        INSERT INTO securities (security_id, symbol, name, valid_from, valid_to)
+        SELECT s + 1, 'SYM' || s, 'Company ' || s, DATE '{2024 - years + 1}-01-01', DATE '2024-12-31'
+        FROM range({symbols}) symbols(s);
+        INSERT INTO stock_price_history (id, security_id, last_traded_price, market_cap, one_day_return, created_at)
+        SELECT uuid()::VARCHAR, s + 1, 100, 1e9 * (s + 1) * (0.8 + random() * 0.4), (random() - 0.5) * 4, d::DATE
+        FROM generate_series(TIMESTAMP '{2024 - years + 1}-01-01', TIMESTAMP '2024-12-31', INTERVAL 1 DAY) days(d),
+             range({symbols}) symbols(s)
+        WHERE dayofweek(d) BETWEEN 1 AND 5
+        ORDER BY d, 1e9 * (s + 1) DESC;
+        INSERT INTO index_compositions (date, security_id, weight_percent, market_cap, price, return_percent)
+        SELECT created_at, security_id, 100.0 / {members}, market_cap, last_traded_price, one_day_return
+        FROM stock_price_history
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY created_at ORDER BY market_cap DESC) <= {members};
+        CHECKPOINT;
+    """)
+    count = connection.execute("SELECT COUNT(*) FROM stock_price_history").fetchone()[0]
+    connection.close()
+    return count
+
+
+def used_mib(repository: StockPriceHistoryRepository) -> float:
+    repository.connection.execute("CHECKPOINT;")
+    block_size, used_blocks = repository.connection.execute(
+        "SELECT block_size, used_blocks FROM pragma_database_size();"
+    ).fetchone()
+    return block_size * used_blocks / 2 ** 20
+
+
+async def measure(repository: StockPriceHistoryRepository, label: str, dates, args) -> None:
+    recent = [day for day in dates if day >= date(2024, 10, 1)]
+    timings = {"recent": [], "old": []}
+    for kind, candidates in (("recent", recent), ("old", dates)):
+        for target_date in random.sample(candidates, min(args.queries, len(candidates))):
+            started = time.perf_counter()
+            await repository.get_stocks_by_date(target_date, args.top_n)
+            timings[kind].append((time.perf_counter() - started) * 1000)
+    started = time.perf_counter()
+    await repository.get_composition_changes(date(2020, 1, 1), date(2020, 12, 31))
+    changes_ms = (time.perf_counter() - started) * 1000
+    print(
+        f"{label:8s} used {used_mib(repository):7.1f} MiB   top-{args.top_n} recent {statistics.median(timings['recent']):6.2f} ms"
+        f"   old {statistics.median(timings['old']):6.2f} ms   2020 changes {changes_ms:7.1f} ms"
+    )
+
+
+async def run(args):
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = str(Path(temp_dir) / "archive.db")
+        await MigrationRunner(db_path=db_path).run_migrations()
+        started = time.perf_counter()
+        rows = load(db_path, args.years, args.symbols, args.members)
+        print(f"loaded {rows} rows in {time.perf_counter() - started:.1f} s")
+
+        base_repository = BaseRepository(db_path=db_path)
+        repository = StockPriceHistoryRepository(base_repository)
+        dates = await repository.get_available_dates()
+        await measure(repository, "hot", dates, args)
+
+        started = time.perf_counter()
+        archived_rows = await repository.archive_closed_months(TODAY)
+        archive_bytes = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for directory, _, names in os.walk(base_repository.archive.archive_path) for name in names
+        )
+        print(
+            f"archived {archived_rows} rows in {time.perf_counter() - started:.1f} s "
+            f"to {archive_bytes / 2 ** 20:.1f} MiB of Parquet"
+        )
+        await measure(repository, "archived", dates, args)
+        base_repository.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--members", type=int, default=100, help="index constituents per day")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-n", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measure backtest throughput in variants per second.
+
+Loads ``--years`` of synthetic daily prices for ``--symbols`` stocks whose
+market caps follow their own returns, so ranks churn the way real ones do.
+It then times loading the shared arrays and evaluating a parameter grid
+in-process and across ``--workers`` processes.
+
+    python benchmarks/backtest_benchmark.py --symbols 500 --years 10 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from migrations.migration_runner import MigrationRunner
+from src.repositories.backtest_repository import BacktestRepository
+from src.repositories.base_repository import BaseRepository
+from src.services.backtest_engine import MarketData, parameter_grid, run_grid
+
+
+def load_prices(db_path: str, symbols: int, years: int) -> int:
+    connection = duckdb.connect(db_path)
+    connection.execute(f"""
+        INSERT INTO securities (security_id, symbol, name, valid_from, valid_to)
+        SELECT s + 1, 'SYM' || s, 'Company ' || s, DATE '{2024 - years + 1}-01-01', DATE '2024-12-31'
+        FROM range({symbols}) symbols(s);
+        INSERT INTO stock_price_history (id, security_id, last_traded_price, market_cap, one_day_return, created_at)
+        SELECT uuid()::VARCHAR, s + 1, 100,
+               1e9 * (s + 1) * EXP(SUM(LN(1 + r / 100)) OVER (PARTITION BY s ORDER BY d)), r, d::DATE
+        FROM (
+            SELECT s, d, (random() - 0.5) * 4 AS r
+            FROM generate_series(TIMESTAMP '{2024 - years + 1}-01-01', TIMESTAMP '2024-12-31', INTERVAL 1 DAY) days(d),
+                 range({symbols}) symbols(s)
+            WHERE dayofweek(d) BETWEEN 1 AND 5
+        );
+    """)
+    count = connection.execute("SELECT COUNT(*) FROM stock_price_history").fetchone()[0]
+    connection.close()
+    return count
+
+
+async def run(args):
+    grid = parameter_grid([25, 50, 100, 200], ["daily", "weekly", "monthly"], [0, 10, 25], [None, 10, 25])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = str(Path(temp_dir) / "backtest.db")
+        await MigrationRunner(db_path=db_path).run_migrations()
+        rows = load_prices(db_path, args.symbols, args.years)
+        base_repository = BaseRepository(db_path=db_path)
+
+        started = time.perf_counter()
+        columns = await BacktestRepository(base_repository).get_market_data(date(2024 - args.years + 1, 1, 1), date(2024, 12, 31))
+        market = MarketData.from_columns(**columns)
+        print(f"{rows} rows -> {market.returns.shape[0]} days x {market.returns.shape[1]} symbols "
+              f"loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
+        base_repository.close()
+
+        for workers in sorted({1, args.workers}):
+            started = time.perf_counter()
+            run_grid(market, grid, 10.0, workers)
+            elapsed = time.perf_counter() - started
+            print(f"{len(grid)} variants, {workers} worker(s): {elapsed:6.2f} s, {len(grid) / elapsed:6.1f} variants/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
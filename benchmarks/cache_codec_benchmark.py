@@ -0,0 +1,96 @@
+"""
+Compare cache codecs on one cached composition day.
+
+Reports encoded size, Redis ``MEMORY USAGE`` (when a Redis server is reachable),
+and encode / decode / decode+validate timings.
+
+    python benchmarks/cache_codec_benchmark.py --rows 500
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import redis
+
+from src.dtos.index_result import IndexComposition
+from src.services.cache_codec import ColumnarCacheCodec, JsonCacheCodec
+
+
+def build_composition_day(rows: int):
+    rng = random.Random(42)
+    weight = 100.0 / rows
+    return [
+        IndexComposition(
+            date=date(2025, 9, 10),
+            symbol=f"SYM{i:04d}",
+            company_name=f"Company Number {i} Holdings Incorporated",
+            weight_percent=weight,
+            market_cap=rng.uniform(1e10, 3e12),
+            price=rng.uniform(5, 900),
+            return_percent=rng.uniform(-5, 5)
+        ).model_dump()
+        for i in range(rows)
+    ]
+
+
+def redis_memory_usage(client, key: str, payload: bytes):
+    if client is None:
+        return None
+    client.set(key, payload)
+    usage = client.memory_usage(key)
+    client.delete(key)
+    return usage
+
+
+def connect_redis():
+    try:
+        client = redis.Redis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            socket_connect_timeout=1
+        )
+        client.ping()
+        return client
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = build_composition_day(args.rows)
+    client = connect_redis()
+
+    codecs = [("json (current)", JsonCacheCodec()), ("columnar", ColumnarCacheCodec())]
+    for compression in ("zstd", "lz4"):
+        try:
+            codecs.append((f"columnar+{compression}", ColumnarCacheCodec(compression=compression)))
+        except ValueError as e:
+            print(f"skipping {compression}: {e}")
+
+    print(f"{args.rows} rows per cached day, {args.repeat} iterations")
+    print(f"{'codec':<18}{'bytes':>10}{'redis mem':>12}{'encode us':>12}{'decode us':>12}{'decode+model us':>17}")
+    for name, codec in codecs:
+        payload = codec.encode(rows)
+        encode_us = timeit.timeit(lambda: codec.encode(rows), number=args.repeat) / args.repeat * 1e6
+        decode_us = timeit.timeit(lambda: codec.decode(payload), number=args.repeat) / args.repeat * 1e6
+        validate_us = timeit.timeit(
+            lambda: [IndexComposition.model_validate(item) for item in codec.decode(payload)],
+            number=args.repeat
+        ) / args.repeat * 1e6
+        memory = redis_memory_usage(client, f"benchmark:cache_codec:{name}", payload)
+        print(f"{name:<18}{len(payload):>10}{memory if memory is not None else 'n/a':>12}"
+              f"{encode_us:>12.1f}{decode_us:>12.1f}{validate_us:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
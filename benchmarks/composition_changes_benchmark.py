@@ -0,0 +1,123 @@
+"""
+Compare the per-day composition-change loop with the single windowed query.
+
+Loads ``--years`` of daily compositions (``--symbols`` per day drawn from a
+larger universe with ``--churn`` replacements per day) into a temporary
+database, then times both approaches over the whole range.
+
+    python benchmarks/composition_changes_benchmark.py --years 5 --symbols 130
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from migrations.migration_runner import MigrationRunner
+from src.repositories.base_repository import BaseRepository
+from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
+
+
+def trading_days(start_date: date, end_date: date):
+    current = start_date
+    while current <= end_date:
+        if current.weekday() < 5:
+            yield current
+        current += timedelta(days=1)
+
+
+def load_compositions(db_path: str, years: int, symbols: int, churn: int) -> date:
+    rng = random.Random(7)
+    universe = [f"SYM{i:04d}" for i in range(symbols * 3)]
+    members = set(universe[:symbols])
+    start_date = date(2024 - years + 1, 1, 1)
+    rows = []
+    for trading_date in trading_days(start_date, date(2024, 12, 31)):
+        for _ in range(churn):
+            members.remove(rng.choice(sorted(members)))
+            members.add(rng.choice([s for s in universe if s not in members]))
+        weight = 100.0 / len(members)
+        rows.extend(
+            (trading_date, symbol, f"{symbol} Inc", weight, 1e9, 100.0, 0.5)
+            for symbol in members
+        )
+
+    connection = duckdb.connect(db_path)
+    connection.execute(
+        "CREATE TEMP TABLE staged (date DATE, symbol VARCHAR, name VARCHAR, weight_percent DOUBLE, "
+        "market_cap DOUBLE, price DOUBLE, return_percent DOUBLE);"
+    )
+    connection.executemany("INSERT INTO staged VALUES (?, ?, ?, ?, ?, ?, ?);", rows)
+    connection.execute("""
+        INSERT INTO securities (symbol, name, valid_from, valid_to)
+        SELECT symbol, name, MIN(date), MAX(date) FROM staged GROUP BY symbol, name;
+        INSERT INTO index_compositions (date, security_id, weight_percent, market_cap, price, return_percent)
+        SELECT staged.date, securities.security_id, staged.weight_percent, staged.market_cap, staged.price, staged.return_percent
+        FROM staged
+        JOIN securities ON securities.symbol = staged.symbol AND securities.name = staged.name;
+    """)
+    connection.close()
+    return start_date
+
+
+async def per_day_changes(repository: StockPriceHistoryRepository, start_date: date, end_date: date) -> int:
+    """The previous implementation: one composition query per calendar day"""
+    changes = 0
+    previous_symbols = set()
+    current_date = start_date
+    while current_date <= end_date:
+        if current_date.weekday() < 5:
+            composition = await repository.get_persisted_index_composition(current_date)
+            if composition:
+                current_symbols = {stock.symbol for stock in composition}
+                if previous_symbols:
+                    changes += len(current_symbols ^ previous_symbols)
+                previous_symbols = current_symbols
+        current_date += timedelta(days=1)
+    return changes
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = str(Path(temp_dir) / "changes.db")
+        await MigrationRunner(db_path=db_path).run_migrations()
+        start_date = load_compositions(db_path, args.years, args.symbols, args.churn)
+        end_date = date(2024, 12, 31)
+
+        base_repository = BaseRepository(db_path=db_path)
+        repository = StockPriceHistoryRepository(base_repository)
+        print(f"{args.years} years x {args.symbols} symbols, {args.churn} replacements per day")
+
+        started = time.perf_counter()
+        windowed = await repository.get_composition_changes(start_date, end_date)
+        windowed_seconds = time.perf_counter() - started
+        print(f"windowed query : {windowed_seconds * 1000:9.1f} ms  {len(windowed)} changes")
+
+        if not args.skip_per_day:
+            started = time.perf_counter()
+            per_day = await per_day_changes(repository, start_date, end_date)
+            per_day_seconds = time.perf_counter() - started
+            print(f"per-day loop   : {per_day_seconds * 1000:9.1f} ms  {per_day} changes")
+            print(f"speedup        : {per_day_seconds / windowed_seconds:9.1f}x")
+
+        base_repository.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--symbols", type=int, default=130)
+    parser.add_argument("--churn", type=int, default=2)
+    parser.add_argument("--skip-per-day", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Time the constituent covariance/correlation matrix for a full index.
+
+Loads ``--days`` of daily returns for ``--symbols`` stocks plus a composition
+of all of them on the last day, then reports the query, the vectorized matrix
+computation and the Arrow payload size against the equivalent JSON.
+
+    python benchmarks/covariance_benchmark.py --symbols 500 --days 1260 --window 252
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from migrations.migration_runner import MigrationRunner
+from src.repositories.analytics_repository import AnalyticsRepository
+from src.repositories.base_repository import BaseRepository
+from src.services import risk_metrics
+from src.services.matrix_codec import encode_matrix
+
+
+def load_returns(db_path: str, symbols: int, days: int):
+    connection = duckdb.connect(db_path)
+    connection.execute(f"""
+        INSERT INTO securities (security_id, symbol, name, valid_from, valid_to)
+        SELECT s + 1, 'SYM' || s, 'Company ' || s, DATE '2024-12-31' - {days}, DATE '2024-12-31'
+        FROM range({symbols}) symbols(s);
+        INSERT INTO stock_price_history (id, security_id, last_traded_price, market_cap, one_day_return, created_at)
+        SELECT uuid()::VARCHAR, s + 1, 100, 1e9 + s, (random() - 0.5) * 4, DATE '2024-12-31' - d::INTEGER
+        FROM range({days}) days(d), range({symbols}) symbols(s)
+        WHERE random() > 0.02;
+    """)
+    connection.execute(f"""
+        INSERT INTO index_compositions (date, security_id, weight_percent, market_cap, price, return_percent)
+        SELECT DATE '2024-12-31', s + 1, 100.0 / {symbols}, 1e9, 100, 0
+        FROM range({symbols}) symbols(s);
+    """)
+    connection.close()
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = str(Path(temp_dir) / "covariance.db")
+        await MigrationRunner(db_path=db_path).run_migrations()
+        load_returns(db_path, args.symbols, args.days)
+        base_repository = BaseRepository(db_path=db_path)
+        repository = AnalyticsRepository(base_repository)
+        as_of = date(2024, 12, 31)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            matrix = await repository.get_return_matrix(as_of, args.window)
+        query_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            covariance, correlation, _ = risk_metrics.pairwise_covariance(matrix["returns"])
+        compute_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+        symbols = matrix["symbols"].tolist()
+        payload = encode_matrix(symbols, correlation, {"kind": "correlation"})
+        as_json = json.dumps({"symbols": symbols, "matrix": correlation.tolist()}).encode()
+        print(f"{matrix['returns'].shape[0]} days x {len(symbols)} symbols")
+        print(f"query {query_ms:7.1f} ms   matrices {compute_ms:7.1f} ms")
+        print(f"arrow {len(payload) / 1024:8.1f} KiB   json {len(as_json) / 1024:8.1f} KiB")
+        base_repository.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=1260)
+    parser.add_argument("--window", type=int, default=252)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Time building index variants from one shared scan of stock_price_history.
+
+Loads ``--years`` of daily data for ``--symbols`` stocks, then builds one
+variant on its own, each seeded variant one at a time, and all of them
+together. Because every variant shares one scan and one market-cap ranking,
+building them together should cost far less than the sum of the separate builds.
+
+    python benchmarks/index_variants_benchmark.py --years 5 --symbols 600
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from migrations.migration_runner import MigrationRunner
+from src.repositories.base_repository import BaseRepository
+from src.repositories.index_variant_repository import IndexVariantRepository
+
+
+def load_stocks(db_path: str, years: int, symbols: int) -> int:
+    connection = duckdb.connect(db_path)
+    connection.execute(f"""
+        INSERT INTO securities (security_id, symbol, name, valid_from, valid_to)
+        SELECT s + 1, 'SYM' || s, 'Company ' || s, DATE '{2024 - years + 1}-01-01', DATE '2024-12-31'
+        FROM range({symbols}) symbols(s);
+        INSERT INTO stock_price_history (id, security_id, last_traded_price, market_cap, one_day_return, created_at)
+        SELECT uuid()::VARCHAR, s + 1, 100, 1e9 * (s + 1) * (0.8 + random() * 0.4),
+               (random() - 0.5) * 4, d::DATE
+        FROM generate_series(TIMESTAMP '{2024 - years + 1}-01-01', TIMESTAMP '2024-12-31', INTERVAL 1 DAY) days(d),
+             range({symbols}) symbols(s)
+        WHERE dayofweek(d) BETWEEN 1 AND 5;
+    """)
+    count = connection.execute("SELECT COUNT(*) FROM stock_price_history").fetchone()[0]
+    connection.close()
+    return count
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = str(Path(temp_dir) / "variants.db")
+        await MigrationRunner(db_path=db_path).run_migrations()
+        rows = load_stocks(db_path, args.years, args.symbols)
+        base_repository = BaseRepository(db_path=db_path)
+        repository = IndexVariantRepository(base_repository)
+        index_ids = [definition.index_id for definition in await repository.get_definitions()]
+        start_date, end_date = date(2024 - args.years + 1, 1, 1), date(2024, 12, 31)
+        print(f"{rows} stock rows, variants {index_ids}")
+
+        separate_ms = 0.0
+        for index_id in index_ids:
+            started = time.perf_counter()
+            await repository.build_variants(start_date, end_date, [index_id])
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            separate_ms += elapsed_ms
+            print(f"{index_id:28s} alone {elapsed_ms:8.0f} ms")
+
+        started = time.perf_counter()
+        written = await repository.build_variants(start_date, end_date, index_ids)
+        shared_ms = (time.perf_counter() - started) * 1000
+        print(f"all {len(index_ids)} variants, shared scan {shared_ms:8.0f} ms ({written} compositions) vs {separate_ms:8.0f} ms separately")
+        base_repository.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--symbols", type=int, default=600)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
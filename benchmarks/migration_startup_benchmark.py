@@ -0,0 +1,70 @@
+"""
+Measure startup migration cost as the number of migration files grows.
+
+Generates ``--counts`` synthetic migrations, applies them once, then times a
+boot that re-executes every file (what the runner did before it recorded
+checksums and skipped applied files) against an incremental boot with
+nothing pending, both on an already-open connection as the app uses it.
+
+    python benchmarks/migration_startup_benchmark.py --counts 10 100 500
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from migrations.migration_runner import MigrationRunner
+
+
+def write_migrations(directory: Path, count: int) -> None:
+    for number in range(1, count + 1):
+        # Idempotent so the re-run-everything boot can execute it repeatedly
+        (directory / f"{number:04d}_table_{number}.sql").write_text(f"""
+            CREATE OR REPLACE TABLE table_{number} (id INTEGER PRIMARY KEY, value DOUBLE, created_at DATE);
+            INSERT INTO table_{number} SELECT range, range * 1.5, DATE '2025-01-01' FROM range(100);
+        """)
+
+
+async def boot(connection, migrations_dir: Path) -> float:
+    runner = MigrationRunner(connection=connection)
+    runner.migrations_dir = migrations_dir
+    started = time.perf_counter()
+    await runner.run_migrations()
+    return (time.perf_counter() - started) * 1000
+
+
+async def run(args):
+    print(f"{'migrations':>10s} {'re-run all':>12s} {'incremental':>12s}")
+    for count in args.counts:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            migrations_dir = Path(temp_dir) / "migrations"
+            migrations_dir.mkdir()
+            write_migrations(migrations_dir, count)
+            connection = duckdb.connect(str(Path(temp_dir) / "startup.db"))
+            await boot(connection, migrations_dir)
+
+            rerun, incremental = [], []
+            for _ in range(args.repeats):
+                connection.execute("DELETE FROM migrations;")
+                rerun.append(await boot(connection, migrations_dir))
+                incremental.append(await boot(connection, migrations_dir))
+            connection.close()
+        print(f"{count:10d} {statistics.median(rerun):9.1f} ms {statistics.median(incremental):9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeats", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Measure the writer/reader topology: snapshot publish time and read throughput
+as reader processes are added.
+
+Loads ``--years`` of daily rows for ``--symbols`` stocks through a writer,
+publishes a snapshot, then runs ``--seconds`` of top-N queries for random dates
+in 1, 2, 4 ... up to ``--max-readers`` reader processes at once, each opening
+the snapshot read-only while the writer still holds the database.
+
+    python benchmarks/reader_workers_benchmark.py --years 5 --symbols 500 --max-readers 8
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from migrations.migration_runner import MigrationRunner
+from src.repositories.base_repository import BaseRepository
+from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
+from src.services.index_service import IndexService
+
+
+def load(db_path: str, years: int, symbols: int) -> int:
+    connection = duckdb.connect(db_path)
+    connection.execute(f"""
+        INSERT INTO securities (security_id, symbol, name, valid_from, valid_to)
+        SELECT s + 1, 'SYM' || s, 'Company ' || s, DATE '{2024 - years + 1}-01-01', DATE '2024-12-31'
+        FROM range({symbols}) symbols(s);
+        INSERT INTO stock_price_history (id, security_id, last_traded_price, market_cap, one_day_return, created_at)
+        SELECT uuid()::VARCHAR, s + 1, 100, 1e9 * (s + 1) * (0.8 + random() * 0.4), (random() - 0.5) * 4, d::DATE
+        FROM generate_series(TIMESTAMP '{2024 - years + 1}-01-01', TIMESTAMP '2024-12-31', INTERVAL 1 DAY) days(d),
+             range({symbols}) symbols(s)
+        WHERE dayofweek(d) BETWEEN 1 AND 5
+        ORDER BY d, 1e9 * (s + 1) DESC;
+        UPDATE data_version SET version = version + 1 WHERE id = 1;
+        CHECKPOINT;
+    """)
+    count = connection.execute("SELECT COUNT(*) FROM stock_price_history").fetchone()[0]
+    connection.close()
+    return count
+
+
+def read_for(db_path: str, dates: list, seconds: float, top_n: int, seed: int, queries) -> None:
+    repository = StockPriceHistoryRepository(BaseRepository(db_path=db_path, read_only=True))
+    rng = random.Random(seed)
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        asyncio.run(repository.get_stocks_by_date(rng.choice(dates), top_n))
+        count += 1
+    queries.put(count)
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = str(Path(temp_dir) / "workers.db")
+        await MigrationRunner(db_path=db_path).run_migrations()
+        rows = load(db_path, args.years, args.symbols)
+
+        writer = StockPriceHistoryRepository(BaseRepository(db_path=db_path))
+        started = time.perf_counter()
+        version = await IndexService(writer).publish_snapshot()
+        print(f"published data version {version} ({rows} rows) in {time.perf_counter() - started:.2f} s")
+        dates = await writer.get_available_dates()
+
+        readers = 1
+        print(f"{multiprocessing.cpu_count()} cores")
+        while readers <= args.max_readers:
+            queries = multiprocessing.Queue()
+            processes = [
+                multiprocessing.Process(
+                    target=read_for, args=(db_path, dates, args.seconds, args.top_n, args.seed + reader, queries)
+                )
+                for reader in range(readers)
+            ]
+            for process in processes:
+                process.start()
+            total = sum(queries.get() for _ in processes)
+            for process in processes:
+                process.join()
+            print(f"{readers:3d} readers  {total / args.seconds:8.0f} top-{args.top_n} queries/s")
+            readers *= 2
+        writer.base_repository.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--max-readers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--top-n", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Time risk analytics over a long index_performance series.
+
+Loads ``--years`` of synthetic daily performance plus a benchmark symbol into
+a temporary database, then reports the uncached computation time and the
+time to serve the same result from the cache codec round trip.
+
+    python benchmarks/risk_analytics_benchmark.py --years 20 --windows 21,63,252
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from migrations.migration_runner import MigrationRunner
+from src.dtos.analytics_result import RiskAnalytics
+from src.repositories.analytics_repository import AnalyticsRepository
+from src.repositories.base_repository import BaseRepository
+from src.services.analytics_service import AnalyticsService
+from src.services.cache_codec import ColumnarCacheCodec
+
+
+def load_series(db_path: str, years: int):
+    connection = duckdb.connect(db_path)
+    connection.execute(f"""
+        INSERT INTO index_performance (date, daily_return_percent, cumulative_return_percent, index_value, companies_count)
+        SELECT d::DATE, (random() - 0.49) * 2, 0, 1000 + row_number() OVER (), 100
+        FROM generate_series(TIMESTAMP '{2024 - years + 1}-01-01', TIMESTAMP '2024-12-31', INTERVAL 1 DAY) days(d)
+        WHERE dayofweek(d) BETWEEN 1 AND 5;
+    """)
+    connection.execute("""
+        INSERT INTO securities (security_id, symbol, name, valid_from, valid_to)
+        SELECT 1, 'SPY', 'SPDR S&P 500', MIN(date), MAX(date) FROM index_performance;
+        INSERT INTO stock_price_history (id, security_id, last_traded_price, market_cap, one_day_return, created_at)
+        SELECT uuid()::VARCHAR, 1, 500, 5e11, daily_return_percent * 0.9, date
+        FROM index_performance;
+    """)
+    count = connection.execute("SELECT COUNT(*) FROM index_performance").fetchone()[0]
+    connection.close()
+    return count
+
+
+async def run(args):
+    windows = [int(window) for window in args.windows.split(",")]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = str(Path(temp_dir) / "risk.db")
+        await MigrationRunner(db_path=db_path).run_migrations()
+        observations = load_series(db_path, args.years)
+        base_repository = BaseRepository(db_path=db_path)
+        service = AnalyticsService(AnalyticsRepository(base_repository))
+        codec = ColumnarCacheCodec()
+        print(f"{observations} observations, windows {windows}")
+
+        for benchmark in (None, "SPY"):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                analytics = await service.get_risk_analytics(date(1900, 1, 1), date(2100, 1, 1), windows, 0.02, benchmark)
+            computed_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+            payload = codec.encode(analytics.model_dump())
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                RiskAnalytics.model_validate(codec.decode(payload))
+            cached_ms = (time.perf_counter() - started) / args.repeat * 1000
+            label = benchmark or "market"
+            print(f"benchmark={label:6s} compute {computed_ms:7.1f} ms   cached {cached_ms:7.1f} ms   {len(payload) / 1024:7.1f} KiB")
+
+        base_repository.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--windows", default="21,63,252")
+    parser.add_argument("--repeat", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
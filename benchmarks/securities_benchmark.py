@@ -0,0 +1,134 @@
+"""
+Measure the securities dimension: file size and range scans before and after.
+
+Loads ``--years`` of daily rows for ``--symbols`` stocks into both
+stock_price_history and index_compositions under the schema as it was before
+011_create_securities_dimension.sql, measures, then applies the remaining
+migrations (the same path an existing database takes) and measures again.
+The scan is a per-symbol average return over the last ``--range-years``.
+
+    python benchmarks/securities_benchmark.py --years 20 --symbols 500
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from migrations.migration_runner import MigrationRunner
+
+LEGACY_SCAN_SQL = """
+SELECT company_symbol, AVG(CAST(one_day_return AS DOUBLE))
+FROM stock_price_history
+WHERE created_at >= ?
+GROUP BY company_symbol;
+"""
+
+ENCODED_SCAN_SQL = """
+SELECT securities.symbol, returns.average_return
+FROM (
+    SELECT security_id, AVG(CAST(one_day_return AS DOUBLE)) AS average_return
+    FROM stock_price_history
+    WHERE created_at >= ?
+    GROUP BY security_id
+) AS returns
+JOIN securities ON securities.security_id = returns.security_id;
+"""
+
+
+def load_legacy(db_path: str, years: int, symbols: int) -> int:
+    connection = duckdb.connect(db_path)
+    connection.execute(f"""
+        CREATE TEMP TABLE days AS
+        SELECT d::DATE AS d
+        FROM generate_series(TIMESTAMP '{2024 - years + 1}-01-01', TIMESTAMP '2024-12-31', INTERVAL 1 DAY) days(d)
+        WHERE dayofweek(d) BETWEEN 1 AND 5;
+        INSERT INTO stock_price_history (id, company_symbol, company_name, last_traded_price, market_cap, one_day_return, created_at)
+        SELECT uuid()::VARCHAR, 'SYM' || s, 'Company ' || s || ' Holdings Incorporated', 100,
+               1e9 * (s + 1), (random() - 0.5) * 4, d
+        FROM days, range({symbols}) symbols(s)
+        ORDER BY d, s;
+        INSERT INTO index_compositions (date, symbol, company_name, weight_percent, market_cap, price, return_percent)
+        SELECT d, 'SYM' || s, 'Company ' || s || ' Holdings Incorporated', 100.0 / {symbols}, 1e9 * (s + 1), 100,
+               (random() - 0.5) * 4
+        FROM days, range({symbols}) symbols(s)
+        ORDER BY d, s;
+        CHECKPOINT;
+    """)
+    count = connection.execute("SELECT COUNT(*) FROM stock_price_history").fetchone()[0]
+    connection.close()
+    return count
+
+
+def compact(db_path: str, temp_dir: str, label: str, tables) -> str:
+    """Copy the tables' data into a fresh file, so the sizes compare data and not freed blocks"""
+    compacted_path = str(Path(temp_dir) / f"{label}_compacted.db")
+    source = duckdb.connect(db_path, read_only=True)
+    connection = duckdb.connect(compacted_path)
+    for table in tables:
+        connection.from_arrow(source.execute(f"SELECT * FROM {table};").fetch_arrow_table()).create(table)
+    connection.close()
+    source.close()
+    return compacted_path
+
+
+def measure(db_path: str, label: str, scan_sql: str, args) -> None:
+    connection = duckdb.connect(db_path)
+    connection.execute("CHECKPOINT;")
+    since = f"{2024 - args.range_years + 1}-01-01"
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        connection.execute(scan_sql, [since]).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    connection.close()
+    print(
+        f"{label:8s} file {os.path.getsize(db_path) / 2 ** 20:8.1f} MiB   "
+        f"{args.range_years}-year scan median {statistics.median(timings):7.1f} ms"
+    )
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = str(Path(temp_dir) / "securities.db")
+        legacy_migrations = Path(temp_dir) / "legacy_migrations"
+        legacy_migrations.mkdir()
+        runner = MigrationRunner(db_path=db_path)
+        for migration in sorted(runner.migrations_dir.glob("*.sql")):
+            if migration.name < "011":
+                shutil.copy(migration, legacy_migrations)
+        runner.migrations_dir = legacy_migrations
+        await runner.run_migrations()
+
+        started = time.perf_counter()
+        rows = load_legacy(db_path, args.years, args.symbols)
+        print(f"loaded {rows} rows per table in {time.perf_counter() - started:.1f} s")
+        tables = ["stock_price_history", "index_compositions"]
+        measure(compact(db_path, temp_dir, "legacy", tables), "symbols", LEGACY_SCAN_SQL, args)
+
+        started = time.perf_counter()
+        await MigrationRunner(db_path=db_path).run_migrations()
+        print(f"encoded in {time.perf_counter() - started:.1f} s")
+        tables = ["securities", "stock_price_history", "index_compositions"]
+        measure(compact(db_path, temp_dir, "encoded", tables), "ids", ENCODED_SCAN_SQL, args)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--range-years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
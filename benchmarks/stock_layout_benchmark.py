@@ -0,0 +1,128 @@
+"""
+Compare stock_price_history layouts: ART indexes vs zone-map clustering.
+
+Loads ``--years`` of daily data for ``--symbols`` stocks (10M rows by default)
+in arrival order, with no useful physical order inside a day, into two
+databases. The first gets the ART indexes on created_at and the security
+(company_symbol before the securities dimension) that the schema used to create (the one on market_cap cannot coexist with the
+upserting loader at all); the second is clustered by the maintenance task
+into (created_at, market_cap DESC) order. Both then ingest
+``--days`` new daily batches through the staged loader and answer the top-N
+query for random dates, the way get_stocks_by_date runs it.
+
+    python benchmarks/stock_layout_benchmark.py --years 10 --symbols 4000 --days 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from migrations.migration_runner import MigrationRunner
+from src.models.stock_price_history import StockPriceHistoryCreate
+from src.repositories.base_repository import BaseRepository
+from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
+
+LEGACY_INDEXES = [
+    "CREATE INDEX idx_stock_date ON stock_price_history(created_at);",
+    "CREATE INDEX idx_stock_symbol ON stock_price_history(security_id);",
+]
+
+
+def load_stocks(db_path: str, years: int, symbols: int) -> int:
+    connection = duckdb.connect(db_path)
+    connection.execute(f"""
+        INSERT INTO securities (security_id, symbol, name, valid_from, valid_to)
+        SELECT s + 1, 'SYM' || s, 'Company ' || s, DATE '{2024 - years + 1}-01-01', DATE '2024-12-31'
+        FROM range({symbols}) symbols(s);
+        INSERT INTO stock_price_history (id, security_id, last_traded_price, market_cap, one_day_return, created_at)
+        SELECT uuid()::VARCHAR, s + 1, 100, 1e9 * (s + 1) * (0.8 + random() * 0.4),
+               (random() - 0.5) * 4, d::DATE
+        FROM generate_series(TIMESTAMP '{2024 - years + 1}-01-01', TIMESTAMP '2024-12-31', INTERVAL 1 DAY) days(d),
+             range({symbols}) symbols(s)
+        WHERE dayofweek(d) BETWEEN 1 AND 5
+        ORDER BY d, hash(s, d);
+    """)
+    count = connection.execute("SELECT COUNT(*) FROM stock_price_history").fetchone()[0]
+    connection.close()
+    return count
+
+
+def daily_batch(target_date: date, symbols: int):
+    return [
+        StockPriceHistoryCreate(
+            company_symbol=f"SYM{s}", company_name=f"Company {s}", last_traded_price=100.0,
+            market_cap=1e9 * (s + 1) * (0.8 + random.random() * 0.4), one_day_return=(random.random() - 0.5) * 4,
+            created_at=target_date
+        )
+        for s in random.sample(range(symbols), symbols)
+    ]
+
+
+async def measure(db_path: str, layout: str, args) -> None:
+    base_repository = BaseRepository(db_path=db_path)
+    repository = StockPriceHistoryRepository(base_repository)
+
+    started = time.perf_counter()
+    if layout == "indexed":
+        for statement in LEGACY_INDEXES:
+            base_repository.connection.execute(statement)
+    else:
+        await repository.cluster_stock_price_history()
+    prepare_s = time.perf_counter() - started
+
+    new_dates = [date(2025, 1, 1) + timedelta(days=day) for day in range(args.days)]
+    batches = [daily_batch(target_date, args.symbols) for target_date in new_dates]
+    started = time.perf_counter()
+    for batch in batches:
+        await repository.bulk_insert_stock_data(batch)
+    ingest_ms = (time.perf_counter() - started) * 1000 / args.days
+
+    stored_dates = await repository.get_available_dates()
+    timings = []
+    for target_date in random.sample(stored_dates, min(args.queries, len(stored_dates))):
+        started = time.perf_counter()
+        await repository.get_stocks_by_date(target_date, args.top_n)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print(
+        f"{layout:9s} {'indexes' if layout == 'indexed' else 'cluster'} {prepare_s:6.1f} s   "
+        f"ingest {ingest_ms:7.1f} ms/day   top-{args.top_n} median {statistics.median(timings):6.2f} ms   "
+        f"p95 {statistics.quantiles(timings, n=20)[-1]:6.2f} ms"
+    )
+    base_repository.close()
+
+
+async def run(args):
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for layout in ("indexed", "clustered"):
+            db_path = str(Path(temp_dir) / f"{layout}.db")
+            await MigrationRunner(db_path=db_path).run_migrations()
+            started = time.perf_counter()
+            rows = load_stocks(db_path, args.years, args.symbols)
+            print(f"{layout:9s} loaded {rows} rows in {time.perf_counter() - started:.1f} s")
+            await measure(db_path, layout, args)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--symbols", type=int, default=4000)
+    parser.add_argument("--days", type=int, default=20, help="daily batches ingested after the load")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-n", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,210 @@
+"""
+Dependency container.
 
+Every component is a module attribute built on first access (PEP 562
+``__getattr__``) and cached in the module from then on, so ``import container``
+opens no database, constructs no client and imports none of the application
+modules. ``from container import index_controller`` builds the controller and
+only the components it depends on.
+"""
 import os
-from src.services.stock_history_service import StockHistoryService
-from src.services.index_service import IndexService
-from src.services.redis_service import RedisService
-from src.managers.index_data_dump_manager import IndexDataDumpManager
-from src.managers.index_manager import IndexManager
-from src.managers.build_index_manager import BuildIndexManager
-from src.controllers.index_controller import IndexController
-from src.scheduler.cron_scheduler import CronScheduler
-from src.services.data_source_service import DataSourceService
-from src.repositories.base_repository import BaseRepository
-from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
+import threading
+from src.constants import APP_ROLE_STANDALONE, APP_ROLE_WRITER, APP_ROLE_READER, APP_ROLES
 
 # Get database path - use test database if in test environment
 db_path = os.getenv("DUCKDB_PATH", "data/hedgineer.db")
 if "pytest" in os.getenv("_", "") or os.getenv("TESTING"):
     db_path = "data/test_hedgineer.db"
 
-# Initialize base repository with connection
-base_repository = BaseRepository(db_path=db_path)
-
-# Initialize services and repositories
-data_source_service = DataSourceService()
-redis_service = RedisService()
-stock_price_history_repository = StockPriceHistoryRepository(base_repository)
-stock_history_service = StockHistoryService(
-    data_source_service=data_source_service,
-    repository=stock_price_history_repository
-)
-index_service = IndexService(repository=stock_price_history_repository)
-build_index_manager = BuildIndexManager(index_service, stock_history_service)
-index_manager = IndexManager(index_service, redis_service)
-index_data_dump_manager = IndexDataDumpManager(stock_history_service)
-index_controller = IndexController(index_manager, build_index_manager)
-cron_scheduler = CronScheduler(index_data_dump_manager, build_index_manager)
+app_role = os.getenv("APP_ROLE", APP_ROLE_STANDALONE)
+if app_role not in APP_ROLES:
+    raise ValueError(f"APP_ROLE must be one of {', '.join(APP_ROLES)}, got {app_role!r}")
+
+# "redis" when several replicas share one Redis, so only the lease holder runs scheduled work
+scheduler_lease = os.getenv("SCHEDULER_LEASE", "none")
+if scheduler_lease not in ("none", "redis"):
+    raise ValueError(f"SCHEDULER_LEASE must be none or redis, got {scheduler_lease!r}")
+
+_providers = {}
+# Re-entrant: building a component resolves its dependencies
+_build_lock = threading.RLock()
+
+
+def _provides(name):
+    def register(build):
+        _providers[name] = build
+        return build
+    return register
+
+
+def __getattr__(name):
+    if name not in _providers:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _build_lock:
+        if name not in globals():
+            globals()[name] = _providers[name]()
+    return globals()[name]
+
+
+# Repositories
+
+@_provides("base_repository")
+def _base_repository():
+    from src.repositories.base_repository import BaseRepository
+    return BaseRepository(db_path=db_path, read_only=app_role == APP_ROLE_READER)
+
+
+@_provides("stock_price_history_repository")
+def _stock_price_history_repository():
+    from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
+    return StockPriceHistoryRepository(__getattr__("base_repository"))
+
+
+@_provides("job_repository")
+def _job_repository():
+    from src.repositories.job_repository import JobRepository
+    return JobRepository(__getattr__("base_repository"))
+
+
+@_provides("analytics_repository")
+def _analytics_repository():
+    from src.repositories.analytics_repository import AnalyticsRepository
+    return AnalyticsRepository(__getattr__("base_repository"))
+
+
+@_provides("index_variant_repository")
+def _index_variant_repository():
+    from src.repositories.index_variant_repository import IndexVariantRepository
+    return IndexVariantRepository(__getattr__("base_repository"))
+
+
+# Services
+
+@_provides("data_source_service")
+def _data_source_service():
+    from src.services.data_source_service import DataSourceService
+    return DataSourceService()
+
+
+@_provides("redis_service")
+def _redis_service():
+    from src.services.redis_service import RedisService
+    return RedisService()
+
+
+@_provides("leader_lease")
+def _leader_lease():
+    from src.services.leader_lease import LeaderLease
+    return LeaderLease(__getattr__("redis_service"))
+
+
+@_provides("stock_history_service")
+def _stock_history_service():
+    from src.services.stock_history_service import StockHistoryService
+    return StockHistoryService(
+        data_source_service=__getattr__("data_source_service"),
+        repository=__getattr__("stock_price_history_repository")
+    )
+
+
+@_provides("index_service")
+def _index_service():
+    from src.services.index_service import IndexService
+    return IndexService(repository=__getattr__("stock_price_history_repository"))
+
+
+@_provides("analytics_service")
+def _analytics_service():
+    from src.services.analytics_service import AnalyticsService
+    return AnalyticsService(repository=__getattr__("analytics_repository"))
+
+
+@_provides("index_variant_service")
+def _index_variant_service():
+    from src.services.index_variant_service import IndexVariantService
+    return IndexVariantService(repository=__getattr__("index_variant_repository"))
+
+
+# Managers
+
+@_provides("build_index_manager")
+def _build_index_manager():
+    from src.managers.build_index_manager import BuildIndexManager
+    return BuildIndexManager(
+        __getattr__("index_service"), __getattr__("stock_history_service"), __getattr__("index_variant_service")
+    )
+
+
+@_provides("index_manager")
+def _index_manager():
+    from src.managers.index_manager import IndexManager
+    return IndexManager(__getattr__("index_service"), __getattr__("redis_service"))
+
+
+@_provides("analytics_manager")
+def _analytics_manager():
+    from src.managers.analytics_manager import AnalyticsManager
+    return AnalyticsManager(__getattr__("analytics_service"), __getattr__("redis_service"))
+
+
+@_provides("index_variant_manager")
+def _index_variant_manager():
+    from src.managers.index_variant_manager import IndexVariantManager
+    return IndexVariantManager(__getattr__("index_variant_service"), __getattr__("redis_service"))
+
+
+@_provides("index_data_dump_manager")
+def _index_data_dump_manager():
+    from src.managers.index_data_dump_manager import IndexDataDumpManager
+    return IndexDataDumpManager(__getattr__("stock_history_service"), __getattr__("index_variant_service"))
+
+
+@_provides("snapshot_manager")
+def _snapshot_manager():
+    from src.managers.snapshot_manager import SnapshotManager
+    return SnapshotManager(__getattr__("index_service"))
+
+
+@_provides("job_manager")
+def _job_manager():
+    from src.managers.job_manager import JobManager
+    return JobManager(
+        __getattr__("job_repository"), __getattr__("build_index_manager"), __getattr__("index_data_dump_manager"),
+        index_service=__getattr__("index_service")
+    )
+
+
+# Controllers and scheduler
+
+@_provides("index_controller")
+def _index_controller():
+    from src.controllers.index_controller import IndexController
+    return IndexController(__getattr__("index_manager"), __getattr__("build_index_manager"))
+
+
+@_provides("job_controller")
+def _job_controller():
+    from src.controllers.job_controller import JobController
+    return JobController(__getattr__("job_manager"))
+
+
+@_provides("analytics_controller")
+def _analytics_controller():
+    from src.controllers.analytics_controller import AnalyticsController
+    return AnalyticsController(__getattr__("analytics_manager"))
+
+
+@_provides("index_variant_controller")
+def _index_variant_controller():
+    from src.controllers.index_variant_controller import IndexVariantController
+    return IndexVariantController(__getattr__("index_variant_manager"))
+
+
+@_provides("cron_scheduler")
+def _cron_scheduler():
+    from src.scheduler.cron_scheduler import CronScheduler
+    return CronScheduler(
+        __getattr__("index_data_dump_manager"), __getattr__("job_manager"),
+        snapshot_manager=__getattr__("snapshot_manager") if app_role == APP_ROLE_WRITER else None,
+        lease=__getattr__("leader_lease") if scheduler_lease == "redis" else None
+    )
@@ -1,10 +1,10 @@
-import uvicorn
 import logging
 import sys
 from pathlib import Path
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from container import index_controller, cron_scheduler
+import container
+from src.constants import APP_ROLE_READER
 
 sys.path.append(str(Path(__file__).parent / "migrations"))
 from migrations.migration_runner import run_migrations
@@ -17,10 +17,17 @@ logging.basicConfig(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await run_migrations()
-    await cron_scheduler.start()
+    if container.app_role == APP_ROLE_READER:
+        # Readers only serve the writer's snapshots: no migrations, jobs or schedules
+        yield
+        return
+    # Migrate through the application's connection rather than opening a second one
+    await run_migrations(container.base_repository.connection)
+    await container.job_manager.start()
+    await container.cron_scheduler.start()
     yield
-    await cron_scheduler.stop()
+    await container.cron_scheduler.stop()
+    await container.job_manager.stop()
 
 
 app = FastAPI(
@@ -30,9 +37,20 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-index_controller.register_routes(app)
+# Readers serve the writer's snapshots, so they register only the routes that read: the job,
+# build and definition routes exist only on the writer. Read-only POSTs such as /export-data stay.
+writes = container.app_role != APP_ROLE_READER
+
+# Controllers are built here; the database, clients and scheduler stay unopened until first use
+container.index_controller.register_routes(app, include_writes=writes)
+if writes:
+    container.job_controller.register_routes(app)
+container.analytics_controller.register_routes(app)
+container.index_variant_controller.register_routes(app, include_writes=writes)
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
@@ -35,9 +35,8 @@ CREATE TABLE IF NOT EXISTS index_performance (
 );
 
 -- Create indexes for performance optimization
-CREATE INDEX IF NOT EXISTS idx_stock_date ON stock_price_history(created_at);
-CREATE INDEX IF NOT EXISTS idx_stock_symbol ON stock_price_history(company_symbol);
-CREATE INDEX IF NOT EXISTS idx_market_cap ON stock_price_history(market_cap);
+-- stock_price_history has none beyond its keys: it is kept in (created_at,
+-- market_cap DESC) order and relies on zone maps (see 010_cluster_stock_price_history.sql)
 
 CREATE INDEX IF NOT EXISTS idx_compositions_date ON index_compositions(date);
 CREATE INDEX IF NOT EXISTS idx_compositions_symbol ON index_compositions(symbol);
@@ -0,0 +1,8 @@
+-- Single-row counter bumped on every write to the index tables; used for ETags and cache keys
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO data_version (id, version) VALUES (1, 0) ON CONFLICT DO NOTHING;
@@ -0,0 +1,18 @@
+-- Create jobs table for queued build/backfill work and its progress
+CREATE TABLE IF NOT EXISTS jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    job_type VARCHAR(30) NOT NULL,
+    dedupe_key VARCHAR(100) NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    phase VARCHAR(30),
+    dates_total INTEGER NOT NULL DEFAULT 0,
+    dates_done INTEGER NOT NULL DEFAULT 0,
+    rows_written BIGINT NOT NULL DEFAULT 0,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    error_message VARCHAR,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
@@ -0,0 +1,19 @@
+-- Per-symbol projection of stock data and index membership, rebuilt in (symbol, date) order
+-- so a single symbol's multi-year history is a contiguous range of row groups
+CREATE TABLE IF NOT EXISTS constituent_history (
+    symbol VARCHAR(30) NOT NULL,
+    date DATE NOT NULL,
+    company_name VARCHAR(100) NOT NULL,
+    price DOUBLE NOT NULL,
+    market_cap DOUBLE NOT NULL,
+    one_day_return DOUBLE,
+    in_index BOOLEAN NOT NULL,
+    weight_percent DOUBLE
+);
+
+-- Data version each derived projection was last rebuilt from
+CREATE TABLE IF NOT EXISTS projection_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    data_version BIGINT NOT NULL,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
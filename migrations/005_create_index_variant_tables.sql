@@ -0,0 +1,38 @@
+-- Index definitions as data: each row is one variant built by the shared-scan engine
+CREATE TABLE IF NOT EXISTS index_definitions (
+    index_id VARCHAR(50) PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    top_n INTEGER NOT NULL,
+    weighting VARCHAR(20) NOT NULL,
+    rebalance VARCHAR(20) NOT NULL,
+    base_value DOUBLE NOT NULL DEFAULT 1000.0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO index_definitions (index_id, name, top_n, weighting, rebalance) VALUES
+    ('equal_top50_daily', 'Top 50 Equal Weight', 50, 'equal', 'daily'),
+    ('equal_top100_daily', 'Top 100 Equal Weight', 100, 'equal', 'daily'),
+    ('equal_top100_monthly', 'Top 100 Equal Weight, Monthly Rebalance', 100, 'equal', 'monthly'),
+    ('market_cap_top500_daily', 'Top 500 Market Cap Weight', 500, 'market_cap', 'daily')
+ON CONFLICT DO NOTHING;
+
+-- Compositions and performance of every variant, keyed by index_id
+CREATE TABLE IF NOT EXISTS index_variant_compositions (
+    index_id VARCHAR(50) NOT NULL,
+    date DATE NOT NULL,
+    symbol VARCHAR(30) NOT NULL,
+    company_name VARCHAR(100) NOT NULL,
+    weight_percent DOUBLE NOT NULL,
+    market_cap DOUBLE NOT NULL,
+    price DOUBLE NOT NULL,
+    return_percent DOUBLE
+);
+
+CREATE TABLE IF NOT EXISTS index_variant_performance (
+    index_id VARCHAR(50) NOT NULL,
+    date DATE NOT NULL,
+    daily_return_percent DOUBLE NOT NULL,
+    cumulative_return_percent DOUBLE NOT NULL,
+    index_value DOUBLE NOT NULL,
+    companies_count INTEGER NOT NULL
+);
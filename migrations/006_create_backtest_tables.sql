@@ -0,0 +1,32 @@
+-- One row per backtest run over a parameter grid
+CREATE TABLE IF NOT EXISTS backtest_runs (
+    run_id VARCHAR(36) PRIMARY KEY,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    symbols_count INTEGER NOT NULL,
+    days_count INTEGER NOT NULL,
+    cost_bps DOUBLE NOT NULL,
+    variants_count INTEGER NOT NULL,
+    workers INTEGER NOT NULL,
+    elapsed_seconds DOUBLE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- One row per parameterization evaluated in a run
+CREATE TABLE IF NOT EXISTS backtest_results (
+    run_id VARCHAR(36) NOT NULL,
+    top_n INTEGER NOT NULL,
+    rebalance VARCHAR(20) NOT NULL,
+    buffer INTEGER NOT NULL,
+    turnover_cap_percent DOUBLE,
+    total_return_percent DOUBLE NOT NULL,
+    annualized_return_percent DOUBLE NOT NULL,
+    annualized_volatility_percent DOUBLE,
+    sharpe_ratio DOUBLE,
+    max_drawdown_percent DOUBLE NOT NULL,
+    average_turnover_percent DOUBLE NOT NULL,
+    annual_turnover_percent DOUBLE NOT NULL,
+    total_cost_percent DOUBLE NOT NULL,
+    rebalance_count INTEGER NOT NULL,
+    final_index_value DOUBLE NOT NULL
+);
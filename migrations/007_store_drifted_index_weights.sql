@@ -0,0 +1,9 @@
+-- Drifted weights need more precision than DECIMAL(5, 3). DuckDB cannot alter a
+-- column while indexes depend on its table, so they are dropped and recreated.
+DROP INDEX IF EXISTS idx_compositions_date;
+DROP INDEX IF EXISTS idx_compositions_symbol;
+
+ALTER TABLE index_compositions ALTER COLUMN weight_percent TYPE DOUBLE;
+
+CREATE INDEX IF NOT EXISTS idx_compositions_date ON index_compositions(date);
+CREATE INDEX IF NOT EXISTS idx_compositions_symbol ON index_compositions(symbol);
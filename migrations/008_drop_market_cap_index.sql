@@ -0,0 +1,6 @@
+-- Ingestion replaces a day by updating stored rows in place (see
+-- src/repositories/staging.py). DuckDB rewrites an updated row whose columns
+-- are indexed as a delete and insert, which its unique constraints reject
+-- inside one transaction, and the market cap index never served a query:
+-- ART indexes are only used for point lookups, not for ORDER BY market_cap.
+DROP INDEX IF EXISTS idx_market_cap;
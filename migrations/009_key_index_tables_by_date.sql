@@ -0,0 +1,58 @@
+-- Key index_compositions by (date, symbol) and index_performance by date, with
+-- compact integer surrogate ids from sequences instead of random VARCHAR(36)
+-- UUIDs, so writes can upsert with INSERT ... ON CONFLICT. DuckDB cannot add
+-- a primary key to an existing table, so each table is rebuilt and renamed.
+-- The runner applies this file once, recorded with its checksum. Ids that are
+-- already integers are carried over, so a rebuild over keyed tables would
+-- leave the data unchanged. The primary keys replace the separate date and
+-- symbol indexes.
+CREATE SEQUENCE IF NOT EXISTS index_compositions_id_seq;
+CREATE SEQUENCE IF NOT EXISTS index_performance_id_seq;
+
+DROP TABLE IF EXISTS index_compositions_keyed;
+CREATE TABLE index_compositions_keyed (
+    id BIGINT NOT NULL DEFAULT nextval('index_compositions_id_seq'),
+    date DATE NOT NULL,
+    symbol VARCHAR(30) NOT NULL,
+    company_name VARCHAR(100) NOT NULL,
+    weight_percent DOUBLE NOT NULL,
+    market_cap DECIMAL(20, 2) NOT NULL,
+    price DECIMAL(18, 8) NOT NULL,
+    return_percent DECIMAL(10, 4),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date, symbol)
+);
+
+INSERT INTO index_compositions_keyed
+SELECT COALESCE(TRY_CAST(id AS BIGINT), nextval('index_compositions_id_seq')),
+       date, symbol, company_name, weight_percent, market_cap, price, return_percent, created_at
+FROM index_compositions
+ORDER BY date, symbol
+ON CONFLICT DO NOTHING;
+
+DROP INDEX IF EXISTS idx_compositions_date;
+DROP INDEX IF EXISTS idx_compositions_symbol;
+DROP TABLE index_compositions;
+ALTER TABLE index_compositions_keyed RENAME TO index_compositions;
+
+DROP TABLE IF EXISTS index_performance_keyed;
+CREATE TABLE index_performance_keyed (
+    id BIGINT NOT NULL DEFAULT nextval('index_performance_id_seq'),
+    date DATE NOT NULL PRIMARY KEY,
+    daily_return_percent DECIMAL(10, 4) NOT NULL,
+    cumulative_return_percent DECIMAL(10, 4) NOT NULL,
+    index_value DECIMAL(18, 8) NOT NULL,
+    companies_count INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO index_performance_keyed
+SELECT COALESCE(TRY_CAST(id AS BIGINT), nextval('index_performance_id_seq')),
+       date, daily_return_percent, cumulative_return_percent, index_value, companies_count, created_at
+FROM index_performance
+ORDER BY date
+ON CONFLICT DO NOTHING;
+
+DROP INDEX IF EXISTS idx_performance_date;
+DROP TABLE index_performance;
+ALTER TABLE index_performance_keyed RENAME TO index_performance;
@@ -0,0 +1,10 @@
+-- stock_price_history is kept physically ordered by (created_at, market_cap
+-- DESC): ingestion inserts each batch in that order and a weekly maintenance
+-- task rewrites the table when updates or out-of-order backfills disturb it.
+-- DuckDB's per-row-group min/max statistics (zone maps) then skip every other
+-- day for the dominant "WHERE created_at = ? ORDER BY market_cap DESC LIMIT N"
+-- query. The ART indexes on created_at and company_symbol only slowed every
+-- insert and are dropped; databases created before 001 stopped creating them
+-- still have them.
+DROP INDEX IF EXISTS idx_stock_date;
+DROP INDEX IF EXISTS idx_stock_symbol;
@@ -0,0 +1,68 @@
+-- Dictionary-encode symbols and company names. Each distinct (symbol, name)
+-- pair is one security with a compact integer id, and valid_from/valid_to
+-- record the first and last date it was seen, so a renamed company or a
+-- reused ticker becomes a new security without rewriting history. The fact
+-- tables keep only security_id; reads map ids back through an in-process
+-- cache (src/repositories/securities.py) or join this small table.
+CREATE SEQUENCE IF NOT EXISTS securities_id_seq;
+
+CREATE TABLE IF NOT EXISTS securities (
+    security_id INTEGER PRIMARY KEY DEFAULT nextval('securities_id_seq'),
+    symbol VARCHAR(30) NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    valid_from DATE NOT NULL,
+    valid_to DATE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (symbol, name)
+);
+
+INSERT INTO securities (symbol, name, valid_from, valid_to)
+SELECT symbol, name, MIN(date), MAX(date)
+FROM (
+    SELECT company_symbol AS symbol, company_name AS name, created_at AS date FROM stock_price_history
+    UNION ALL
+    SELECT symbol, company_name AS name, date FROM index_compositions
+)
+GROUP BY symbol, name
+ORDER BY symbol, MIN(date);
+
+CREATE TABLE stock_price_history_encoded (
+    id VARCHAR(36) PRIMARY KEY,
+    security_id INTEGER NOT NULL,
+    last_traded_price DECIMAL(18, 8) NOT NULL,
+    market_cap DECIMAL(20, 2) NOT NULL,
+    one_day_return DECIMAL(10, 4),
+    created_at DATE NOT NULL,
+    UNIQUE (security_id, created_at)
+);
+
+INSERT INTO stock_price_history_encoded
+SELECT stocks.id, securities.security_id, stocks.last_traded_price, stocks.market_cap, stocks.one_day_return, stocks.created_at
+FROM stock_price_history AS stocks
+JOIN securities ON securities.symbol = stocks.company_symbol AND securities.name = stocks.company_name
+ORDER BY stocks.created_at, stocks.market_cap DESC;
+
+DROP TABLE stock_price_history;
+ALTER TABLE stock_price_history_encoded RENAME TO stock_price_history;
+
+CREATE TABLE index_compositions_encoded (
+    id BIGINT NOT NULL DEFAULT nextval('index_compositions_id_seq'),
+    date DATE NOT NULL,
+    security_id INTEGER NOT NULL,
+    weight_percent DOUBLE NOT NULL,
+    market_cap DECIMAL(20, 2) NOT NULL,
+    price DECIMAL(18, 8) NOT NULL,
+    return_percent DECIMAL(10, 4),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date, security_id)
+);
+
+INSERT INTO index_compositions_encoded
+SELECT compositions.id, compositions.date, securities.security_id, compositions.weight_percent,
+       compositions.market_cap, compositions.price, compositions.return_percent, compositions.created_at
+FROM index_compositions AS compositions
+JOIN securities ON securities.symbol = compositions.symbol AND securities.name = compositions.company_name
+ORDER BY compositions.date, securities.security_id;
+
+DROP TABLE index_compositions;
+ALTER TABLE index_compositions_encoded RENAME TO index_compositions;
@@ -0,0 +1,18 @@
+-- Closed months moved out of stock_price_history and index_compositions into
+-- the Parquet archive (src/repositories/archive.py), one file per table and
+-- month; path is relative to the archive directory.
+CREATE TABLE IF NOT EXISTS archived_partitions (
+    table_name VARCHAR(50) NOT NULL,
+    month DATE NOT NULL,
+    path VARCHAR NOT NULL,
+    rows_archived BIGINT NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (table_name, month)
+);
+
+-- Hot and archived rows together; redefined over the archive's files whenever a month is archived
+CREATE VIEW IF NOT EXISTS stock_price_history_all AS
+SELECT id, security_id, last_traded_price, market_cap, one_day_return, created_at FROM stock_price_history;
+
+CREATE VIEW IF NOT EXISTS index_compositions_all AS
+SELECT id, date, security_id, weight_percent, market_cap, price, return_percent, created_at FROM index_compositions;
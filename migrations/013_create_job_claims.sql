@@ -0,0 +1,20 @@
+-- One row per job dedupe key, naming the latest job submitted for it. A
+-- submission moves the claim to its new job in the same transaction that
+-- inserts the job, and only while the job it names has finished. Two
+-- concurrent submissions of one range conflict on this row, so at most one
+-- job per key is ever queued or running.
+CREATE TABLE IF NOT EXISTS job_claims (
+    dedupe_key VARCHAR(100) PRIMARY KEY,
+    job_id VARCHAR(36) NOT NULL
+);
+
+INSERT INTO job_claims
+SELECT dedupe_key, id
+FROM (
+    SELECT dedupe_key, id,
+           ROW_NUMBER() OVER (
+               PARTITION BY dedupe_key ORDER BY status IN ('queued', 'running') DESC, created_at DESC
+           ) AS claim_rank
+    FROM jobs
+)
+WHERE claim_rank = 1;
@@ -0,0 +1,12 @@
+-- Largest scheduler lease token any fenced write has committed with. Staged
+-- swaps check and advance it in their own transaction, so a replica whose
+-- lease has passed to another cannot write after its successor has.
+CREATE TABLE IF NOT EXISTS scheduler_fencing_token (
+    id INTEGER PRIMARY KEY,
+    token BIGINT NOT NULL
+);
+
+INSERT INTO scheduler_fencing_token (id, token) VALUES (1, 0) ON CONFLICT DO NOTHING;
+
+-- The token a scheduled job was submitted under, carried into its writes
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS fencing_token BIGINT;
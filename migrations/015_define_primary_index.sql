@@ -0,0 +1,6 @@
+-- The primary index as a definition row: its size, weighting and rebalance
+-- frequency are read from here. It keeps its own composition and performance
+-- tables, so the variant engine does not build it.
+INSERT INTO index_definitions (index_id, name, top_n, weighting, rebalance)
+SELECT 'primary', 'Top 130 Equal Weight', 130, 'equal', 'daily'
+WHERE NOT EXISTS (SELECT 1 FROM index_definitions WHERE index_id = 'primary');
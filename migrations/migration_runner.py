@@ -1,63 +1,110 @@
 import os
 import asyncio
+import hashlib
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 import duckdb
 
+
+class MigrationChecksumError(Exception):
+    """An applied migration file was edited; add a new migration instead"""
+
+
 class MigrationRunner:
-    def __init__(self, db_path: str = None):
+    """
+    Applies each migration once, in filename order, in its own transaction.
+
+    Applied files are recorded in ``migrations`` with a SHA-256 of their
+    contents, so a start with nothing pending reads one small table and runs
+    no migration SQL, however many files there are. Editing an applied file
+    is refused rather than silently ignored. Rows recorded before checksums
+    existed take the file's current checksum on the first start.
+
+    Pass the application's ``connection`` to migrate through it; otherwise
+    the runner opens ``db_path`` itself and closes it when done.
+    """
+
+    def __init__(self, db_path: str = None, connection: Optional[duckdb.DuckDBPyConnection] = None):
         self.db_path = db_path or os.getenv("DUCKDB_PATH", "data/hedgineer.db")
         self.migrations_dir = Path(__file__).parent
-        self.connection = None
-        
+        self.connection = connection
+        self._owns_connection = connection is None
+
     def _setup_database(self):
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        self.connection = duckdb.connect(self.db_path)
-        
-        self.connection.execute("DROP TABLE IF EXISTS migrations")
+        if self._owns_connection:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self.connection = duckdb.connect(self.db_path)
+
         self.connection.execute("""
-            CREATE TABLE migrations (
+            CREATE TABLE IF NOT EXISTS migrations (
                 filename VARCHAR(255) NOT NULL UNIQUE,
                 executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
         """)
-    
+        self.connection.execute("ALTER TABLE migrations ADD COLUMN IF NOT EXISTS checksum VARCHAR(64);")
+
     def _get_pending_migrations(self) -> List[Path]:
-        try:
-            executed = self.connection.execute("SELECT filename FROM migrations").fetchall()
-            executed_files = [row[0] for row in executed]
-        except Exception:
-            executed_files = []
-            
-        return sorted([
-            f for f in self.migrations_dir.glob("*.sql") 
-            if f.name not in executed_files
-        ])
-    
-    def _execute_migration(self, migration_file: Path):
-        with open(migration_file, 'r') as f:
-            sql_content = f.read()
-        
-        self.connection.execute(sql_content)
-        self.connection.execute(
-            "INSERT INTO migrations (filename) VALUES (?)",
-            [migration_file.name]
+        applied: Dict[str, Optional[str]] = dict(
+            self.connection.execute("SELECT filename, checksum FROM migrations").fetchall()
         )
-    
-    async def run_migrations(self):
+        pending = []
+        for migration_file in sorted(self.migrations_dir.glob("*.sql")):
+            if migration_file.name not in applied:
+                pending.append(migration_file)
+                continue
+            checksum = _checksum(migration_file)
+            if applied[migration_file.name] is None:
+                self.connection.execute(
+                    "UPDATE migrations SET checksum = ? WHERE filename = ?", [checksum, migration_file.name]
+                )
+            elif applied[migration_file.name] != checksum:
+                raise MigrationChecksumError(
+                    f"{migration_file.name} changed after it was applied; add a new migration instead"
+                )
+        return pending
+
+    def _execute_migration(self, migration_file: Path):
+        sql_content = migration_file.read_text()
+
+        # Own cursor, so the migration's transaction is not shared with other users of the connection
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("BEGIN TRANSACTION;")
+            try:
+                cursor.execute(sql_content)
+                cursor.execute(
+                    "INSERT INTO migrations (filename, checksum) VALUES (?, ?)",
+                    [migration_file.name, _checksum(migration_file)]
+                )
+                cursor.execute("COMMIT;")
+            except Exception as e:
+                cursor.execute("ROLLBACK;")
+                raise Exception(f"Migration {migration_file.name} failed and was rolled back: {e}") from e
+        finally:
+            cursor.close()
+
+    async def run_migrations(self) -> List[str]:
+        """Apply every pending migration; returns the filenames applied"""
         try:
             self._setup_database()
             pending_migrations = self._get_pending_migrations()
-            
+
             for migration_file in pending_migrations:
                 await asyncio.to_thread(self._execute_migration, migration_file)
-                
+            return [migration_file.name for migration_file in pending_migrations]
+
         finally:
-            if self.connection:
+            if self._owns_connection and self.connection:
                 self.connection.close()
+                self.connection = None
+
+
+def _checksum(migration_file: Path) -> str:
+    return hashlib.sha256(migration_file.read_bytes()).hexdigest()
+
 
-async def run_migrations():
-    runner = MigrationRunner()
+async def run_migrations(connection: Optional[duckdb.DuckDBPyConnection] = None):
+    runner = MigrationRunner(connection=connection)
     await runner.run_migrations()
 
 if __name__ == "__main__":
@@ -2,15 +2,14 @@ import asyncio
 import requests
 from datetime import date, timedelta, datetime
 from typing import List, Dict, Any, Optional
-import pandas as pd
 import time
 from urllib3.exceptions import InsecureRequestWarning
 
-requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
-
 
 class YahooFinanceClient:
     def __init__(self):
+        # The session skips certificate verification; silence the warning once a client exists
+        requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
         self.session = requests.Session()
         self.session.verify = False
         self.session.headers.update({
@@ -28,6 +27,9 @@ class YahooFinanceClient:
     async def get_sp500_symbols(self) -> List[str]:
         def _fetch_sp500_symbols():
             try:
+                # pandas (and its HTML parser) is only needed for this page
+                import pandas as pd
+
                 url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
                 response = self.session.get(url)
                 tables = pd.read_html(response.content)
@@ -1,11 +1,40 @@
-TOP_COMPANIES_COUNT = 130  # Number of companies in equal-weight index
 DEFAULT_BACKFILL_DAYS = 30
-MARKET_CLOSED_WEEKENDS = [5, 6]
 DAILY_CRON_HOUR = 0
 DAILY_CRON_MINUTE = 5
+MAINTENANCE_CRON_DAY_OF_WEEK = "sat"
+MAINTENANCE_CRON_HOUR = 2
+ARCHIVE_HOT_MONTHS = 3  # Closed months kept in DuckDB before moving to the Parquet archive
+SNAPSHOT_PUBLISH_INTERVAL_SECONDS = 30  # How often the writer checks for a new data version to publish to readers
+APP_ROLE_STANDALONE = "standalone"  # One process serves the API and owns ingestion
+APP_ROLE_WRITER = "writer"  # Owns ingestion and builds, and publishes read-only snapshots
+APP_ROLE_READER = "reader"  # Serves reads from the latest published snapshot
+APP_ROLES = [APP_ROLE_STANDALONE, APP_ROLE_WRITER, APP_ROLE_READER]
+SCHEDULER_LEASE_TTL_SECONDS = 30  # A replica that stops renewing loses scheduled work to another after this long
+SCHEDULER_LEASE_RENEW_SECONDS = 10  # How often the leader renews, and followers try to take over
 MAX_COMPANY_SYMBOL_LENGTH = 30
 MAX_COMPANY_NAME_LENGTH = 100
 PRICE_DECIMAL_PLACES = 8
 MARKET_CAP_DECIMAL_PLACES = 2
 INDEX_BASE_VALUE = 1000.0
 WEEKDAY_TRADING_LIMIT = 5
+STREAM_CHUNK_SIZE = 10000
+JOB_TYPE_BUILD_INDEX = "build_index"
+JOB_TYPE_BACKFILL = "backfill"
+JOB_TYPE_MAINTENANCE = "maintenance"  # Archive closed months, then re-cluster the hot stock data
+MAX_BATCH_COMPOSITION_DATES = 366
+MIN_SOURCE_ROW_RATIO = 0.5  # Smallest share of the requested stocks any data source's fetch is accepted with
+MIN_RELOAD_ROW_RATIO = 0.5  # A reload with fewer than this share of a stored day's rows is rejected as truncated
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_RISK_WINDOWS = [21, 63, 252]
+MAX_RISK_WINDOW = 1260
+MARKET_BENCHMARK = "market"
+DEFAULT_ATTRIBUTION_LIMIT = 10
+MAX_ATTRIBUTION_LIMIT = 500
+DEFAULT_TURNOVER_WINDOW = 21
+MAX_TURNOVER_WINDOW = 252
+DEFAULT_REBALANCE_COST_BPS = 10.0
+DEFAULT_COVARIANCE_WINDOW = 63
+COVARIANCE_MATRIX_KINDS = ["correlation", "covariance"]
+PRIMARY_INDEX_ID = "primary"  # index_definitions row that defines the primary index
+CALENDAR_FIRST_YEAR = 1970
+CALENDAR_LAST_YEAR = 2100
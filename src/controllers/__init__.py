@@ -1,3 +1,6 @@
 from .index_controller import IndexController
+from .job_controller import JobController
+from .analytics_controller import AnalyticsController
+from .index_variant_controller import IndexVariantController
 
-__all__ = ["IndexController"]
+__all__ = ["IndexController", "JobController", "AnalyticsController", "IndexVariantController"]
@@ -0,0 +1,100 @@
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request, Response
+from src.managers.analytics_manager import AnalyticsManager
+from src.dtos.analytics_result import RiskAnalytics, ReturnAttribution
+from src.controllers.http_cache import not_modified_response
+from src.controllers.response_formats import MEDIA_TYPES, FORMAT_ARROW, require_pyarrow
+from src.constants import (
+    DEFAULT_RISK_WINDOWS, MAX_RISK_WINDOW, DEFAULT_ATTRIBUTION_LIMIT, MAX_ATTRIBUTION_LIMIT,
+    DEFAULT_COVARIANCE_WINDOW, COVARIANCE_MATRIX_KINDS
+)
+
+
+class AnalyticsController:
+    def __init__(self, analytics_manager: AnalyticsManager):
+        self.analytics_manager = analytics_manager
+        self.router = APIRouter(prefix="/analytics", tags=["Analytics"])
+        self._setup_routes()
+
+    def _setup_routes(self):
+        @self.router.get("/risk", response_model=RiskAnalytics)
+        async def get_risk_analytics(
+            request: Request,
+            response: Response,
+            start_date: date = Query(...),
+            end_date: date = Query(...),
+            windows: Optional[List[str]] = Query(None),
+            risk_free_rate: float = Query(0.0),
+            benchmark: Optional[str] = Query(None)
+        ):
+            window_sizes = self._parse_windows(windows)
+            benchmark_symbol = benchmark.upper() if benchmark else None
+            not_modified = await self._check_not_modified(
+                request, response, start_date, end_date, window_sizes, risk_free_rate, benchmark_symbol
+            )
+            if not_modified:
+                return not_modified
+
+            analytics = await self.analytics_manager.get_risk_analytics(
+                start_date, end_date, window_sizes, risk_free_rate, benchmark_symbol
+            )
+            if not analytics:
+                raise HTTPException(status_code=404, detail="No index performance in the requested range")
+            return analytics
+
+        @self.router.get("/attribution", response_model=ReturnAttribution)
+        async def get_return_attribution(
+            request: Request,
+            response: Response,
+            start_date: date = Query(...),
+            end_date: date = Query(...),
+            limit: int = Query(DEFAULT_ATTRIBUTION_LIMIT, ge=1, le=MAX_ATTRIBUTION_LIMIT)
+        ):
+            not_modified = await self._check_not_modified(request, response, start_date, end_date, limit)
+            if not_modified:
+                return not_modified
+
+            attribution = await self.analytics_manager.get_return_attribution(start_date, end_date, limit)
+            if not attribution:
+                raise HTTPException(status_code=404, detail="No index compositions in the requested range")
+            return attribution
+
+        @self.router.get("/correlation", response_class=Response)
+        async def get_correlation_matrix(
+            request: Request,
+            response: Response,
+            date: date = Query(...),
+            window: int = Query(DEFAULT_COVARIANCE_WINDOW, ge=2, le=MAX_RISK_WINDOW),
+            kind: str = Query(COVARIANCE_MATRIX_KINDS[0]),
+            min_periods: int = Query(2, ge=2)
+        ):
+            if kind not in COVARIANCE_MATRIX_KINDS:
+                raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(COVARIANCE_MATRIX_KINDS)}")
+            require_pyarrow()
+            not_modified = await self._check_not_modified(request, response, date, window, kind, min_periods)
+            if not_modified:
+                return not_modified
+
+            payload = await self.analytics_manager.get_covariance_matrix(date, window, kind, min_periods)
+            if not payload:
+                raise HTTPException(status_code=404, detail=f"No index composition for date: {date}")
+            return Response(content=payload, media_type=MEDIA_TYPES[FORMAT_ARROW], headers=dict(response.headers))
+
+    def _parse_windows(self, windows: Optional[List[str]]) -> List[int]:
+        if not windows:
+            return list(DEFAULT_RISK_WINDOWS)
+        try:
+            sizes = sorted({int(item) for value in windows for item in value.split(",") if item.strip()})
+        except ValueError:
+            raise HTTPException(status_code=400, detail="windows must be integers")
+        if not sizes or sizes[0] < 2 or sizes[-1] > MAX_RISK_WINDOW:
+            raise HTTPException(status_code=400, detail=f"windows must be between 2 and {MAX_RISK_WINDOW}")
+        return sizes
+
+    async def _check_not_modified(self, request: Request, response: Response, *params) -> Optional[Response]:
+        data_version = await self.analytics_manager.get_data_version()
+        return not_modified_response(request, response, data_version, *params)
+
+    def register_routes(self, app: FastAPI):
+        app.include_router(self.router)
@@ -0,0 +1,31 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+
+
+def make_etag(data_version: int, *parts) -> str:
+    """Strong ETag derived from the data version and the request parameters"""
+    raw = ":".join(str(part) for part in (data_version, *parts))
+    return f'"{hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def not_modified_response(request: Request, response: Response, data_version: int, *params) -> Optional[Response]:
+    """304 response when If-None-Match matches; otherwise tag ``response`` with validators"""
+    etag = make_etag(data_version, request.url.path, *params)
+    # Any day can be backfilled or rebuilt later, so caches always revalidate against the ETag
+    headers = {"ETag": etag, "Cache-Control": "public, no-cache", "Vary": "Accept"}
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return None
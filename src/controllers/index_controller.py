@@ -1,12 +1,17 @@
 from datetime import date
 from typing import Optional, List
-from fastapi import APIRouter, FastAPI, Query
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-import io
+from pydantic import BaseModel, Field
 from src.managers.index_manager import IndexManager
 from src.managers.build_index_manager import BuildIndexManager
-from src.dtos.index_result import IndexComposition, IndexPerformance, CompositionChange, IndexBuildResult
+from src.dtos.index_result import IndexComposition, IndexPerformance, CompositionChange, IndexBuildResult, ConstituentHistory, IndexTurnover
+from src.controllers.http_cache import not_modified_response
+from src.controllers.response_formats import negotiate_format, streaming_response, STREAMING_FORMATS
+from src.services.trading_calendar import nyse_calendar
+from src.constants import (
+    MAX_BATCH_COMPOSITION_DATES, DEFAULT_TURNOVER_WINDOW, MAX_TURNOVER_WINDOW, DEFAULT_REBALANCE_COST_BPS
+)
 
 
 class BuildIndexRequest(BaseModel):
@@ -17,6 +22,8 @@ class BuildIndexRequest(BaseModel):
 class ExportDataRequest(BaseModel):
     start_date: date
     end_date: Optional[date] = None
+    include_all_compositions: bool = False
+    cost_bps: float = Field(DEFAULT_REBALANCE_COST_BPS, ge=0)
 
 
 class IndexController:
@@ -24,37 +31,141 @@ class IndexController:
         self.index_manager = index_manager
         self.build_index_manager = build_index_manager
         self.router = APIRouter(tags=["Equal Weight Index"])
+        # Routes that write the database, registered only on processes that own it
+        self.write_router = APIRouter(tags=["Equal Weight Index"])
         self._setup_routes()
     
     def _setup_routes(self):
-        @self.router.post("/build-index", response_model=IndexBuildResult)
+        @self.write_router.post("/build-index", response_model=IndexBuildResult)
         async def build_index(request: BuildIndexRequest):
             return await self.build_index_manager.build_index(request.start_date, request.end_date)
         
         @self.router.get("/index-performance", response_model=List[IndexPerformance])
         async def get_index_performance(
+            request: Request,
+            response: Response,
             start_date: date = Query(...),
-            end_date: date = Query(...)
+            end_date: date = Query(...),
+            format: Optional[str] = Query(None)
         ):
+            response_format = negotiate_format(request.headers.get("accept"), format)
+            not_modified = await self._check_not_modified(request, response, start_date, end_date, response_format)
+            if not_modified:
+                return not_modified
+            if response_format in STREAMING_FORMATS:
+                stream = self.index_manager.stream_index_performance(start_date, end_date)
+                return streaming_response(stream, response_format, dict(response.headers))
             return await self.index_manager.get_index_performance(start_date, end_date)
         
         @self.router.get("/index-composition", response_model=List[IndexComposition])
-        async def get_index_composition(date: date = Query(...)):
+        async def get_index_composition(
+            request: Request,
+            response: Response,
+            date: date = Query(...),
+            format: Optional[str] = Query(None)
+        ):
+            response_format = negotiate_format(request.headers.get("accept"), format)
+            not_modified = await self._check_not_modified(request, response, date, response_format)
+            if not_modified:
+                return not_modified
+            if response_format in STREAMING_FORMATS:
+                stream = self.index_manager.stream_index_composition(date)
+                return streaming_response(stream, response_format, dict(response.headers))
             return await self.index_manager.get_index_composition(date)
         
+        @self.router.get("/index-compositions")
+        async def get_index_compositions(
+            request: Request,
+            response: Response,
+            start_date: Optional[date] = Query(None),
+            end_date: Optional[date] = Query(None),
+            dates: Optional[List[date]] = Query(None),
+            symbols: Optional[List[str]] = Query(None),
+            fields: Optional[List[str]] = Query(None)
+        ):
+            target_dates = self._resolve_batch_dates(start_date, end_date, dates)
+            symbol_filter = self._split_values(symbols)
+            selected_fields = self._resolve_fields(self._split_values(fields))
+            not_modified = await self._check_not_modified(
+                request, response, ",".join(map(str, target_dates)),
+                ",".join(symbol_filter), ",".join(selected_fields)
+            )
+            if not_modified:
+                return not_modified
+            
+            compositions_by_date = await self.index_manager.get_index_compositions(target_dates, symbol_filter)
+            return [
+                {field: getattr(composition, field) for field in selected_fields}
+                for compositions in compositions_by_date.values()
+                for composition in compositions
+            ]
+        
         @self.router.get("/composition-changes", response_model=List[CompositionChange])
         async def get_composition_changes(
+            request: Request,
+            response: Response,
             start_date: date = Query(...),
-            end_date: date = Query(...)
+            end_date: date = Query(...),
+            format: Optional[str] = Query(None)
         ):
+            response_format = negotiate_format(request.headers.get("accept"), format)
+            not_modified = await self._check_not_modified(request, response, start_date, end_date, response_format)
+            if not_modified:
+                return not_modified
+            if response_format in STREAMING_FORMATS:
+                stream = self.index_manager.stream_composition_changes(start_date, end_date)
+                return streaming_response(stream, response_format, dict(response.headers))
             return await self.index_manager.get_composition_changes(start_date, end_date)
         
+        @self.router.get("/turnover", response_model=IndexTurnover)
+        async def get_turnover(
+            request: Request,
+            response: Response,
+            start_date: date = Query(...),
+            end_date: date = Query(...),
+            window: int = Query(DEFAULT_TURNOVER_WINDOW, ge=1, le=MAX_TURNOVER_WINDOW),
+            cost_bps: float = Query(DEFAULT_REBALANCE_COST_BPS, ge=0),
+            format: Optional[str] = Query(None)
+        ):
+            response_format = negotiate_format(request.headers.get("accept"), format)
+            not_modified = await self._check_not_modified(
+                request, response, start_date, end_date, window, cost_bps, response_format
+            )
+            if not_modified:
+                return not_modified
+            if response_format in STREAMING_FORMATS:
+                stream = self.index_manager.stream_turnover(start_date, end_date, cost_bps, window)
+                return streaming_response(stream, response_format, dict(response.headers))
+            turnover = await self.index_manager.get_turnover(start_date, end_date, cost_bps, window)
+            if not turnover:
+                raise HTTPException(status_code=404, detail="No index compositions in the requested range")
+            return turnover
+        
+        @self.router.get("/constituents/{symbol}/history", response_model=ConstituentHistory)
+        async def get_constituent_history(
+            request: Request,
+            response: Response,
+            symbol: str,
+            start_date: Optional[date] = Query(None),
+            end_date: Optional[date] = Query(None)
+        ):
+            not_modified = await self._check_not_modified(
+                request, response, start_date, end_date
+            )
+            if not_modified:
+                return not_modified
+            history = await self.index_manager.get_constituent_history(symbol, start_date, end_date)
+            if not history:
+                raise HTTPException(status_code=404, detail=f"No history for symbol: {symbol.upper()}")
+            return history
+        
         @self.router.post("/export-data")
         async def export_data(request: ExportDataRequest):
-            excel_buffer = await self.index_manager.export_to_excel(request.start_date, request.end_date)
-            excel_buffer.seek(0)
+            workbook = await self.index_manager.export_to_excel(
+                request.start_date, request.end_date, request.include_all_compositions, request.cost_bps
+            )
             return StreamingResponse(
-                io.BytesIO(excel_buffer.read()),
+                workbook,
                 media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 headers={"Content-Disposition": f"attachment; filename=index_data_{request.start_date}_{request.end_date or request.start_date}.xlsx"}
             )
@@ -62,7 +173,49 @@ class IndexController:
         @self.router.get("/health")
         async def health_check():
             return {"status": "healthy", "service": "hedgineer-equal-weight-stock"}
+    
+    def _resolve_batch_dates(
+        self, start_date: Optional[date], end_date: Optional[date], dates: Optional[List[date]]
+    ) -> List[date]:
+        if dates and (start_date or end_date):
+            raise HTTPException(status_code=400, detail="Pass either dates or start_date/end_date, not both")
+        if dates:
+            target_dates = sorted(set(dates))
+        elif start_date and end_date:
+            if end_date < start_date:
+                raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+            try:
+                target_dates = nyse_calendar().trading_days(start_date, end_date)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        else:
+            raise HTTPException(status_code=400, detail="Pass dates or both start_date and end_date")
         
+        if not target_dates:
+            raise HTTPException(status_code=400, detail="No trading days in the requested dates")
+        if len(target_dates) > MAX_BATCH_COMPOSITION_DATES:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_COMPOSITION_DATES} dates per request")
+        return target_dates
+    
+    def _resolve_fields(self, fields: List[str]) -> List[str]:
+        available = list(IndexComposition.model_fields.keys())
+        if not fields:
+            return available
+        unknown = [field for field in fields if field not in available]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        # Rows always carry their date so a multi-date response stays attributable
+        return ["date"] + [field for field in available if field in fields and field != "date"]
+    
+    def _split_values(self, values: Optional[List[str]]) -> List[str]:
+        # Accept both repeated parameters and comma-separated lists
+        return [item.strip() for value in values or [] for item in value.split(",") if item.strip()]
+    
+    async def _check_not_modified(self, request: Request, response: Response, *params) -> Optional[Response]:
+        data_version = await self.index_manager.get_data_version()
+        return not_modified_response(request, response, data_version, *params)
     
-    def register_routes(self, app: FastAPI):
+    def register_routes(self, app: FastAPI, include_writes: bool = True):
         app.include_router(self.router)
+        if include_writes:
+            app.include_router(self.write_router)
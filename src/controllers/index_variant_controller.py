@@ -0,0 +1,89 @@
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request, Response
+from pydantic import BaseModel
+from src.managers.index_variant_manager import IndexVariantManager
+from src.dtos.index_definition import IndexDefinition, IndexVariantBuildResult
+from src.dtos.index_result import IndexComposition, IndexPerformance
+from src.controllers.http_cache import not_modified_response
+
+
+class BuildVariantsRequest(BaseModel):
+    start_date: date
+    end_date: Optional[date] = None
+    index_ids: Optional[List[str]] = None
+
+
+class IndexVariantController:
+    def __init__(self, index_variant_manager: IndexVariantManager):
+        self.index_variant_manager = index_variant_manager
+        self.router = APIRouter(prefix="/indexes", tags=["Index Variants"])
+        # Routes that write the database, registered only on processes that own it
+        self.write_router = APIRouter(prefix="/indexes", tags=["Index Variants"])
+        self._setup_routes()
+
+    def _setup_routes(self):
+        @self.router.get("", response_model=List[IndexDefinition])
+        async def get_definitions():
+            return await self.index_variant_manager.get_definitions()
+
+        @self.write_router.post("", response_model=IndexDefinition, status_code=201)
+        async def create_definition(definition: IndexDefinition):
+            if not await self.index_variant_manager.create_definition(definition):
+                raise HTTPException(status_code=409, detail=f"Index already exists: {definition.index_id}")
+            return definition
+
+        @self.write_router.post("/build", response_model=IndexVariantBuildResult)
+        async def build_variants(request: BuildVariantsRequest):
+            if request.index_ids is not None:
+                for index_id in request.index_ids:
+                    await self._require_definition(index_id)
+            return await self.index_variant_manager.build_variants(
+                request.start_date, request.end_date, request.index_ids
+            )
+
+        @self.router.get("/{index_id}", response_model=IndexDefinition)
+        async def get_definition(index_id: str):
+            return await self._require_definition(index_id)
+
+        @self.router.get("/{index_id}/performance", response_model=List[IndexPerformance])
+        async def get_performance(
+            request: Request,
+            response: Response,
+            index_id: str,
+            start_date: date = Query(...),
+            end_date: date = Query(...)
+        ):
+            await self._require_definition(index_id)
+            not_modified = await self._check_not_modified(request, response, start_date, end_date)
+            if not_modified:
+                return not_modified
+            return await self.index_variant_manager.get_performance(index_id, start_date, end_date)
+
+        @self.router.get("/{index_id}/composition", response_model=List[IndexComposition])
+        async def get_composition(
+            request: Request,
+            response: Response,
+            index_id: str,
+            date: date = Query(...)
+        ):
+            await self._require_definition(index_id)
+            not_modified = await self._check_not_modified(request, response, date)
+            if not_modified:
+                return not_modified
+            return await self.index_variant_manager.get_composition(index_id, date)
+
+    async def _require_definition(self, index_id: str) -> IndexDefinition:
+        definition = await self.index_variant_manager.get_definition(index_id)
+        if not definition:
+            raise HTTPException(status_code=404, detail=f"Index not found: {index_id}")
+        return definition
+
+    async def _check_not_modified(self, request: Request, response: Response, *params) -> Optional[Response]:
+        data_version = await self.index_variant_manager.get_data_version()
+        return not_modified_response(request, response, data_version, *params)
+
+    def register_routes(self, app: FastAPI, include_writes: bool = True):
+        app.include_router(self.router)
+        if include_writes:
+            app.include_router(self.write_router)
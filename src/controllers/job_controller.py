@@ -0,0 +1,45 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, FastAPI, HTTPException
+from pydantic import BaseModel
+from src.constants import JOB_TYPE_BUILD_INDEX, JOB_TYPE_BACKFILL
+from src.managers.job_manager import JobManager
+from src.dtos.job_result import JobStatus
+
+
+class JobRequest(BaseModel):
+    start_date: date
+    end_date: Optional[date] = None
+
+
+class JobController:
+    def __init__(self, job_manager: JobManager):
+        self.job_manager = job_manager
+        self.router = APIRouter(prefix="/jobs", tags=["Jobs"])
+        self._setup_routes()
+
+    def _setup_routes(self):
+        @self.router.post("/build-index", response_model=JobStatus, status_code=202)
+        async def submit_build_index(request: JobRequest):
+            return await self.job_manager.submit(JOB_TYPE_BUILD_INDEX, request.start_date, request.end_date)
+
+        @self.router.post("/backfill", response_model=JobStatus, status_code=202)
+        async def submit_backfill(request: JobRequest):
+            return await self.job_manager.submit(JOB_TYPE_BACKFILL, request.start_date, request.end_date)
+
+        @self.router.get("/{job_id}", response_model=JobStatus)
+        async def get_job(job_id: str):
+            job = await self.job_manager.get_job(job_id)
+            if not job:
+                raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+            return job
+
+        @self.router.delete("/{job_id}", response_model=JobStatus)
+        async def cancel_job(job_id: str):
+            job = await self.job_manager.cancel(job_id)
+            if not job:
+                raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+            return job
+
+    def register_routes(self, app: FastAPI):
+        app.include_router(self.router)
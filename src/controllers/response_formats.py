@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+from typing import Iterator, Optional
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+FORMAT_JSON = "json"
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+FORMAT_ARROW = "arrow"
+
+MEDIA_TYPES = {
+    FORMAT_JSON: "application/json",
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv",
+    FORMAT_ARROW: "application/vnd.apache.arrow.stream",
+}
+
+STREAMING_FORMATS = (FORMAT_NDJSON, FORMAT_CSV, FORMAT_ARROW)
+
+
+def negotiate_format(accept: Optional[str], requested_format: Optional[str] = None) -> str:
+    """Pick the response format from an explicit ``format`` parameter or the Accept header"""
+    if requested_format:
+        if requested_format not in MEDIA_TYPES:
+            raise HTTPException(status_code=406, detail=f"Unsupported format: {requested_format}")
+        return requested_format
+
+    if not accept:
+        return FORMAT_JSON
+
+    media_type_formats = {media_type: fmt for fmt, media_type in MEDIA_TYPES.items()}
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if media_type in media_type_formats and quality > 0:
+            candidates.append((-quality, position, media_type_formats[media_type]))
+
+    return min(candidates)[2] if candidates else FORMAT_JSON
+
+
+def streaming_response(stream, response_format: str, headers: Optional[dict] = None) -> StreamingResponse:
+    encoders = {
+        FORMAT_NDJSON: iter_ndjson,
+        FORMAT_CSV: iter_csv,
+        FORMAT_ARROW: iter_arrow,
+    }
+    if response_format == FORMAT_ARROW:
+        require_pyarrow()
+    return StreamingResponse(
+        encoders[response_format](stream),
+        media_type=MEDIA_TYPES[response_format],
+        headers=headers
+    )
+
+
+def iter_ndjson(stream) -> Iterator[bytes]:
+    columns = stream.columns
+    for chunk in stream.iter_chunks():
+        lines = [json.dumps(dict(zip(columns, row)), default=str) for row in chunk]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def iter_csv(stream) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(stream.columns)
+    for chunk in stream.iter_chunks():
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_arrow(stream) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    sink = io.BytesIO()
+    writer = None
+    for batch in stream.iter_record_batches():
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, batch.schema)
+        writer.write_batch(batch)
+        yield _drain(sink)
+
+    if writer is None:
+        schema = pa.schema([(column, pa.null()) for column in stream.columns])
+        writer = pa.ipc.new_stream(sink, schema)
+    writer.close()
+    yield _drain(sink)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate(0)
+    return data
+
+
+def require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(status_code=406, detail="Arrow responses require the 'pyarrow' package")
@@ -1,7 +1,19 @@
 from .operation_result import OperationResult, DataSummary, ValidationResult, ReturnStats, StockSummary
-from .index_result import IndexComposition, IndexPerformance, CompositionChange, IndexBuildResult
+from .index_result import (
+    IndexComposition, IndexPerformance, CompositionChange, IndexBuildResult,
+    ConstituentHistoryPoint, ConstituentHistory, IndexTurnover
+)
+from .job_result import JobStatus
+from .index_definition import IndexDefinition, IndexVariantBuildResult
+from .backtest_result import BacktestParameters, BacktestResult, BacktestRun
+from .analytics_result import RollingRiskMetrics, RiskAnalytics, ConstituentContribution, ReturnAttribution
 
 __all__ = [
     "OperationResult", "DataSummary", "ValidationResult", "ReturnStats", "StockSummary",
-    "IndexComposition", "IndexPerformance", "CompositionChange", "IndexBuildResult"
+    "IndexComposition", "IndexPerformance", "CompositionChange", "IndexBuildResult",
+    "ConstituentHistoryPoint", "ConstituentHistory", "IndexTurnover",
+    "JobStatus",
+    "IndexDefinition", "IndexVariantBuildResult",
+    "BacktestParameters", "BacktestResult", "BacktestRun",
+    "RollingRiskMetrics", "RiskAnalytics", "ConstituentContribution", "ReturnAttribution"
 ]
\ No newline at end of file
@@ -0,0 +1,48 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class RollingRiskMetrics(BaseModel):
+    """Column-oriented series: entry i of each list belongs to dates[i]"""
+    window: int
+    dates: List[date]
+    volatility_percent: List[Optional[float]]
+    sharpe_ratio: List[Optional[float]]
+    beta: List[Optional[float]]
+    max_drawdown_percent: List[Optional[float]]
+
+
+class RiskAnalytics(BaseModel):
+    start_date: date
+    end_date: date
+    observations: int
+    benchmark: str
+    risk_free_rate: float
+    annualized_return_percent: Optional[float] = None
+    annualized_volatility_percent: Optional[float] = None
+    sharpe_ratio: Optional[float] = None
+    beta: Optional[float] = None
+    max_drawdown_percent: float
+    drawdown_peak_date: date
+    drawdown_trough_date: date
+    rolling: List[RollingRiskMetrics]
+
+
+class ConstituentContribution(BaseModel):
+    symbol: str
+    company_name: str
+    contribution_percent: float
+    average_weight_percent: float
+    days_in_index: int
+    compounded_return_percent: float
+
+
+class ReturnAttribution(BaseModel):
+    start_date: date
+    end_date: date
+    index_return_percent: float
+    trading_days: int
+    constituents_count: int
+    top: List[ConstituentContribution]
+    bottom: List[ConstituentContribution]
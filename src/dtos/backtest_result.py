@@ -0,0 +1,40 @@
+from datetime import date
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class BacktestParameters(BaseModel):
+    """One point of a backtest grid: an equal-weight top-N strategy and its trading rules"""
+    top_n: int = Field(..., ge=1)
+    rebalance: Literal["daily", "weekly", "monthly"] = "daily"
+    # Members keep their place while they rank within top_n + buffer
+    buffer: int = Field(0, ge=0)
+    # At most this share of top_n names is replaced at one rebalance; None means no cap
+    turnover_cap_percent: Optional[float] = Field(None, gt=0, le=100)
+
+
+class BacktestResult(BacktestParameters):
+    total_return_percent: float
+    annualized_return_percent: float
+    annualized_volatility_percent: Optional[float] = None
+    sharpe_ratio: Optional[float] = None
+    max_drawdown_percent: float
+    average_turnover_percent: float
+    annual_turnover_percent: float
+    total_cost_percent: float
+    rebalance_count: int
+    final_index_value: float
+
+
+class BacktestRun(BaseModel):
+    run_id: str
+    start_date: date
+    end_date: date
+    symbols_count: int
+    days_count: int
+    cost_bps: float
+    variants_count: int
+    workers: int
+    elapsed_seconds: float
+    variants_per_second: float
+    results: List[BacktestResult]
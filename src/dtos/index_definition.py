@@ -0,0 +1,23 @@
+from datetime import date
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+from src.constants import INDEX_BASE_VALUE
+
+
+class IndexDefinition(BaseModel):
+    """One index variant: which stocks it holds, how they are weighted and how often it reselects"""
+    index_id: str = Field(..., pattern=r"^[a-z0-9_]{1,50}$")
+    name: str = Field(..., min_length=1, max_length=100)
+    top_n: int = Field(..., ge=1)
+    weighting: Literal["equal", "market_cap"] = "equal"
+    rebalance: Literal["daily", "weekly", "monthly"] = "daily"
+    base_value: float = Field(INDEX_BASE_VALUE, gt=0)
+
+
+class IndexVariantBuildResult(BaseModel):
+    start_date: date
+    end_date: date
+    index_ids: List[str]
+    compositions_built: int
+    success: bool
+    error_message: Optional[str] = None
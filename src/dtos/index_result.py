@@ -30,6 +30,45 @@ class CompositionChange(BaseModel):
     new_weight_percent: float
 
 
+class ConstituentHistoryPoint(BaseModel):
+    date: date
+    price: float
+    market_cap: float
+    one_day_return: Optional[float] = None
+    in_index: bool
+    weight_percent: Optional[float] = None
+
+
+class ConstituentHistory(BaseModel):
+    symbol: str
+    company_name: str
+    start_date: date
+    end_date: date
+    membership_days: int
+    history: List[ConstituentHistoryPoint]
+
+
+class IndexTurnover(BaseModel):
+    """Column-oriented series: entry i of each list belongs to dates[i]"""
+    start_date: date
+    end_date: date
+    window: int
+    cost_bps: float
+    trading_days: int
+    average_one_way_percent: float
+    annualized_one_way_percent: float
+    total_two_way_percent: float
+    total_cost_percent: float
+    dates: List[date]
+    entered: List[int]
+    exited: List[int]
+    one_way_percent: List[float]
+    two_way_percent: List[float]
+    rolling_one_way_percent: List[float]
+    rolling_two_way_percent: List[float]
+    cost_percent: List[float]
+
+
 class IndexBuildResult(BaseModel):
     start_date: date
     end_date: date
@@ -0,0 +1,24 @@
+from datetime import date, datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class JobStatus(BaseModel):
+    id: str
+    job_type: str
+    start_date: date
+    end_date: date
+    status: str
+    phase: Optional[str] = None
+    dates_total: int = 0
+    dates_done: int = 0
+    rows_written: int = 0
+    rows_per_second: float = 0.0
+    dates_per_second: float = 0.0
+    cancel_requested: bool = False
+    error_message: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Scheduler lease token a scheduled job writes under; None for jobs submitted through the API
+    fencing_token: Optional[int] = None
@@ -1,4 +1,8 @@
 from .index_data_dump_manager import IndexDataDumpManager
 from .index_manager import IndexManager
+from .job_manager import JobManager
+from .analytics_manager import AnalyticsManager
+from .index_variant_manager import IndexVariantManager
+from .snapshot_manager import SnapshotManager
 
-__all__ = ["IndexDataDumpManager", "IndexManager"]
+__all__ = ["IndexDataDumpManager", "IndexManager", "JobManager", "AnalyticsManager", "IndexVariantManager", "SnapshotManager"]
@@ -0,0 +1,84 @@
+from datetime import date
+from typing import List, Optional
+from src.services.analytics_service import AnalyticsService
+from src.services.redis_service import RedisService
+from src.services.matrix_codec import encode_matrix
+from src.constants import COVARIANCE_MATRIX_KINDS
+from src.dtos.analytics_result import RiskAnalytics, ReturnAttribution
+
+
+class AnalyticsManager:
+    def __init__(self, analytics_service: AnalyticsService, redis_service: RedisService):
+        self.analytics_service = analytics_service
+        self.redis_service = redis_service
+
+    async def get_data_version(self) -> int:
+        return await self.analytics_service.get_data_version()
+
+    async def get_risk_analytics(
+        self,
+        start_date: date,
+        end_date: date,
+        windows: List[int],
+        risk_free_rate: float = 0.0,
+        benchmark_symbol: Optional[str] = None
+    ) -> Optional[RiskAnalytics]:
+        data_version = await self.get_data_version()
+        cache_params = dict(
+            start_date=start_date,
+            end_date=end_date,
+            windows=",".join(str(window) for window in sorted(set(windows))),
+            risk_free_rate=risk_free_rate,
+            benchmark=benchmark_symbol or ""
+        )
+        cached_data = await self.redis_service.get_analytics("risk", data_version, **cache_params)
+        if cached_data:
+            return RiskAnalytics.model_validate(cached_data)
+
+        analytics = await self.analytics_service.get_risk_analytics(
+            start_date, end_date, windows, risk_free_rate, benchmark_symbol
+        )
+        if analytics:
+            await self.redis_service.set_analytics("risk", data_version, analytics.model_dump(), **cache_params)
+        return analytics
+
+    async def get_return_attribution(self, start_date: date, end_date: date, limit: int) -> Optional[ReturnAttribution]:
+        data_version = await self.get_data_version()
+        cache_params = dict(start_date=start_date, end_date=end_date, limit=limit)
+        cached_data = await self.redis_service.get_analytics("attribution", data_version, **cache_params)
+        if cached_data:
+            return ReturnAttribution.model_validate(cached_data)
+
+        attribution = await self.analytics_service.get_return_attribution(start_date, end_date, limit)
+        if attribution:
+            await self.redis_service.set_analytics("attribution", data_version, attribution.model_dump(), **cache_params)
+        return attribution
+
+    async def get_covariance_matrix(self, target_date: date, window: int, kind: str, min_periods: int) -> Optional[bytes]:
+        """Arrow IPC payload of the covariance or correlation matrix; both are cached per (date, window)"""
+        data_version = await self.get_data_version()
+        cache_params = dict(date=target_date, window=window, min_periods=min_periods)
+        cached_payload = await self.redis_service.get_analytics_payload(kind, data_version, **cache_params)
+        if cached_payload:
+            return cached_payload
+
+        matrices = await self.analytics_service.get_covariance_matrices(target_date, window, min_periods)
+        if not matrices:
+            return None
+
+        dates = matrices["dates"]
+        symbols = matrices["symbols"].tolist()
+        payloads = {}
+        for matrix_kind in COVARIANCE_MATRIX_KINDS:
+            payloads[matrix_kind] = encode_matrix(symbols, matrices[matrix_kind], dict(
+                kind=matrix_kind,
+                date=target_date,
+                window=window,
+                min_periods=min_periods,
+                start_date=dates[0],
+                end_date=dates[-1],
+                trading_days=len(dates),
+                min_observations=int(matrices["observations"].min())
+            ))
+            await self.redis_service.set_analytics_payload(matrix_kind, data_version, payloads[matrix_kind], **cache_params)
+        return payloads[kind]
@@ -1,16 +1,34 @@
 from datetime import date, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional
+import numpy as np
 from src.services.index_service import IndexService
 from src.services.stock_history_service import StockHistoryService
+from src.services.index_variant_service import IndexVariantService
+from src.services.job_progress import JobProgress, JobCancelledError
+from src.services import weight_drift
+from src.models.stock_price_history import StockPriceHistory
 from src.dtos.index_result import IndexComposition, IndexPerformance, IndexBuildResult
-from src.constants import INDEX_BASE_VALUE, WEEKDAY_TRADING_LIMIT, TOP_COMPANIES_COUNT
+from src.dtos.index_definition import IndexDefinition
+from src.services.trading_calendar import TradingCalendar, nyse_calendar
+from src.constants import INDEX_BASE_VALUE
 
 class BuildIndexManager:
-    def __init__(self, index_service: IndexService, stock_history_service: StockHistoryService):
+    def __init__(
+        self,
+        index_service: IndexService,
+        stock_history_service: StockHistoryService,
+        index_variant_service: IndexVariantService,
+        calendar: Optional[TradingCalendar] = None
+    ):
         self.index_service = index_service
         self.stock_history_service = stock_history_service
+        # Owns the variants and the primary index's definition
+        self.index_variant_service = index_variant_service
+        self.calendar = calendar or nyse_calendar()
 
-    async def build_index(self, start_date: date, end_date: Optional[date] = None) -> IndexBuildResult:
+    async def build_index(
+        self, start_date: date, end_date: Optional[date] = None, progress: Optional[JobProgress] = None
+    ) -> IndexBuildResult:
         if end_date is None:
             end_date = start_date
         
@@ -20,38 +38,49 @@ class BuildIndexManager:
             if not trading_days:
                 return self._create_success_result(start_date, end_date, 0, 0, "No trading days in date range")
             
+            progress = progress or JobProgress()
+            definition = await self.index_variant_service.get_primary_definition()
+            
             missing_stock_dates = await self._get_missing_stock_dates(trading_days)
+            await progress.start_phase("fetching_stock_data", len(missing_stock_dates))
             if missing_stock_dates:
-                await self._fetch_missing_stock_data(missing_stock_dates)
+                await self._fetch_missing_stock_data(missing_stock_dates, definition, progress)
             
             missing_composition_dates = await self._get_missing_composition_dates(trading_days)
+            await progress.start_phase("building_compositions", len(missing_composition_dates))
             compositions_built = 0
             if missing_composition_dates:
-                await self._build_missing_compositions(missing_composition_dates)
+                await self._build_missing_compositions(missing_composition_dates, definition, progress)
                 compositions_built = len(missing_composition_dates)
             
             missing_performance_dates = await self._get_missing_performance_dates(trading_days)
+            await progress.start_phase("building_performance", len(missing_performance_dates))
             if missing_performance_dates:
-                await self._build_missing_performance(missing_performance_dates)
+                await self._build_missing_performance(missing_performance_dates, progress)
+            
+            if missing_stock_dates or missing_composition_dates:
+                # Every variant is rebuilt from the same scan, so this costs one statement however many there are
+                await progress.start_phase("building_variants", 1)
+                variants = await self.index_variant_service.build_variants(start_date, end_date)
+                await progress.advance(rows=variants.compositions_built)
             
             total_processed = max(compositions_built, len(missing_performance_dates) if missing_performance_dates else 0)
             
             if not missing_stock_dates and not missing_composition_dates and not missing_performance_dates:
                 return self._create_success_result(start_date, end_date, len(trading_days), 0, "Index already complete for this date range")
             
+            # Brought up to date here, on the write path, rather than by the next reader
+            await self.index_service.refresh_constituent_history()
+            
             return self._create_success_result(start_date, end_date, len(trading_days), total_processed)
             
+        except JobCancelledError:
+            raise
         except Exception as e:
             return self._create_error_result(start_date, end_date, str(e))
 
     def _get_trading_days(self, start_date: date, end_date: date) -> List[date]:
-        trading_days = []
-        current_date = start_date
-        while current_date <= end_date:
-            if self._is_trading_day(current_date):
-                trading_days.append(current_date)
-            current_date += timedelta(days=1)
-        return trading_days
+        return self.calendar.trading_days(start_date, end_date)
 
     async def _get_missing_stock_dates(self, trading_days: List[date]) -> List[date]:
         missing_dates = []
@@ -77,63 +106,131 @@ class BuildIndexManager:
                 missing_dates.append(trading_date)
         return missing_dates
 
-    async def _fetch_missing_stock_data(self, missing_dates: List[date]) -> None:
+    async def _fetch_missing_stock_data(
+        self, missing_dates: List[date], definition: IndexDefinition, progress: JobProgress
+    ) -> None:
         for missing_date in missing_dates:
-            await self.stock_history_service.fetch_and_store_top_stocks(missing_date)
+            rows = await self.stock_history_service.fetch_and_store_top_stocks(missing_date, definition.top_n)
+            await progress.advance(rows=rows or 0)
 
-    async def _build_missing_compositions(self, missing_dates: List[date]) -> None:
-        all_compositions = []
-        
-        for missing_date in missing_dates:
-            stocks = await self.stock_history_service.get_stocks_for_date(missing_date, TOP_COMPANIES_COUNT)
-            if not stocks:
-                continue
-            
-            weight_per_stock = 100.0 / len(stocks)
-            compositions_for_date = []
-            
-            for stock in stocks:
-                composition = IndexComposition(
-                    date=missing_date,
-                    symbol=stock.company_symbol,
-                    company_name=stock.company_name,
-                    weight_percent=weight_per_stock,
-                    price=stock.last_traded_price,
-                    return_percent=stock.one_day_return,
-                    market_cap=stock.market_cap
-                )
-                compositions_for_date.append(composition)
-            
-            all_compositions.extend(compositions_for_date)
-        
-        if all_compositions:
-            await self.index_service.persist_index_composition(all_compositions)
+    async def _build_missing_compositions(
+        self, missing_dates: List[date], definition: IndexDefinition, progress: JobProgress
+    ) -> None:
+        for period_dates in self._holding_periods(sorted(missing_dates), definition.rebalance):
+            await self._build_holding_period(period_dates, definition, progress)
+
+    def _holding_periods(self, dates: List[date], rebalance: str) -> List[List[date]]:
+        """Split sorted dates into runs of consecutive trading days inside one rebalance period"""
+        periods = []
+        for current_date in dates:
+            if (
+                periods
+                and self._get_previous_trading_day(current_date) == periods[-1][-1]
+                and weight_drift.same_period(periods[-1][-1], current_date, rebalance)
+            ):
+                periods[-1].append(current_date)
+            else:
+                periods.append([current_date])
+        return periods
 
-    async def _build_missing_performance(self, missing_dates: List[date]) -> None:
+    async def _build_holding_period(self, dates: List[date], definition: IndexDefinition, progress: JobProgress) -> None:
+        stocks_by_date: Dict[date, Dict[str, StockPriceHistory]] = {}
+        for target_date in dates:
+            stocks = await self.stock_history_service.get_stocks_for_date(target_date)
+            if stocks:
+                stocks_by_date[target_date] = {stock.company_symbol: stock for stock in stocks}
+            else:
+                await progress.advance()
+        dates = [target_date for target_date in dates if target_date in stocks_by_date]
+        if not dates:
+            return
+
+        members = await self._get_drift_anchor(dates[0], definition.rebalance)
+        if members:
+            # Carried over from the previous day, grown by that day's returns
+            initial_weights = np.array([member.weight_percent * (1 + member.return_percent / 100) for member in members])
+        else:
+            # Rebalance: the day's largest companies at the definition's weighting
+            members = [
+                self._composition(dates[0], None, stock, 0.0)
+                for stock in list(stocks_by_date[dates[0]].values())[:definition.top_n]
+            ]
+            if definition.weighting == "market_cap":
+                initial_weights = np.array([member.market_cap for member in members])
+            else:
+                initial_weights = np.ones(len(members))
+
+        returns = np.array([
+            [self._stock_return(stocks_by_date[target_date].get(member.symbol)) / 100 for member in members]
+            for target_date in dates
+        ])
+        weights = weight_drift.drifted_weights(initial_weights * 100.0 / initial_weights.sum(), returns)
+        # Every day of the period holds the members chosen at its rebalance
+        member_count = len(members)
+
+        for row, target_date in enumerate(dates):
+            day_stocks = stocks_by_date[target_date]
+            members = [
+                self._composition(target_date, member, day_stocks.get(member.symbol), weights[row, column])
+                for column, member in enumerate(members)
+            ]
+            # Persisting per date keeps completed work durable if the build is cancelled
+            await self.index_service.persist_index_composition(members, member_count)
+            await progress.advance(rows=len(members))
+
+    async def _get_drift_anchor(self, target_date: date, rebalance: str) -> List[IndexComposition]:
+        """The latest earlier composition if it is in the same rebalance period; empty when the date rebalances"""
+        for previous_date in self._recent_trading_days(target_date):
+            if not weight_drift.same_period(previous_date, target_date, rebalance):
+                return []
+            composition = await self.index_service.get_persisted_index_composition(previous_date)
+            if composition:
+                return composition
+        return []
+
+    def _composition(
+        self,
+        target_date: date,
+        member: Optional[IndexComposition],
+        stock: Optional[StockPriceHistory],
+        weight_percent: float
+    ) -> IndexComposition:
+        """A member's row for the date, from the day's stock data or, without it, its last known values"""
+        if stock is not None:
+            return IndexComposition(
+                date=target_date,
+                symbol=stock.company_symbol,
+                company_name=stock.company_name,
+                weight_percent=weight_percent,
+                price=stock.last_traded_price,
+                return_percent=self._stock_return(stock),
+                market_cap=stock.market_cap
+            )
+        return member.model_copy(update={"date": target_date, "weight_percent": weight_percent, "return_percent": 0.0})
+
+    def _stock_return(self, stock: Optional[StockPriceHistory]) -> float:
+        return float(stock.one_day_return or 0.0) if stock is not None else 0.0
+
+    async def _build_missing_performance(self, missing_dates: List[date], progress: JobProgress) -> None:
         if not missing_dates:
             return
         
         missing_dates.sort()
-        performance_list = []
         
         for missing_date in missing_dates:
             previous_index_value = await self._get_previous_index_value(missing_date)
-            composition = await self.index_service.get_index_composition(missing_date)
+            composition = await self.index_service.get_persisted_index_composition(missing_date)
             if not composition:
+                await progress.advance()
                 continue
             
+            # Persisted before the next date so its previous index value chains from this one
             performance = self._calculate_performance(composition, missing_date, previous_index_value)
-            performance_list.append(performance)
-        
-        if performance_list:
-            await self.index_service.persist_index_performance(performance_list)
+            await self.index_service.persist_index_performance([performance])
+            await progress.advance(rows=1)
 
     async def _get_previous_index_value(self, current_date: date) -> float:
-        for days_back in range(1, 11):
-            previous_date = current_date - timedelta(days=days_back)
-            if not self._is_trading_day(previous_date):
-                continue
-            
+        for previous_date in self._recent_trading_days(current_date):
             previous_performance = await self.index_service.get_persisted_index_performance(previous_date, previous_date)
             if previous_performance:
                 return previous_performance[0].index_value
@@ -141,12 +238,21 @@ class BuildIndexManager:
         return INDEX_BASE_VALUE
 
     def _is_trading_day(self, date: date) -> bool:
-        return date.weekday() < WEEKDAY_TRADING_LIMIT
+        return self.calendar.is_trading_day(date)
+
+    def _get_previous_trading_day(self, current_date: date) -> date:
+        return self.calendar.previous_trading_day(current_date)
+
+    def _recent_trading_days(self, current_date: date) -> List[date]:
+        """Trading days in the ten calendar days before a date, most recent first"""
+        return self.calendar.trading_days(current_date - timedelta(days=10), current_date - timedelta(days=1))[::-1]
 
     def _calculate_performance(
         self, composition: List[IndexComposition], date: date, current_index_value: float
     ) -> IndexPerformance:
-        daily_return = sum(stock.return_percent for stock in composition) / len(composition)
+        # Weights are the drifted start-of-day weights, so this is the day's actual portfolio return
+        total_weight = sum(stock.weight_percent for stock in composition)
+        daily_return = sum(stock.weight_percent * stock.return_percent for stock in composition) / total_weight
         new_index_value = current_index_value * (1 + daily_return / 100)
         cumulative_return = ((new_index_value - INDEX_BASE_VALUE) / INDEX_BASE_VALUE) * 100
         
@@ -1,13 +1,23 @@
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from typing import List, Optional
 from src.services.stock_history_service import StockHistoryService
-from src.constants import TOP_COMPANIES_COUNT
+from src.services.index_variant_service import IndexVariantService
+from src.services.job_progress import JobProgress
+from src.services.trading_calendar import TradingCalendar, nyse_calendar
 from src.dtos.operation_result import OperationResult, DataSummary, ValidationResult, ReturnStats, StockSummary
 
 
 class IndexDataDumpManager:
-    def __init__(self, stock_history_service: StockHistoryService):
+    def __init__(
+        self,
+        stock_history_service: StockHistoryService,
+        index_variant_service: IndexVariantService,
+        calendar: Optional[TradingCalendar] = None
+    ):
         self.stock_history_service = stock_history_service
+        # The primary index's definition sets how many stocks a day holds
+        self.index_variant_service = index_variant_service
+        self.calendar = calendar or nyse_calendar()
     
     async def run_daily_dump(self, target_date: Optional[date] = None) -> OperationResult:
         if target_date is None:
@@ -16,7 +26,8 @@ class IndexDataDumpManager:
         start_time = datetime.now()
         
         try:
-            records_stored = await self.stock_history_service.fetch_and_store_top_stocks(target_date)
+            definition = await self.index_variant_service.get_primary_definition()
+            records_stored = await self.stock_history_service.fetch_and_store_top_stocks(target_date, definition.top_n)
             execution_time = (datetime.now() - start_time).total_seconds()
             
             return OperationResult(
@@ -38,32 +49,83 @@ class IndexDataDumpManager:
                 error_message=str(e)
             )
     
-    async def run_backfill(self, start_date: date, end_date: Optional[date] = None) -> List[OperationResult]:
+    async def run_backfill(
+        self, start_date: date, end_date: Optional[date] = None, progress: Optional[JobProgress] = None
+    ) -> List[OperationResult]:
         if end_date is None:
             end_date = start_date
         
-        results = []
-        current_date = start_date
+        progress = progress or JobProgress()
+        # Holidays are never requested from the data source
+        trading_days = self.calendar.trading_days(start_date, end_date)
+        await progress.start_phase("fetching_stock_data", len(trading_days))
         
-        while current_date <= end_date:
-            if current_date.weekday() >= 5:
-                current_date += timedelta(days=1)
-                continue
-            
-            result = await self.run_daily_dump(current_date)
+        results = []
+        for trading_date in trading_days:
+            result = await self.run_daily_dump(trading_date)
             results.append(result)
-            current_date += timedelta(days=1)
+            await progress.advance(rows=result.records_processed)
         
         return results
     
+    async def run_archive(self, today: Optional[date] = None) -> OperationResult:
+        """Move closed months before the hot window to the Parquet archive; records_processed is the rows moved"""
+        today = today or date.today()
+        start_time = datetime.now()
+        
+        try:
+            archived_rows = await self.stock_history_service.archive_closed_months(today)
+            return OperationResult(
+                success=True,
+                operation="archive_closed_months",
+                date=today,
+                records_processed=archived_rows,
+                execution_time_seconds=(datetime.now() - start_time).total_seconds()
+            )
+            
+        except Exception as e:
+            return OperationResult(
+                success=False,
+                operation="archive_closed_months",
+                date=today,
+                records_processed=0,
+                execution_time_seconds=(datetime.now() - start_time).total_seconds(),
+                error_message=str(e)
+            )
+    
+    async def run_stock_data_maintenance(self) -> OperationResult:
+        """Re-cluster stored stock data by date and market cap; records_processed is the rows that were out of order"""
+        start_time = datetime.now()
+        
+        try:
+            unclustered_rows = await self.stock_history_service.cluster_stock_data()
+            return OperationResult(
+                success=True,
+                operation="stock_data_maintenance",
+                date=date.today(),
+                records_processed=unclustered_rows,
+                execution_time_seconds=(datetime.now() - start_time).total_seconds()
+            )
+            
+        except Exception as e:
+            return OperationResult(
+                success=False,
+                operation="stock_data_maintenance",
+                date=date.today(),
+                records_processed=0,
+                execution_time_seconds=(datetime.now() - start_time).total_seconds(),
+                error_message=str(e)
+            )
+    
     async def validate_data(self, target_date: date) -> ValidationResult:
         try:
+            expected_count = (await self.index_variant_service.get_primary_definition()).top_n
             stock_count = await self.stock_history_service.get_stocks_count_by_date(target_date)
             
             return ValidationResult(
                 date=target_date,
-                is_valid=stock_count == TOP_COMPANIES_COUNT,
-                expected_count=TOP_COMPANIES_COUNT,
+                is_valid=stock_count == expected_count,
+                expected_count=expected_count,
                 actual_count=stock_count,
                 has_data=stock_count > 0
             )
@@ -72,7 +134,6 @@ class IndexDataDumpManager:
             return ValidationResult(
                 date=target_date,
                 is_valid=False,
-                expected_count=TOP_COMPANIES_COUNT,
                 actual_count=0,
                 has_data=False
             )
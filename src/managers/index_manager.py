@@ -1,20 +1,25 @@
-import io
-from datetime import date, timedelta
-from typing import List, Dict, Optional
-import pandas as pd
+from datetime import date
+from typing import Iterator, List, Dict, Optional
 from src.services.index_service import IndexService
 from src.services.redis_service import RedisService
-from src.constants import TOP_COMPANIES_COUNT
-from src.dtos.index_result import IndexComposition, IndexPerformance, CompositionChange, IndexBuildResult
+from src.services.xlsx_stream_writer import XlsxStreamWriter, ExcelSheet
+from src.repositories.row_stream import RowStream
+from src.dtos.index_result import IndexComposition, IndexPerformance, CompositionChange, IndexBuildResult, ConstituentHistory, IndexTurnover
+from src.constants import DEFAULT_TURNOVER_WINDOW, DEFAULT_REBALANCE_COST_BPS
 
 
 class IndexManager:
-    def __init__(self, index_service: IndexService, redis_service: RedisService):
+    def __init__(self, index_service: IndexService, redis_service: RedisService, xlsx_writer: Optional[XlsxStreamWriter] = None):
         self.index_service = index_service
         self.redis_service = redis_service
+        self.xlsx_writer = xlsx_writer or XlsxStreamWriter()
+    
+    async def get_data_version(self) -> int:
+        return await self.index_service.get_data_version()
     
     async def get_index_performance(self, start_date: date, end_date: date) -> List[IndexPerformance]:
-        cached_data = await self.redis_service.get_index_performance(start_date, end_date)
+        data_version = await self.get_data_version()
+        cached_data = await self.redis_service.get_index_performance(data_version, start_date, end_date)
         if cached_data:
             return [IndexPerformance.model_validate(item) for item in cached_data]
         
@@ -22,12 +27,13 @@ class IndexManager:
         
         if performance_data:
             serializable_data = [perf.model_dump() for perf in performance_data]
-            await self.redis_service.set_index_performance(start_date, end_date, serializable_data)
+            await self.redis_service.set_index_performance(data_version, start_date, end_date, serializable_data)
         
         return performance_data
     
     async def get_index_composition(self, target_date: date) -> List[IndexComposition]:
-        cached_data = await self.redis_service.get_index_composition(target_date)
+        data_version = await self.get_data_version()
+        cached_data = await self.redis_service.get_index_composition(data_version, target_date)
         if cached_data:
             return [IndexComposition.model_validate(item) for item in cached_data]
         
@@ -35,113 +41,138 @@ class IndexManager:
         
         if composition_data:
             serializable_data = [comp.model_dump() for comp in composition_data]
-            await self.redis_service.set_index_composition(target_date, serializable_data)
+            await self.redis_service.set_index_composition(data_version, target_date, serializable_data)
         
         return composition_data
     
+    async def get_index_compositions(
+        self, target_dates: List[date], symbols: Optional[List[str]] = None
+    ) -> Dict[date, List[IndexComposition]]:
+        target_dates = sorted(set(target_dates))
+        data_version = await self.get_data_version()
+        cached_data = await self.redis_service.get_index_compositions(data_version, target_dates)
+        compositions_by_date = {
+            target_date: [IndexComposition.model_validate(item) for item in items]
+            for target_date, items in cached_data.items()
+        }
+        
+        missing_dates = [target_date for target_date in target_dates if target_date not in compositions_by_date]
+        if missing_dates:
+            persisted = await self.index_service.get_persisted_index_compositions(missing_dates)
+            if persisted:
+                await self.redis_service.set_index_compositions(data_version, {
+                    target_date: [comp.model_dump() for comp in compositions]
+                    for target_date, compositions in persisted.items()
+                })
+            compositions_by_date.update(persisted)
+        
+        if symbols:
+            wanted = {symbol.upper() for symbol in symbols}
+            compositions_by_date = {
+                target_date: [comp for comp in compositions if comp.symbol.upper() in wanted]
+                for target_date, compositions in compositions_by_date.items()
+            }
+        
+        return {target_date: compositions_by_date[target_date] for target_date in sorted(compositions_by_date)}
+    
     async def get_composition_changes(self, start_date: date, end_date: date) -> List[CompositionChange]:
-        cached_data = await self.redis_service.get_composition_changes(start_date, end_date)
+        data_version = await self.get_data_version()
+        cached_data = await self.redis_service.get_composition_changes(data_version, start_date, end_date)
         if cached_data:
             return [CompositionChange.model_validate(item) for item in cached_data]
         
-        changes = []
-        current_date = start_date
-        previous_symbols = set()
-        
-        while current_date <= end_date:
-            if current_date.weekday() >= 5:
-                current_date += timedelta(days=1)
-                continue
-            
-            composition = await self.index_service.get_persisted_index_composition(current_date)
-            
-            if composition:
-                current_symbols = {stock.symbol for stock in composition}
-                
-                if previous_symbols:
-                    entered = current_symbols - previous_symbols
-                    exited = previous_symbols - current_symbols
-                    for symbol in entered:
-                        stock = next(s for s in composition if s.symbol == symbol)
-                        changes.append(CompositionChange(
-                            date=current_date,
-                            symbol=symbol,
-                            company_name=stock.company_name,
-                            change_type="entered",
-                            previous_weight_percent=0.0,
-                            new_weight_percent=stock.weight_percent
-                        ))
-                    
-                    for symbol in exited:
-                        changes.append(CompositionChange(
-                            date=current_date,
-                            symbol=symbol,
-                            company_name="Unknown",
-                            change_type="exited",
-                            previous_weight_percent=100.0 / TOP_COMPANIES_COUNT,
-                            new_weight_percent=0.0
-                        ))
-                
-                previous_symbols = current_symbols
-            
-            current_date += timedelta(days=1)
+        changes = await self.index_service.get_composition_changes(start_date, end_date)
         
         if changes:
             serializable_data = [change.model_dump() for change in changes]
-            await self.redis_service.set_composition_changes(start_date, end_date, serializable_data)
+            await self.redis_service.set_composition_changes(data_version, start_date, end_date, serializable_data)
         
         return changes
     
-    async def export_to_excel(self, start_date: date, end_date: Optional[date] = None) -> io.BytesIO:
+    async def get_turnover(
+        self,
+        start_date: date,
+        end_date: date,
+        cost_bps: float = DEFAULT_REBALANCE_COST_BPS,
+        window: int = DEFAULT_TURNOVER_WINDOW
+    ) -> Optional[IndexTurnover]:
+        data_version = await self.get_data_version()
+        cache_params = dict(start_date=start_date, end_date=end_date, cost_bps=cost_bps, window=window)
+        cached_data = await self.redis_service.get_analytics("turnover", data_version, **cache_params)
+        if cached_data:
+            return IndexTurnover.model_validate(cached_data)
+        
+        turnover = await self.index_service.get_turnover(start_date, end_date, cost_bps, window)
+        
+        if turnover:
+            await self.redis_service.set_analytics("turnover", data_version, turnover.model_dump(), **cache_params)
+        
+        return turnover
+    
+    async def get_constituent_history(
+        self, symbol: str, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> Optional[ConstituentHistory]:
+        return await self.index_service.get_constituent_history(symbol, start_date, end_date)
+    
+    def stream_index_performance(self, start_date: date, end_date: date) -> RowStream:
+        return self.index_service.stream_index_performance(start_date, end_date)
+    
+    def stream_index_composition(self, target_date: date) -> RowStream:
+        return self.index_service.stream_index_composition(target_date)
+    
+    def stream_composition_changes(self, start_date: date, end_date: date) -> RowStream:
+        return self.index_service.stream_composition_changes(start_date, end_date)
+    
+    def stream_turnover(
+        self,
+        start_date: date,
+        end_date: date,
+        cost_bps: float = DEFAULT_REBALANCE_COST_BPS,
+        window: int = DEFAULT_TURNOVER_WINDOW
+    ) -> RowStream:
+        return self.index_service.stream_turnover(start_date, end_date, cost_bps, window)
+    
+    async def export_to_excel(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        include_all_compositions: bool = False,
+        cost_bps: float = DEFAULT_REBALANCE_COST_BPS
+    ) -> Iterator[bytes]:
         if end_date is None:
             end_date = start_date
-            
-        excel_buffer = io.BytesIO()
-        
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            performance_data = await self.get_index_performance(start_date, end_date)
-            if performance_data:
-                perf_df = pd.DataFrame([
-                    {
-                        'Date': p.date,
-                        'Daily Return (%)': p.daily_return_percent,
-                        'Cumulative Return (%)': p.cumulative_return_percent,
-                        'Index Value': p.index_value,
-                        'Companies Count': p.companies_count
-                    }
-                    for p in performance_data
-                ])
-                perf_df.to_excel(writer, sheet_name='Index Performance', index=False)
-            
-            latest_composition = await self.get_index_composition(end_date)
-            if latest_composition:
-                comp_df = pd.DataFrame([
-                    {
-                        'Symbol': c.symbol,
-                        'Company Name': c.company_name,
-                        'Weight (%)': c.weight_percent,
-                        'Market Cap': c.market_cap,
-                        'Stock Price': c.price,
-                        'Return (%)': c.return_percent
-                    }
-                    for c in latest_composition
-                ])
-                comp_df.to_excel(writer, sheet_name=f'Composition {end_date}', index=False)
-            
-            changes_data = await self.get_composition_changes(start_date, end_date)
-            if changes_data:
-                changes_df = pd.DataFrame([
-                    {
-                        'Date': c.date,
-                        'Symbol': c.symbol,
-                        'Company Name': c.company_name,
-                        'Change Type': c.change_type,
-                        'Previous Weight (%)': c.previous_weight_percent,
-                        'New Weight (%)': c.new_weight_percent
-                    }
-                    for c in changes_data
-                ])
-                changes_df.to_excel(writer, sheet_name='Composition Changes', index=False)
-        
-        excel_buffer.seek(0)
-        return excel_buffer
+        
+        composition_headers = ['Date', 'Symbol', 'Company Name', 'Weight (%)', 'Market Cap', 'Stock Price', 'Return (%)']
+        if include_all_compositions:
+            composition_sheet = ExcelSheet(
+                'Daily Compositions', composition_headers,
+                self.index_service.stream_index_compositions(start_date, end_date)
+            )
+        else:
+            composition_sheet = ExcelSheet(
+                f'Composition {end_date}', composition_headers,
+                self.index_service.stream_index_composition(end_date)
+            )
+        
+        sheets = [
+            ExcelSheet(
+                'Index Performance',
+                ['Date', 'Daily Return (%)', 'Cumulative Return (%)', 'Index Value', 'Companies Count'],
+                self.index_service.stream_index_performance(start_date, end_date)
+            ),
+            composition_sheet,
+            ExcelSheet(
+                'Composition Changes',
+                ['Date', 'Symbol', 'Company Name', 'Change Type', 'Previous Weight (%)', 'New Weight (%)'],
+                self.stream_composition_changes(start_date, end_date)
+            ),
+            ExcelSheet(
+                'Turnover',
+                ['Date', 'Entered', 'Exited', 'One-Way Turnover (%)', 'Two-Way Turnover (%)',
+                 f'Rolling {DEFAULT_TURNOVER_WINDOW}D One-Way (%)', f'Rolling {DEFAULT_TURNOVER_WINDOW}D Two-Way (%)',
+                 f'Estimated Cost at {cost_bps:g} bps (%)'],
+                self.stream_turnover(start_date, end_date, cost_bps)
+            ),
+        ]
+        
+        return self.xlsx_writer.iter_workbook(sheets)
@@ -0,0 +1,57 @@
+from datetime import date
+from typing import List, Optional
+from src.services.index_variant_service import IndexVariantService
+from src.services.redis_service import RedisService
+from src.dtos.index_definition import IndexDefinition, IndexVariantBuildResult
+from src.dtos.index_result import IndexComposition, IndexPerformance
+
+
+class IndexVariantManager:
+    def __init__(self, index_variant_service: IndexVariantService, redis_service: RedisService):
+        self.index_variant_service = index_variant_service
+        self.redis_service = redis_service
+
+    async def get_data_version(self) -> int:
+        return await self.index_variant_service.get_data_version()
+
+    async def get_definitions(self) -> List[IndexDefinition]:
+        return await self.index_variant_service.get_definitions()
+
+    async def get_definition(self, index_id: str) -> Optional[IndexDefinition]:
+        return await self.index_variant_service.get_definition(index_id)
+
+    async def create_definition(self, definition: IndexDefinition) -> bool:
+        return await self.index_variant_service.create_definition(definition)
+
+    async def build_variants(
+        self, start_date: date, end_date: Optional[date] = None, index_ids: Optional[List[str]] = None
+    ) -> IndexVariantBuildResult:
+        return await self.index_variant_service.build_variants(start_date, end_date or start_date, index_ids)
+
+    async def get_performance(self, index_id: str, start_date: date, end_date: date) -> List[IndexPerformance]:
+        data_version = await self.get_data_version()
+        cache_params = dict(index_id=index_id, start_date=start_date, end_date=end_date)
+        cached_data = await self.redis_service.get_analytics("variant_performance", data_version, **cache_params)
+        if cached_data:
+            return [IndexPerformance.model_validate(item) for item in cached_data]
+
+        performance = await self.index_variant_service.get_performance(index_id, start_date, end_date)
+        if performance:
+            await self.redis_service.set_analytics(
+                "variant_performance", data_version, [perf.model_dump() for perf in performance], **cache_params
+            )
+        return performance
+
+    async def get_composition(self, index_id: str, target_date: date) -> List[IndexComposition]:
+        data_version = await self.get_data_version()
+        cache_params = dict(index_id=index_id, date=target_date)
+        cached_data = await self.redis_service.get_analytics("variant_composition", data_version, **cache_params)
+        if cached_data:
+            return [IndexComposition.model_validate(item) for item in cached_data]
+
+        composition = await self.index_variant_service.get_composition(index_id, target_date)
+        if composition:
+            await self.redis_service.set_analytics(
+                "variant_composition", data_version, [comp.model_dump() for comp in composition], **cache_params
+            )
+        return composition
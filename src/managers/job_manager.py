@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import uuid
+from datetime import date
+from typing import Dict, Optional, Set
+from src.constants import JOB_TYPE_BUILD_INDEX, JOB_TYPE_BACKFILL, JOB_TYPE_MAINTENANCE
+from src.dtos.job_result import JobStatus
+from src.managers.build_index_manager import BuildIndexManager
+from src.managers.index_data_dump_manager import IndexDataDumpManager
+from src.repositories.job_repository import JobRepository
+from src.repositories.staging import fencing_token
+from src.services.index_service import IndexService
+from src.services.job_progress import JobProgress, JobCancelledError
+
+logger = logging.getLogger(__name__)
+
+
+class JobManager:
+    """
+    Runs build-index, backfill and maintenance work as persisted background jobs.
+
+    Jobs are queued in the ``jobs`` table and executed one at a time by a
+    single worker, so concurrent writers never race on the same dates; the
+    scheduler submits its daily ingestion and weekly maintenance here too.
+    Submitting a range that already has an active job returns that job (the
+    check and the insert are one transaction), and unfinished jobs are
+    re-queued on startup unless their cancellation was requested; the underlying managers skip dates that are already
+    complete, so resuming only repeats missing work. Scheduled jobs carry the
+    scheduler lease's fencing token, and their writes are fenced with it.
+    """
+
+    def __init__(
+        self,
+        job_repository: JobRepository,
+        build_index_manager: BuildIndexManager,
+        index_data_dump_manager: IndexDataDumpManager,
+        index_service: Optional[IndexService] = None
+    ):
+        self.job_repository = job_repository
+        self.build_index_manager = build_index_manager
+        self.index_data_dump_manager = index_data_dump_manager
+        # Rebuilds the derived read projections after each job, so reads never have to
+        self.index_service = index_service
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.running_progress: Dict[str, JobProgress] = {}
+        self.cancelled_job_ids: Set[str] = set()
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        for job in await self.job_repository.get_unfinished_jobs():
+            if job.cancel_requested:
+                # Cancelled while it ran and interrupted before it could stop: honour the cancel
+                await self.job_repository.mark_finished(job.id, "cancelled")
+                logger.info(f"Marked interrupted {job.job_type} job {job.id} cancelled")
+                continue
+            await self.job_repository.mark_queued(job.id)
+            self.queue.put_nowait(job.id)
+            logger.info(f"Re-queued unfinished {job.job_type} job {job.id}")
+        self.worker = asyncio.create_task(self._run_worker())
+
+    async def stop(self):
+        for progress in self.running_progress.values():
+            progress.cancel()
+        if self.worker:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+    async def submit(
+        self, job_type: str, start_date: date, end_date: Optional[date] = None, fencing_token: Optional[int] = None
+    ) -> JobStatus:
+        if job_type not in (JOB_TYPE_BUILD_INDEX, JOB_TYPE_BACKFILL, JOB_TYPE_MAINTENANCE):
+            raise ValueError(f"Unknown job type: {job_type}")
+        if end_date is None:
+            end_date = start_date
+
+        job_id = str(uuid.uuid4())
+        dedupe_key = f"{job_type}:{start_date.isoformat()}:{end_date.isoformat()}"
+        job = await self.job_repository.claim_job(job_id, job_type, dedupe_key, start_date, end_date, fencing_token)
+        if job.id == job_id and self.queue is not None:
+            self.queue.put_nowait(job.id)
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[JobStatus]:
+        return await self.job_repository.get_job(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[JobStatus]:
+        job = await self.job_repository.get_job(job_id)
+        if not job or job.status not in ("queued", "running"):
+            return job
+
+        await self.job_repository.request_cancel(job_id)
+        self.cancelled_job_ids.add(job_id)
+        if job_id in self.running_progress:
+            self.running_progress[job_id].cancel()
+        else:
+            await self.job_repository.mark_finished(job_id, "cancelled")
+        return await self.job_repository.get_job(job_id)
+
+    async def _run_worker(self):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Job {job_id} crashed: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _run_job(self, job_id: str):
+        job = await self.job_repository.get_job(job_id)
+        if not job or job.status != "queued" or job_id in self.cancelled_job_ids:
+            return
+
+        progress = JobProgress(on_update=lambda current: self._persist_progress(job_id, current))
+        self.running_progress[job_id] = progress
+        await self.job_repository.mark_running(job_id)
+        logger.info(f"Running {job.job_type} job {job_id} for {job.start_date} to {job.end_date}")
+
+        # Every write the job makes is fenced with the lease token it was submitted under
+        fencing = fencing_token.set(job.fencing_token)
+        try:
+            error_message = await self._execute(job, progress)
+            status = "failed" if error_message else "completed"
+        except JobCancelledError as e:
+            status, error_message = "cancelled", str(e)
+        except Exception as e:
+            status, error_message = "failed", str(e)
+        finally:
+            fencing_token.reset(fencing)
+            self.running_progress.pop(job_id, None)
+            self.cancelled_job_ids.discard(job_id)
+
+        await self.job_repository.mark_finished(job_id, status, error_message)
+        logger.info(f"Job {job_id} finished with status {status}")
+        # Failed and cancelled jobs keep the dates they completed, so those are projected too
+        if self.index_service:
+            await self.index_service.refresh_constituent_history()
+
+    async def _execute(self, job: JobStatus, progress: JobProgress) -> Optional[str]:
+        if job.job_type == JOB_TYPE_BUILD_INDEX:
+            result = await self.build_index_manager.build_index(job.start_date, job.end_date, progress)
+            return None if result.success else result.error_message
+
+        if job.job_type == JOB_TYPE_MAINTENANCE:
+            return await self._run_maintenance(job, progress)
+
+        results = await self.index_data_dump_manager.run_backfill(job.start_date, job.end_date, progress)
+        failed_dates = [str(result.date) for result in results if not result.success]
+        if failed_dates:
+            return f"Backfill failed for {len(failed_dates)} dates: {', '.join(failed_dates)}"
+        return None
+
+    async def _run_maintenance(self, job: JobStatus, progress: JobProgress) -> Optional[str]:
+        # Archive first, so the re-clustering only rewrites the months that stay hot
+        await progress.start_phase("archiving", 1)
+        archive_result = await self.index_data_dump_manager.run_archive(job.end_date)
+        if not archive_result.success:
+            return f"Archive failed: {archive_result.error_message}"
+        await progress.advance(rows=archive_result.records_processed)
+
+        await progress.start_phase("clustering", 1)
+        cluster_result = await self.index_data_dump_manager.run_stock_data_maintenance()
+        if not cluster_result.success:
+            return f"Stock data maintenance failed: {cluster_result.error_message}"
+        await progress.advance(rows=cluster_result.records_processed)
+        return None
+
+    async def _persist_progress(self, job_id: str, progress: JobProgress):
+        await self.job_repository.update_progress(
+            job_id, progress.phase, progress.dates_total, progress.dates_done, progress.rows_written
+        )
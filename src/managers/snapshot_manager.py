@@ -0,0 +1,34 @@
+from datetime import date, datetime
+from src.services.index_service import IndexService
+from src.dtos.operation_result import OperationResult
+
+
+class SnapshotManager:
+    """Publishes the read-only snapshots reader workers serve from; used by the writer process"""
+
+    def __init__(self, index_service: IndexService):
+        self.index_service = index_service
+
+    async def run_publish(self) -> OperationResult:
+        """Publish a snapshot if data changed; records_processed is the data version published (0 when unchanged)"""
+        start_time = datetime.now()
+
+        try:
+            version = await self.index_service.publish_snapshot()
+            return OperationResult(
+                success=True,
+                operation="publish_snapshot",
+                date=date.today(),
+                records_processed=version or 0,
+                execution_time_seconds=(datetime.now() - start_time).total_seconds()
+            )
+
+        except Exception as e:
+            return OperationResult(
+                success=False,
+                operation="publish_snapshot",
+                date=date.today(),
+                records_processed=0,
+                execution_time_seconds=(datetime.now() - start_time).total_seconds(),
+                error_message=str(e)
+            )
@@ -1,4 +1,11 @@
 from .base_repository import BaseRepository
 from .stock_price_history_repository import StockPriceHistoryRepository
+from .job_repository import JobRepository
+from .analytics_repository import AnalyticsRepository
+from .index_variant_repository import IndexVariantRepository
+from .backtest_repository import BacktestRepository
+from .staging import StagingValidationError
+from .securities import SecurityMap
 
-__all__ = ["BaseRepository", "StockPriceHistoryRepository"]
+__all__ = ["BaseRepository", "StockPriceHistoryRepository", "JobRepository", "AnalyticsRepository", "IndexVariantRepository",
+           "BacktestRepository", "StagingValidationError", "SecurityMap"]
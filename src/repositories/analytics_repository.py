@@ -0,0 +1,192 @@
+import asyncio
+from datetime import date
+from typing import Dict, List, Optional
+import numpy as np
+from src.repositories.base_repository import BaseRepository
+from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
+
+
+# Per-symbol contribution to the compounded index return over a range.
+# Each day's weighted return is scaled by the index growth up to the prior day,
+# so the contributions sum exactly to the compounded index return. Ranking and
+# top/bottom-K selection happen in the engine; bottom ranks are the exact
+# reverse of top ranks so callers can split the ordered rows without sorting.
+RETURN_ATTRIBUTION_SQL = """
+WITH holdings AS MATERIALIZED (
+    SELECT compositions.date, securities.symbol, securities.name AS company_name,
+           CAST(compositions.weight_percent AS DOUBLE) / 100 AS weight,
+           COALESCE(CAST(compositions.return_percent AS DOUBLE), 0) / 100 AS asset_return
+    FROM {index_compositions} AS compositions
+    JOIN securities ON securities.security_id = compositions.security_id
+    WHERE compositions.date >= ? AND compositions.date <= ?
+),
+daily AS (
+    SELECT date, SUM(weight * asset_return) AS index_return
+    FROM holdings
+    GROUP BY date
+),
+linked AS (
+    SELECT date,
+           COALESCE(EXP(SUM(LN(1 + index_return)) OVER (
+               ORDER BY date ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+           )), 1.0) AS growth_before
+    FROM daily
+),
+contributions AS (
+    SELECT holdings.symbol,
+           arg_max(holdings.company_name, holdings.date) AS company_name,
+           SUM(holdings.weight * holdings.asset_return * linked.growth_before) AS contribution,
+           AVG(holdings.weight) AS average_weight,
+           COUNT(*) AS days_in_index,
+           EXP(SUM(LN(1 + holdings.asset_return))) - 1 AS compounded_return
+    FROM holdings
+    JOIN linked ON linked.date = holdings.date
+    GROUP BY holdings.symbol
+)
+SELECT symbol, company_name, contribution, average_weight, days_in_index, compounded_return,
+       ROW_NUMBER() OVER (ORDER BY contribution DESC, symbol ASC) AS top_rank,
+       ROW_NUMBER() OVER (ORDER BY contribution ASC, symbol DESC) AS bottom_rank,
+       SUM(contribution) OVER () AS index_return,
+       COUNT(*) OVER () AS constituents_count,
+       (SELECT COUNT(*) FROM daily) AS trading_days
+FROM contributions
+QUALIFY top_rank <= ? OR bottom_rank <= ?
+ORDER BY top_rank ASC;
+"""
+
+
+# Dense dates x symbols grid of daily returns for the constituents of $1 over
+# the last $2 stored trading days up to $1. The cross join emits every cell in
+# row-major order, so the result reshapes straight into a matrix; days a symbol
+# has no price row come back as NaN. Prices are matched by symbol through every
+# security listed under it, so a renamed company keeps its history.
+RETURN_MATRIX_SQL = """
+WITH members AS (
+    SELECT DISTINCT securities.symbol
+    FROM {index_compositions} AS index_compositions
+    JOIN securities ON securities.security_id = index_compositions.security_id
+    WHERE index_compositions.date = $1
+),
+listings AS (
+    SELECT securities.security_id, securities.symbol
+    FROM securities
+    JOIN members ON members.symbol = securities.symbol
+),
+trading_days AS (
+    SELECT DISTINCT created_at AS date
+    FROM {stock_price_history} AS stock_price_history
+    WHERE created_at <= $1
+    ORDER BY created_at DESC
+    LIMIT $2
+)
+SELECT trading_days.date, members.symbol,
+       COALESCE(CAST(stocks.one_day_return AS DOUBLE) / 100, 'NaN'::DOUBLE) AS daily_return
+FROM trading_days
+CROSS JOIN members
+LEFT JOIN ({stock_price_history} AS stocks JOIN listings ON listings.security_id = stocks.security_id)
+  ON stocks.created_at = trading_days.date AND listings.symbol = members.symbol
+ORDER BY trading_days.date ASC, members.symbol ASC;
+"""
+
+
+class AnalyticsRepository:
+    """Columnar reads for analytics; results come back as NumPy arrays rather than models"""
+
+    def __init__(self, base_repository: BaseRepository):
+        self.base_repository = base_repository
+
+    @property
+    def connection(self):
+        return self.base_repository.connection
+
+    # One data version for every table, read the same way
+    get_data_version = StockPriceHistoryRepository.get_data_version
+
+    async def get_performance_series(
+        self, start_date: date, end_date: date, benchmark_symbol: Optional[str] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Daily index returns and values with the benchmark's return on the same dates.
+
+        The benchmark is one symbol's return when ``benchmark_symbol`` is given,
+        otherwise the market-cap weighted return of every stock stored that day.
+        Returns are fractional and a missing benchmark day is NaN.
+        """
+        if benchmark_symbol:
+            benchmark_sql = """
+            SELECT created_at, CAST(one_day_return AS DOUBLE) / 100 AS benchmark_return
+            FROM {stock_price_history} AS stock_price_history
+            WHERE security_id IN (SELECT security_id FROM securities WHERE symbol = ?)
+              AND created_at >= ? AND created_at <= ?
+            """
+            benchmark_params = [benchmark_symbol, start_date, end_date]
+        else:
+            benchmark_sql = """
+            SELECT created_at,
+                   SUM(CAST(one_day_return AS DOUBLE) * CAST(market_cap AS DOUBLE))
+                   / SUM(CAST(market_cap AS DOUBLE)) / 100 AS benchmark_return
+            FROM {stock_price_history} AS stock_price_history
+            WHERE created_at >= ? AND created_at <= ?
+            GROUP BY created_at
+            """
+            benchmark_params = [start_date, end_date]
+
+        query_sql = f"""
+        SELECT performance.date,
+               CAST(performance.daily_return_percent AS DOUBLE) / 100 AS daily_return,
+               CAST(performance.index_value AS DOUBLE) AS index_value,
+               COALESCE(benchmark.benchmark_return, 'NaN'::DOUBLE) AS benchmark_return
+        FROM index_performance AS performance
+        LEFT JOIN ({benchmark_sql}) AS benchmark ON benchmark.created_at = performance.date
+        WHERE performance.date >= ? AND performance.date <= ?
+        ORDER BY performance.date ASC;
+        """
+        try:
+            query_sql = self.base_repository.archive.with_sources(query_sql, start_date, end_date)
+            result = await asyncio.to_thread(
+                self.connection.execute, query_sql, benchmark_params + [start_date, end_date]
+            )
+            columns = result.fetchnumpy()
+            return {
+                "date": columns["date"].astype("datetime64[D]"),
+                "daily_return": np.asarray(columns["daily_return"], dtype=float),
+                "index_value": np.asarray(columns["index_value"], dtype=float),
+                "benchmark_return": np.asarray(columns["benchmark_return"], dtype=float),
+            }
+        except Exception:
+            return {}
+
+    async def get_return_attribution(self, start_date: date, end_date: date, limit: int) -> List[tuple]:
+        try:
+            query_sql = self.base_repository.archive.with_sources(RETURN_ATTRIBUTION_SQL, start_date, end_date)
+            result = await asyncio.to_thread(
+                self.connection.execute, query_sql, [start_date, end_date, limit, limit]
+            )
+            return result.fetchall()
+        except Exception:
+            return []
+
+    async def get_return_matrix(self, target_date: date, window: int) -> Dict[str, np.ndarray]:
+        """
+        Daily returns of the index constituents on ``target_date`` as a dense matrix.
+
+        Returns ``dates`` (rows), ``symbols`` (columns) and ``returns`` with shape
+        ``(len(dates), len(symbols))``; returns are fractional and missing days NaN.
+        """
+        try:
+            # The window reaches back an unknown number of calendar days, so every earlier month is a source
+            query_sql = self.base_repository.archive.with_sources(RETURN_MATRIX_SQL, None, target_date)
+            result = await asyncio.to_thread(
+                self.connection.execute, query_sql, [target_date, window]
+            )
+            columns = result.fetchnumpy()
+            if len(columns["date"]) == 0:
+                return {}
+            symbol_count = int(np.count_nonzero(columns["date"] == columns["date"][0]))
+            return {
+                "dates": columns["date"][::symbol_count].astype("datetime64[D]"),
+                "symbols": np.asarray(columns["symbol"][:symbol_count]).astype(str),
+                "returns": np.asarray(columns["daily_return"], dtype=float).reshape(-1, symbol_count),
+            }
+        except Exception:
+            return {}
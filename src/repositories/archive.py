@@ -0,0 +1,191 @@
+"""
+Parquet archive tier for closed months of the daily fact tables.
+
+Months older than the hot window are exported from stock_price_history and
+index_compositions to one zstd-compressed Parquet file per month, laid out
+as Hive partitions (``<table>/year=YYYY/month=MM/data.parquet``), and deleted
+from the database. ``archived_partitions`` lists the files; the
+``<table>_all`` views union the hot table with every file, and repositories
+read through ``sources``, which only names the files whose month overlaps the
+queried range. DuckDB prunes Hive directories only on constant predicates,
+so the pruning is done here rather than left to parameterized queries.
+
+A date stored in the hot table wins over the same date in the archive. The
+staged loader can therefore still replace any date, and the next run folds
+such dates back into their month's file. It also makes the run crash-safe:
+the new file is written before the transaction that deletes the hot rows
+commits, and until then every date it holds is still read from the table.
+"""
+import os
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from src.constants import ARCHIVE_HOT_MONTHS
+
+
+class ArchivedTable:
+    def __init__(self, table: str, date_column: str, columns: List[str], order_by: str):
+        self.table = table
+        self.date_column = date_column
+        self.columns = columns
+        # Row order inside a file, so row-group statistics stay selective
+        self.order_by = order_by
+
+
+ARCHIVED_TABLES = [
+    ArchivedTable(
+        "stock_price_history",
+        "created_at",
+        ["id", "security_id", "last_traded_price", "market_cap", "one_day_return", "created_at"],
+        "created_at, market_cap DESC"
+    ),
+    ArchivedTable(
+        "index_compositions",
+        "date",
+        ["id", "date", "security_id", "weight_percent", "market_cap", "price", "return_percent", "created_at"],
+        "date, security_id"
+    ),
+]
+
+PARTITIONS_SQL = """
+SELECT table_name, month, path
+FROM archived_partitions
+WHERE (? IS NULL OR month >= date_trunc('month', ?::DATE)) AND (? IS NULL OR month <= ?)
+ORDER BY table_name, month;
+"""
+
+
+def month_end(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+class ParquetArchive:
+    def __init__(self, connection_source, archive_path: str):
+        # Callable returning the current connection, so a reconnect is picked up
+        self._connection_source = connection_source
+        self.archive_path = os.path.abspath(archive_path)
+
+    def sources(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict[str, str]:
+        """Table name -> relation holding its rows in [start_date, end_date], either bound open"""
+        cursor = self._connection_source().cursor()
+        try:
+            rows = cursor.execute(PARTITIONS_SQL, [start_date, start_date, end_date, end_date]).fetchall()
+        finally:
+            cursor.close()
+        months = {archived.table: [] for archived in ARCHIVED_TABLES}
+        for table_name, month, path in rows:
+            months[table_name].append((month, path))
+        return {
+            archived.table: f"({self._unified_sql(archived, months[archived.table])})" if months[archived.table] else archived.table
+            for archived in ARCHIVED_TABLES
+        }
+
+    def with_sources(self, query_sql: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> str:
+        """``query_sql`` with its {stock_price_history} and {index_compositions} placeholders filled for the range"""
+        return query_sql.format(**self.sources(start_date, end_date))
+
+    def archive_closed_months(self, today: date) -> int:
+        """Move every month before the hot window to Parquet; returns the rows moved out of the database"""
+        cutoff = today.replace(day=1)
+        for _ in range(ARCHIVE_HOT_MONTHS):
+            cutoff = (cutoff - timedelta(days=1)).replace(day=1)
+
+        archived_rows = 0
+        for archived in ARCHIVED_TABLES:
+            cursor = self._connection_source().cursor()
+            try:
+                months = cursor.execute(f"""
+                    SELECT DISTINCT date_trunc('month', {archived.date_column})::DATE AS month
+                    FROM {archived.table}
+                    WHERE {archived.date_column} < ?
+                    ORDER BY month;
+                """, [cutoff]).fetchall()
+            finally:
+                cursor.close()
+            for (month,) in months:
+                archived_rows += self._archive_month(archived, month)
+        if archived_rows:
+            self._export_securities()
+        return archived_rows
+
+    def _archive_month(self, archived: ArchivedTable, month: date) -> int:
+        relative_path = os.path.join(archived.table, f"year={month.year}", f"month={month.month:02d}", "data.parquet")
+        path = os.path.join(self.archive_path, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        in_month = f"{archived.date_column} BETWEEN DATE '{month}' AND DATE '{month_end(month)}'"
+        columns = ", ".join(archived.columns)
+
+        cursor = self._connection_source().cursor()
+        try:
+            cursor.execute("BEGIN TRANSACTION;")
+            try:
+                hot_rows = cursor.execute(f"SELECT COUNT(*) FROM {archived.table} WHERE {in_month};").fetchone()[0]
+                # Hot rows, plus the dates of an earlier export of this month they do not replace
+                rows = f"SELECT {columns} FROM {archived.table} WHERE {in_month}"
+                if os.path.exists(path):
+                    rows += f"""
+                    UNION ALL
+                    SELECT {columns} FROM read_parquet({_literal(path)})
+                    WHERE {archived.date_column} NOT IN (SELECT {archived.date_column} FROM {archived.table} WHERE {in_month})
+                    """
+                temporary_path = f"{path}.tmp"
+                file_rows = cursor.execute(f"""
+                    COPY (SELECT * FROM ({rows}) ORDER BY {archived.order_by})
+                    TO {_literal(temporary_path)} (FORMAT PARQUET, COMPRESSION ZSTD);
+                """).fetchone()[0]
+                os.replace(temporary_path, path)
+
+                cursor.execute(f"DELETE FROM {archived.table} WHERE {in_month};")
+                cursor.execute("""
+                    INSERT INTO archived_partitions (table_name, month, path, rows_archived, archived_at)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT (table_name, month) DO UPDATE SET
+                        path = excluded.path, rows_archived = excluded.rows_archived, archived_at = excluded.archived_at;
+                """, [archived.table, month, relative_path, file_rows])
+                self._refresh_view(cursor, archived)
+                cursor.execute("COMMIT;")
+                return hot_rows
+            except Exception:
+                cursor.execute("ROLLBACK;")
+                raise
+        finally:
+            cursor.close()
+
+    def _refresh_view(self, cursor, archived: ArchivedTable) -> None:
+        months = cursor.execute(
+            "SELECT month, path FROM archived_partitions WHERE table_name = ? ORDER BY month;", [archived.table]
+        ).fetchall()
+        cursor.execute(f"CREATE OR REPLACE VIEW {archived.table}_all AS {self._unified_sql(archived, months)};")
+
+    def _export_securities(self) -> None:
+        # Archived rows carry only security_id; readers of the files outside this process need the names too
+        path = os.path.join(self.archive_path, "securities.parquet")
+        cursor = self._connection_source().cursor()
+        try:
+            cursor.execute(f"""
+                COPY (SELECT * FROM securities ORDER BY security_id)
+                TO {_literal(f"{path}.tmp")} (FORMAT PARQUET, COMPRESSION ZSTD);
+            """)
+        finally:
+            cursor.close()
+        os.replace(f"{path}.tmp", path)
+
+    def _unified_sql(self, archived: ArchivedTable, months: list) -> str:
+        columns = ", ".join(archived.columns)
+        if not months:
+            return f"SELECT {columns} FROM {archived.table}"
+        files = ", ".join(_literal(os.path.join(self.archive_path, path)) for _, path in months)
+        archived_range = (
+            f"{archived.date_column} BETWEEN DATE '{months[0][0]}' AND DATE '{month_end(months[-1][0])}'"
+        )
+        return f"""
+            SELECT {columns} FROM {archived.table}
+            UNION ALL
+            SELECT {columns} FROM read_parquet([{files}])
+            WHERE {archived.date_column} NOT IN (
+                SELECT DISTINCT {archived.date_column} FROM {archived.table} WHERE {archived_range}
+            )
+        """
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
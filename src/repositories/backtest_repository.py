@@ -0,0 +1,108 @@
+import asyncio
+from datetime import date
+from typing import Dict, List
+import numpy as np
+from src.dtos.backtest_result import BacktestResult, BacktestRun
+from src.repositories.base_repository import BaseRepository
+
+# Every stock's daily return and market-cap rank over [$1, $2] as a dense
+# dates x symbols grid in row-major order. A stock with no row on a date gets
+# a NaN return and rank 0.
+MARKET_DATA_SQL = """
+WITH stocks AS MATERIALIZED (
+    SELECT stocks.created_at AS date, securities.symbol,
+           CAST(stocks.one_day_return AS DOUBLE) / 100 AS daily_return,
+           ROW_NUMBER() OVER (
+               PARTITION BY stocks.created_at ORDER BY stocks.market_cap DESC, securities.symbol ASC
+           ) AS market_cap_rank
+    FROM {stock_price_history} AS stocks
+    JOIN securities ON securities.security_id = stocks.security_id
+    WHERE stocks.created_at >= $1 AND stocks.created_at <= $2
+),
+trading_days AS (
+    SELECT DISTINCT date FROM stocks
+),
+symbols AS (
+    SELECT DISTINCT symbol FROM stocks
+)
+SELECT trading_days.date, symbols.symbol,
+       COALESCE(stocks.daily_return, 'NaN'::DOUBLE) AS daily_return,
+       COALESCE(stocks.market_cap_rank, 0) AS market_cap_rank
+FROM trading_days
+CROSS JOIN symbols
+LEFT JOIN stocks ON stocks.date = trading_days.date AND stocks.symbol = symbols.symbol
+ORDER BY trading_days.date ASC, symbols.symbol ASC;
+"""
+
+RESULT_COLUMNS = list(BacktestResult.model_fields.keys())
+
+
+class BacktestRepository:
+    def __init__(self, base_repository: BaseRepository):
+        self.base_repository = base_repository
+
+    @property
+    def connection(self):
+        return self.base_repository.connection
+
+    async def get_market_data(self, start_date: date, end_date: date) -> Dict[str, np.ndarray]:
+        """Returns and market-cap ranks as dates x symbols arrays, or an empty dict when there is no data"""
+        try:
+            query_sql = self.base_repository.archive.with_sources(MARKET_DATA_SQL, start_date, end_date)
+            result = await asyncio.to_thread(self.connection.execute, query_sql, [start_date, end_date])
+            columns = result.fetchnumpy()
+            if len(columns["date"]) == 0:
+                return {}
+            symbol_count = int(np.count_nonzero(columns["date"] == columns["date"][0]))
+            return {
+                "dates": columns["date"][::symbol_count].astype("datetime64[D]"),
+                "symbols": np.asarray(columns["symbol"][:symbol_count]).astype(str),
+                "returns": np.asarray(columns["daily_return"], dtype=float).reshape(-1, symbol_count),
+                "ranks": np.asarray(columns["market_cap_rank"], dtype=np.int32).reshape(-1, symbol_count),
+            }
+        except Exception:
+            return {}
+
+    async def save_run(self, run: BacktestRun) -> None:
+        await asyncio.to_thread(self._save_run, run)
+
+    def _save_run(self, run: BacktestRun) -> None:
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("BEGIN TRANSACTION;")
+            cursor.execute("""
+                INSERT INTO backtest_runs (
+                    run_id, start_date, end_date, symbols_count, days_count, cost_bps,
+                    variants_count, workers, elapsed_seconds
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+            """, [
+                run.run_id, run.start_date, run.end_date, run.symbols_count, run.days_count, run.cost_bps,
+                run.variants_count, run.workers, run.elapsed_seconds
+            ])
+            if run.results:
+                cursor.executemany(
+                    f"""
+                    INSERT INTO backtest_results (run_id, {', '.join(RESULT_COLUMNS)})
+                    VALUES (?, {', '.join('?' for _ in RESULT_COLUMNS)});
+                    """,
+                    [[run.run_id] + [getattr(result, column) for column in RESULT_COLUMNS] for result in run.results]
+                )
+            cursor.execute("COMMIT;")
+        except Exception:
+            cursor.execute("ROLLBACK;")
+            raise
+        finally:
+            cursor.close()
+
+    async def get_results(self, run_id: str) -> List[BacktestResult]:
+        try:
+            query_sql = f"""
+            SELECT {', '.join(RESULT_COLUMNS)}
+            FROM backtest_results
+            WHERE run_id = ?
+            ORDER BY sharpe_ratio DESC NULLS LAST, top_n ASC, rebalance ASC, buffer ASC, turnover_cap_percent ASC NULLS FIRST;
+            """
+            result = await asyncio.to_thread(self.connection.execute, query_sql, [run_id])
+            return [BacktestResult(**dict(zip(RESULT_COLUMNS, row))) for row in result.fetchall()]
+        except Exception:
+            return []
@@ -1,28 +1,69 @@
 import os
+import threading
 import duckdb
 from typing import Optional
+from src.repositories.archive import ParquetArchive
+from src.repositories.securities import SecurityMap
+from src.repositories.snapshot import DatabaseSnapshot, default_snapshot_path, published_snapshot
 
 
 class BaseRepository:
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, read_only: bool = False, snapshot_path: Optional[str] = None):
         self.db_path = db_path or os.getenv("DUCKDB_PATH", "data/hedgineer.db")
-        self.connection = None
-        self._ensure_db_directory()
-        self._initialize_connection()
-    
+        # Read-only repositories read the writer's published snapshot, never the database itself
+        self.read_only = read_only
+        self.snapshot_path = snapshot_path or os.getenv("SNAPSHOT_PATH") or default_snapshot_path(self.db_path)
+        self._connection = None
+        self._connection_lock = threading.Lock()
+        self._snapshot_file = None
+        self.snapshot = DatabaseSnapshot(lambda: self.connection, self.snapshot_path)
+        # Shared by every repository on this connection
+        self.securities = SecurityMap(lambda: self.connection)
+        self.archive = ParquetArchive(
+            lambda: self.connection,
+            os.getenv("ARCHIVE_PATH", os.path.join(os.path.dirname(self.db_path), "archive"))
+        )
+
+    @property
+    def connection(self) -> duckdb.DuckDBPyConnection:
+        if self.read_only:
+            return self._snapshot_connection()
+        # Opened on first use, so building the container does not touch the database file
+        if self._connection is None:
+            with self._connection_lock:
+                if self._connection is None:
+                    self._ensure_db_directory()
+                    self._initialize_connection()
+        return self._connection
+
+    def _snapshot_connection(self) -> duckdb.DuckDBPyConnection:
+        snapshot_file = published_snapshot(self.snapshot_path)
+        if snapshot_file is None:
+            raise Exception(f"No DuckDB snapshot has been published at {self.snapshot_path}")
+        if snapshot_file != self._snapshot_file:
+            with self._connection_lock:
+                if snapshot_file != self._snapshot_file:
+                    try:
+                        connection = duckdb.connect(snapshot_file, read_only=True)
+                    except Exception as e:
+                        raise Exception(f"Failed to open DuckDB snapshot {snapshot_file}: {e}")
+                    # The previous snapshot is not closed: queries still running on it keep it alive until they finish
+                    self._connection, self._snapshot_file = connection, snapshot_file
+        return self._connection
+
     def _ensure_db_directory(self):
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
     
     def _initialize_connection(self):
         try:
-            self.connection = duckdb.connect(self.db_path)
+            self._connection = duckdb.connect(self.db_path)
         except Exception as e:
             raise Exception(f"Failed to initialize DuckDB connection: {e}")
     
     def close(self):
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        if self._connection:
+            self._connection.close()
+            self._connection = None
     
     def __del__(self):
         self.close()
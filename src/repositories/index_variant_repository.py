@@ -0,0 +1,240 @@
+import asyncio
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from src.dtos.index_definition import IndexDefinition
+from src.dtos.index_result import IndexComposition, IndexPerformance
+from src.repositories.base_repository import BaseRepository
+from src.repositories.staging import check_fencing_token
+from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
+
+DEFINITION_COLUMNS = ["index_id", "name", "top_n", "weighting", "rebalance", "base_value"]
+
+# Holdings of every requested variant over [$1, $2] from one scan of
+# stock_price_history, starting at $4: the first of $1's month or week,
+# whichever is earlier, so every variant can see the rebalance date of the
+# period $1 falls in. Each stock is ranked by market cap once per day and every
+# variant takes its own top_n from that shared ranking. Members chosen on a
+# rebalance date are held until the next one, using that day's price and
+# return, or the rebalance-day row and a zero return on a day the stock has no
+# price row. weight_percent is the rebalance weight; every day of the period
+# is returned, from its rebalance date on, so the caller can drift the weights
+# with returns. Rows are ordered so each period is a days x members block.
+VARIANT_HOLDINGS_SQL = """
+WITH definitions AS (
+    SELECT index_id, top_n, weighting, rebalance FROM index_definitions WHERE index_id = ANY($3)
+),
+stocks AS MATERIALIZED (
+    SELECT stocks.created_at AS date, securities.symbol, securities.name AS company_name,
+           CAST(stocks.market_cap AS DOUBLE) AS market_cap,
+           CAST(stocks.last_traded_price AS DOUBLE) AS price,
+           CAST(stocks.one_day_return AS DOUBLE) AS return_percent,
+           ROW_NUMBER() OVER (
+               PARTITION BY stocks.created_at ORDER BY stocks.market_cap DESC, securities.symbol ASC
+           ) AS market_cap_rank
+    FROM {stock_price_history} AS stocks
+    JOIN securities ON securities.security_id = stocks.security_id
+    WHERE stocks.created_at >= $4 AND stocks.created_at <= $2
+),
+trading_days AS (
+    SELECT date,
+           MIN(date) OVER (PARTITION BY date_trunc('week', date)) AS week_start,
+           MIN(date) OVER (PARTITION BY date_trunc('month', date)) AS month_start
+    FROM (SELECT DISTINCT date FROM stocks)
+),
+periods AS (
+    SELECT definitions.index_id, trading_days.date,
+           CASE definitions.rebalance
+               WHEN 'monthly' THEN trading_days.month_start
+               WHEN 'weekly' THEN trading_days.week_start
+               ELSE trading_days.date
+           END AS rebalance_date
+    FROM definitions
+    CROSS JOIN trading_days
+),
+schedule AS MATERIALIZED (
+    SELECT index_id, date, rebalance_date
+    FROM periods
+    QUALIFY rebalance_date >= MIN(CASE WHEN date >= $1 THEN rebalance_date END) OVER (PARTITION BY index_id)
+),
+selections AS MATERIALIZED (
+    SELECT definitions.index_id, stocks.date AS rebalance_date, stocks.symbol, stocks.company_name,
+           stocks.market_cap, stocks.price,
+           CASE definitions.weighting
+               WHEN 'market_cap' THEN stocks.market_cap / SUM(stocks.market_cap) OVER selection
+               ELSE 1.0 / COUNT(*) OVER selection
+           END * 100 AS weight_percent
+    FROM definitions
+    JOIN stocks ON stocks.market_cap_rank <= definitions.top_n
+    SEMI JOIN schedule ON schedule.index_id = definitions.index_id AND schedule.rebalance_date = stocks.date
+    WINDOW selection AS (PARTITION BY definitions.index_id, stocks.date)
+)
+SELECT schedule.index_id, schedule.rebalance_date, schedule.date, selections.symbol,
+       COALESCE(day.company_name, selections.company_name) AS company_name,
+       selections.weight_percent,
+       COALESCE(day.market_cap, selections.market_cap) AS market_cap,
+       COALESCE(day.price, selections.price) AS price,
+       COALESCE(day.return_percent, 0.0) AS return_percent
+FROM schedule
+JOIN selections ON selections.index_id = schedule.index_id AND selections.rebalance_date = schedule.rebalance_date
+LEFT JOIN stocks AS day ON day.date = schedule.date AND day.symbol = selections.symbol
+ORDER BY schedule.index_id, schedule.rebalance_date, schedule.date, selections.symbol;
+"""
+
+# Holdings to keep: those in [$1, $2], with the weights the caller drifted
+INSERT_VARIANT_COMPOSITIONS_SQL = """
+INSERT INTO index_variant_compositions
+SELECT index_id, date, symbol, company_name, weight_percent, market_cap, price, return_percent
+FROM variant_holdings
+WHERE date >= $1;
+"""
+
+# Daily performance of the variants rebuilt over [$1, $2], chained from each
+# variant's last stored index value before $1 (or its base value).
+BUILD_VARIANT_PERFORMANCE_SQL = """
+INSERT INTO index_variant_performance
+WITH daily AS (
+    SELECT index_id, date,
+           SUM(weight_percent * COALESCE(return_percent, 0)) / 100 AS daily_return_percent,
+           COUNT(*) AS companies_count
+    FROM index_variant_compositions
+    WHERE index_id = ANY($3) AND date >= $1 AND date <= $2
+    GROUP BY index_id, date
+),
+starting_values AS (
+    SELECT definitions.index_id, definitions.base_value,
+           COALESCE(previous.index_value, definitions.base_value) AS starting_value
+    FROM index_definitions AS definitions
+    LEFT JOIN (
+        SELECT index_id, arg_max(index_value, date) AS index_value
+        FROM index_variant_performance
+        WHERE index_id = ANY($3) AND date < $1
+        GROUP BY index_id
+    ) AS previous ON previous.index_id = definitions.index_id
+    WHERE definitions.index_id = ANY($3)
+),
+chained AS (
+    SELECT daily.index_id, daily.date, daily.daily_return_percent, daily.companies_count,
+           starting_values.base_value,
+           starting_values.starting_value * EXP(SUM(LN(1 + daily.daily_return_percent / 100)) OVER (
+               PARTITION BY daily.index_id ORDER BY daily.date ROWS UNBOUNDED PRECEDING
+           )) AS index_value
+    FROM daily
+    JOIN starting_values ON starting_values.index_id = daily.index_id
+)
+SELECT index_id, date, daily_return_percent, (index_value / base_value - 1) * 100, index_value, companies_count
+FROM chained;
+"""
+
+
+class IndexVariantRepository:
+    def __init__(self, base_repository: BaseRepository):
+        self.base_repository = base_repository
+
+    @property
+    def connection(self):
+        return self.base_repository.connection
+
+    # One data version for every table, read the same way
+    get_data_version = StockPriceHistoryRepository.get_data_version
+
+    async def get_definitions(self) -> List[IndexDefinition]:
+        try:
+            query_sql = f"SELECT {', '.join(DEFINITION_COLUMNS)} FROM index_definitions ORDER BY index_id ASC;"
+            result = await asyncio.to_thread(self.connection.execute, query_sql)
+            return [IndexDefinition(**dict(zip(DEFINITION_COLUMNS, row))) for row in result.fetchall()]
+        except Exception:
+            return []
+
+    async def get_definition(self, index_id: str) -> Optional[IndexDefinition]:
+        try:
+            query_sql = f"SELECT {', '.join(DEFINITION_COLUMNS)} FROM index_definitions WHERE index_id = ?;"
+            result = await asyncio.to_thread(self.connection.execute, query_sql, [index_id])
+            row = result.fetchone()
+            return IndexDefinition(**dict(zip(DEFINITION_COLUMNS, row))) if row else None
+        except Exception:
+            return None
+
+    async def insert_definition(self, definition: IndexDefinition) -> bool:
+        try:
+            insert_sql = f"""
+            INSERT INTO index_definitions ({', '.join(DEFINITION_COLUMNS)})
+            VALUES (?, ?, ?, ?, ?, ?);
+            """
+            params = [getattr(definition, column) for column in DEFINITION_COLUMNS]
+            await asyncio.to_thread(self.connection.execute, insert_sql, params)
+            return True
+        except Exception:
+            return False
+
+    async def build_variants(
+        self, start_date: date, end_date: date, index_ids: List[str],
+        reweight: Callable[[Dict[str, np.ndarray]], np.ndarray]
+    ) -> int:
+        """
+        Replace the compositions and performance of ``index_ids`` over a range; returns composition rows written.
+
+        ``reweight`` takes the holdings' columns and returns each row's weight for the day.
+        """
+        return await asyncio.to_thread(self._build_variants, start_date, end_date, index_ids, reweight)
+
+    def _build_variants(
+        self, start_date: date, end_date: date, index_ids: List[str],
+        reweight: Callable[[Dict[str, np.ndarray]], np.ndarray]
+    ) -> int:
+        import pyarrow as pa
+
+        params = [start_date, end_date, index_ids]
+        # Weekly periods can start in the month before
+        scan_start = min(start_date.replace(day=1), start_date - timedelta(days=start_date.weekday()))
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("BEGIN TRANSACTION;")
+            check_fencing_token(cursor)
+            for table in ("index_variant_compositions", "index_variant_performance"):
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE index_id = ANY($3) AND date >= $1 AND date <= $2;", params
+                )
+            query_sql = self.base_repository.archive.with_sources(VARIANT_HOLDINGS_SQL, scan_start, end_date)
+            holdings = cursor.execute(query_sql, params + [scan_start]).fetchnumpy()
+            holdings["weight_percent"] = reweight(holdings)
+            cursor.register("variant_holdings", pa.table(holdings))
+            rows_written = cursor.execute(INSERT_VARIANT_COMPOSITIONS_SQL, [start_date]).fetchone()[0]
+            cursor.unregister("variant_holdings")
+            cursor.execute(BUILD_VARIANT_PERFORMANCE_SQL, params)
+            cursor.execute("UPDATE data_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;")
+            cursor.execute("COMMIT;")
+            return rows_written
+        except Exception:
+            cursor.execute("ROLLBACK;")
+            raise
+        finally:
+            cursor.close()
+
+    async def get_composition(self, index_id: str, target_date: date) -> List[IndexComposition]:
+        try:
+            query_sql = """
+            SELECT date, symbol, company_name, weight_percent, market_cap, price, return_percent
+            FROM index_variant_compositions
+            WHERE index_id = ? AND date = ?
+            ORDER BY market_cap DESC;
+            """
+            result = await asyncio.to_thread(self.connection.execute, query_sql, [index_id, target_date])
+            columns = ["date", "symbol", "company_name", "weight_percent", "market_cap", "price", "return_percent"]
+            return [IndexComposition(**dict(zip(columns, row))) for row in result.fetchall()]
+        except Exception:
+            return []
+
+    async def get_performance(self, index_id: str, start_date: date, end_date: date) -> List[IndexPerformance]:
+        try:
+            query_sql = """
+            SELECT date, daily_return_percent, cumulative_return_percent, index_value, companies_count
+            FROM index_variant_performance
+            WHERE index_id = ? AND date >= ? AND date <= ?
+            ORDER BY date ASC;
+            """
+            result = await asyncio.to_thread(self.connection.execute, query_sql, [index_id, start_date, end_date])
+            columns = ["date", "daily_return_percent", "cumulative_return_percent", "index_value", "companies_count"]
+            return [IndexPerformance(**dict(zip(columns, row))) for row in result.fetchall()]
+        except Exception:
+            return []
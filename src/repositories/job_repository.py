@@ -0,0 +1,161 @@
+import asyncio
+import threading
+from datetime import date
+from typing import List, Optional
+from src.dtos.job_result import JobStatus
+from src.repositories.base_repository import BaseRepository
+
+JOB_COLUMNS = """
+id, job_type, start_date, end_date, status, phase, dates_total, dates_done,
+rows_written, cancel_requested, error_message, created_at, started_at, finished_at,
+date_diff('millisecond', started_at, COALESCE(finished_at, CURRENT_TIMESTAMP::TIMESTAMP)) AS elapsed_ms,
+fencing_token
+"""
+
+
+class JobRepository:
+    def __init__(self, base_repository: BaseRepository):
+        self.base_repository = base_repository
+        # Claims run one at a time: the check and the insert are then atomic, and DuckDB never sees
+        # two conflicting claims (it can lose a committed job row when a conflicting one rolls back).
+        # Only one process opens the database read-write, so this orders every claim
+        self._claim_lock = threading.Lock()
+
+    @property
+    def connection(self):
+        return self.base_repository.connection
+
+    async def claim_job(
+        self, job_id: str, job_type: str, dedupe_key: str, start_date: date, end_date: date,
+        fencing_token: Optional[int] = None
+    ) -> Optional[JobStatus]:
+        """Queue a new job unless one with the same dedupe key is active; returns whichever job is active"""
+        active_job_id = await asyncio.to_thread(
+            self._claim_job, job_id, job_type, dedupe_key, start_date, end_date, fencing_token
+        )
+        return await self.get_job(active_job_id)
+
+    def _claim_job(
+        self, job_id: str, job_type: str, dedupe_key: str, start_date: date, end_date: date,
+        fencing_token: Optional[int]
+    ) -> str:
+        cursor = self.connection.cursor()
+        try:
+            with self._claim_lock:
+                cursor.execute("BEGIN TRANSACTION;")
+                try:
+                    claim = cursor.execute("""
+                        SELECT job_claims.job_id, jobs.status IN ('queued', 'running')
+                        FROM job_claims
+                        LEFT JOIN jobs ON jobs.id = job_claims.job_id
+                        WHERE job_claims.dedupe_key = ?;
+                    """, [dedupe_key]).fetchone()
+                    if claim and claim[1]:
+                        cursor.execute("COMMIT;")
+                        return claim[0]
+                    if claim:
+                        cursor.execute("UPDATE job_claims SET job_id = ? WHERE dedupe_key = ?;", [job_id, dedupe_key])
+                    else:
+                        cursor.execute(
+                            "INSERT INTO job_claims (dedupe_key, job_id) VALUES (?, ?);", [dedupe_key, job_id]
+                        )
+                    cursor.execute("""
+                        INSERT INTO jobs (id, job_type, dedupe_key, start_date, end_date, status, fencing_token)
+                        VALUES (?, ?, ?, ?, ?, 'queued', ?);
+                    """, [job_id, job_type, dedupe_key, start_date, end_date, fencing_token])
+                    cursor.execute("COMMIT;")
+                    return job_id
+                except Exception:
+                    cursor.execute("ROLLBACK;")
+                    raise
+        finally:
+            cursor.close()
+
+    async def get_job(self, job_id: str) -> Optional[JobStatus]:
+        try:
+            query_sql = f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?;"
+            rows = await asyncio.to_thread(self._fetch_all, query_sql, [job_id])
+            row = rows[0] if rows else None
+            return self._to_job_status(row) if row else None
+        except Exception:
+            return None
+
+    async def get_unfinished_jobs(self) -> List[JobStatus]:
+        try:
+            query_sql = f"""
+            SELECT {JOB_COLUMNS} FROM jobs
+            WHERE status IN ('queued', 'running')
+            ORDER BY created_at ASC;
+            """
+            rows = await asyncio.to_thread(self._fetch_all, query_sql, [])
+            return [self._to_job_status(row) for row in rows]
+        except Exception:
+            return []
+
+    async def mark_queued(self, job_id: str) -> None:
+        update_sql = "UPDATE jobs SET status = 'queued', started_at = NULL WHERE id = ?;"
+        await asyncio.to_thread(self._fetch_all, update_sql, [job_id])
+
+    async def mark_running(self, job_id: str) -> None:
+        update_sql = """
+        UPDATE jobs
+        SET status = 'running', started_at = CURRENT_TIMESTAMP, dates_done = 0, rows_written = 0
+        WHERE id = ?;
+        """
+        await asyncio.to_thread(self._fetch_all, update_sql, [job_id])
+
+    async def update_progress(self, job_id: str, phase: Optional[str], dates_total: int, dates_done: int, rows_written: int) -> None:
+        update_sql = """
+        UPDATE jobs
+        SET phase = ?, dates_total = ?, dates_done = ?, rows_written = ?
+        WHERE id = ?;
+        """
+        try:
+            await asyncio.to_thread(self._fetch_all, update_sql, [phase, dates_total, dates_done, rows_written, job_id])
+        except Exception:
+            pass
+
+    async def mark_finished(self, job_id: str, status: str, error_message: Optional[str] = None) -> None:
+        update_sql = """
+        UPDATE jobs
+        SET status = ?, error_message = ?, finished_at = CURRENT_TIMESTAMP
+        WHERE id = ?;
+        """
+        await asyncio.to_thread(self._fetch_all, update_sql, [status, error_message, job_id])
+
+    async def request_cancel(self, job_id: str) -> None:
+        update_sql = "UPDATE jobs SET cancel_requested = TRUE WHERE id = ?;"
+        await asyncio.to_thread(self._fetch_all, update_sql, [job_id])
+
+    def _fetch_all(self, sql: str, params: list) -> list:
+        # Job status is polled while the worker writes progress, so each call gets its own cursor
+        cursor = self.connection.cursor()
+        try:
+            result = cursor.execute(sql, params)
+            return result.fetchall() if result.description else []
+        finally:
+            cursor.close()
+
+    def _to_job_status(self, row) -> JobStatus:
+        job = JobStatus(
+            id=row[0],
+            job_type=row[1],
+            start_date=row[2],
+            end_date=row[3],
+            status=row[4],
+            phase=row[5],
+            dates_total=row[6],
+            dates_done=row[7],
+            rows_written=row[8],
+            cancel_requested=row[9],
+            error_message=row[10],
+            created_at=row[11],
+            started_at=row[12],
+            finished_at=row[13],
+            fencing_token=row[15]
+        )
+        elapsed_seconds = (row[14] or 0) / 1000
+        if elapsed_seconds > 0:
+            job.rows_per_second = job.rows_written / elapsed_seconds
+            job.dates_per_second = job.dates_done / elapsed_seconds
+        return job
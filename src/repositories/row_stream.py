@@ -0,0 +1,92 @@
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+
+class RowStream:
+    """
+    Lazily executed query whose rows are consumed in fixed-size chunks.
+
+    Each iteration opens its own cursor on the shared database so a slow client
+    never holds the repository connection, and at most ``chunk_size`` rows are
+    held in memory at once.
+    """
+
+    def __init__(self, connection, query_sql: str, params: Sequence[Any], columns: List[str], chunk_size: int):
+        self.connection = connection
+        self.query_sql = query_sql
+        self.params = list(params)
+        self.columns = columns
+        self.chunk_size = chunk_size
+
+    def iter_chunks(self) -> Iterator[List[Tuple]]:
+        return self._iter_chunks(self.params)
+
+    def iter_record_batches(self) -> Iterator:
+        return self._iter_record_batches(self.params)
+
+    def _iter_chunks(self, params: List[Any]) -> Iterator[List[Tuple]]:
+        cursor = self.connection.cursor()
+        try:
+            result = cursor.execute(self.query_sql, params)
+            while True:
+                chunk = result.fetchmany(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            cursor.close()
+
+    def _iter_record_batches(self, params: List[Any]) -> Iterator:
+        cursor = self.connection.cursor()
+        try:
+            reader = cursor.execute(self.query_sql, params).fetch_record_batch(self.chunk_size)
+            for batch in reader:
+                yield batch
+        finally:
+            cursor.close()
+
+
+class PartitionedRowStream(RowStream):
+    """
+    RowStream that runs the same query once per parameter set, in order.
+
+    Used for long ranges so each execution (and any ORDER BY it needs) only
+    covers one partition instead of sorting the whole range at once.
+    """
+
+    def __init__(self, connection, query_sql: str, partition_params: List[Sequence[Any]], columns: List[str], chunk_size: int):
+        super().__init__(connection, query_sql, [], columns, chunk_size)
+        self.partition_params = [list(params) for params in partition_params]
+
+    def iter_chunks(self) -> Iterator[List[Tuple]]:
+        for params in self.partition_params:
+            yield from self._iter_chunks(params)
+
+    def iter_record_batches(self) -> Iterator:
+        for params in self.partition_params:
+            yield from self._iter_record_batches(params)
+
+
+class StaticRowStream:
+    """RowStream-compatible wrapper over rows that are already in memory"""
+
+    def __init__(self, columns: List[str], rows: List[Tuple], chunk_size: int):
+        self.columns = columns
+        self.rows = rows
+        self.chunk_size = chunk_size
+
+    def iter_chunks(self) -> Iterator[List[Tuple]]:
+        for offset in range(0, len(self.rows), self.chunk_size):
+            yield self.rows[offset:offset + self.chunk_size]
+
+    def iter_record_batches(self) -> Iterator:
+        import pyarrow as pa
+
+        schema: Optional[pa.Schema] = None
+        for chunk in self.iter_chunks():
+            arrays = [pa.array(list(column)) for column in zip(*chunk)]
+            if schema is None:
+                batch = pa.RecordBatch.from_arrays(arrays, names=self.columns)
+                schema = batch.schema
+            else:
+                batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+            yield batch
@@ -0,0 +1,42 @@
+"""
+In-process map from security_id to (symbol, name).
+
+The fact tables store only the integer security_id; the symbol and name live
+once per security in the ``securities`` dimension. A security is never
+renamed or deleted (a new symbol or name is a new security), so an id, once
+read, maps to the same pair for the life of the process. The map is therefore
+loaded once and only reloaded when a read turns up an id loaded after it.
+"""
+import threading
+from typing import Dict, Iterable, Tuple
+
+SECURITIES_SQL = "SELECT security_id, symbol, name FROM securities;"
+
+
+class SecurityMap:
+    def __init__(self, connection_source):
+        # Callable returning the current connection, so a reconnect is picked up
+        self._connection_source = connection_source
+        self._securities: Dict[int, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, security_ids: Iterable[int]) -> Dict[int, Tuple[str, str]]:
+        """The (symbol, name) of every id, reloading the map once if any is unknown"""
+        securities = self._securities
+        if any(security_id not in securities for security_id in security_ids):
+            securities = self._reload()
+        return securities
+
+    def symbol(self, security_id: int) -> str:
+        return self.resolve([security_id])[security_id][0]
+
+    def _reload(self) -> Dict[int, Tuple[str, str]]:
+        with self._lock:
+            cursor = self._connection_source().cursor()
+            try:
+                rows = cursor.execute(SECURITIES_SQL).fetchall()
+            finally:
+                cursor.close()
+            # Swapped whole, so concurrent readers see the old map or the new one
+            self._securities = {security_id: (symbol, name) for security_id, symbol, name in rows}
+            return self._securities
@@ -0,0 +1,130 @@
+"""
+Read-only snapshots of the database for reader processes.
+
+A DuckDB file is locked by the one process that opens it read-write, so API
+workers cannot read it directly. The writer instead publishes a copy: every
+table and view is copied into a new file inside one transaction, so the copy
+is a consistent point in time. Each snapshot gets a new file name, because
+DuckDB shares one open database per path within a process and would keep
+serving the old file; the small ``snapshot_path`` file names the current one
+and is swapped with ``os.replace``. Readers open the named file read-only,
+any number at once, and open the next one when the name changes. The writer
+deletes all but the current and previous files; a reader still querying a
+deleted one keeps it until it lets go.
+
+Readers cannot rebuild projections, and the writer's own copy may lag the
+data. Projections are therefore rebuilt from their query inside the copy's
+transaction, and recorded in the snapshot's ``projection_versions`` at the
+version copied, so they always match the tables published with them.
+
+A new snapshot is only written when ``data_version`` has moved since the last
+one, so an idle writer costs one query per check. Tables are copied without
+their constraints and sequences, which readers never use.
+"""
+import glob
+import os
+import uuid
+from typing import Dict, Optional
+
+
+def default_snapshot_path(db_path: str) -> str:
+    # Next to the database, so the default archive directory is shared with it
+    return f"{os.path.splitext(db_path)[0]}.snapshot"
+
+
+def published_snapshot(snapshot_path: str) -> Optional[str]:
+    """Path of the snapshot file currently published at ``snapshot_path``, or None before the first"""
+    try:
+        with open(snapshot_path) as pointer:
+            file_name = pointer.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(os.path.dirname(snapshot_path), file_name)
+
+
+class DatabaseSnapshot:
+    def __init__(self, connection_source, snapshot_path: str):
+        # Callable returning the current connection, so a reconnect is picked up
+        self._connection_source = connection_source
+        self.snapshot_path = os.path.abspath(snapshot_path)
+        self.published_version: Optional[int] = None
+
+    def publish(self, projections: Optional[Dict[str, str]] = None) -> Optional[int]:
+        """
+        Publish a snapshot if data changed since the last one; returns its data version, or None if unchanged.
+
+        ``projections`` maps a main-schema table name to the query that builds it; those tables
+        are built from the query in the snapshot rather than copied.
+        """
+        projections = projections or {}
+        os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+
+        cursor = self._connection_source().cursor()
+        try:
+            current_version = cursor.execute("SELECT version FROM data_version WHERE id = 1;").fetchone()[0]
+            if current_version == self.published_version and published_snapshot(self.snapshot_path):
+                return None
+
+            file_path = f"{self.snapshot_path}-{current_version}-{uuid.uuid4().hex[:8]}.db"
+            database = cursor.execute("SELECT current_database();").fetchone()[0]
+            cursor.execute(f"ATTACH {_literal(file_path)} AS published;")
+            try:
+                cursor.execute("BEGIN TRANSACTION;")
+                try:
+                    # Read inside the copy's transaction, so the recorded version is the one copied
+                    version = cursor.execute("SELECT version FROM data_version WHERE id = 1;").fetchone()[0]
+                    tables = cursor.execute("""
+                        SELECT schema_name, table_name FROM duckdb_tables()
+                        WHERE database_name = ? AND NOT temporary
+                        ORDER BY schema_name, table_name;
+                    """, [database]).fetchall()
+                    for schema_name, table_name in tables:
+                        if schema_name == "main" and table_name in projections:
+                            continue
+                        if schema_name != "main":
+                            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS published."{schema_name}";')
+                        cursor.execute(f"""
+                            CREATE TABLE published."{schema_name}"."{table_name}" AS
+                            SELECT * FROM "{database}"."{schema_name}"."{table_name}";
+                        """)
+                    for table_name, query_sql in projections.items():
+                        cursor.execute(f'CREATE TABLE published.main."{table_name}" AS {query_sql};')
+                        cursor.execute("DELETE FROM published.main.projection_versions WHERE name = ?;", [table_name])
+                        cursor.execute("""
+                            INSERT INTO published.main.projection_versions (name, data_version, refreshed_at)
+                            VALUES (?, ?, CURRENT_TIMESTAMP);
+                        """, [table_name, version])
+                    views = cursor.execute("""
+                        SELECT sql FROM duckdb_views()
+                        WHERE database_name = ? AND NOT internal AND NOT temporary
+                        ORDER BY schema_name, view_name;
+                    """, [database]).fetchall()
+                    for (view_sql,) in views:
+                        # Names in the view body stay unqualified and resolve inside the snapshot
+                        cursor.execute(view_sql.replace("CREATE VIEW ", "CREATE VIEW published.", 1))
+                    cursor.execute("COMMIT;")
+                except Exception:
+                    cursor.execute("ROLLBACK;")
+                    raise
+                # Into the file itself: its write-ahead log would not move with it
+                cursor.execute("CHECKPOINT published;")
+            finally:
+                cursor.execute("DETACH published;")
+        finally:
+            cursor.close()
+
+        previous_path = published_snapshot(self.snapshot_path)
+        with open(f"{self.snapshot_path}.tmp", "w") as pointer:
+            pointer.write(os.path.basename(file_path))
+        os.replace(f"{self.snapshot_path}.tmp", self.snapshot_path)
+        self.published_version = version
+
+        # Readers may still be opening the previous snapshot; anything older is unreachable
+        for stale_path in glob.glob(f"{glob.escape(self.snapshot_path)}-*.db*"):
+            if not stale_path.startswith((file_path, previous_path or file_path)):
+                os.remove(stale_path)
+        return version
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
@@ -0,0 +1,292 @@
+"""
+Atomic per-date replacement of the daily tables through a staging table.
+
+A batch is loaded into a temporary staging table on its own cursor and
+validated there: every key unique, every value within range, every date at
+least the caller's minimum of rows and not sharply smaller than the day
+already stored, and every date's totals consistent. Only then is it
+swapped into the target table in one transaction that deletes the stored rows
+of the batch's dates that the batch no longer has, upserts the batch on its
+natural key with INSERT ... ON CONFLICT and bumps the data version. Readers
+run on DuckDB snapshots, so they see each date either as it was or as the
+whole batch, never empty or half-loaded, and take no locks to do so.
+
+Rows are upserted rather than deleted and re-inserted because DuckDB rejects
+a unique key that is deleted and inserted again in the same transaction.
+
+Tables keyed by security are staged with the symbol and name the batch
+carries. The swap first upserts each (symbol, name) pair into ``securities``,
+widening its validity range to the batch's dates, and then writes the
+security_id it resolves to.
+
+Scheduled jobs run under the scheduler lease's fencing token, set in
+``fencing_token`` for the job's duration. The swap compares it with the one
+stored in ``scheduler_fencing_token`` inside the same transaction: an older
+token means another replica has since taken the lease and written, so the
+batch is rejected; otherwise the stored token is advanced to it. A leader
+that stalled past its lease therefore cannot overwrite its successor's days.
+Writes made outside a scheduled job carry no token and are not fenced.
+"""
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from src.constants import MIN_RELOAD_ROW_RATIO
+
+# Lease token of the scheduled job writing on this task, None when unfenced
+fencing_token: ContextVar[Optional[int]] = ContextVar("fencing_token", default=None)
+
+
+class StagingValidationError(Exception):
+    """A staged batch failed validation; nothing was written"""
+
+
+class StaleFencingTokenError(Exception):
+    """A write carried an older lease token than one already written; nothing was written"""
+
+
+class StagedTable:
+    """A daily table replaced one date at a time; the first key column is the date"""
+
+    def __init__(
+        self,
+        table: str,
+        key_columns: List[str],
+        value_columns: List[str],
+        checks: Dict[str, str],
+        date_checks: Optional[Dict[str, str]] = None,
+        id_expression: Optional[str] = None,
+        cluster_by: Optional[str] = None,
+        keyed_by_security: bool = False
+    ):
+        self.table = table
+        self.key_columns = key_columns
+        self.value_columns = value_columns
+        # Description -> predicate that is true for an invalid row
+        self.checks = checks
+        # Description -> aggregate over one date's rows that is true for an invalid date
+        self.date_checks = date_checks or {}
+        # Id of an inserted row; None leaves it to the column default
+        self.id_expression = id_expression
+        # Physical order new rows are appended in, to keep zone maps selective
+        self.cluster_by = cluster_by
+        # The security_id key column is resolved from staged symbol and name columns
+        self.keyed_by_security = keyed_by_security
+
+    @property
+    def date_column(self) -> str:
+        return self.key_columns[0]
+
+    @property
+    def staging_table(self) -> str:
+        return f"{self.table}_staging"
+
+    @property
+    def columns(self) -> List[str]:
+        return self.key_columns + self.value_columns
+
+    @property
+    def staged_key_columns(self) -> List[str]:
+        """Key of the staged batch: the date and symbol in place of security_id"""
+        if not self.keyed_by_security:
+            return self.key_columns
+        return [self.date_column, "symbol"]
+
+    @property
+    def staged_columns(self) -> List[str]:
+        if not self.keyed_by_security:
+            return self.columns
+        return [self.date_column, "symbol", "name"] + self.value_columns
+
+
+STOCK_PRICE_HISTORY = StagedTable(
+    "stock_price_history",
+    ["created_at", "security_id"],
+    ["last_traded_price", "market_cap", "one_day_return"],
+    {
+        "have a non-positive price": "last_traded_price <= 0",
+        "have a non-positive market cap": "market_cap <= 0",
+        "lose more than 100% in a day": "one_day_return <= -100",
+    },
+    id_expression="gen_random_uuid()::VARCHAR",
+    cluster_by="created_at, market_cap DESC",
+    keyed_by_security=True
+)
+
+INDEX_COMPOSITIONS = StagedTable(
+    "index_compositions",
+    ["date", "security_id"],
+    ["weight_percent", "market_cap", "price", "return_percent"],
+    {
+        "have a weight outside 0-100%": "weight_percent < 0 OR weight_percent > 100",
+        "have a negative market cap": "market_cap < 0",
+    },
+    date_checks={
+        "have weights that do not sum to 100%": "ABS(SUM(weight_percent) - 100) > 0.01",
+    },
+    keyed_by_security=True
+)
+
+INDEX_PERFORMANCE = StagedTable(
+    "index_performance",
+    ["date"],
+    ["daily_return_percent", "cumulative_return_percent", "index_value", "companies_count"],
+    {
+        "have a non-positive index value": "index_value <= 0",
+        "have no companies": "companies_count <= 0",
+        "lose more than 100% in a day": "daily_return_percent <= -100",
+    }
+)
+
+
+def replace_dates(connection, staged: StagedTable, rows: Dict[str, list], minimum_rows: int = 0) -> int:
+    """
+    Replace every date in ``rows`` (column name -> values) with exactly those rows; returns the rows written.
+
+    Each date must have at least ``minimum_rows`` rows.
+    """
+    import pyarrow as pa
+
+    batch = pa.table({column: rows[column] for column in staged.staged_columns})
+    if batch.num_rows == 0:
+        return 0
+
+    cursor = connection.cursor()
+    try:
+        cursor.register("staged_batch", batch)
+        # Temporary tables belong to this cursor's connection, so concurrent loads never share one
+        cursor.execute(f"""
+            CREATE OR REPLACE TEMP TABLE {staged.staging_table} AS
+            SELECT {_list(_staging_definition(staged))} FROM {staged.table}
+            {"CROSS JOIN securities" if staged.keyed_by_security else ""} LIMIT 0;
+        """)
+        cursor.execute(
+            f"INSERT INTO {staged.staging_table} SELECT {_list(staged.staged_columns)} FROM staged_batch;"
+        )
+        cursor.unregister("staged_batch")
+        _validate(cursor, staged, minimum_rows)
+
+        cursor.execute("BEGIN TRANSACTION;")
+        try:
+            check_fencing_token(cursor)
+            _swap(cursor, staged)
+            cursor.execute("UPDATE data_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;")
+            cursor.execute("COMMIT;")
+        except Exception:
+            cursor.execute("ROLLBACK;")
+            raise
+        return batch.num_rows
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {staged.staging_table};")
+        cursor.close()
+
+
+def check_fencing_token(cursor) -> None:
+    """Reject the open transaction's write if its token is stale, otherwise record the token"""
+    token = fencing_token.get()
+    if token is None:
+        return
+    stored_token = cursor.execute("SELECT token FROM scheduler_fencing_token WHERE id = 1;").fetchone()[0]
+    if token < stored_token:
+        raise StaleFencingTokenError(f"Fencing token {token} is older than {stored_token}; another replica now leads")
+    # Also conflicts with a concurrent fenced write, so at most one of two racing writers commits
+    cursor.execute("UPDATE scheduler_fencing_token SET token = ? WHERE id = 1;", [token])
+
+
+def _validate(cursor, staged: StagedTable, minimum_rows: int) -> None:
+    staging, day = staged.staging_table, staged.date_column
+    staged_rows, distinct_keys = cursor.execute(
+        f"SELECT COUNT(*), COUNT(DISTINCT ({_list(staged.staged_key_columns)})) FROM {staging};"
+    ).fetchone()
+    if distinct_keys != staged_rows:
+        raise StagingValidationError(
+            f"{staged.table} batch has {staged_rows - distinct_keys} duplicate ({_list(staged.staged_key_columns)}) rows"
+        )
+    for description, predicate in staged.checks.items():
+        invalid = cursor.execute(f"SELECT COUNT(*) FROM {staging} WHERE {predicate};").fetchone()[0]
+        if invalid:
+            raise StagingValidationError(f"{staged.table} batch rejected: {invalid} rows {description}")
+
+    short_day = cursor.execute(f"""
+        SELECT {day}, COUNT(*) FROM {staging} GROUP BY {day} HAVING COUNT(*) < ? ORDER BY {day} LIMIT 1;
+    """, [minimum_rows]).fetchone()
+    if short_day:
+        raise StagingValidationError(
+            f"{staged.table} batch rejected: {short_day[0]} has {short_day[1]} rows, fewer than {minimum_rows}"
+        )
+    # A reload much smaller than the stored day is a truncated feed, not a real change
+    shrunk_day = cursor.execute(f"""
+        WITH staged_days AS (SELECT {day}, COUNT(*) AS staged_rows FROM {staging} GROUP BY {day}),
+             stored_days AS (
+                 SELECT {day}, COUNT(*) AS stored_rows FROM {staged.table}
+                 WHERE {day} IN (SELECT {day} FROM staged_days) GROUP BY {day}
+             )
+        SELECT {day}, staged_rows, stored_rows
+        FROM staged_days JOIN stored_days USING ({day})
+        WHERE staged_rows < stored_rows * ?
+        ORDER BY {day} LIMIT 1;
+    """, [MIN_RELOAD_ROW_RATIO]).fetchone()
+    if shrunk_day:
+        raise StagingValidationError(
+            f"{staged.table} batch rejected: {shrunk_day[0]} would drop from {shrunk_day[2]} to {shrunk_day[1]} rows"
+        )
+    for description, predicate in staged.date_checks.items():
+        invalid = cursor.execute(f"""
+            SELECT COUNT(*) FROM (SELECT {day} FROM {staging} GROUP BY {day} HAVING {predicate});
+        """).fetchone()[0]
+        if invalid:
+            raise StagingValidationError(f"{staged.table} batch rejected: {invalid} dates {description}")
+
+
+def _staging_definition(staged: StagedTable) -> List[str]:
+    """Typed columns for the empty staging table, taken from the tables they are written to"""
+    return [
+        f"securities.{column}" if column in ("symbol", "name") else f"{staged.table}.{column}"
+        for column in staged.staged_columns
+    ]
+
+
+def _resolve_securities(cursor, staged: StagedTable) -> str:
+    """Upsert the batch's securities and return the staged rows keyed by security_id"""
+    staging = staged.staging_table
+    cursor.execute(f"""
+        INSERT INTO securities (symbol, name, valid_from, valid_to)
+        SELECT symbol, name, MIN({staged.date_column}), MAX({staged.date_column})
+        FROM {staging}
+        GROUP BY symbol, name
+        ON CONFLICT (symbol, name) DO UPDATE SET
+            valid_from = LEAST(securities.valid_from, excluded.valid_from),
+            valid_to = GREATEST(securities.valid_to, excluded.valid_to);
+    """)
+    columns = [
+        "securities.security_id" if column == "security_id" else f"{staging}.{column}"
+        for column in staged.columns
+    ]
+    return f"""(
+        SELECT {_list(columns)}
+        FROM {staging}
+        JOIN securities ON securities.symbol = {staging}.symbol AND securities.name = {staging}.name
+    )"""
+
+
+def _swap(cursor, staged: StagedTable) -> None:
+    table, staging = staged.table, staged.staging_table
+    source = _resolve_securities(cursor, staged) if staged.keyed_by_security else staging
+    matches = " AND ".join(f"staged.{column} = {table}.{column}" for column in staged.key_columns)
+    cursor.execute(f"""
+        DELETE FROM {table}
+        WHERE {staged.date_column} IN (SELECT DISTINCT {staged.date_column} FROM {staging})
+          AND NOT EXISTS (SELECT 1 FROM {source} AS staged WHERE {matches});
+    """)
+
+    columns = ([] if staged.id_expression is None else ["id"]) + staged.columns
+    values = ([] if staged.id_expression is None else [staged.id_expression]) + staged.columns
+    assignments = ", ".join(f"{column} = excluded.{column}" for column in staged.value_columns)
+    order_by = f"ORDER BY {staged.cluster_by}" if staged.cluster_by else ""
+    cursor.execute(f"""
+        INSERT INTO {table} ({_list(columns)})
+        SELECT {_list(values)} FROM {source} AS staged {order_by}
+        ON CONFLICT ({_list(staged.key_columns)}) DO UPDATE SET {assignments};
+    """)
+
+
+def _list(columns: List[str]) -> str:
+    return ", ".join(columns)
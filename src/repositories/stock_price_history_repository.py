@@ -1,9 +1,196 @@
 import asyncio
-import uuid
-from datetime import date
-from typing import List, Optional
+from datetime import date, timedelta
+from typing import Dict, List, Optional
 from src.models.stock_price_history import StockPriceHistory, StockPriceHistoryCreate
 from src.repositories.base_repository import BaseRepository
+from src.repositories.row_stream import RowStream, PartitionedRowStream
+from src.repositories.staging import (
+    INDEX_COMPOSITIONS, INDEX_PERFORMANCE, STOCK_PRICE_HISTORY, check_fencing_token, replace_dates
+)
+
+# Reads name their tables as {stock_price_history} and {index_compositions};
+# ParquetArchive.with_sources fills in the hot table, unioned with the archived
+# months the queried range overlaps.
+
+# Entries and exits between consecutive index dates, computed in one pass.
+# Index dates in [$2, $3] are numbered, with the last index date in [$1, $2)
+# prepended as the baseline so month partitions of a longer range chain onto
+# each other. LAG/LEAD over each symbol's day numbers find the gaps: a gap
+# before a row is an entry on that date, a gap after it is an exit on the next
+# index date. Symbols rather than security ids, so a company that is only
+# renamed stays in the index. Only boundary rows are joined back for the
+# weight, and to securities for the symbol and the name on that date.
+COMPOSITION_CHANGES_SQL = """
+WITH index_days AS MATERIALIZED (
+    SELECT date, ROW_NUMBER() OVER (ORDER BY date) AS day_number
+    FROM (
+        SELECT DISTINCT date
+        FROM {index_compositions} AS index_compositions
+        WHERE date >= COALESCE((SELECT MAX(date) FROM {index_compositions} AS index_compositions WHERE date >= $1 AND date < $2), $2)
+          AND date <= $3
+    )
+),
+boundaries AS MATERIALIZED (
+    SELECT date, security_id, day_number, previous_day, next_day
+    FROM (
+        SELECT index_compositions.date, index_compositions.security_id, index_days.day_number,
+               LAG(index_days.day_number) OVER symbol_days AS previous_day,
+               LEAD(index_days.day_number) OVER symbol_days AS next_day
+        FROM {index_compositions} AS index_compositions
+        JOIN index_days ON index_days.date = index_compositions.date
+        JOIN securities ON securities.security_id = index_compositions.security_id
+        WINDOW symbol_days AS (PARTITION BY securities.symbol ORDER BY index_days.day_number)
+    )
+    WHERE (day_number > 1 AND (previous_day IS NULL OR previous_day < day_number - 1))
+       OR next_day IS NULL OR next_day > day_number + 1
+),
+changes AS (
+    SELECT date, security_id, 'entered' AS change_type, date AS source_date
+    FROM boundaries
+    WHERE day_number > 1 AND (previous_day IS NULL OR previous_day < day_number - 1)
+    UNION ALL
+    SELECT index_days.date, boundaries.security_id, 'exited' AS change_type, boundaries.date AS source_date
+    FROM boundaries
+    JOIN index_days ON index_days.day_number = boundaries.day_number + 1
+    WHERE boundaries.next_day IS NULL OR boundaries.next_day > boundaries.day_number + 1
+)
+SELECT changes.date, securities.symbol, securities.name, changes.change_type,
+       CASE WHEN changes.change_type = 'exited' THEN CAST(source.weight_percent AS DOUBLE) ELSE 0.0 END,
+       CASE WHEN changes.change_type = 'entered' THEN CAST(source.weight_percent AS DOUBLE) ELSE 0.0 END
+FROM changes
+JOIN {index_compositions} AS source ON source.date = changes.source_date AND source.security_id = changes.security_id
+JOIN securities ON securities.security_id = changes.security_id
+ORDER BY changes.date ASC, changes.change_type ASC, securities.symbol ASC;
+"""
+# Daily turnover as the set difference between consecutive index dates.
+# Each date's holdings are full-outer-joined to the previous index date's by
+# symbol, so entries, exits and reweights all show up as |new - old| weight,
+# and a renamed company is none of them. The old weight is the previous
+# date's weight grown by its return and renormalized, i.e. what the index held
+# at that close, so drift between rebalances is not counted as trading.
+# Index dates in [$1, $2] are numbered
+# together with the $4 index dates before $1; those supply the baseline and
+# the trailing window of the first dates in range, so partitions of a long
+# range need no state from each other. $3 is the cost in basis points of
+# traded notional.
+TURNOVER_SQL = """
+WITH index_days AS MATERIALIZED (
+    SELECT date, ROW_NUMBER() OVER (ORDER BY date) AS day_number
+    FROM (
+        SELECT DISTINCT date FROM {index_compositions} AS index_compositions WHERE date >= $1 AND date <= $2
+        UNION ALL
+        (SELECT DISTINCT date FROM {index_compositions} AS index_compositions WHERE date < $1 ORDER BY date DESC LIMIT $4)
+    )
+),
+holdings AS (
+    SELECT index_days.day_number, securities.symbol,
+           CAST(index_compositions.weight_percent AS DOUBLE) AS weight,
+           CAST(index_compositions.weight_percent AS DOUBLE)
+               * (1 + COALESCE(CAST(index_compositions.return_percent AS DOUBLE), 0) / 100) AS grown
+    FROM {index_compositions} AS index_compositions
+    JOIN index_days ON index_days.date = index_compositions.date
+    JOIN securities ON securities.security_id = index_compositions.security_id
+    WHERE index_compositions.date <= $2
+),
+closing AS (
+    SELECT day_number, symbol, weight,
+           grown * SUM(weight) OVER index_day / NULLIF(SUM(grown) OVER index_day, 0) AS closing_weight
+    FROM holdings
+    WINDOW index_day AS (PARTITION BY day_number)
+),
+daily AS (
+    SELECT COALESCE(current.day_number, previous.day_number + 1) AS day_number,
+           COUNT(*) FILTER (WHERE previous.symbol IS NULL) AS entered,
+           COUNT(*) FILTER (WHERE current.symbol IS NULL) AS exited,
+           SUM(ABS(COALESCE(current.weight, 0) - COALESCE(previous.closing_weight, 0))) AS two_way
+    FROM closing AS current
+    FULL OUTER JOIN closing AS previous
+      ON previous.day_number = current.day_number - 1 AND previous.symbol = current.symbol
+    GROUP BY 1
+)
+SELECT date, entered, exited, one_way, two_way, rolling_one_way, rolling_two_way, cost
+FROM (
+    SELECT index_days.date, daily.entered, daily.exited,
+           daily.two_way / 2 AS one_way,
+           daily.two_way,
+           SUM(daily.two_way / 2) OVER trailing_days AS rolling_one_way,
+           SUM(daily.two_way) OVER trailing_days AS rolling_two_way,
+           daily.two_way * $3 / 10000 AS cost
+    FROM daily
+    JOIN index_days ON index_days.day_number = daily.day_number
+    WHERE daily.day_number > 1
+    WINDOW trailing_days AS (ORDER BY daily.day_number ROWS BETWEEN $4 - 1 PRECEDING AND CURRENT ROW)
+)
+WHERE date >= $1
+ORDER BY date ASC;
+"""
+
+TURNOVER_COLUMNS = [
+    "date", "entered", "exited", "one_way_percent", "two_way_percent",
+    "rolling_one_way_percent", "rolling_two_way_percent", "cost_percent"
+]
+
+CONSTITUENT_HISTORY_PROJECTION = "constituent_history"
+
+# The ORDER BY lays rows out clustered by symbol so zone maps skip every row
+# group but the symbol's own. Snapshots build their copy from this query too.
+CONSTITUENT_HISTORY_SQL = """
+SELECT securities.symbol,
+       stocks.created_at AS date,
+       securities.name AS company_name,
+       CAST(stocks.last_traded_price AS DOUBLE) AS price,
+       CAST(stocks.market_cap AS DOUBLE) AS market_cap,
+       CAST(stocks.one_day_return AS DOUBLE) AS one_day_return,
+       compositions.security_id IS NOT NULL AS in_index,
+       CAST(compositions.weight_percent AS DOUBLE) AS weight_percent
+FROM {stock_price_history} AS stocks
+JOIN securities ON securities.security_id = stocks.security_id
+LEFT JOIN {index_compositions} AS compositions
+  ON compositions.date = stocks.created_at AND compositions.security_id = stocks.security_id
+ORDER BY symbol ASC, date ASC
+"""
+
+# Replaces the projection in one statement
+REFRESH_CONSTITUENT_HISTORY_SQL = f"CREATE OR REPLACE TABLE {CONSTITUENT_HISTORY_PROJECTION} AS {CONSTITUENT_HISTORY_SQL};"
+
+# Rows that break the (created_at, market_cap DESC) physical order. rowid is
+# the row's position in the table, so this counts every row stored after one
+# that should follow it.
+UNCLUSTERED_STOCK_ROWS_SQL = """
+SELECT COUNT(*)
+FROM (
+    SELECT created_at, market_cap,
+           LAG(created_at) OVER physical AS previous_date,
+           LAG(market_cap) OVER physical AS previous_market_cap
+    FROM stock_price_history
+    WINDOW physical AS (ORDER BY rowid)
+)
+WHERE created_at < previous_date OR (created_at = previous_date AND market_cap > previous_market_cap);
+"""
+
+# DuckDB has no CLUSTER, and rejects a unique key deleted and re-inserted in
+# one transaction, so the table is rewritten in order into a copy that
+# replaces it. The definition matches 011_create_securities_dimension.sql.
+CLUSTER_STOCK_PRICE_HISTORY_SQL = [
+    """
+    CREATE TABLE stock_price_history_clustered (
+        id VARCHAR(36) PRIMARY KEY,
+        security_id INTEGER NOT NULL,
+        last_traded_price DECIMAL(18, 8) NOT NULL,
+        market_cap DECIMAL(20, 2) NOT NULL,
+        one_day_return DECIMAL(10, 4),
+        created_at DATE NOT NULL,
+        UNIQUE (security_id, created_at)
+    );
+    """,
+    "INSERT INTO stock_price_history_clustered SELECT * FROM stock_price_history ORDER BY created_at, market_cap DESC;",
+    "DROP TABLE stock_price_history;",
+    "ALTER TABLE stock_price_history_clustered RENAME TO stock_price_history;",
+]
+
+COMPOSITION_CHANGE_COLUMNS = [
+    "date", "symbol", "company_name", "change_type", "previous_weight_percent", "new_weight_percent"
+]
 
 
 class StockPriceHistoryRepository:
@@ -14,78 +201,64 @@ class StockPriceHistoryRepository:
     def connection(self):
         return self.base_repository.connection
 
-    async def bulk_insert_stock_data(self, stock_data: List[StockPriceHistoryCreate]) -> int:
-        if not stock_data:
-            return 0
-        
-        target_date = stock_data[0].created_at
-        delete_sql = "DELETE FROM stock_price_history WHERE created_at = ?;"
-        
-        try:
-            await asyncio.to_thread(self.connection.execute, delete_sql, [target_date])
-            
-            insert_sql = """
-            INSERT INTO stock_price_history 
-            (id, company_symbol, company_name, last_traded_price, market_cap, one_day_return, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?);
-            """
-            
-            for stock in stock_data:
-                unique_id = str(uuid.uuid4())
-                values = [
-                    unique_id,
-                    stock.company_symbol,
-                    stock.company_name,
-                    float(stock.last_traded_price),
-                    float(stock.market_cap),
-                    float(stock.one_day_return),
-                    stock.created_at
-                ]
-                await asyncio.to_thread(self.connection.execute, insert_sql, values)
-            
-            return len(stock_data)
-            
-        except Exception:
-            return 0
+    @property
+    def archive(self):
+        return self.base_repository.archive
+
+    async def bulk_insert_stock_data(self, stock_data: List[StockPriceHistoryCreate], minimum_rows: int = 0) -> int:
+        """Replace every date in the batch with exactly its rows, atomically; raises if the batch is rejected"""
+        rows = {column: [] for column in STOCK_PRICE_HISTORY.staged_columns}
+        for stock in stock_data:
+            rows["created_at"].append(stock.created_at)
+            rows["symbol"].append(stock.company_symbol)
+            rows["name"].append(stock.company_name)
+            rows["last_traded_price"].append(float(stock.last_traded_price))
+            rows["market_cap"].append(float(stock.market_cap))
+            rows["one_day_return"].append(float(stock.one_day_return))
+        return await asyncio.to_thread(replace_dates, self.connection, STOCK_PRICE_HISTORY, rows, minimum_rows)
     
     async def get_stocks_by_date(self, target_date: date, limit: Optional[int] = None) -> List[StockPriceHistory]:
         try:
             if limit:
                 query_sql = """
-                SELECT id, company_symbol, company_name, last_traded_price, 
+                SELECT id, security_id, last_traded_price, 
                        market_cap, one_day_return, created_at
-                FROM stock_price_history 
+                FROM {stock_price_history} AS stock_price_history
                 WHERE created_at = ?
                 ORDER BY market_cap DESC
                 LIMIT ?;
                 """
+                query_sql = self.archive.with_sources(query_sql, target_date, target_date)
                 result = await asyncio.to_thread(
                     self.connection.execute, query_sql, [target_date, limit]
                 )
             else:
                 query_sql = """
-                SELECT id, company_symbol, company_name, last_traded_price, 
+                SELECT id, security_id, last_traded_price, 
                        market_cap, one_day_return, created_at
-                FROM stock_price_history 
+                FROM {stock_price_history} AS stock_price_history
                 WHERE created_at = ?
                 ORDER BY market_cap DESC;
                 """
+                query_sql = self.archive.with_sources(query_sql, target_date, target_date)
                 result = await asyncio.to_thread(
                     self.connection.execute, query_sql, [target_date]
                 )
             
             rows = result.fetchall()
+            securities = self.base_repository.securities.resolve(row[1] for row in rows)
             stocks = []
             for row in rows:
                 try:
+                    symbol, name = securities[row[1]]
                     stock = StockPriceHistory(
                         id=row[0],
-                        company_symbol=row[1],
-                        company_name=row[2],
-                        last_traded_price=row[3],
-                        market_cap=row[4],
-                        one_day_return=row[5],
-                        created_at=row[6]
+                        company_symbol=symbol,
+                        company_name=name,
+                        last_traded_price=row[2],
+                        market_cap=row[3],
+                        one_day_return=row[4],
+                        created_at=row[5]
                     )
                     stocks.append(stock)
                 except Exception:
@@ -98,7 +271,10 @@ class StockPriceHistoryRepository:
 
     async def get_stocks_count_by_date(self, target_date: date) -> int:
         try:
-            query_sql = "SELECT COUNT(*) FROM stock_price_history WHERE created_at = ?;"
+            query_sql = self.archive.with_sources(
+                "SELECT COUNT(*) FROM {stock_price_history} AS stock_price_history WHERE created_at = ?;",
+                target_date, target_date
+            )
             result = await asyncio.to_thread(
                 self.connection.execute, query_sql, [target_date]
             )
@@ -110,50 +286,33 @@ class StockPriceHistoryRepository:
         try:
             query_sql = """
             SELECT DISTINCT created_at 
-            FROM stock_price_history 
+            FROM {stock_price_history} AS stock_price_history
             ORDER BY created_at DESC;
             """
+            query_sql = self.archive.with_sources(query_sql)
             result = await asyncio.to_thread(self.connection.execute, query_sql)
             rows = result.fetchall()
             return [row[0] for row in rows]
         except Exception:
             return []
 
-    async def insert_index_composition(self, compositions: List) -> bool:
-        if not compositions:
-            return True
-        
-        try:
-            insert_sql = """
-            INSERT INTO index_compositions 
-            (id, date, symbol, company_name, weight_percent, market_cap, price, return_percent)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?);
-            """
-            
-            for comp in compositions:
-                unique_id = str(uuid.uuid4())
-                # Handle both dict and Pydantic model
-                if hasattr(comp, 'model_dump'):
-                    comp_data = comp.model_dump()
-                else:
-                    comp_data = comp
-                    
-                values = [
-                    unique_id,
-                    comp_data['date'],
-                    comp_data.get('symbol', comp_data.get('company_symbol')),
-                    comp_data['company_name'],
-                    comp_data.get('weight_percent', comp_data.get('weight')),
-                    comp_data['market_cap'],
-                    comp_data.get('price', comp_data.get('last_traded_price')),
-                    comp_data.get('return_percent', comp_data.get('one_day_return'))
-                ]
-                await asyncio.to_thread(self.connection.execute, insert_sql, values)
-            
-            return True
-            
-        except Exception:
-            return False
+    async def insert_index_composition(self, compositions: List, minimum_rows: int = 0) -> int:
+        """Replace every date in the batch with exactly its members, atomically; raises if the batch is rejected"""
+        rows = {column: [] for column in INDEX_COMPOSITIONS.staged_columns}
+        for comp in compositions:
+            # Handle both dict and Pydantic model
+            if hasattr(comp, 'model_dump'):
+                comp_data = comp.model_dump()
+            else:
+                comp_data = comp
+            rows["date"].append(comp_data['date'])
+            rows["symbol"].append(comp_data.get('symbol', comp_data.get('company_symbol')))
+            rows["name"].append(comp_data['company_name'])
+            rows["weight_percent"].append(comp_data.get('weight_percent', comp_data.get('weight')))
+            rows["market_cap"].append(comp_data['market_cap'])
+            rows["price"].append(comp_data.get('price', comp_data.get('last_traded_price')))
+            rows["return_percent"].append(comp_data.get('return_percent', comp_data.get('one_day_return')))
+        return await asyncio.to_thread(replace_dates, self.connection, INDEX_COMPOSITIONS, rows, minimum_rows)
 
     async def get_index_composition_by_date(self, target_date: date) -> List[dict]:
         try:
@@ -184,39 +343,21 @@ class StockPriceHistoryRepository:
         except Exception:
             return []
 
-    async def insert_index_performance(self, performances: List) -> bool:
-        if not performances:
-            return True
-        
-        try:
-            insert_sql = """
-            INSERT INTO index_performance 
-            (id, date, daily_return_percent, cumulative_return_percent, index_value, companies_count)
-            VALUES (?, ?, ?, ?, ?, ?);
-            """
-            
-            for perf in performances:
-                unique_id = str(uuid.uuid4())
-                # Handle both dict and Pydantic model
-                if hasattr(perf, 'model_dump'):
-                    perf_data = perf.model_dump()
-                else:
-                    perf_data = perf
-                    
-                values = [
-                    unique_id,
-                    perf_data['date'],
-                    perf_data.get('daily_return_percent', perf_data.get('daily_return')),
-                    perf_data.get('cumulative_return_percent', perf_data.get('cumulative_return')),
-                    perf_data['index_value'],
-                    perf_data.get('companies_count', 100)
-                ]
-                await asyncio.to_thread(self.connection.execute, insert_sql, values)
-            
-            return True
-            
-        except Exception:
-            return False
+    async def insert_index_performance(self, performances: List) -> int:
+        """Replace every date in the batch with its performance row, atomically; raises if the batch is rejected"""
+        rows = {column: [] for column in INDEX_PERFORMANCE.columns}
+        for perf in performances:
+            # Handle both dict and Pydantic model
+            if hasattr(perf, 'model_dump'):
+                perf_data = perf.model_dump()
+            else:
+                perf_data = perf
+            rows["date"].append(perf_data['date'])
+            rows["daily_return_percent"].append(perf_data.get('daily_return_percent', perf_data.get('daily_return')))
+            rows["cumulative_return_percent"].append(perf_data.get('cumulative_return_percent', perf_data.get('cumulative_return')))
+            rows["index_value"].append(perf_data['index_value'])
+            rows["companies_count"].append(perf_data.get('companies_count', 100))
+        return await asyncio.to_thread(replace_dates, self.connection, INDEX_PERFORMANCE, rows)
 
     async def get_index_performance_by_date_range(self, start_date: date, end_date: date) -> List[dict]:
         try:
@@ -283,26 +424,29 @@ class StockPriceHistoryRepository:
         from src.dtos.index_result import IndexComposition
         try:
             query_sql = """
-            SELECT date, symbol, company_name, weight_percent, market_cap, price, return_percent
-            FROM index_compositions 
+            SELECT date, security_id, weight_percent, market_cap, price, return_percent
+            FROM {index_compositions} AS index_compositions
             WHERE date = ?
             ORDER BY market_cap DESC;
             """
+            query_sql = self.archive.with_sources(query_sql, target_date, target_date)
             result = await asyncio.to_thread(
                 self.connection.execute, query_sql, [target_date]
             )
             
             rows = result.fetchall()
+            securities = self.base_repository.securities.resolve(row[1] for row in rows)
             compositions = []
             for row in rows:
+                symbol, name = securities[row[1]]
                 composition = IndexComposition(
                     date=row[0],
-                    symbol=row[1],
-                    company_name=row[2],
-                    weight_percent=row[3],
-                    market_cap=row[4],
-                    price=row[5],
-                    return_percent=row[6]
+                    symbol=symbol,
+                    company_name=name,
+                    weight_percent=row[2],
+                    market_cap=row[3],
+                    price=row[4],
+                    return_percent=row[5]
                 )
                 compositions.append(composition)
             
@@ -311,6 +455,44 @@ class StockPriceHistoryRepository:
         except Exception:
             return []
 
+    async def get_persisted_index_compositions(self, target_dates: List[date]) -> Dict[date, List]:
+        """Get persisted index compositions for many dates with a single range query"""
+        from src.dtos.index_result import IndexComposition
+        if not target_dates:
+            return {}
+        try:
+            query_sql = """
+            SELECT date, security_id, weight_percent, market_cap, price, return_percent
+            FROM {index_compositions} AS index_compositions
+            WHERE date >= ? AND date <= ? AND date = ANY(?)
+            ORDER BY date ASC, market_cap DESC;
+            """
+            query_sql = self.archive.with_sources(query_sql, min(target_dates), max(target_dates))
+            result = await asyncio.to_thread(
+                self.connection.execute, query_sql, [min(target_dates), max(target_dates), list(target_dates)]
+            )
+            
+            rows = result.fetchall()
+            securities = self.base_repository.securities.resolve(row[1] for row in rows)
+            compositions_by_date = {}
+            for row in rows:
+                symbol, name = securities[row[1]]
+                composition = IndexComposition(
+                    date=row[0],
+                    symbol=symbol,
+                    company_name=name,
+                    weight_percent=row[2],
+                    market_cap=row[3],
+                    price=row[4],
+                    return_percent=row[5]
+                )
+                compositions_by_date.setdefault(row[0], []).append(composition)
+            
+            return compositions_by_date
+            
+        except Exception:
+            return {}
+
     async def get_persisted_index_performance(self, start_date: date, end_date: date) -> List:
         """Get persisted index performance for a date range"""
         from src.dtos.index_result import IndexPerformance
@@ -340,4 +522,208 @@ class StockPriceHistoryRepository:
             return performances
             
         except Exception:
-            return []
\ No newline at end of file
+            return []
+
+    def stream_index_performance(self, start_date: date, end_date: date, chunk_size: int) -> RowStream:
+        query_sql = """
+        SELECT date,
+               CAST(daily_return_percent AS DOUBLE),
+               CAST(cumulative_return_percent AS DOUBLE),
+               CAST(index_value AS DOUBLE),
+               companies_count
+        FROM index_performance 
+        WHERE date >= ? AND date <= ?
+        ORDER BY date ASC;
+        """
+        columns = ["date", "daily_return_percent", "cumulative_return_percent", "index_value", "companies_count"]
+        return RowStream(self.connection, query_sql, [start_date, end_date], columns, chunk_size)
+
+    def stream_index_composition(self, target_date: date, chunk_size: int) -> RowStream:
+        query_sql = """
+        SELECT compositions.date, securities.symbol, securities.name,
+               CAST(compositions.weight_percent AS DOUBLE),
+               CAST(compositions.market_cap AS DOUBLE),
+               CAST(compositions.price AS DOUBLE),
+               CAST(compositions.return_percent AS DOUBLE)
+        FROM {index_compositions} AS compositions
+        JOIN securities ON securities.security_id = compositions.security_id
+        WHERE compositions.date = ?
+        ORDER BY compositions.market_cap DESC;
+        """
+        query_sql = self.archive.with_sources(query_sql, target_date, target_date)
+        columns = ["date", "symbol", "company_name", "weight_percent", "market_cap", "price", "return_percent"]
+        return RowStream(self.connection, query_sql, [target_date], columns, chunk_size)
+
+    def stream_index_compositions(self, start_date: date, end_date: date, chunk_size: int) -> PartitionedRowStream:
+        query_sql = """
+        SELECT compositions.date, securities.symbol, securities.name,
+               CAST(compositions.weight_percent AS DOUBLE),
+               CAST(compositions.market_cap AS DOUBLE),
+               CAST(compositions.price AS DOUBLE),
+               CAST(compositions.return_percent AS DOUBLE)
+        FROM {index_compositions} AS compositions
+        JOIN securities ON securities.security_id = compositions.security_id
+        WHERE compositions.date >= ? AND compositions.date <= ?
+        ORDER BY compositions.date ASC, compositions.market_cap DESC;
+        """
+        query_sql = self.archive.with_sources(query_sql, start_date, end_date)
+        columns = ["date", "symbol", "company_name", "weight_percent", "market_cap", "price", "return_percent"]
+        return PartitionedRowStream(
+            self.connection, query_sql, self._month_partitions(start_date, end_date), columns, chunk_size
+        )
+
+    async def get_composition_changes(self, start_date: date, end_date: date) -> List:
+        """Get symbols entering and leaving the index between consecutive index dates"""
+        from src.dtos.index_result import CompositionChange
+        try:
+            query_sql = self.archive.with_sources(COMPOSITION_CHANGES_SQL, start_date, end_date)
+            result = await asyncio.to_thread(
+                self.connection.execute, query_sql, [start_date, start_date, end_date]
+            )
+            return [
+                CompositionChange(**dict(zip(COMPOSITION_CHANGE_COLUMNS, row)))
+                for row in result.fetchall()
+            ]
+        except Exception:
+            return []
+
+    def stream_composition_changes(self, start_date: date, end_date: date, chunk_size: int) -> PartitionedRowStream:
+        # Month partitions keep the window working set bounded on multi-year exports
+        partitions = [
+            [start_date, partition_start, partition_end]
+            for partition_start, partition_end in self._month_partitions(start_date, end_date)
+        ]
+        query_sql = self.archive.with_sources(COMPOSITION_CHANGES_SQL, start_date, end_date)
+        return PartitionedRowStream(
+            self.connection, query_sql, partitions, COMPOSITION_CHANGE_COLUMNS, chunk_size
+        )
+
+    async def get_turnover(self, start_date: date, end_date: date, cost_bps: float, window: int) -> List[tuple]:
+        """Get daily and trailing turnover with estimated cost for every index date in a range"""
+        try:
+            # The trailing window reaches back before start_date, so every earlier month is a source
+            query_sql = self.archive.with_sources(TURNOVER_SQL, None, end_date)
+            result = await asyncio.to_thread(
+                self.connection.execute, query_sql, [start_date, end_date, cost_bps, window]
+            )
+            return result.fetchall()
+        except Exception:
+            return []
+
+    def stream_turnover(self, start_date: date, end_date: date, cost_bps: float, window: int, chunk_size: int) -> PartitionedRowStream:
+        # The full outer join holds both sides of the range, so long exports run a year at a time
+        partitions = [
+            [partition_start, partition_end, cost_bps, window]
+            for partition_start, partition_end in self._year_partitions(start_date, end_date)
+        ]
+        query_sql = self.archive.with_sources(TURNOVER_SQL, None, end_date)
+        return PartitionedRowStream(self.connection, query_sql, partitions, TURNOVER_COLUMNS, chunk_size)
+
+    async def get_projection_version(self, name: str) -> Optional[int]:
+        try:
+            query_sql = "SELECT data_version FROM projection_versions WHERE name = ?;"
+            result = await asyncio.to_thread(self.connection.execute, query_sql, [name])
+            row = result.fetchone()
+            return row[0] if row else None
+        except Exception:
+            return None
+
+    async def refresh_constituent_history(self, data_version: int) -> bool:
+        """Rebuild the (symbol, date) ordered projection and record the data version it reflects"""
+        try:
+            await asyncio.to_thread(self._refresh_constituent_history, data_version)
+            return True
+        except Exception:
+            return False
+
+    def _refresh_constituent_history(self, data_version: int) -> None:
+        # Own cursor so the swap and the version update commit together without
+        # interleaving with statements other requests run on the shared connection
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("BEGIN TRANSACTION;")
+            cursor.execute(self.archive.with_sources(REFRESH_CONSTITUENT_HISTORY_SQL))
+            cursor.execute("""
+                INSERT INTO projection_versions (name, data_version, refreshed_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (name) DO UPDATE SET data_version = excluded.data_version, refreshed_at = excluded.refreshed_at;
+            """, [CONSTITUENT_HISTORY_PROJECTION, data_version])
+            cursor.execute("COMMIT;")
+        except Exception:
+            cursor.execute("ROLLBACK;")
+            raise
+        finally:
+            cursor.close()
+
+    async def archive_closed_months(self, today: date) -> int:
+        return await asyncio.to_thread(self.archive.archive_closed_months, today)
+
+    async def publish_snapshot(self) -> Optional[int]:
+        # The projection is rebuilt inside the copy, so it always matches the data published with it
+        projections = {CONSTITUENT_HISTORY_PROJECTION: self.archive.with_sources(CONSTITUENT_HISTORY_SQL)}
+        return await asyncio.to_thread(self.base_repository.snapshot.publish, projections)
+
+    async def cluster_stock_price_history(self) -> int:
+        """Rewrite stock_price_history in (created_at, market_cap DESC) order if any row is out of it; returns those rows"""
+        return await asyncio.to_thread(self._cluster_stock_price_history)
+
+    def _cluster_stock_price_history(self) -> int:
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("BEGIN TRANSACTION;")
+            # The rewrite replaces the whole table, so a stale leader's maintenance is fenced like its loads
+            check_fencing_token(cursor)
+            unclustered_rows = cursor.execute(UNCLUSTERED_STOCK_ROWS_SQL).fetchone()[0]
+            if unclustered_rows:
+                for statement in CLUSTER_STOCK_PRICE_HISTORY_SQL:
+                    cursor.execute(statement)
+            cursor.execute("COMMIT;")
+            return unclustered_rows
+        except Exception:
+            cursor.execute("ROLLBACK;")
+            raise
+        finally:
+            cursor.close()
+
+    async def get_constituent_history(self, symbol: str, start_date: date, end_date: date) -> List[tuple]:
+        try:
+            query_sql = """
+            SELECT date, company_name, price, market_cap, one_day_return, in_index, weight_percent
+            FROM constituent_history
+            WHERE symbol = ? AND date >= ? AND date <= ?
+            ORDER BY date ASC;
+            """
+            result = await asyncio.to_thread(
+                self.connection.execute, query_sql, [symbol, start_date, end_date]
+            )
+            return result.fetchall()
+        except Exception:
+            return []
+
+    def _month_partitions(self, start_date: date, end_date: date) -> List[List[date]]:
+        partitions = []
+        partition_start = start_date
+        while partition_start <= end_date:
+            next_month = (partition_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+            partition_end = min(next_month - timedelta(days=1), end_date)
+            partitions.append([partition_start, partition_end])
+            partition_start = next_month
+        return partitions
+
+    def _year_partitions(self, start_date: date, end_date: date) -> List[List[date]]:
+        partitions = []
+        partition_start = start_date
+        while partition_start <= end_date:
+            next_year = date(partition_start.year + 1, 1, 1)
+            partitions.append([partition_start, min(next_year - timedelta(days=1), end_date)])
+            partition_start = next_year
+        return partitions
+
+    async def get_data_version(self) -> int:
+        try:
+            query_sql = "SELECT version FROM data_version WHERE id = 1;"
+            result = await asyncio.to_thread(self.connection.execute, query_sql)
+            row = result.fetchone()
+            return row[0] if row else 0
+        except Exception:
+            return 0
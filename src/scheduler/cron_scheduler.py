@@ -1,36 +1,72 @@
 import logging
 from datetime import date, timedelta
+from typing import Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from src.constants import DAILY_CRON_HOUR, DAILY_CRON_MINUTE, MARKET_CLOSED_WEEKENDS, DEFAULT_BACKFILL_DAYS, TOP_COMPANIES_COUNT
+from src.constants import (
+    DAILY_CRON_HOUR, DAILY_CRON_MINUTE, DEFAULT_BACKFILL_DAYS,
+    JOB_TYPE_BUILD_INDEX, JOB_TYPE_BACKFILL, JOB_TYPE_MAINTENANCE, MAINTENANCE_CRON_DAY_OF_WEEK, MAINTENANCE_CRON_HOUR,
+    SNAPSHOT_PUBLISH_INTERVAL_SECONDS, SCHEDULER_LEASE_RENEW_SECONDS
+)
 from src.managers.index_data_dump_manager import IndexDataDumpManager
-from src.managers.build_index_manager import BuildIndexManager
+from src.managers.job_manager import JobManager
+from src.managers.snapshot_manager import SnapshotManager
+from src.services.leader_lease import LeaderLease
+from src.services.trading_calendar import TradingCalendar, nyse_calendar
 
 logger = logging.getLogger(__name__)
 
 
 class CronScheduler:
-    def __init__(self, index_data_dump_manager: IndexDataDumpManager, build_index_manager: BuildIndexManager):
+    def __init__(
+        self,
+        index_data_dump_manager: IndexDataDumpManager,
+        job_manager: JobManager,
+        calendar: Optional[TradingCalendar] = None,
+        snapshot_manager: Optional[SnapshotManager] = None,
+        lease: Optional[LeaderLease] = None
+    ):
         self.manager = index_data_dump_manager
-        self.build_manager = build_index_manager
+        self.job_manager = job_manager
+        self.calendar = calendar or nyse_calendar()
+        # Only the writer of a writer/reader deployment publishes snapshots
+        self.snapshot_manager = snapshot_manager
+        # With several replicas, only the lease holder runs ingestion, maintenance and backfills
+        self.lease = lease
         self.scheduler = AsyncIOScheduler()
         
     async def start(self):
         logger.info("Starting cron scheduler")
         self._schedule_daily_job()
+        self._schedule_maintenance_job()
+        if self.snapshot_manager:
+            # Readers have nothing to open until the first snapshot exists
+            await self._publish_snapshot()
+            self._schedule_snapshot_job()
         self.scheduler.start()
         logger.info(f"Cron job scheduled for daily execution at {DAILY_CRON_HOUR:02d}:{DAILY_CRON_MINUTE:02d}")
         
+        if self.lease:
+            # The initial backfill runs whenever this node becomes leader, including on takeover
+            await self._renew_lease()
+            self._schedule_lease_job()
+        else:
+            self._schedule_initial_backfill()
+        
+    async def stop(self):
+        logger.info("Stopping cron scheduler")
+        self.scheduler.shutdown(wait=True)
+        if self.lease:
+            await self.lease.release()
+        
+    def _schedule_initial_backfill(self):
         # Run initial backfill in background (non-blocking)
         self.scheduler.add_job(
             self._run_initial_backfill,
             'date',
-            id='initial_backfill'
+            id='initial_backfill',
+            replace_existing=True
         )
         
-    async def stop(self):
-        logger.info("Stopping cron scheduler")
-        self.scheduler.shutdown(wait=True)
-        
     def _schedule_daily_job(self):
         self.scheduler.add_job(
             self._daily_data_ingestion,
@@ -40,7 +76,52 @@ class CronScheduler:
             id='daily_stock_data_ingestion'
         )
         
+    def _schedule_maintenance_job(self):
+        # Weekly while the market is closed, so the rewrite never races the daily ingestion
+        self.scheduler.add_job(
+            self._stock_data_maintenance,
+            'cron',
+            day_of_week=MAINTENANCE_CRON_DAY_OF_WEEK,
+            hour=MAINTENANCE_CRON_HOUR,
+            id='stock_data_maintenance'
+        )
+        
+    def _schedule_snapshot_job(self):
+        self.scheduler.add_job(
+            self._publish_snapshot,
+            'interval',
+            seconds=SNAPSHOT_PUBLISH_INTERVAL_SECONDS,
+            id='snapshot_publish',
+            max_instances=1,
+            coalesce=True
+        )
+        
+    def _schedule_lease_job(self):
+        self.scheduler.add_job(
+            self._renew_lease,
+            'interval',
+            seconds=SCHEDULER_LEASE_RENEW_SECONDS,
+            id='scheduler_lease',
+            max_instances=1,
+            coalesce=True
+        )
+        
+    async def _renew_lease(self):
+        was_leader = self.lease.fencing_token is not None
+        if await self.lease.acquire_or_renew() and not was_leader:
+            self._schedule_initial_backfill()
+        
+    async def _is_leader(self) -> bool:
+        return self.lease is None or await self.lease.is_current()
+        
+    @property
+    def _fencing_token(self) -> Optional[int]:
+        # Carried into the job's writes, which are rejected once a newer leader has written
+        return self.lease.fencing_token if self.lease else None
+        
     async def _run_initial_backfill(self):
+        if not await self._is_leader():
+            return
         try:
             logger.info("Starting initial data backfill and index building...")
             
@@ -54,17 +135,17 @@ class CronScheduler:
                 if start_date > date.today():
                     start_date = date.today()
                 
-            await self.manager.run_backfill(start_date, date.today())
+            # Jobs run in submission order on a single worker, so the build starts after the backfill
+            backfill_job = await self.job_manager.submit(
+                JOB_TYPE_BACKFILL, start_date, date.today(), fencing_token=self._fencing_token
+            )
             
             index_start_date = date.today() - timedelta(days=DEFAULT_BACKFILL_DAYS)
-            result = await self.build_manager.build_index(index_start_date, date.today())
+            build_job = await self.job_manager.submit(
+                JOB_TYPE_BUILD_INDEX, index_start_date, date.today(), fencing_token=self._fencing_token
+            )
             
-            if result.success:
-                logger.info(f"Index building completed: {result.total_compositions_built} compositions built")
-            else:
-                logger.error(f"Index building failed: {result.error_message}")
-                
-            logger.info("Initial setup completed! API endpoints are ready.")
+            logger.info(f"Initial setup queued: backfill job {backfill_job.id}, build-index job {build_job.id}")
                 
         except Exception as e:
             logger.error(f"Error during initial backfill: {e}")
@@ -73,15 +154,32 @@ class CronScheduler:
         try:
             today = date.today()
             
-            if today.weekday() in MARKET_CLOSED_WEEKENDS:
+            if not self.calendar.is_trading_day(today) or not await self._is_leader():
                 return
                 
-            result = await self.manager.run_daily_dump(today)
-            
-            if result.success:
-                logger.info(f"Daily ingestion completed: {result.records_processed} records")
-            else:
-                logger.error(f"Daily ingestion failed: {result.error_message}")
+            # Queued like any backfill, so it is deduplicated, reports progress and can be cancelled
+            job = await self.job_manager.submit(JOB_TYPE_BACKFILL, today, today, fencing_token=self._fencing_token)
+            logger.info(f"Daily ingestion queued: backfill job {job.id}")
                 
         except Exception as e:
             logger.error(f"Critical error in daily data ingestion: {e}")
+
+    async def _stock_data_maintenance(self):
+        try:
+            if not await self._is_leader():
+                return
+            # One job on the same worker as ingestion, so the rewrite never runs alongside a load
+            job = await self.job_manager.submit(
+                JOB_TYPE_MAINTENANCE, date.today(), date.today(), fencing_token=self._fencing_token
+            )
+            logger.info(f"Stock data maintenance queued: job {job.id}")
+        
+        except Exception as e:
+            logger.error(f"Error queuing stock data maintenance: {e}")
+
+    async def _publish_snapshot(self):
+        result = await self.snapshot_manager.run_publish()
+        if not result.success:
+            logger.error(f"Snapshot publish failed: {result.error_message}")
+        elif result.records_processed:
+            logger.info(f"Published snapshot of data version {result.records_processed}")
@@ -0,0 +1,140 @@
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+import numpy as np
+from src.repositories.analytics_repository import AnalyticsRepository
+from src.services import risk_metrics
+from src.constants import TRADING_DAYS_PER_YEAR, MARKET_BENCHMARK
+from src.dtos.analytics_result import RiskAnalytics, RollingRiskMetrics, ConstituentContribution, ReturnAttribution
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsService:
+    def __init__(self, repository: AnalyticsRepository):
+        self.repository = repository
+
+    async def get_data_version(self) -> int:
+        return await self.repository.get_data_version()
+
+    async def get_risk_analytics(
+        self,
+        start_date: date,
+        end_date: date,
+        windows: List[int],
+        risk_free_rate: float = 0.0,
+        benchmark_symbol: Optional[str] = None
+    ) -> Optional[RiskAnalytics]:
+        """Full-period and rolling risk statistics for the stored index performance series"""
+        series = await self.repository.get_performance_series(start_date, end_date, benchmark_symbol)
+        if not series or len(series["date"]) == 0:
+            return None
+
+        dates = series["date"].astype(object)
+        returns = series["daily_return"]
+        index_values = series["index_value"]
+        benchmark_returns = series["benchmark_return"]
+        observations = len(returns)
+
+        drawdown, peak, trough = risk_metrics.max_drawdown(index_values)
+        full_volatility = risk_metrics.rolling_volatility(returns, observations, TRADING_DAYS_PER_YEAR)[-1]
+        full_sharpe = risk_metrics.rolling_sharpe(returns, observations, TRADING_DAYS_PER_YEAR, risk_free_rate)[-1]
+        growth = np.prod(1.0 + returns)
+        annualized_return = growth ** (TRADING_DAYS_PER_YEAR / observations) - 1.0
+
+        rolling = [
+            self._rolling_metrics(dates, returns, index_values, benchmark_returns, window, risk_free_rate)
+            for window in sorted(set(windows))
+        ]
+
+        return RiskAnalytics(
+            start_date=dates[0],
+            end_date=dates[-1],
+            observations=observations,
+            benchmark=benchmark_symbol or MARKET_BENCHMARK,
+            risk_free_rate=risk_free_rate,
+            annualized_return_percent=self._percent(annualized_return),
+            annualized_volatility_percent=self._percent(full_volatility),
+            sharpe_ratio=self._finite(full_sharpe),
+            beta=self._finite(risk_metrics.beta(returns, benchmark_returns)),
+            max_drawdown_percent=drawdown * 100,
+            drawdown_peak_date=dates[peak],
+            drawdown_trough_date=dates[trough],
+            rolling=rolling
+        )
+
+    async def get_return_attribution(self, start_date: date, end_date: date, limit: int) -> Optional[ReturnAttribution]:
+        """Top and bottom ``limit`` constituents by compounded contribution to the index return"""
+        rows = await self.repository.get_return_attribution(start_date, end_date, limit)
+        if not rows:
+            return None
+
+        contributions = [
+            ConstituentContribution(
+                symbol=row[0],
+                company_name=row[1],
+                contribution_percent=row[2] * 100,
+                average_weight_percent=row[3] * 100,
+                days_in_index=row[4],
+                compounded_return_percent=row[5] * 100
+            )
+            for row in rows
+        ]
+        # Rows arrive in top-rank order and bottom ranks are its exact reverse
+        return ReturnAttribution(
+            start_date=start_date,
+            end_date=end_date,
+            index_return_percent=rows[0][8] * 100,
+            trading_days=rows[0][10],
+            constituents_count=rows[0][9],
+            top=[contribution for contribution, row in zip(contributions, rows) if row[6] <= limit],
+            bottom=[contribution for contribution, row in zip(contributions[::-1], rows[::-1]) if row[7] <= limit]
+        )
+
+    async def get_covariance_matrices(
+        self, target_date: date, window: int, min_periods: int
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """Pairwise-complete covariance and correlation of the constituents on ``target_date``"""
+        matrix = await self.repository.get_return_matrix(target_date, window)
+        if not matrix:
+            return None
+
+        covariance, correlation, counts = risk_metrics.pairwise_covariance(matrix["returns"], min_periods)
+        return {
+            "dates": matrix["dates"],
+            "symbols": matrix["symbols"],
+            "covariance": covariance,
+            "correlation": correlation,
+            "observations": counts,
+        }
+
+    def _rolling_metrics(
+        self, dates, returns, index_values, benchmark_returns, window: int, risk_free_rate: float
+    ) -> RollingRiskMetrics:
+        volatility = risk_metrics.rolling_volatility(returns, window, TRADING_DAYS_PER_YEAR) * 100
+        sharpe = risk_metrics.rolling_sharpe(returns, window, TRADING_DAYS_PER_YEAR, risk_free_rate)
+        betas = risk_metrics.rolling_beta(returns, benchmark_returns, window)
+        drawdowns = risk_metrics.rolling_max_drawdown(index_values, window) * 100
+
+        # Dates before the first full window carry no statistics and are left out
+        first = window - 1
+        return RollingRiskMetrics(
+            window=window,
+            dates=dates[first:].tolist(),
+            volatility_percent=self._column(volatility[first:]),
+            sharpe_ratio=self._column(sharpe[first:]),
+            beta=self._column(betas[first:]),
+            max_drawdown_percent=self._column(drawdowns[first:])
+        )
+
+    def _column(self, values: np.ndarray) -> List[Optional[float]]:
+        column = values.astype(object)
+        column[~np.isfinite(values)] = None
+        return column.tolist()
+
+    def _percent(self, value: float) -> Optional[float]:
+        value = self._finite(value)
+        return None if value is None else value * 100
+
+    def _finite(self, value: float) -> Optional[float]:
+        return float(value) if np.isfinite(value) else None
@@ -0,0 +1,226 @@
+"""
+Vectorized backtests of equal-weight top-N strategies over a parameter grid.
+
+The market is a handful of dates x symbols arrays: daily returns (fractional,
+zero where a stock has no row), each day's market-cap rank (1 is the largest,
+0 where the stock has no row) and each day's symbol positions in rank order.
+They are built once per run. With more than one worker they are written to
+.npy files that every pool process memory-maps read-only, so the page cache
+holds a single copy of the data however many processes evaluate the grid.
+
+A strategy picks its members at the close of each rebalance date from that
+day's ranks and holds them from the next trading day, so no variant trades on
+a price it could not have seen. Between rebalances the weights drift with
+each member's return; a rebalance resets them to equal and pays ``cost_bps``
+on the two-way turnover.
+"""
+import itertools
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from src.constants import INDEX_BASE_VALUE, TRADING_DAYS_PER_YEAR
+from src.dtos.backtest_result import BacktestParameters, BacktestResult
+from src.services import risk_metrics, weight_drift
+
+
+class MarketData:
+    """Read-only dates x symbols arrays shared by every variant of a run"""
+
+    ARRAYS = ("dates", "symbols", "returns", "ranks", "order", "present")
+
+    def __init__(self, dates, symbols, returns, ranks, order, present):
+        self.dates = dates
+        self.symbols = symbols
+        self.returns = returns
+        self.ranks = ranks
+        self.order = order
+        self.present = present
+
+    @classmethod
+    def from_columns(cls, dates: np.ndarray, symbols: np.ndarray, returns: np.ndarray, ranks: np.ndarray) -> "MarketData":
+        ranks = np.asarray(ranks, dtype=np.int32)
+        # Stocks without a row sort after every ranked stock
+        sortable = np.where(ranks > 0, ranks, np.iinfo(np.int32).max)
+        order = np.argsort(sortable, axis=1, kind="stable").astype(np.int32)
+        present = np.count_nonzero(ranks > 0, axis=1).astype(np.int32)
+        return cls(
+            np.asarray(dates, dtype="datetime64[D]"), np.asarray(symbols).astype(str),
+            np.nan_to_num(np.asarray(returns, dtype=np.float64), nan=0.0), ranks, order, present
+        )
+
+    def save(self, directory: str) -> Dict[str, str]:
+        paths = {}
+        for name in self.ARRAYS:
+            paths[name] = os.path.join(directory, f"{name}.npy")
+            np.save(paths[name], getattr(self, name))
+        return paths
+
+    @classmethod
+    def load(cls, paths: Dict[str, str]) -> "MarketData":
+        return cls(**{name: np.load(path, mmap_mode="r") for name, path in paths.items()})
+
+
+def parameter_grid(
+    top_ns: Iterable[int],
+    rebalances: Iterable[str],
+    buffers: Iterable[int] = (0,),
+    turnover_caps: Iterable[Optional[float]] = (None,)
+) -> List[BacktestParameters]:
+    return [
+        BacktestParameters(top_n=top_n, rebalance=rebalance, buffer=buffer, turnover_cap_percent=cap)
+        for top_n, rebalance, buffer, cap in itertools.product(top_ns, rebalances, buffers, turnover_caps)
+    ]
+
+
+def rebalance_mask(dates: np.ndarray, frequency: str) -> np.ndarray:
+    """True on the first trading day of each rebalance period"""
+    periods = weight_drift.rebalance_period(dates, frequency)
+    mask = np.ones(len(dates), dtype=bool)
+    mask[1:] = periods[1:] != periods[:-1]
+    return mask
+
+
+def select_members(
+    ranks: np.ndarray,
+    order: np.ndarray,
+    present: int,
+    holdings: np.ndarray,
+    parameters: BacktestParameters
+) -> np.ndarray:
+    """
+    Members for one rebalance date from that day's ranks.
+
+    Holdings still ranked within top_n + buffer are kept, and the best-ranked
+    newcomers fill the remaining places. With a turnover cap, voluntary exits
+    beyond the cap are withdrawn, best-ranked first; holdings with no row on
+    the date always leave.
+    """
+    top_n = parameters.top_n
+    candidates = order[:min(top_n, present)]
+    if holdings.size == 0:
+        return candidates
+
+    holding_ranks = ranks[holdings]
+    kept = (holding_ranks > 0) & (holding_ranks <= top_n + parameters.buffer)
+    if parameters.turnover_cap_percent is not None:
+        max_exits = int(top_n * parameters.turnover_cap_percent / 100)
+        exits = np.flatnonzero(~kept & (holding_ranks > 0))
+        if exits.size > max_exits:
+            withdrawn = exits[np.argsort(holding_ranks[exits], kind="stable")[:exits.size - max_exits]]
+            kept[withdrawn] = True
+    retained = holdings[kept]
+    # Ranks are unique per day, so the candidate with rank k sits at position k - 1
+    retained_ranks = holding_ranks[kept]
+    taken = np.zeros(candidates.size, dtype=bool)
+    taken[retained_ranks[retained_ranks <= candidates.size] - 1] = True
+    entrants = candidates[~taken][:max(top_n - retained.size, 0)]
+    return np.concatenate((retained, entrants))
+
+
+def run_backtest(market: MarketData, parameters: BacktestParameters, cost_bps: float) -> BacktestResult:
+    days_count, symbols_count = market.returns.shape
+    rebalance_days = np.flatnonzero(rebalance_mask(market.dates, parameters.rebalance))
+    period_ends = np.append(rebalance_days[1:], days_count - 1)
+
+    daily_returns = np.zeros(days_count)
+    weight_changes = np.zeros(symbols_count)
+    members = np.empty(0, dtype=np.int32)
+    drifted = np.empty(0)
+    one_way_turnover = []
+    costs = []
+    for day, period_end in zip(rebalance_days, period_ends):
+        if period_end <= day:
+            break
+        selected = select_members(market.ranks[day], market.order[day], int(market.present[day]), members, parameters)
+        targets = np.full(selected.size, 1.0 / selected.size) if selected.size else np.empty(0)
+
+        if members.size:
+            weight_changes[members] = -drifted
+            weight_changes[selected] += targets
+            two_way = float(np.abs(weight_changes).sum())
+            weight_changes[members] = 0.0
+            weight_changes[selected] = 0.0
+            cost = two_way * cost_bps / 10000
+            daily_returns[day] = (1 + daily_returns[day]) * (1 - cost) - 1
+            one_way_turnover.append(two_way / 2)
+            costs.append(cost)
+
+        members = selected
+        if not members.size:
+            drifted = targets
+            continue
+        # Members' growth since the rebalance; the portfolio is its weighted sum
+        growth = np.cumprod(1.0 + market.returns[day + 1:period_end + 1, members], axis=0)
+        values = growth @ targets
+        daily_returns[day + 1:period_end + 1] = values / np.concatenate(([1.0], values[:-1])) - 1.0
+        drifted = targets * growth[-1] / values[-1]
+
+    return _summarize(parameters, daily_returns[1:], one_way_turnover, costs)
+
+
+def run_grid(
+    market: MarketData,
+    grid: List[BacktestParameters],
+    cost_bps: float,
+    workers: int = 1
+) -> List[BacktestResult]:
+    """Evaluate every parameterization, in grid order, across ``workers`` processes"""
+    workers = min(workers, len(grid))
+    if workers <= 1:
+        return [run_backtest(market, parameters, cost_bps) for parameters in grid]
+
+    with tempfile.TemporaryDirectory(prefix="backtest-") as directory:
+        paths = market.save(directory)
+        # Spawned workers start clean rather than inheriting the parent's DuckDB and event-loop threads
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_attach_market,
+            initargs=(paths, cost_bps)
+        ) as executor:
+            chunksize = max(1, len(grid) // (workers * 4))
+            return list(executor.map(_run_attached, grid, chunksize=chunksize))
+
+
+_worker_state = {}
+
+
+def _attach_market(paths: Dict[str, str], cost_bps: float):
+    _worker_state["market"] = MarketData.load(paths)
+    _worker_state["cost_bps"] = cost_bps
+
+
+def _run_attached(parameters: BacktestParameters) -> BacktestResult:
+    return run_backtest(_worker_state["market"], parameters, _worker_state["cost_bps"])
+
+
+def _summarize(
+    parameters: BacktestParameters,
+    returns: np.ndarray,
+    one_way_turnover: List[float],
+    costs: List[float]
+) -> BacktestResult:
+    observations = len(returns)
+    index_values = INDEX_BASE_VALUE * np.cumprod(1.0 + returns)
+    growth = index_values[-1] / INDEX_BASE_VALUE if observations else 1.0
+    years = observations / TRADING_DAYS_PER_YEAR
+    volatility = risk_metrics.rolling_volatility(returns, observations, TRADING_DAYS_PER_YEAR)[-1] if observations else np.nan
+    sharpe = risk_metrics.rolling_sharpe(returns, observations, TRADING_DAYS_PER_YEAR, 0.0)[-1] if observations else np.nan
+    drawdown, _, _ = risk_metrics.max_drawdown(index_values)
+
+    return BacktestResult(
+        **parameters.model_dump(),
+        total_return_percent=(growth - 1.0) * 100,
+        annualized_return_percent=(growth ** (1 / years) - 1.0) * 100 if years else 0.0,
+        annualized_volatility_percent=float(volatility) * 100 if np.isfinite(volatility) else None,
+        sharpe_ratio=float(sharpe) if np.isfinite(sharpe) else None,
+        max_drawdown_percent=drawdown * 100,
+        average_turnover_percent=float(np.mean(one_way_turnover)) * 100 if one_way_turnover else 0.0,
+        annual_turnover_percent=sum(one_way_turnover) / years * 100 if years else 0.0,
+        total_cost_percent=sum(costs) * 100,
+        rebalance_count=len(one_way_turnover),
+        final_index_value=float(index_values[-1]) if observations else INDEX_BASE_VALUE
+    )
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import date
+from typing import List, Optional
+from src.repositories.backtest_repository import BacktestRepository
+from src.dtos.backtest_result import BacktestParameters, BacktestResult, BacktestRun
+from src.services.backtest_engine import MarketData, run_grid
+from src.constants import DEFAULT_REBALANCE_COST_BPS
+
+logger = logging.getLogger(__name__)
+
+
+class BacktestService:
+    def __init__(self, repository: BacktestRepository):
+        self.repository = repository
+
+    async def run(
+        self,
+        start_date: date,
+        end_date: date,
+        grid: List[BacktestParameters],
+        cost_bps: float = DEFAULT_REBALANCE_COST_BPS,
+        workers: int = 1
+    ) -> Optional[BacktestRun]:
+        """Backtest every parameterization over the stored history and persist the results; None without data"""
+        columns = await self.repository.get_market_data(start_date, end_date)
+        if not columns:
+            return None
+        market = MarketData.from_columns(**columns)
+        days_count, symbols_count = market.returns.shape
+
+        started = time.perf_counter()
+        results = await asyncio.to_thread(run_grid, market, grid, cost_bps, workers)
+        elapsed = time.perf_counter() - started
+        logger.info(f"Backtested {len(grid)} variants over {days_count} days x {symbols_count} symbols in {elapsed:.2f}s")
+
+        run = BacktestRun(
+            run_id=str(uuid.uuid4()),
+            start_date=market.dates[0].item(),
+            end_date=market.dates[-1].item(),
+            symbols_count=symbols_count,
+            days_count=days_count,
+            cost_bps=cost_bps,
+            variants_count=len(grid),
+            workers=workers,
+            elapsed_seconds=elapsed,
+            variants_per_second=len(grid) / elapsed if elapsed > 0 else 0.0,
+            results=results
+        )
+        await self.repository.save_run(run)
+        return run
+
+    async def get_results(self, run_id: str) -> List[BacktestResult]:
+        return await self.repository.get_results(run_id)
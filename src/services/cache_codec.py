@@ -0,0 +1,179 @@
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import msgpack
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+CODEC_MAGIC = b"HC"
+CODEC_FORMAT_VERSION = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZSTD = 1
+COMPRESSION_LZ4 = 2
+
+COMPRESSION_IDS = {"none": COMPRESSION_NONE, "zstd": COMPRESSION_ZSTD, "lz4": COMPRESSION_LZ4}
+
+# Column type tags stored in the columnar header
+COLUMN_DATE = "d"
+COLUMN_DATETIME = "t"
+COLUMN_VALUE = "v"
+
+
+class CacheCodec:
+    name = "base"
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, payload: Any) -> Any:
+        raise NotImplementedError
+
+
+class JsonCacheCodec(CacheCodec):
+    """Legacy row-oriented encoding: ``json.dumps`` of the cached value."""
+
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=str).encode("utf-8")
+
+    def decode(self, payload: Any) -> Any:
+        return json.loads(payload)
+
+
+class ColumnarCacheCodec(CacheCodec):
+    """
+    Column-oriented msgpack encoding for lists of homogeneous dicts.
+
+    Layout: ``b"HC" | format version (1 byte) | compression id (1 byte) | body``.
+    The body stores each key once with a per-column array of values; dates are
+    stored as ordinals and floats as native doubles. Payloads without the magic
+    header are decoded as legacy JSON so entries written before a rollout stay readable.
+    """
+
+    name = "columnar"
+
+    def __init__(self, compression: str = "none", level: int = 3):
+        if compression not in COMPRESSION_IDS:
+            raise ValueError(f"Unsupported cache compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd cache compression requires the 'zstandard' package")
+        if compression == "lz4" and lz4_frame is None:
+            raise ValueError("lz4 cache compression requires the 'lz4' package")
+
+        self.compression = compression
+        self.compression_id = COMPRESSION_IDS[compression]
+        self.level = level
+        self._zstd_compressor = zstandard.ZstdCompressor(level=level) if compression == "zstd" else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if zstandard is not None else None
+
+    def encode(self, value: Any) -> bytes:
+        if self._is_table(value):
+            body = self._encode_table(value)
+        else:
+            body = {"k": "raw", "v": value}
+
+        packed = msgpack.packb(body, use_bin_type=True, default=self._pack_default)
+        header = CODEC_MAGIC + bytes([CODEC_FORMAT_VERSION, self.compression_id])
+        return header + self._compress(packed)
+
+    def decode(self, payload: Any) -> Any:
+        if isinstance(payload, str) or not payload.startswith(CODEC_MAGIC):
+            return json.loads(payload)
+
+        version = payload[2]
+        if version != CODEC_FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache format version: {version}")
+
+        body = msgpack.unpackb(self._decompress(payload[3], payload[4:]), raw=False)
+        if body["k"] == "raw":
+            return body["v"]
+        return self._decode_table(body)
+
+    def _is_table(self, value: Any) -> bool:
+        if not isinstance(value, list) or not value:
+            return False
+        if not all(isinstance(row, dict) for row in value):
+            return False
+        keys = list(value[0].keys())
+        return all(list(row.keys()) == keys for row in value)
+
+    def _encode_table(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        columns = list(rows[0].keys())
+        types = []
+        values = []
+
+        for column in columns:
+            column_values = [row[column] for row in rows]
+            column_type = self._column_type(column_values)
+            if column_type == COLUMN_DATE:
+                column_values = [v.toordinal() if v is not None else None for v in column_values]
+            elif column_type == COLUMN_DATETIME:
+                column_values = [v.isoformat() if v is not None else None for v in column_values]
+            types.append(column_type)
+            values.append(column_values)
+
+        return {"k": "table", "n": len(rows), "c": columns, "t": types, "v": values}
+
+    def _decode_table(self, body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        columns = body["c"]
+        decoded_columns = []
+
+        for column_type, column_values in zip(body["t"], body["v"]):
+            if column_type == COLUMN_DATE:
+                column_values = [date.fromordinal(v) if v is not None else None for v in column_values]
+            elif column_type == COLUMN_DATETIME:
+                column_values = [datetime.fromisoformat(v) if v is not None else None for v in column_values]
+            decoded_columns.append(column_values)
+
+        return [dict(zip(columns, row)) for row in zip(*decoded_columns)]
+
+    def _column_type(self, column_values: List[Any]) -> str:
+        present = [v for v in column_values if v is not None]
+        if present and all(type(v) is date for v in present):
+            return COLUMN_DATE
+        if present and all(isinstance(v, datetime) for v in present):
+            return COLUMN_DATETIME
+        return COLUMN_VALUE
+
+    def _pack_default(self, value: Any) -> Any:
+        return str(value)
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression_id == COMPRESSION_ZSTD:
+            return self._zstd_compressor.compress(data)
+        if self.compression_id == COMPRESSION_LZ4:
+            return lz4_frame.compress(data)
+        return data
+
+    def _decompress(self, compression_id: int, data: bytes) -> bytes:
+        if compression_id == COMPRESSION_NONE:
+            return data
+        if compression_id == COMPRESSION_ZSTD:
+            if self._zstd_decompressor is None:
+                raise ValueError("zstd cache payload found but 'zstandard' is not installed")
+            return self._zstd_decompressor.decompress(data)
+        if compression_id == COMPRESSION_LZ4:
+            if lz4_frame is None:
+                raise ValueError("lz4 cache payload found but 'lz4' is not installed")
+            return lz4_frame.decompress(data)
+        raise ValueError(f"Unsupported cache compression id: {compression_id}")
+
+
+def create_cache_codec(name: str = "columnar", compression: Optional[str] = None) -> CacheCodec:
+    if name == JsonCacheCodec.name:
+        return JsonCacheCodec()
+    if name == ColumnarCacheCodec.name:
+        return ColumnarCacheCodec(compression=compression or "none")
+    raise ValueError(f"Unsupported cache codec: {name}")
@@ -1,18 +1,32 @@
 from datetime import date
 from typing import List, Dict, Any
-from src.clients.yahoo_finance_client import YahooFinanceClient
-from src.clients.alpha_vantage_client import AlphaVantageClient
 import logging
+from src.constants import MIN_SOURCE_ROW_RATIO
 
 logger = logging.getLogger(__name__)
 
 
 class DataSourceService:
     def __init__(self):
-        self.yahoo_client = YahooFinanceClient()
-        self.alpha_vantage_client = AlphaVantageClient()
         self.primary_source = "yahoo_finance"
         self.secondary_source = "alpha_vantage"
+        self._yahoo_client = None
+        self._alpha_vantage_client = None
+
+    # Clients (and requests, aiohttp and pandas behind them) are only loaded by the first fetch
+    @property
+    def yahoo_client(self):
+        if self._yahoo_client is None:
+            from src.clients.yahoo_finance_client import YahooFinanceClient
+            self._yahoo_client = YahooFinanceClient()
+        return self._yahoo_client
+
+    @property
+    def alpha_vantage_client(self):
+        if self._alpha_vantage_client is None:
+            from src.clients.alpha_vantage_client import AlphaVantageClient
+            self._alpha_vantage_client = AlphaVantageClient()
+        return self._alpha_vantage_client
     
     async def get_top_stocks_by_market_cap(self, target_date: date, limit: int = 100) -> List[Dict[str, Any]]:
         # Try primary source (Yahoo Finance)
@@ -28,7 +42,7 @@ class DataSourceService:
         # Try secondary source (Alpha Vantage)
         try:
             secondary_data = await self.alpha_vantage_client.get_top_stocks_by_market_cap(target_date, limit)
-            if secondary_data and len(secondary_data) >= limit * 0.5:
+            if secondary_data and len(secondary_data) >= limit * MIN_SOURCE_ROW_RATIO:
                 for stock in secondary_data:
                     stock['data_source'] = self.secondary_source
                 return secondary_data[:limit]
@@ -1,9 +1,14 @@
+import asyncio
 import logging
 from datetime import date
-from typing import List, Dict
+from typing import List, Dict, Optional
 from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
-from src.constants import TOP_COMPANIES_COUNT
-from src.dtos.index_result import IndexComposition, IndexPerformance
+from src.repositories.row_stream import RowStream
+from src.constants import STREAM_CHUNK_SIZE, TRADING_DAYS_PER_YEAR
+from src.dtos.index_result import (
+    IndexComposition, IndexPerformance, CompositionChange, ConstituentHistory, ConstituentHistoryPoint, IndexTurnover
+)
+from src.repositories.stock_price_history_repository import CONSTITUENT_HISTORY_PROJECTION
 
 logger = logging.getLogger(__name__)
 
@@ -11,9 +16,10 @@ logger = logging.getLogger(__name__)
 class IndexService:
     def __init__(self, repository: StockPriceHistoryRepository):
         self.repository = repository
+        self._projection_lock = asyncio.Lock()
         
-    async def get_index_composition(self, target_date: date) -> List[IndexComposition]:
-        stocks = await self.repository.get_stocks_by_date(target_date, TOP_COMPANIES_COUNT)
+    async def get_index_composition(self, target_date: date, top_n: int) -> List[IndexComposition]:
+        stocks = await self.repository.get_stocks_by_date(target_date, top_n)
         
         if not stocks:
             return []
@@ -35,8 +41,10 @@ class IndexService:
         
         return composition
     
-    async def get_index_composition_for_date_range(self, start_date: date, end_date: date) -> Dict[date, List[IndexComposition]]:
-        stocks_by_date = await self.repository.get_top_stocks_by_date_range(start_date, end_date, TOP_COMPANIES_COUNT)
+    async def get_index_composition_for_date_range(
+        self, start_date: date, end_date: date, top_n: int
+    ) -> Dict[date, List[IndexComposition]]:
+        stocks_by_date = await self.repository.get_top_stocks_by_date_range(start_date, end_date, top_n)
         
         composition_by_date = {}
         
@@ -65,46 +73,120 @@ class IndexService:
         """Get persisted index composition for a specific date"""
         return await self.repository.get_persisted_index_composition(target_date)
     
+    async def get_persisted_index_compositions(self, target_dates: List[date]) -> Dict[date, List[IndexComposition]]:
+        """Get persisted index compositions for many dates in one query"""
+        return await self.repository.get_persisted_index_compositions(target_dates)
+    
     async def get_persisted_index_performance(self, start_date: date, end_date: date) -> List[IndexPerformance]:
         """Get persisted index performance for a date range"""
         return await self.repository.get_persisted_index_performance(start_date, end_date)
     
-    async def persist_index_composition(self, compositions: List[IndexComposition]) -> None:
-        """Persist index compositions to database (only inserts new data, skips existing)"""
-        if not compositions:
-            return
-        
-        # Business logic: Only persist data for dates that don't already exist
-        # Group by date to check existence efficiently
-        compositions_by_date = {}
-        for comp in compositions:
-            if comp.date not in compositions_by_date:
-                compositions_by_date[comp.date] = []
-            compositions_by_date[comp.date].append(comp)
+    def stream_index_performance(self, start_date: date, end_date: date) -> RowStream:
+        """Stream persisted index performance rows in chunks without building models"""
+        return self.repository.stream_index_performance(start_date, end_date, STREAM_CHUNK_SIZE)
+    
+    def stream_index_composition(self, target_date: date) -> RowStream:
+        """Stream persisted index composition rows in chunks without building models"""
+        return self.repository.stream_index_composition(target_date, STREAM_CHUNK_SIZE)
+    
+    def stream_index_compositions(self, start_date: date, end_date: date) -> RowStream:
+        """Stream every persisted daily composition in a date range, month by month"""
+        return self.repository.stream_index_compositions(start_date, end_date, STREAM_CHUNK_SIZE)
+    
+    async def get_composition_changes(self, start_date: date, end_date: date) -> List[CompositionChange]:
+        """Get index entries and exits between consecutive index dates in a range"""
+        return await self.repository.get_composition_changes(start_date, end_date)
+    
+    def stream_composition_changes(self, start_date: date, end_date: date) -> RowStream:
+        """Stream index entries and exits in a range straight from the database cursor"""
+        return self.repository.stream_composition_changes(start_date, end_date, STREAM_CHUNK_SIZE)
+    
+    async def get_turnover(self, start_date: date, end_date: date, cost_bps: float, window: int) -> Optional[IndexTurnover]:
+        """Get daily and trailing one-way/two-way turnover with the cost of trading it at ``cost_bps``"""
+        rows = await self.repository.get_turnover(start_date, end_date, cost_bps, window)
+        if not rows:
+            return None
         
-        new_compositions = []
-        for target_date, date_compositions in compositions_by_date.items():
-            existing = await self.repository.get_persisted_index_composition(target_date)
-            if not existing:  # Only add if no data exists for this date
-                new_compositions.extend(date_compositions)
+        dates, entered, exited, one_way, two_way, rolling_one_way, rolling_two_way, cost = (list(column) for column in zip(*rows))
+        average_one_way = sum(one_way) / len(one_way)
+        return IndexTurnover(
+            start_date=dates[0],
+            end_date=dates[-1],
+            window=window,
+            cost_bps=cost_bps,
+            trading_days=len(dates),
+            average_one_way_percent=average_one_way,
+            annualized_one_way_percent=average_one_way * TRADING_DAYS_PER_YEAR,
+            total_two_way_percent=sum(two_way),
+            total_cost_percent=sum(cost),
+            dates=dates,
+            entered=entered,
+            exited=exited,
+            one_way_percent=one_way,
+            two_way_percent=two_way,
+            rolling_one_way_percent=rolling_one_way,
+            rolling_two_way_percent=rolling_two_way,
+            cost_percent=cost
+        )
+    
+    def stream_turnover(self, start_date: date, end_date: date, cost_bps: float, window: int) -> RowStream:
+        """Stream daily turnover rows in a range straight from the database cursor"""
+        return self.repository.stream_turnover(start_date, end_date, cost_bps, window, STREAM_CHUNK_SIZE)
+    
+    async def get_constituent_history(
+        self, symbol: str, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> Optional[ConstituentHistory]:
+        """Get one symbol's prices and index membership from the symbol-ordered projection"""
+        # Only read: writers refresh the projection once their jobs finish
+        rows = await self.repository.get_constituent_history(
+            symbol.upper(), start_date or date.min, end_date or date.max
+        )
+        if not rows:
+            return None
         
-        if new_compositions:
-            await self.repository.insert_index_composition(new_compositions)
+        history = [
+            ConstituentHistoryPoint(
+                date=row[0],
+                price=row[2],
+                market_cap=row[3],
+                one_day_return=row[4],
+                in_index=row[5],
+                weight_percent=row[6]
+            )
+            for row in rows
+        ]
+        return ConstituentHistory(
+            symbol=symbol.upper(),
+            company_name=rows[-1][1],
+            start_date=rows[0][0],
+            end_date=rows[-1][0],
+            membership_days=sum(1 for point in history if point.in_index),
+            history=history
+        )
+    
+    async def refresh_constituent_history(self) -> None:
+        """Rebuild the constituent projection if data was written since it was last built"""
+        async with self._projection_lock:
+            data_version = await self.repository.get_data_version()
+            if await self.repository.get_projection_version(CONSTITUENT_HISTORY_PROJECTION) == data_version:
+                return
+            if not await self.repository.refresh_constituent_history(data_version):
+                logger.error("Failed to refresh constituent history projection")
+    
+    async def publish_snapshot(self) -> Optional[int]:
+        """Publish a read-only snapshot for reader workers if data changed; returns its data version, or None"""
+        return await self.repository.publish_snapshot()
+    
+    async def get_data_version(self) -> int:
+        """Get the monotonically increasing version of persisted index data"""
+        return await self.repository.get_data_version()
+    
+    async def persist_index_composition(self, compositions: List[IndexComposition], member_count: int = 0) -> None:
+        """Upsert index compositions keyed by date and symbol, replacing each given date's members"""
+        if compositions:
+            await self.repository.insert_index_composition(compositions, minimum_rows=member_count)
     
     async def persist_index_performance(self, performance: List[IndexPerformance]) -> None:
-        """Persist index performance to database (only inserts new data, skips existing)"""
-        if not performance:
-            return
-        
-        # Business logic: Only persist data for dates that don't already exist
-        # Check all dates at once for efficiency
-        all_dates = [perf.date for perf in performance]
-        start_date = min(all_dates)
-        end_date = max(all_dates)
-        existing_performance = await self.repository.get_persisted_index_performance(start_date, end_date)
-        existing_dates = set(perf.date for perf in existing_performance)
-        
-        new_performance = [perf for perf in performance if perf.date not in existing_dates]
-        
-        if new_performance:
-            await self.repository.insert_index_performance(new_performance)
\ No newline at end of file
+        """Upsert index performance keyed by date"""
+        if performance:
+            await self.repository.insert_index_performance(performance)
\ No newline at end of file
@@ -0,0 +1,95 @@
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+import numpy as np
+from src.repositories.index_variant_repository import IndexVariantRepository
+from src.dtos.index_definition import IndexDefinition, IndexVariantBuildResult
+from src.dtos.index_result import IndexComposition, IndexPerformance
+from src.services import weight_drift
+from src.constants import PRIMARY_INDEX_ID
+
+logger = logging.getLogger(__name__)
+
+
+class IndexVariantService:
+    def __init__(self, repository: IndexVariantRepository):
+        self.repository = repository
+
+    async def get_data_version(self) -> int:
+        return await self.repository.get_data_version()
+
+    async def get_definitions(self) -> List[IndexDefinition]:
+        return await self.repository.get_definitions()
+
+    async def get_definition(self, index_id: str) -> Optional[IndexDefinition]:
+        return await self.repository.get_definition(index_id)
+
+    async def get_primary_definition(self) -> IndexDefinition:
+        """The primary index's size, weighting and rebalance frequency; the only place they are defined"""
+        definition = await self.repository.get_definition(PRIMARY_INDEX_ID)
+        if definition is None:
+            raise ValueError(f"Index definition not found: {PRIMARY_INDEX_ID}")
+        return definition
+
+    async def create_definition(self, definition: IndexDefinition) -> bool:
+        """Register a new variant; False when the index id is already taken"""
+        return await self.repository.insert_definition(definition)
+
+    async def build_variants(
+        self, start_date: date, end_date: date, index_ids: Optional[List[str]] = None
+    ) -> IndexVariantBuildResult:
+        """Build every requested variant (all of them by default) from one scan of the stored stock data"""
+        if index_ids is None:
+            index_ids = [definition.index_id for definition in await self.repository.get_definitions()]
+        # The primary index has its own tables and is built by BuildIndexManager
+        index_ids = [index_id for index_id in index_ids if index_id != PRIMARY_INDEX_ID]
+        try:
+            rows_written = await self.repository.build_variants(
+                start_date, end_date, index_ids, _drifted_weights
+            ) if index_ids else 0
+            return IndexVariantBuildResult(
+                start_date=start_date,
+                end_date=end_date,
+                index_ids=index_ids,
+                compositions_built=rows_written,
+                success=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to build index variants {index_ids}: {e}")
+            return IndexVariantBuildResult(
+                start_date=start_date,
+                end_date=end_date,
+                index_ids=index_ids,
+                compositions_built=0,
+                success=False,
+                error_message=str(e)
+            )
+
+    async def get_composition(self, index_id: str, target_date: date) -> List[IndexComposition]:
+        return await self.repository.get_composition(index_id, target_date)
+
+    async def get_performance(self, index_id: str, start_date: date, end_date: date) -> List[IndexPerformance]:
+        return await self.repository.get_performance(index_id, start_date, end_date)
+
+
+def _drifted_weights(holdings: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Each holding's start-of-day weight, drifted with returns from its rebalance weight.
+
+    Rows come ordered by index, rebalance date, date and symbol, so each holding
+    period is a contiguous days x members block.
+    """
+    index_ids, rebalance_dates = holdings["index_id"], holdings["rebalance_date"]
+    weights = np.empty(len(index_ids))
+    if not len(index_ids):
+        return weights
+    boundaries = np.flatnonzero(
+        (index_ids[1:] != index_ids[:-1]) | (rebalance_dates[1:] != rebalance_dates[:-1])
+    ) + 1
+    for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(index_ids)]):
+        dates = holdings["date"][start:end]
+        members = int(np.count_nonzero(dates == dates[0]))
+        returns = holdings["return_percent"][start:end].reshape(-1, members) / 100
+        initial_weights = holdings["weight_percent"][start:start + members]
+        weights[start:end] = weight_drift.drifted_weights(initial_weights, returns)[:-1].ravel()
+    return weights
@@ -0,0 +1,47 @@
+from typing import Awaitable, Callable, Optional
+
+
+class JobCancelledError(Exception):
+    pass
+
+
+class JobProgress:
+    """
+    Progress handle passed into long-running manager calls.
+
+    Managers report each phase and every finished date; the owning job
+    persists the counters through ``on_update`` and flips ``cancelled`` when a
+    cancel is requested, which the manager observes at the next date boundary.
+    """
+
+    def __init__(self, on_update: Optional[Callable[["JobProgress"], Awaitable[None]]] = None):
+        self.on_update = on_update
+        self.phase: Optional[str] = None
+        self.dates_total = 0
+        self.dates_done = 0
+        self.rows_written = 0
+        self.cancelled = False
+
+    async def start_phase(self, phase: str, dates_total: int) -> None:
+        self.check_cancelled()
+        self.phase = phase
+        self.dates_total = dates_total
+        self.dates_done = 0
+        await self._notify()
+
+    async def advance(self, dates: int = 1, rows: int = 0) -> None:
+        self.dates_done += dates
+        self.rows_written += rows
+        await self._notify()
+        self.check_cancelled()
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def check_cancelled(self) -> None:
+        if self.cancelled:
+            raise JobCancelledError(f"Job cancelled during {self.phase or 'startup'}")
+
+    async def _notify(self) -> None:
+        if self.on_update:
+            await self.on_update(self)
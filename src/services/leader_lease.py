@@ -0,0 +1,107 @@
+"""
+Redis lease electing the one replica that runs scheduled work.
+
+The lease is a key holding ``<node id>:<fencing token>`` with a TTL. A node
+takes it with ``SET NX PX`` after drawing a token from an ``INCR`` counter,
+so every grant carries a token larger than any before it. The holder renews
+the TTL, and gives the lease up on shutdown. Renewal and release are
+compare-and-set through ``WATCH``/``MULTI``/``EXEC``, so they never touch a
+lease another node has since taken. If the holder stops renewing (crash,
+partition or a long pause), the key expires and the next node to try takes
+over with a new token.
+
+A node that paused past its TTL may still believe it leads. Before queuing
+work the holder confirms with ``is_current`` that its grant is still the one
+in Redis. That check can pass just before the lease moves, so the token also
+travels with the scheduled job into its database writes, which reject a
+token older than one already written (``src/repositories/staging.py``).
+"""
+import logging
+import os
+import socket
+import uuid
+from typing import Optional
+from src.services.redis_service import RedisService
+from src.constants import SCHEDULER_LEASE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLease:
+    def __init__(
+        self,
+        redis_service: RedisService,
+        name: str = "scheduler",
+        ttl_seconds: float = SCHEDULER_LEASE_TTL_SECONDS,
+        node_id: Optional[str] = None
+    ):
+        self.redis_service = redis_service
+        self.key = f"lease:{name}"
+        self.token_key = f"lease:{name}:fencing_token"
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Token of the grant this node holds, None while it does not lead
+        self.fencing_token: Optional[int] = None
+
+    @property
+    def _value(self) -> str:
+        return f"{self.node_id}:{self.fencing_token}"
+
+    async def acquire_or_renew(self) -> bool:
+        """Renew the lease if held, otherwise try to take it; returns whether this node now leads"""
+        try:
+            if self.fencing_token is not None:
+                if self._compare_and_set(lambda pipeline: pipeline.pexpire(self.key, self.ttl_ms)):
+                    return True
+                logger.warning(f"Lost lease {self.key} with fencing token {self.fencing_token}")
+                self.fencing_token = None
+
+            client = self.redis_service.client
+            if client.exists(self.key):
+                return False
+            token = client.incr(self.token_key)
+            if client.set(self.key, f"{self.node_id}:{token}", nx=True, px=self.ttl_ms):
+                self.fencing_token = token
+                logger.info(f"Acquired lease {self.key} with fencing token {token}")
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"Lease {self.key} unavailable: {e}")
+            self.fencing_token = None
+            return False
+
+    async def is_current(self) -> bool:
+        """Whether this node's grant is still the one in Redis"""
+        if self.fencing_token is None:
+            return False
+        try:
+            value = self.redis_service.client.get(self.key)
+        except Exception:
+            return False
+        return value is not None and value.decode() == self._value
+
+    async def release(self) -> None:
+        if self.fencing_token is None:
+            return
+        try:
+            self._compare_and_set(lambda pipeline: pipeline.delete(self.key))
+        except Exception as e:
+            logger.error(f"Failed to release lease {self.key}: {e}")
+        self.fencing_token = None
+
+    def _compare_and_set(self, command) -> bool:
+        """Queue ``command`` in a transaction that only commits while the key still holds this node's grant"""
+        import redis
+
+        with self.redis_service.client.pipeline() as pipeline:
+            try:
+                pipeline.watch(self.key)
+                value = pipeline.get(self.key)
+                if value is None or value.decode() != self._value:
+                    return False
+                pipeline.multi()
+                command(pipeline)
+                pipeline.execute()
+                return True
+            except redis.WatchError:
+                return False
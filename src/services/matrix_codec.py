@@ -0,0 +1,35 @@
+"""
+Arrow IPC encoding for square symbol x symbol matrices.
+
+The payload is one record batch: a ``symbol`` column naming the rows followed by
+one float32 column per symbol, so ``pyarrow.ipc.open_stream(payload).read_pandas()``
+gives the labelled matrix directly. Descriptive fields travel as schema metadata.
+"""
+from typing import Dict, List
+import numpy as np
+
+
+def encode_matrix(symbols: List[str], matrix: np.ndarray, metadata: Dict[str, str]) -> bytes:
+    import pyarrow as pa
+
+    values = np.asarray(matrix, dtype=np.float32)
+    arrays = [pa.array(symbols, type=pa.string())] + [pa.array(values[:, column]) for column in range(len(symbols))]
+    schema = pa.schema(
+        [pa.field("symbol", pa.string())] + [pa.field(symbol, pa.float32()) for symbol in symbols],
+        metadata={key: str(value) for key, value in metadata.items()}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+    return sink.getvalue().to_pybytes()
+
+
+def decode_matrix(payload: bytes):
+    """Inverse of ``encode_matrix``: ``(symbols, matrix, metadata)``"""
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(payload).read_all()
+    symbols = table.column("symbol").to_pylist()
+    matrix = np.column_stack([table.column(symbol).to_numpy() for symbol in symbols]) if symbols else np.empty((0, 0))
+    metadata = {key.decode(): value.decode() for key, value in (table.schema.metadata or {}).items()}
+    return symbols, matrix, metadata
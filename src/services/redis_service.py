@@ -1,25 +1,28 @@
-import json
-import redis
 import os
-from typing import Optional, Any
+from typing import Optional, Any, Dict, List
 from datetime import date
+from src.services.cache_codec import CacheCodec, create_cache_codec
 
 class RedisService:
-    def __init__(self):
+    def __init__(self, codec: Optional[CacheCodec] = None):
         self.redis_host = os.getenv("REDIS_HOST", "localhost")
         self.redis_port = int(os.getenv("REDIS_PORT", "6379"))
         self.redis_db = int(os.getenv("REDIS_DB", "0"))
         self.default_ttl = 3600
+        self.codec = codec or create_cache_codec(
+            os.getenv("CACHE_CODEC", "columnar"),
+            os.getenv("CACHE_COMPRESSION", "none")
+        )
         self._client = None
 
     @property
     def client(self):
         if self._client is None:
+            import redis
             self._client = redis.Redis(
                 host=self.redis_host,
                 port=self.redis_port,
-                db=self.redis_db,
-                decode_responses=True
+                db=self.redis_db
             )
         return self._client
 
@@ -34,38 +37,97 @@ class RedisService:
     async def get(self, key: str) -> Optional[Any]:
         try:
             data = self.client.get(key)
-            return json.loads(data) if data else None
+            return self.codec.decode(data) if data else None
         except Exception:
             return None
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         try:
             ttl = ttl or self.default_ttl
-            serialized = json.dumps(value, default=str)
+            serialized = self.codec.encode(value)
             return self.client.setex(key, ttl, serialized)
         except Exception:
             return False
 
-    async def get_index_performance(self, start_date: date, end_date: date) -> Optional[Any]:
-        key = self._make_key("index_performance", start_date=start_date, end_date=end_date)
+    # Index entries are keyed by data version like the analytics ones, so a reload never serves a stale body
+    async def get_index_performance(self, data_version: int, start_date: date, end_date: date) -> Optional[Any]:
+        key = self._make_key("index_performance", data_version=data_version, start_date=start_date, end_date=end_date)
         return await self.get(key)
 
-    async def set_index_performance(self, start_date: date, end_date: date, data: Any) -> bool:
-        key = self._make_key("index_performance", start_date=start_date, end_date=end_date)
+    async def set_index_performance(self, data_version: int, start_date: date, end_date: date, data: Any) -> bool:
+        key = self._make_key("index_performance", data_version=data_version, start_date=start_date, end_date=end_date)
         return await self.set(key, data)
 
-    async def get_index_composition(self, target_date: date) -> Optional[Any]:
-        key = self._make_key("index_composition", date=target_date)
+    async def get_index_composition(self, data_version: int, target_date: date) -> Optional[Any]:
+        key = self._make_key("index_composition", data_version=data_version, date=target_date)
         return await self.get(key)
 
-    async def set_index_composition(self, target_date: date, data: Any) -> bool:
-        key = self._make_key("index_composition", date=target_date)
+    async def set_index_composition(self, data_version: int, target_date: date, data: Any) -> bool:
+        key = self._make_key("index_composition", data_version=data_version, date=target_date)
         return await self.set(key, data)
 
-    async def get_composition_changes(self, start_date: date, end_date: date) -> Optional[Any]:
-        key = self._make_key("composition_changes", start_date=start_date, end_date=end_date)
+    async def get_index_compositions(self, data_version: int, target_dates: List[date]) -> Dict[date, Any]:
+        """Fetch cached compositions for many dates in one MGET round trip"""
+        if not target_dates:
+            return {}
+        try:
+            keys = [
+                self._make_key("index_composition", data_version=data_version, date=target_date)
+                for target_date in target_dates
+            ]
+            payloads = self.client.mget(keys)
+            return {
+                target_date: self.codec.decode(payload)
+                for target_date, payload in zip(target_dates, payloads)
+                if payload
+            }
+        except Exception:
+            return {}
+
+    async def set_index_compositions(
+        self, data_version: int, data_by_date: Dict[date, Any], ttl: Optional[int] = None
+    ) -> bool:
+        """Cache compositions for many dates in one pipelined round trip"""
+        if not data_by_date:
+            return True
+        try:
+            ttl = ttl or self.default_ttl
+            pipeline = self.client.pipeline(transaction=False)
+            for target_date, data in data_by_date.items():
+                key = self._make_key("index_composition", data_version=data_version, date=target_date)
+                pipeline.setex(key, ttl, self.codec.encode(data))
+            return all(pipeline.execute())
+        except Exception:
+            return False
+
+    async def get_composition_changes(self, data_version: int, start_date: date, end_date: date) -> Optional[Any]:
+        key = self._make_key("composition_changes", data_version=data_version, start_date=start_date, end_date=end_date)
+        return await self.get(key)
+
+    async def set_composition_changes(self, data_version: int, start_date: date, end_date: date, data: Any) -> bool:
+        key = self._make_key("composition_changes", data_version=data_version, start_date=start_date, end_date=end_date)
+        return await self.set(key, data)
+
+    async def get_analytics(self, kind: str, data_version: int, **params) -> Optional[Any]:
+        key = self._make_key(f"analytics:{kind}", data_version=data_version, **params)
         return await self.get(key)
 
-    async def set_composition_changes(self, start_date: date, end_date: date, data: Any) -> bool:
-        key = self._make_key("composition_changes", start_date=start_date, end_date=end_date)
+    async def set_analytics(self, kind: str, data_version: int, data: Any, **params) -> bool:
+        # Keyed by data version, so entries never go stale; the TTL only bounds memory
+        key = self._make_key(f"analytics:{kind}", data_version=data_version, **params)
         return await self.set(key, data)
+
+    async def get_analytics_payload(self, kind: str, data_version: int, **params) -> Optional[bytes]:
+        """Cached analytics already in their wire format, stored as-is without the codec"""
+        try:
+            key = self._make_key(f"analytics:{kind}", data_version=data_version, **params)
+            return self.client.get(key)
+        except Exception:
+            return None
+
+    async def set_analytics_payload(self, kind: str, data_version: int, payload: bytes, **params) -> bool:
+        try:
+            key = self._make_key(f"analytics:{kind}", data_version=data_version, **params)
+            return self.client.setex(key, self.default_ttl, payload)
+        except Exception:
+            return False
@@ -0,0 +1,140 @@
+"""
+Vectorized risk statistics over daily return series.
+
+Every rolling statistic costs O(n) regardless of the window's length: sums
+come from prefix sums, and drawdowns from a sliding-window aggregate that
+touches each point a constant number of times. Returns are fractional (0.01 == 1%) and
+NaN marks a missing observation; windows only use the observations they have.
+"""
+from typing import Tuple
+import numpy as np
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sum over ``window`` points; NaN entries count as zero"""
+    cumulative = np.concatenate(([0.0], np.cumsum(np.nan_to_num(values, nan=0.0))))
+    sums = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums[window - 1:] = cumulative[window:] - cumulative[:-window]
+    return sums
+
+
+def rolling_count(values: np.ndarray, window: int) -> np.ndarray:
+    return rolling_sum((~np.isnan(values)).astype(float), window)
+
+
+def rolling_volatility(returns: np.ndarray, window: int, periods_per_year: int) -> np.ndarray:
+    """Annualized sample standard deviation of the trailing window"""
+    count = rolling_count(returns, window)
+    mean = rolling_sum(returns, window) / count
+    sum_squares = rolling_sum(returns * returns, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = (sum_squares - count * mean * mean) / (count - 1)
+    variance = np.where(count > 1, np.maximum(variance, 0.0), np.nan)
+    return np.sqrt(variance * periods_per_year)
+
+
+def rolling_sharpe(returns: np.ndarray, window: int, periods_per_year: int, risk_free_rate: float) -> np.ndarray:
+    """Annualized Sharpe ratio of the trailing window against an annual risk-free rate"""
+    excess = returns - risk_free_rate / periods_per_year
+    count = rolling_count(excess, window)
+    mean = rolling_sum(excess, window) / count
+    volatility = rolling_volatility(excess, window, periods_per_year)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = mean * periods_per_year / volatility
+    return np.where(volatility > 0, sharpe, np.nan)
+
+
+def rolling_beta(returns: np.ndarray, benchmark_returns: np.ndarray, window: int) -> np.ndarray:
+    """Trailing beta of ``returns`` on ``benchmark_returns`` over pairwise-complete observations"""
+    valid = ~(np.isnan(returns) | np.isnan(benchmark_returns))
+    x = np.where(valid, returns, np.nan)
+    y = np.where(valid, benchmark_returns, np.nan)
+    count = rolling_count(x, window)
+    sum_x = rolling_sum(x, window)
+    sum_y = rolling_sum(y, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = rolling_sum(x * y, window) - sum_x * sum_y / count
+        variance = rolling_sum(y * y, window) - sum_y * sum_y / count
+        beta = covariance / variance
+    return np.where((count > 1) & (variance > 0), beta, np.nan)
+
+
+def rolling_max_drawdown(values: np.ndarray, window: int) -> np.ndarray:
+    """Worst peak-to-trough decline inside each trailing window of index values"""
+    drawdowns = np.full(len(values), np.nan)
+    if len(values) < window:
+        return drawdowns
+    # A queue of two stacks holding (peak, trough, drawdown) summaries. Summaries of
+    # consecutive runs combine associatively, so each stack keeps the summary of its
+    # points so far and every point is pushed, moved and popped once: O(n) in total.
+    # ``oldest`` holds the summary from each of its points through its newest point;
+    # ``newest`` the summary of the points pushed since it was last emptied.
+    oldest, newest, newest_values = [], None, []
+    for position, value in enumerate(values.tolist()):
+        point = (value, value, 0.0)
+        newest = point if newest is None else _combine_drawdowns(newest, point)
+        newest_values.append(value)
+        if position >= window:
+            if not oldest:
+                for moved in reversed(newest_values):
+                    point = (moved, moved, 0.0)
+                    oldest.append(_combine_drawdowns(point, oldest[-1]) if oldest else point)
+                newest, newest_values = None, []
+            oldest.pop()
+        if position >= window - 1:
+            if not oldest:
+                summary = newest
+            else:
+                summary = oldest[-1] if newest is None else _combine_drawdowns(oldest[-1], newest)
+            drawdowns[position] = summary[2]
+    return drawdowns
+
+
+def _combine_drawdowns(earlier: Tuple[float, float, float], later: Tuple[float, float, float]) -> Tuple[float, float, float]:
+    """(peak, trough, drawdown) of two consecutive runs from the summaries of each"""
+    return (
+        max(earlier[0], later[0]),
+        min(earlier[1], later[1]),
+        min(earlier[2], later[2], later[1] / earlier[0] - 1.0)
+    )
+
+
+def max_drawdown(values: np.ndarray) -> Tuple[float, int, int]:
+    """Largest peak-to-trough decline and the (peak, trough) positions it spans"""
+    if len(values) == 0:
+        return 0.0, 0, 0
+    peaks = np.maximum.accumulate(values)
+    drawdowns = values / peaks - 1.0
+    trough = int(np.argmin(drawdowns))
+    peak = int(np.argmax(values[:trough + 1]))
+    return float(drawdowns[trough]), peak, trough
+
+
+def beta(returns: np.ndarray, benchmark_returns: np.ndarray) -> float:
+    values = rolling_beta(returns, benchmark_returns, len(returns)) if len(returns) else np.array([np.nan])
+    return float(values[-1])
+
+
+def pairwise_covariance(matrix: np.ndarray, min_periods: int = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sample covariance and correlation of every column pair in a dates x symbols matrix.
+
+    Each pair only uses the dates where both columns are present, like pandas'
+    ``DataFrame.cov``/``corr``; pairs with fewer than ``min_periods`` shared
+    observations are NaN. Returns ``(covariance, correlation, counts)``.
+    """
+    present = (~np.isnan(matrix)).astype(float)
+    values = np.nan_to_num(matrix, nan=0.0)
+    counts = present.T @ present
+    # sums[i, j] is the sum of column i over the dates column j is also present
+    sums = values.T @ present
+    sum_squares = (values * values).T @ present
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = (values.T @ values - sums * sums.T / counts) / (counts - 1)
+        variance = (sum_squares - sums * sums / counts) / (counts - 1)
+        correlation = covariance / np.sqrt(variance * variance.T)
+    valid = counts >= max(min_periods, 2)
+    covariance = np.where(valid, covariance, np.nan)
+    correlation = np.where(valid & (variance > 0) & (variance.T > 0), np.clip(correlation, -1.0, 1.0), np.nan)
+    return covariance, correlation, counts.astype(np.int64)
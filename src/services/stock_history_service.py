@@ -3,7 +3,7 @@ from typing import List, Optional
 from src.services.data_source_service import DataSourceService
 from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
 from src.models.stock_price_history import StockPriceHistory, StockPriceHistoryCreate
-from src.constants import TOP_COMPANIES_COUNT
+from src.constants import MIN_SOURCE_ROW_RATIO
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,14 +14,15 @@ class StockHistoryService:
         self.data_source_service = data_source_service
         self.repository: StockPriceHistoryRepository = repository
     
-    async def fetch_and_store_top_stocks(self, target_date: date) -> int:
+    async def fetch_and_store_top_stocks(self, target_date: date, limit: int) -> int:
+        """Fetch and store the ``limit`` largest stocks for a date, unless the date is already stored"""
         existing_data = await self.repository.get_stocks_by_date(target_date)
         if existing_data:
             return len(existing_data)
         
         stock_data = await self.data_source_service.get_top_stocks_by_market_cap(
             target_date=target_date,
-            limit=TOP_COMPANIES_COUNT
+            limit=limit
         )
         
         if not stock_data:
@@ -42,7 +43,10 @@ class StockHistoryService:
             except Exception:
                 continue
         
-        result = await self.repository.bulk_insert_stock_data(stock_models)
+        # Below what any data source is accepted with, the day is a broken feed and is rejected rather than stored
+        result = await self.repository.bulk_insert_stock_data(
+            stock_models, minimum_rows=int(limit * MIN_SOURCE_ROW_RATIO)
+        )
         return result
     
     async def get_stocks_for_date(self, target_date: date, limit: Optional[int] = None) -> List[StockPriceHistory]:
@@ -51,6 +55,14 @@ class StockHistoryService:
     async def get_available_dates(self) -> List[date]:
         return await self.repository.get_available_dates()
     
+    async def archive_closed_months(self, today: date) -> int:
+        """Move closed months before the hot window to the Parquet archive; returns the rows moved"""
+        return await self.repository.archive_closed_months(today)
+    
+    async def cluster_stock_data(self) -> int:
+        """Restore the physical (date, market cap) order of stored stock data; returns the rows that were out of order"""
+        return await self.repository.cluster_stock_price_history()
+    
     async def get_stocks_count_by_date(self, target_date: date) -> int:
         """Get count of stocks for a specific date"""
         return await self.repository.get_stocks_count_by_date(target_date)
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+NYSE trading calendar.
+
+Holidays and early closes are generated from the exchange's rules (plus its
+one-off closures) for every year in range. They are kept as sorted arrays of
+day numbers next to the sorted array of trading days, so every lookup is a
+binary search. A range of trading days is a slice between two searches, and
+walking over weekends and holidays costs nothing.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Iterable, List
+import numpy as np
+from src.constants import WEEKDAY_TRADING_LIMIT, CALENDAR_FIRST_YEAR, CALENDAR_LAST_YEAR
+
+# Unscheduled full-day closures: national mourning, weather and 11 September 2001
+NYSE_SPECIAL_CLOSURES = [
+    date(2001, 9, 11), date(2001, 9, 12), date(2001, 9, 13), date(2001, 9, 14),
+    date(2004, 6, 11), date(2007, 1, 2), date(2012, 10, 29), date(2012, 10, 30),
+    date(2018, 12, 5), date(2025, 1, 9),
+]
+
+_EPOCH = date(1970, 1, 1)
+_MONDAY, _THURSDAY, _SATURDAY, _SUNDAY = 0, 3, 5, 6
+
+
+def _day_number(value: date) -> int:
+    return (value - _EPOCH).days
+
+
+def _to_date(day_number: int) -> date:
+    return _EPOCH + timedelta(days=int(day_number))
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(holiday: date) -> date:
+    """Saturday holidays close the Friday before, Sunday holidays the Monday after"""
+    if holiday.weekday() == _SATURDAY:
+        return holiday - timedelta(days=1)
+    if holiday.weekday() == _SUNDAY:
+        return holiday + timedelta(days=1)
+    return holiday
+
+
+def _easter(year: int) -> date:
+    # Anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    weekday_offset = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * weekday_offset) // 451
+    month, day = divmod(h + weekday_offset - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nyse_holidays(year: int) -> List[date]:
+    new_year = date(year, 1, 1)
+    holidays = [
+        # A Saturday New Year's Day is not moved back into the previous year
+        new_year if new_year.weekday() != _SUNDAY else new_year + timedelta(days=1),
+        _nth_weekday(year, 2, _MONDAY, 3),
+        _easter(year) - timedelta(days=2),
+        _last_weekday(year, 5, _MONDAY),
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, _MONDAY, 1),
+        _nth_weekday(year, 11, _THURSDAY, 4),
+        _observed(date(year, 12, 25)),
+    ]
+    if year >= 1998:
+        holidays.append(_nth_weekday(year, 1, _MONDAY, 3))
+    if year >= 2022:
+        holidays.append(_observed(date(year, 6, 19)))
+    return sorted(day for day in holidays if day.weekday() < WEEKDAY_TRADING_LIMIT)
+
+
+def nyse_early_closes(year: int) -> List[date]:
+    """1 p.m. closes: the day before Independence Day, the day after Thanksgiving and Christmas Eve"""
+    candidates = [
+        date(year, 7, 3),
+        _nth_weekday(year, 11, _THURSDAY, 4) + timedelta(days=1),
+        date(year, 12, 24),
+    ]
+    holidays = set(nyse_holidays(year))
+    return [day for day in candidates if day.weekday() < WEEKDAY_TRADING_LIMIT and day not in holidays]
+
+
+class TradingCalendar:
+    """Trading days between two years, excluding weekends and the given closures"""
+
+    def __init__(self, first_year: int, last_year: int, holidays: Iterable[date], early_closes: Iterable[date] = ()):
+        self.first_day = date(first_year, 1, 1)
+        self.last_day = date(last_year, 12, 31)
+        days = np.arange(_day_number(self.first_day), _day_number(self.last_day) + 1, dtype=np.int64)
+        # 1970-01-01 was a Thursday, so (day + 3) % 7 is the weekday with Monday as 0
+        weekdays = days[(days + 3) % 7 < WEEKDAY_TRADING_LIMIT]
+        self.holidays = np.unique(np.array([_day_number(day) for day in holidays], dtype=np.int64))
+        self.early_closes = np.unique(np.array([_day_number(day) for day in early_closes], dtype=np.int64))
+        self.trading_days_array = np.setdiff1d(weekdays, self.holidays, assume_unique=True)
+
+    def is_trading_day(self, value: date) -> bool:
+        day = self._check(value)
+        position = np.searchsorted(self.trading_days_array, day)
+        return position < len(self.trading_days_array) and self.trading_days_array[position] == day
+
+    def is_holiday(self, value: date) -> bool:
+        day = self._check(value)
+        position = np.searchsorted(self.holidays, day)
+        return position < len(self.holidays) and self.holidays[position] == day
+
+    def is_early_close(self, value: date) -> bool:
+        day = self._check(value)
+        position = np.searchsorted(self.early_closes, day)
+        return position < len(self.early_closes) and self.early_closes[position] == day
+
+    def next_trading_day(self, value: date) -> date:
+        """First trading day strictly after ``value``"""
+        position = np.searchsorted(self.trading_days_array, self._check(value), side="right")
+        if position >= len(self.trading_days_array):
+            raise ValueError(f"No trading day after {value} in the calendar")
+        return _to_date(self.trading_days_array[position])
+
+    def previous_trading_day(self, value: date) -> date:
+        """Last trading day strictly before ``value``"""
+        position = np.searchsorted(self.trading_days_array, self._check(value), side="left")
+        if position == 0:
+            raise ValueError(f"No trading day before {value} in the calendar")
+        return _to_date(self.trading_days_array[position - 1])
+
+    def trading_days(self, start_date: date, end_date: date) -> List[date]:
+        """Every trading day in [start_date, end_date], in order"""
+        if end_date < start_date:
+            return []
+        first = np.searchsorted(self.trading_days_array, self._check(start_date), side="left")
+        last = np.searchsorted(self.trading_days_array, self._check(end_date), side="right")
+        return [_to_date(day) for day in self.trading_days_array[first:last]]
+
+    def count_trading_days(self, start_date: date, end_date: date) -> int:
+        if end_date < start_date:
+            return 0
+        first = np.searchsorted(self.trading_days_array, self._check(start_date), side="left")
+        last = np.searchsorted(self.trading_days_array, self._check(end_date), side="right")
+        return int(last - first)
+
+    def _check(self, value: date) -> int:
+        if not self.first_day <= value <= self.last_day:
+            raise ValueError(f"{value} is outside the trading calendar ({self.first_day} to {self.last_day})")
+        return _day_number(value)
+
+
+@lru_cache(maxsize=1)
+def nyse_calendar() -> TradingCalendar:
+    years = range(CALENDAR_FIRST_YEAR, CALENDAR_LAST_YEAR + 1)
+    return TradingCalendar(
+        CALENDAR_FIRST_YEAR,
+        CALENDAR_LAST_YEAR,
+        [day for year in years for day in nyse_holidays(year)] + NYSE_SPECIAL_CLOSURES,
+        [day for year in years for day in nyse_early_closes(year)]
+    )
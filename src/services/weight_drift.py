@@ -0,0 +1,54 @@
+"""
+Constituent weights that drift with returns between rebalances.
+
+A holding period starts from a set of weights and a days x constituents matrix
+of the returns earned on each day (fractional; 0.01 == 1%). Every day's weights
+are the starting weights grown by the cumulative product of the returns before
+that day, renormalized to the starting total. The whole period is therefore
+computed with one cumulative product rather than a loop over days.
+"""
+from datetime import date
+import numpy as np
+
+REBALANCE_FREQUENCIES = ("daily", "weekly", "monthly")
+
+
+def drifted_weights(initial_weights: np.ndarray, returns: np.ndarray) -> np.ndarray:
+    """
+    Weights at the start of each day of a holding period, plus the weights at its close.
+
+    Row ``t`` holds the weights that earn ``returns[t]``; the extra last row holds
+    the weights after the final day, which the next period starts from.
+    """
+    initial_weights = np.asarray(initial_weights, dtype=float)
+    returns = np.asarray(returns, dtype=float)
+    grown = np.empty((len(returns) + 1, len(initial_weights)))
+    grown[0] = 1.0
+    np.cumprod(1.0 + returns, axis=0, out=grown[1:])
+    grown *= initial_weights
+    totals = grown.sum(axis=1, keepdims=True)
+    return np.divide(grown * initial_weights.sum(), totals, out=np.zeros_like(grown), where=totals > 0)
+
+
+def portfolio_returns(weights: np.ndarray, returns: np.ndarray) -> np.ndarray:
+    """Each day's return of a portfolio holding the given start-of-day weights"""
+    totals = weights.sum(axis=1)
+    return np.divide(np.einsum("ij,ij->i", weights, returns), totals, out=np.zeros(len(totals)), where=totals > 0)
+
+
+def rebalance_period(dates: np.ndarray, frequency: str) -> np.ndarray:
+    """Key of each date's rebalance period; a rebalance falls wherever the key changes"""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    if frequency == "daily":
+        return days.astype(np.int64)
+    if frequency == "weekly":
+        # 1970-01-01 was a Thursday; shifting by three days makes weeks start on Monday
+        return (days.astype(np.int64) + 3) // 7
+    if frequency == "monthly":
+        return days.astype("datetime64[M]").astype(np.int64)
+    raise ValueError(f"Unknown rebalance frequency: {frequency}")
+
+
+def same_period(first: date, second: date, frequency: str) -> bool:
+    periods = rebalance_period(np.array([first, second], dtype="datetime64[D]"), frequency)
+    return bool(periods[0] == periods[1])
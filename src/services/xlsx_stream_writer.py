@@ -0,0 +1,220 @@
+import math
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator, List
+from xml.sax.saxutils import escape
+
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_SHEET_NAME_LENGTH = 31
+EXCEL_EPOCH_ORDINAL = date(1899, 12, 30).toordinal()
+
+DATE_STYLE_ID = 1
+
+_INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_INVALID_SHEET_NAME_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_SHEET_OPEN = (
+    _XML_HEADER
+    + '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_CLOSE = "</sheetData></worksheet>"
+
+_CONTENT_TYPES = (
+    _XML_HEADER
+    + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "{sheets}</Types>"
+)
+_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_ROOT_RELS = (
+    _XML_HEADER
+    + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    _XML_HEADER
+    + '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    "<sheets>{sheets}</sheets></workbook>"
+)
+_WORKBOOK_SHEET = '<sheet name="{name}" sheetId="{index}" r:id="rId{index}"/>'
+_WORKBOOK_RELS = (
+    _XML_HEADER
+    + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    "{sheets}"
+    '<Relationship Id="rId{styles_id}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/></Relationships>'
+)
+_WORKBOOK_SHEET_REL = (
+    '<Relationship Id="rId{index}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{index}.xml"/>'
+)
+_STYLES = (
+    _XML_HEADER
+    + '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+
+
+class ExcelSheet:
+    def __init__(self, title: str, headers: List[str], stream):
+        self.title = title
+        self.headers = headers
+        self.stream = stream
+
+
+class _ChunkSink:
+    """Write-only file object that buffers zip output until it is drained"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class XlsxStreamWriter:
+    """
+    Streaming xlsx writer.
+
+    Rows are rendered straight to SpreadsheetML and deflated into a zip
+    written to a non-seekable sink, so only the current chunk of rows and
+    the compressor state are held in memory. Strings are written inline
+    (no shared-string table) and sheets that exceed Excel's row limit
+    continue on a numbered sheet.
+    """
+
+    def __init__(self, compress_level: int = 1):
+        self.compress_level = compress_level
+
+    def iter_workbook(self, sheets: List[ExcelSheet]) -> Iterator[bytes]:
+        sink = _ChunkSink()
+        sheet_names: List[str] = []
+
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=self.compress_level) as archive:
+            for sheet in sheets:
+                for _ in self._write_sheet(archive, sheet, sheet_names):
+                    data = sink.drain()
+                    if data:
+                        yield data
+            self._write_package_parts(archive, sheet_names)
+
+        yield sink.drain()
+
+    def _write_sheet(self, archive: zipfile.ZipFile, sheet: ExcelSheet, sheet_names: List[str]) -> Iterator[None]:
+        part = 1
+        worksheet = self._open_worksheet(archive, sheet, part, sheet_names)
+        row_number = 1
+
+        try:
+            for chunk in sheet.stream.iter_chunks():
+                rendered = []
+                for row in chunk:
+                    if row_number >= EXCEL_MAX_ROWS:
+                        worksheet.write("".join(rendered).encode("utf-8"))
+                        rendered = []
+                        self._close_worksheet(worksheet)
+                        part += 1
+                        worksheet = self._open_worksheet(archive, sheet, part, sheet_names)
+                        row_number = 1
+                    row_number += 1
+                    rendered.append(self._render_row(row_number, row))
+                worksheet.write("".join(rendered).encode("utf-8"))
+                yield
+        finally:
+            self._close_worksheet(worksheet)
+
+    def _open_worksheet(self, archive: zipfile.ZipFile, sheet: ExcelSheet, part: int, sheet_names: List[str]):
+        title = sheet.title if part == 1 else f"{sheet.title} ({part})"
+        sheet_names.append(self._sheet_name(title, sheet_names))
+        worksheet = archive.open(f"xl/worksheets/sheet{len(sheet_names)}.xml", "w")
+        worksheet.write((_SHEET_OPEN + self._render_row(1, sheet.headers)).encode("utf-8"))
+        return worksheet
+
+    def _close_worksheet(self, worksheet):
+        if not worksheet.closed:
+            worksheet.write(_SHEET_CLOSE.encode("utf-8"))
+            worksheet.close()
+
+    def _write_package_parts(self, archive: zipfile.ZipFile, sheet_names: List[str]):
+        indexes = range(1, len(sheet_names) + 1)
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES.format(
+            sheets="".join(_SHEET_CONTENT_TYPE.format(index=index) for index in indexes)
+        ))
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK.format(sheets="".join(
+            _WORKBOOK_SHEET.format(name=escape(name, {'"': "&quot;"}), index=index)
+            for index, name in zip(indexes, sheet_names)
+        )))
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS.format(
+            sheets="".join(_WORKBOOK_SHEET_REL.format(index=index) for index in indexes),
+            styles_id=len(sheet_names) + 1
+        ))
+        archive.writestr("xl/styles.xml", _STYLES)
+
+    def _sheet_name(self, title: str, existing: List[str]) -> str:
+        name = _INVALID_SHEET_NAME_CHARS.sub("_", title)[:EXCEL_MAX_SHEET_NAME_LENGTH]
+        suffix = 2
+        base = name
+        while name in existing:
+            tag = f" ({suffix})"
+            name = base[:EXCEL_MAX_SHEET_NAME_LENGTH - len(tag)] + tag
+            suffix += 1
+        return name
+
+    def _render_row(self, row_number: int, values) -> str:
+        return f'<row r="{row_number}">' + "".join(self._render_cell(value) for value in values) + "</row>"
+
+    def _render_cell(self, value) -> str:
+        if value is None:
+            return "<c/>"
+        if isinstance(value, bool):
+            return f'<c t="b"><v>{int(value)}</v></c>'
+        if isinstance(value, Decimal):
+            value = float(value)
+        if isinstance(value, (int, float)):
+            if isinstance(value, float) and not math.isfinite(value):
+                return "<c/>"
+            return f"<c><v>{value!r}</v></c>"
+        if isinstance(value, datetime):
+            return f'<c s="{DATE_STYLE_ID}"><v>{self._excel_serial(value)}</v></c>'
+        if isinstance(value, date):
+            return f'<c s="{DATE_STYLE_ID}"><v>{value.toordinal() - EXCEL_EPOCH_ORDINAL}</v></c>'
+        text = _INVALID_XML_CHARS.sub("", str(value))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+    def _excel_serial(self, value: datetime) -> float:
+        seconds = value.hour * 3600 + value.minute * 60 + value.second
+        return value.toordinal() - EXCEL_EPOCH_ORDINAL + seconds / 86400
@@ -9,9 +9,12 @@ from src.managers.index_manager import IndexManager
 from src.managers.build_index_manager import BuildIndexManager
 from src.services.redis_service import RedisService
 from src.services.index_service import IndexService
+from src.services.index_variant_service import IndexVariantService
 from src.repositories.base_repository import BaseRepository
 from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
 from src.dtos.index_result import IndexComposition, IndexPerformance, IndexBuildResult
+from src.dtos.index_definition import IndexDefinition
+from migrations.migration_runner import MigrationRunner
 
 
 @pytest.fixture(scope="session")
@@ -54,6 +57,17 @@ def test_stock_repository(test_base_repository):
 
 
 
+@pytest.fixture
+def migrated_stock_repository(tmp_path):
+    """Create a StockPriceHistoryRepository on a fresh, fully migrated database"""
+    db_path = str(tmp_path / "migrated_hedgineer.db")
+    asyncio.run(MigrationRunner(db_path=db_path).run_migrations())
+    
+    base_repo = BaseRepository(db_path=db_path)
+    yield StockPriceHistoryRepository(base_repo)
+    base_repo.close()
+
+
 @pytest.fixture
 def mock_redis_service():
     return Mock(spec=RedisService)
@@ -70,6 +84,15 @@ def mock_index_service():
     return mock
 
 
+@pytest.fixture
+def mock_index_variant_service():
+    mock = Mock(spec=IndexVariantService)
+    mock.get_primary_definition = AsyncMock(
+        return_value=IndexDefinition(index_id="primary", name="Top 130 Equal Weight", top_n=130)
+    )
+    return mock
+
+
 @pytest.fixture
 def mock_build_index_manager():
     return Mock(spec=BuildIndexManager)
@@ -87,7 +110,7 @@ def sample_index_composition():
             date=date(2025, 9, 10),
             symbol="AAPL",
             company_name="Apple Inc.",
-            weight_percent=1.0,
+            weight_percent=50.0,
             market_cap=2580000000000.0,
             price=173.32,
             return_percent=-1.52
@@ -96,7 +119,7 @@ def sample_index_composition():
             date=date(2025, 9, 10),
             symbol="MSFT",
             company_name="Microsoft Corporation",
-            weight_percent=1.0,
+            weight_percent=50.0,
             market_cap=2450000000000.0,
             price=329.15,
             return_percent=0.87
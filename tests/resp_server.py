@@ -0,0 +1,163 @@
+"""
+In-process stand-in for a Redis server, for tests that need several processes
+sharing one Redis over TCP.
+
+Speaks RESP2 and implements only what the lease and cache code use: strings
+with expiry (GET, SET with NX/XX/PX/EX, SETEX, INCR/INCRBY, DEL, EXISTS, PEXPIRE,
+PTTL, MGET) and optimistic transactions (WATCH, UNWATCH, MULTI, EXEC,
+DISCARD). Commands run one at a time under a lock, as on a real server.
+"""
+import socketserver
+import threading
+import time
+
+
+class RespServer:
+    def __init__(self):
+        self.values = {}
+        self.expires_at = {}
+        # Bumped on every change to a key, so EXEC can tell whether a watched key moved
+        self.versions = {}
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                session = {"watched": {}, "queued": None}
+                while True:
+                    command = _read_command(self.rfile)
+                    if command is None:
+                        return
+                    self.wfile.write(server.execute(session, command))
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+    def start(self) -> "RespServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def execute(self, session: dict, command: list) -> bytes:
+        name = command[0].decode().upper()
+        with self.lock:
+            if session["queued"] is not None and name not in ("EXEC", "DISCARD", "MULTI", "WATCH"):
+                session["queued"].append(command)
+                return b"+QUEUED\r\n"
+            if name == "MULTI":
+                session["queued"] = []
+                return b"+OK\r\n"
+            if name == "DISCARD":
+                session["queued"], session["watched"] = None, {}
+                return b"+OK\r\n"
+            if name == "WATCH":
+                for key in command[1:]:
+                    self._expire(key)
+                    session["watched"][key] = self.versions.get(key, 0)
+                return b"+OK\r\n"
+            if name == "UNWATCH":
+                session["watched"] = {}
+                return b"+OK\r\n"
+            if name == "EXEC":
+                queued, watched = session["queued"], session["watched"]
+                session["queued"], session["watched"] = None, {}
+                for key in watched:
+                    self._expire(key)
+                if any(self.versions.get(key, 0) != version for key, version in watched.items()):
+                    return b"*-1\r\n"
+                replies = [self._run(queued_command) for queued_command in queued]
+                return b"*%d\r\n" % len(replies) + b"".join(replies)
+            return self._run(command)
+
+    def _run(self, command: list) -> bytes:
+        name, args = command[0].decode().upper(), command[1:]
+        for key in args[:1]:
+            self._expire(key)
+        if name in ("PING",):
+            return b"+PONG\r\n"
+        if name in ("CLIENT", "SELECT"):
+            return b"+OK\r\n"
+        if name == "GET":
+            return _bulk(self.values.get(args[0]))
+        if name == "MGET":
+            for key in args:
+                self._expire(key)
+            return b"*%d\r\n" % len(args) + b"".join(_bulk(self.values.get(key)) for key in args)
+        if name == "EXISTS":
+            for key in args:
+                self._expire(key)
+            return b":%d\r\n" % sum(1 for key in args if key in self.values)
+        if name in ("SET", "SETEX"):
+            if name == "SETEX":
+                key, value, options = args[0], args[2], [b"EX", args[1]]
+            else:
+                key, value, options = args[0], args[1], args[2:]
+            options = [option.upper() if option.isalpha() else option for option in options]
+            if (b"NX" in options and key in self.values) or (b"XX" in options and key not in self.values):
+                return b"$-1\r\n"
+            self._write(key, value)
+            self.expires_at.pop(key, None)
+            for unit, scale in ((b"PX", 0.001), (b"EX", 1.0)):
+                if unit in options:
+                    self.expires_at[key] = time.monotonic() + int(options[options.index(unit) + 1]) * scale
+            return b"+OK\r\n"
+        if name in ("INCR", "INCRBY"):
+            value = int(self.values.get(args[0], b"0")) + (int(args[1]) if name == "INCRBY" else 1)
+            self._write(args[0], str(value).encode())
+            return b":%d\r\n" % value
+        if name == "DEL":
+            deleted = 0
+            for key in args:
+                self._expire(key)
+                if key in self.values:
+                    self._delete(key)
+                    deleted += 1
+            return b":%d\r\n" % deleted
+        if name == "PEXPIRE":
+            if args[0] not in self.values:
+                return b":0\r\n"
+            self.expires_at[args[0]] = time.monotonic() + int(args[1]) / 1000
+            self.versions[args[0]] = self.versions.get(args[0], 0) + 1
+            return b":1\r\n"
+        if name == "PTTL":
+            if args[0] not in self.values:
+                return b":-2\r\n"
+            if args[0] not in self.expires_at:
+                return b":-1\r\n"
+            return b":%d\r\n" % int((self.expires_at[args[0]] - time.monotonic()) * 1000)
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+    def _write(self, key: bytes, value: bytes) -> None:
+        self.values[key] = value
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _delete(self, key: bytes) -> None:
+        self.values.pop(key, None)
+        self.expires_at.pop(key, None)
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _expire(self, key: bytes) -> None:
+        if key in self.expires_at and self.expires_at[key] <= time.monotonic():
+            self._delete(key)
+
+
+def _bulk(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _read_command(stream):
+    line = stream.readline()
+    if not line:
+        return None
+    count = int(line[1:])
+    command = []
+    for _ in range(count):
+        length = int(stream.readline()[1:])
+        command.append(stream.read(length + 2)[:-2])
+    return command
@@ -0,0 +1,106 @@
+import asyncio
+import os
+from datetime import date, timedelta
+import duckdb
+from src.dtos.index_result import IndexComposition
+from src.models.stock_price_history import StockPriceHistoryCreate
+
+TODAY = date(2025, 6, 16)
+SYMBOLS = ["AAA", "BBB", "CCC"]
+
+
+def _weekdays(start_date, end_date):
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    return [day for day in days if day.weekday() < 5]
+
+
+def _load(repository, days, market_cap_scale=1.0):
+    for day in days:
+        asyncio.run(repository.bulk_insert_stock_data([
+            StockPriceHistoryCreate(
+                company_symbol=symbol, company_name=f"{symbol} Inc", last_traded_price=100.0,
+                market_cap=1e9 * (rank + 1) * market_cap_scale, one_day_return=0.5, created_at=day
+            )
+            for rank, symbol in enumerate(SYMBOLS)
+        ]))
+        members = SYMBOLS[:2] if day.month % 2 else SYMBOLS[1:]
+        asyncio.run(repository.insert_index_composition([
+            IndexComposition(
+                date=day, symbol=symbol, company_name=f"{symbol} Inc", weight_percent=50.0,
+                market_cap=1e9, price=100.0, return_percent=0.5
+            )
+            for symbol in members
+        ]))
+
+
+def _reads(repository):
+    return (
+        [stock.model_dump(exclude={"id"}) for stock in asyncio.run(repository.get_stocks_by_date(date(2025, 1, 15)))],
+        asyncio.run(repository.get_persisted_index_compositions([date(2025, 1, 31), date(2025, 4, 1)])),
+        asyncio.run(repository.get_composition_changes(date(2025, 1, 1), date(2025, 5, 31))),
+        asyncio.run(repository.get_available_dates()),
+    )
+
+
+def _count(repository, table):
+    return repository.connection.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0]
+
+
+class TestParquetArchive:
+
+    def test_closed_months_move_to_parquet_and_read_back_unchanged(self, migrated_stock_repository):
+        repository = migrated_stock_repository
+        _load(repository, _weekdays(date(2025, 1, 1), date(2025, 5, 30)))
+        before = _reads(repository)
+        total_rows = _count(repository, "stock_price_history")
+
+        archived_rows = asyncio.run(repository.archive_closed_months(TODAY))
+
+        archive = repository.archive
+        # Three hot months before June keep March onwards in the database
+        assert repository.connection.execute("SELECT MIN(created_at) FROM stock_price_history;").fetchone()[0] == date(2025, 3, 3)
+        assert archived_rows == total_rows - _count(repository, "stock_price_history") + 2 * 43
+        february = os.path.join(archive.archive_path, "stock_price_history", "year=2025", "month=02", "data.parquet")
+        assert os.path.exists(february)
+        assert repository.connection.execute(
+            f"SELECT DISTINCT compression FROM parquet_metadata('{february}');"
+        ).fetchall() == [("ZSTD",)]
+        assert _reads(repository) == before
+        assert _count(repository, "stock_price_history_all") == total_rows
+
+        # Ranges inside the hot window never touch the files; ranges over archived months name only theirs
+        assert archive.sources(date(2025, 3, 3), date(2025, 5, 30)) == {
+            "stock_price_history": "stock_price_history", "index_compositions": "index_compositions"
+        }
+        february_sources = archive.sources(date(2025, 2, 10), date(2025, 2, 10))["stock_price_history"]
+        assert "month=02" in february_sources and "month=01" not in february_sources
+
+        # Another process reads the archive on its own, Hive partitions and all
+        reader = duckdb.connect()
+        rows = reader.execute(f"""
+            SELECT month, COUNT(*), MIN(securities.symbol)
+            FROM read_parquet('{archive.archive_path}/stock_price_history/*/*/*.parquet', hive_partitioning = true) AS stocks
+            JOIN read_parquet('{archive.archive_path}/securities.parquet') AS securities USING (security_id)
+            WHERE year = '2025'
+            GROUP BY month ORDER BY month;
+        """).fetchall()
+        reader.close()
+        assert rows == [("01", 23 * 3, "AAA"), ("02", 20 * 3, "AAA")]
+
+    def test_reloaded_archived_dates_win_and_fold_back_into_their_month(self, migrated_stock_repository):
+        repository = migrated_stock_repository
+        _load(repository, _weekdays(date(2025, 1, 1), date(2025, 1, 31)))
+        asyncio.run(repository.archive_closed_months(TODAY))
+        assert _count(repository, "stock_price_history") == 0
+
+        # A correction to an archived day goes to the hot table and shadows the archived rows
+        _load(repository, [date(2025, 1, 15)], market_cap_scale=2.0)
+        stocks = asyncio.run(repository.get_stocks_by_date(date(2025, 1, 15)))
+        assert [float(stock.market_cap) for stock in stocks] == [6e9, 4e9, 2e9]
+        assert _count(repository, "stock_price_history_all") == 23 * 3
+
+        assert asyncio.run(repository.archive_closed_months(TODAY)) == 3 + 2
+        assert _count(repository, "stock_price_history") == 0
+        stocks = asyncio.run(repository.get_stocks_by_date(date(2025, 1, 15)))
+        assert [float(stock.market_cap) for stock in stocks] == [6e9, 4e9, 2e9]
+        assert _count(repository, "stock_price_history_all") == 23 * 3
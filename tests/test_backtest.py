@@ -0,0 +1,119 @@
+import asyncio
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from src.dtos.backtest_result import BacktestParameters
+from src.models.stock_price_history import StockPriceHistoryCreate
+from src.repositories.backtest_repository import BacktestRepository
+from src.services.backtest_engine import MarketData, parameter_grid, rebalance_mask, run_backtest, run_grid, select_members
+from src.services.backtest_service import BacktestService
+
+
+def _market(caps, returns, start=date(2024, 1, 1)):
+    """Market data from days x symbols caps (NaN for no row) and fractional returns"""
+    caps = np.asarray(caps, dtype=float)
+    ranked = np.where(np.isnan(caps), -np.inf, caps)
+    ranks = np.argsort(np.argsort(-ranked, axis=1, kind="stable"), axis=1) + 1
+    ranks = np.where(np.isnan(caps), 0, ranks)
+    dates = np.datetime64(start) + np.arange(len(caps))
+    symbols = [f"S{position}" for position in range(caps.shape[1])]
+    return MarketData.from_columns(dates, symbols, returns, ranks)
+
+
+def _random_market(days=260, symbols=30, seed=7):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.02, (days, symbols))
+    caps = np.exp(np.cumsum(returns, axis=0)) * np.arange(1, symbols + 1)
+    caps[rng.random(caps.shape) < 0.02] = np.nan
+    returns[np.isnan(caps)] = np.nan
+    return _market(caps, returns)
+
+
+class TestBacktestEngine:
+
+    def test_rebalance_mask_marks_first_trading_day_of_each_period(self):
+        # Friday 29 Dec 2023 through Tuesday 9 Jan 2024, weekdays only
+        dates = np.array(["2023-12-29", "2024-01-02", "2024-01-05", "2024-01-08", "2024-01-09"], dtype="datetime64[D]")
+
+        assert rebalance_mask(dates, "weekly").tolist() == [True, True, False, True, False]
+        assert rebalance_mask(dates, "monthly").tolist() == [True, True, False, False, False]
+        assert rebalance_mask(dates, "daily").all()
+
+    def test_members_are_held_from_the_next_day_and_drift(self):
+        caps = [[3, 2, 1]] * 4
+        returns = [[0.5, 0.5, 0.5], [0.10, -0.10, 0.9], [0.10, 0.20, 0.9], [0.0, 0.0, 0.9]]
+        market = _market(caps, returns, start=date(2024, 1, 30))
+
+        result = run_backtest(market, BacktestParameters(top_n=2, rebalance="monthly"), cost_bps=0)
+
+        # Selected at the close of 30 January and rebalanced to equal weight at the close of 1 February
+        day_one = 0.5 * 0.10 + 0.5 * -0.10
+        drifted = np.array([0.5 * 1.10, 0.5 * 0.90]) / (1 + day_one)
+        day_two = float(drifted @ [0.10, 0.20])
+        at_rebalance = drifted * [1.10, 1.20] / (1 + day_two)
+        assert result.final_index_value == pytest.approx(1000 * (1 + day_one) * (1 + day_two))
+        assert result.rebalance_count == 1
+        assert result.average_turnover_percent == pytest.approx(np.abs(at_rebalance - 0.5).sum() / 2 * 100)
+
+    def test_buffer_keeps_incumbents_and_cap_limits_replacements(self):
+        holdings = np.array([0, 1, 2, 3])
+        # Today's order by market cap: 4, 5, 0, 1, 2, 3
+        ranks = np.array([3, 4, 5, 6, 1, 2], dtype=np.int32)
+        order = np.argsort(ranks).astype(np.int32)
+
+        plain = select_members(ranks, order, 6, holdings, BacktestParameters(top_n=4))
+        buffered = select_members(ranks, order, 6, holdings, BacktestParameters(top_n=4, buffer=1))
+        capped = select_members(ranks, order, 6, holdings, BacktestParameters(top_n=4, turnover_cap_percent=25))
+
+        assert sorted(plain.tolist()) == [0, 1, 4, 5]
+        assert sorted(buffered.tolist()) == [0, 1, 2, 4]
+        assert sorted(capped.tolist()) == [0, 1, 2, 4]
+
+    def test_costs_reduce_returns_by_turnover(self):
+        market = _random_market()
+        parameters = BacktestParameters(top_n=10, rebalance="weekly")
+
+        free = run_backtest(market, parameters, cost_bps=0)
+        costly = run_backtest(market, parameters, cost_bps=25)
+
+        assert costly.annual_turnover_percent == pytest.approx(free.annual_turnover_percent)
+        assert costly.total_cost_percent == pytest.approx(free.average_turnover_percent * 2 * 25 / 10000 * free.rebalance_count)
+        assert costly.final_index_value < free.final_index_value
+
+    def test_process_pool_matches_in_process_results(self):
+        market = _random_market()
+        grid = parameter_grid([5, 10], ["daily", "monthly"], [0, 3], [None, 20])
+
+        pooled = run_grid(market, grid, 10.0, workers=2)
+
+        assert pooled == run_grid(market, grid, 10.0, workers=1)
+        assert [(result.top_n, result.rebalance, result.buffer, result.turnover_cap_percent) for result in pooled] == [
+            (parameters.top_n, parameters.rebalance, parameters.buffer, parameters.turnover_cap_percent) for parameters in grid
+        ]
+
+
+class TestBacktestService:
+
+    def test_run_persists_results(self, migrated_stock_repository):
+        stocks = []
+        for day in range(40):
+            trading_date = date(2024, 1, 1) + timedelta(days=day)
+            for position, symbol in enumerate(["AAA", "BBB", "CCC", "DDD"]):
+                stocks.append(StockPriceHistoryCreate(
+                    company_symbol=symbol, company_name=f"{symbol} Corp", last_traded_price=10.0,
+                    market_cap=(4 - position) * 1e9 * (1 + 0.3 * ((day + position) % 3)),
+                    one_day_return=round(0.1 * position - 0.1 * (day % 4), 4), created_at=trading_date
+                ))
+        asyncio.run(migrated_stock_repository.bulk_insert_stock_data(stocks))
+        service = BacktestService(BacktestRepository(migrated_stock_repository.base_repository))
+        grid = parameter_grid([2, 3], ["daily", "monthly"])
+
+        run = asyncio.run(service.run(date(2024, 1, 1), date(2024, 3, 1), grid, cost_bps=5))
+        stored = asyncio.run(service.get_results(run.run_id))
+
+        assert (run.days_count, run.symbols_count, run.variants_count) == (40, 4, 4)
+        assert run.end_date == date(2024, 2, 9)
+        assert sorted(stored, key=lambda result: (result.top_n, result.rebalance)) == sorted(
+            run.results, key=lambda result: (result.top_n, result.rebalance)
+        )
+        assert asyncio.run(service.run(date(2023, 1, 1), date(2023, 2, 1), grid)) is None
@@ -0,0 +1,77 @@
+import json
+import pytest
+from datetime import date
+from src.services.cache_codec import ColumnarCacheCodec, JsonCacheCodec, CODEC_MAGIC, CODEC_FORMAT_VERSION, create_cache_codec
+from src.dtos.index_result import IndexComposition
+
+
+def _composition_rows():
+    return [
+        IndexComposition(
+            date=date(2025, 9, 10),
+            symbol="AAPL",
+            company_name="Apple Inc.",
+            weight_percent=1.0,
+            market_cap=2580000000000.0,
+            price=173.32,
+            return_percent=-1.52
+        ).model_dump(),
+        IndexComposition(
+            date=date(2025, 9, 10),
+            symbol="MSFT",
+            company_name="Microsoft Corporation",
+            weight_percent=1.0,
+            market_cap=2450000000000.0,
+            price=329.15,
+            return_percent=0.87
+        ).model_dump()
+    ]
+
+
+class TestColumnarCacheCodec:
+
+    @pytest.mark.parametrize("compression", ["none", "zstd", "lz4"])
+    def test_round_trip_composition(self, compression):
+        codec = ColumnarCacheCodec(compression=compression)
+        rows = _composition_rows()
+
+        payload = codec.encode(rows)
+        decoded = codec.decode(payload)
+
+        assert payload[:2] == CODEC_MAGIC
+        assert payload[2] == CODEC_FORMAT_VERSION
+        assert decoded == rows
+        assert decoded[0]["date"] == date(2025, 9, 10)
+        assert [IndexComposition.model_validate(item) for item in decoded][1].symbol == "MSFT"
+
+    def test_columnar_payload_smaller_than_json(self):
+        rows = _composition_rows() * 250
+
+        assert len(ColumnarCacheCodec().encode(rows)) < len(JsonCacheCodec().encode(rows))
+
+    def test_non_table_values_round_trip(self):
+        codec = ColumnarCacheCodec()
+
+        assert codec.decode(codec.encode({"test": "data"})) == {"test": "data"}
+        assert codec.decode(codec.encode([])) == []
+
+    def test_legacy_json_payload_is_readable(self):
+        codec = ColumnarCacheCodec()
+        legacy = json.dumps([{"symbol": "AAPL"}]).encode("utf-8")
+
+        assert codec.decode(legacy) == [{"symbol": "AAPL"}]
+        assert codec.decode('{"key": "value"}') == {"key": "value"}
+
+    def test_unknown_format_version_rejected(self):
+        codec = ColumnarCacheCodec()
+        payload = bytearray(codec.encode(_composition_rows()))
+        payload[2] = CODEC_FORMAT_VERSION + 1
+
+        with pytest.raises(ValueError):
+            codec.decode(bytes(payload))
+
+    def test_codec_factory(self):
+        assert isinstance(create_cache_codec("json"), JsonCacheCodec)
+        assert create_cache_codec("columnar", "zstd").compression == "zstd"
+        with pytest.raises(ValueError):
+            create_cache_codec("pickle")
@@ -0,0 +1,128 @@
+import random
+from datetime import date, timedelta
+import pytest
+from src.dtos.index_result import IndexComposition
+
+
+def _composition(target_date, symbols, weight=None):
+    weight = weight or 100.0 / len(symbols)
+    return [
+        IndexComposition(
+            date=target_date,
+            symbol=symbol,
+            company_name=f"{symbol} Inc",
+            weight_percent=weight,
+            market_cap=1e9,
+            price=100.0,
+            return_percent=0.5
+        )
+        for symbol in symbols
+    ]
+
+
+def _reference_changes(compositions_by_date):
+    """Straightforward set diff between consecutive index dates"""
+    changes = []
+    previous = None
+    for target_date in sorted(compositions_by_date):
+        current = {comp.symbol: comp for comp in compositions_by_date[target_date]}
+        if previous is not None:
+            for symbol in sorted(current.keys() - previous.keys()):
+                changes.append((target_date, symbol, "entered", 0.0, round(current[symbol].weight_percent, 3)))
+            for symbol in sorted(previous.keys() - current.keys()):
+                changes.append((target_date, symbol, "exited", round(previous[symbol].weight_percent, 3), 0.0))
+        previous = current
+    return sorted(changes, key=lambda change: (change[0], change[2], change[1]))
+
+
+class TestCompositionChanges:
+
+    @pytest.mark.asyncio
+    async def test_exits_report_previous_name_and_weight(self, migrated_stock_repository):
+        await migrated_stock_repository.insert_index_composition(
+            _composition(date(2025, 9, 8), ["AAPL", "MSFT", "NVDA", "AMZN"], 25.0)
+            + _composition(date(2025, 9, 9), ["AAPL", "MSFT", "TSLA"], 33.333)
+        )
+
+        changes = await migrated_stock_repository.get_composition_changes(date(2025, 9, 8), date(2025, 9, 9))
+
+        assert [(c.symbol, c.change_type) for c in changes] == [
+            ("TSLA", "entered"), ("AMZN", "exited"), ("NVDA", "exited")
+        ]
+        exited = changes[1]
+        assert exited.date == date(2025, 9, 9)
+        assert exited.company_name == "AMZN Inc"
+        assert exited.previous_weight_percent == 25.0
+        assert exited.new_weight_percent == 0.0
+        assert changes[0].new_weight_percent == pytest.approx(33.333)
+
+    @pytest.mark.asyncio
+    async def test_first_date_is_baseline_and_gaps_are_skipped(self, migrated_stock_repository):
+        await migrated_stock_repository.insert_index_composition(
+            _composition(date(2025, 9, 5), ["AAPL", "MSFT"])
+            + _composition(date(2025, 9, 10), ["AAPL", "NVDA"])
+        )
+
+        changes = await migrated_stock_repository.get_composition_changes(date(2025, 9, 1), date(2025, 9, 30))
+
+        assert [(c.date, c.symbol, c.change_type) for c in changes] == [
+            (date(2025, 9, 10), "NVDA", "entered"),
+            (date(2025, 9, 10), "MSFT", "exited"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_renamed_company_is_not_a_change(self, migrated_stock_repository):
+        renamed = [member.model_copy(update={"company_name": "AAPL Inc."}) for member in _composition(date(2025, 9, 9), ["AAPL"])]
+        await migrated_stock_repository.insert_index_composition(
+            _composition(date(2025, 9, 8), ["AAPL", "MSFT"], 50.0)
+            + [member.model_copy(update={"weight_percent": 50.0}) for member in renamed]
+            + _composition(date(2025, 9, 9), ["NVDA"], 50.0)
+        )
+
+        changes = await migrated_stock_repository.get_composition_changes(date(2025, 9, 8), date(2025, 9, 9))
+
+        assert [(c.symbol, c.company_name, c.change_type) for c in changes] == [
+            ("NVDA", "NVDA Inc", "entered"), ("MSFT", "MSFT Inc", "exited")
+        ]
+
+    @pytest.mark.asyncio
+    async def test_matches_pairwise_set_diff(self, migrated_stock_repository):
+        rng = random.Random(3)
+        universe = [f"S{i:02d}" for i in range(30)]
+        compositions_by_date = {}
+        target_date = date(2025, 1, 6)
+        for _ in range(40):
+            if target_date.weekday() < 5:
+                compositions_by_date[target_date] = _composition(target_date, rng.sample(universe, 10), 10.0)
+            target_date += timedelta(days=1)
+        await migrated_stock_repository.insert_index_composition(
+            [comp for compositions in compositions_by_date.values() for comp in compositions]
+        )
+
+        changes = await migrated_stock_repository.get_composition_changes(date(2025, 1, 1), date(2025, 12, 31))
+
+        actual = [
+            (c.date, c.symbol, c.change_type, c.previous_weight_percent, c.new_weight_percent) for c in changes
+        ]
+        assert actual == _reference_changes(compositions_by_date)
+
+    @pytest.mark.asyncio
+    async def test_month_partitioned_stream_matches_query(self, migrated_stock_repository):
+        await migrated_stock_repository.insert_index_composition(
+            _composition(date(2025, 8, 28), ["AAPL", "MSFT"])
+            + _composition(date(2025, 9, 2), ["AAPL", "NVDA"])
+            + _composition(date(2025, 10, 1), ["NVDA", "TSLA"])
+        )
+
+        changes = await migrated_stock_repository.get_composition_changes(date(2025, 8, 1), date(2025, 10, 31))
+        stream = migrated_stock_repository.stream_composition_changes(date(2025, 8, 1), date(2025, 10, 31), 1)
+        rows = [row for chunk in stream.iter_chunks() for row in chunk]
+
+        assert stream.columns[:4] == ["date", "symbol", "company_name", "change_type"]
+        assert rows == [tuple(change.model_dump().values()) for change in changes]
+        assert [row[:4] for row in rows] == [
+            (date(2025, 9, 2), "NVDA", "NVDA Inc", "entered"),
+            (date(2025, 9, 2), "MSFT", "MSFT Inc", "exited"),
+            (date(2025, 10, 1), "TSLA", "TSLA Inc", "entered"),
+            (date(2025, 10, 1), "AAPL", "AAPL Inc", "exited"),
+        ]
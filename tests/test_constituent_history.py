@@ -0,0 +1,124 @@
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.constants import JOB_TYPE_BACKFILL
+from src.controllers.index_controller import IndexController
+from src.dtos.index_result import IndexComposition
+from src.managers.build_index_manager import BuildIndexManager
+from src.managers.index_data_dump_manager import IndexDataDumpManager
+from src.managers.index_manager import IndexManager
+from src.managers.job_manager import JobManager
+from src.models.stock_price_history import StockPriceHistoryCreate
+from src.repositories.job_repository import JobRepository
+from src.services.index_service import IndexService
+from src.services.redis_service import RedisService
+
+
+def _stocks(target_date, symbols):
+    return [
+        StockPriceHistoryCreate(
+            company_symbol=symbol,
+            company_name=f"{symbol} Inc",
+            last_traded_price=100.0 + offset,
+            market_cap=1e9 * (len(symbols) - offset),
+            one_day_return=0.5,
+            created_at=target_date
+        )
+        for offset, symbol in enumerate(symbols)
+    ]
+
+
+def _member(target_date, symbol, weight):
+    return IndexComposition(
+        date=target_date, symbol=symbol, company_name=f"{symbol} Inc",
+        weight_percent=weight, market_cap=1e9, price=100.0, return_percent=0.5
+    )
+
+
+@pytest.fixture
+def seeded_service(migrated_stock_repository):
+    asyncio.run(migrated_stock_repository.bulk_insert_stock_data(_stocks(date(2025, 9, 8), ["AAPL", "MSFT", "NVDA"])))
+    asyncio.run(migrated_stock_repository.bulk_insert_stock_data(_stocks(date(2025, 9, 9), ["MSFT", "AAPL", "NVDA"])))
+    asyncio.run(migrated_stock_repository.insert_index_composition([
+        _member(date(2025, 9, 8), "AAPL", 50.0), _member(date(2025, 9, 8), "MSFT", 50.0),
+        _member(date(2025, 9, 9), "MSFT", 50.0), _member(date(2025, 9, 9), "NVDA", 50.0),
+    ]))
+    service = IndexService(migrated_stock_repository)
+    asyncio.run(service.refresh_constituent_history())
+    return service
+
+
+class TestConstituentHistory:
+
+    @pytest.mark.asyncio
+    async def test_history_includes_prices_and_membership(self, seeded_service):
+        history = await seeded_service.get_constituent_history("aapl")
+
+        assert history.symbol == "AAPL"
+        assert (history.start_date, history.end_date) == (date(2025, 9, 8), date(2025, 9, 9))
+        assert history.membership_days == 1
+        assert [(point.date, point.in_index, point.weight_percent) for point in history.history] == [
+            (date(2025, 9, 8), True, 50.0),
+            (date(2025, 9, 9), False, None),
+        ]
+        assert history.history[1].price == 101.0
+
+    @pytest.mark.asyncio
+    async def test_projection_is_clustered_by_symbol(self, seeded_service, migrated_stock_repository):
+        await seeded_service.refresh_constituent_history()
+
+        rows = migrated_stock_repository.connection.execute(
+            "SELECT symbol, date FROM constituent_history ORDER BY rowid"
+        ).fetchall()
+
+        assert rows == sorted(rows)
+
+    @pytest.mark.asyncio
+    async def test_reads_never_rebuild_the_projection(self, seeded_service, migrated_stock_repository):
+        await migrated_stock_repository.bulk_insert_stock_data(_stocks(date(2025, 9, 10), ["NVDA"]))
+        stale = await seeded_service.get_constituent_history("NVDA", start_date=date(2025, 9, 9))
+        assert [point.date for point in stale.history] == [date(2025, 9, 9)]
+
+        await seeded_service.refresh_constituent_history()
+        history = await seeded_service.get_constituent_history("NVDA", start_date=date(2025, 9, 9))
+
+        assert [point.date for point in history.history] == [date(2025, 9, 9), date(2025, 9, 10)]
+        assert await migrated_stock_repository.get_projection_version("constituent_history") == \
+            await migrated_stock_repository.get_data_version()
+
+    @pytest.mark.asyncio
+    async def test_finished_jobs_refresh_the_projection(self, seeded_service, migrated_stock_repository):
+        async def backfill(start_date, end_date, progress):
+            await migrated_stock_repository.bulk_insert_stock_data(_stocks(date(2025, 9, 10), ["NVDA"]))
+            return []
+
+        dump_manager = Mock(spec=IndexDataDumpManager)
+        dump_manager.run_backfill = AsyncMock(side_effect=backfill)
+        job_repository = JobRepository(migrated_stock_repository.base_repository)
+        job_manager = JobManager(job_repository, Mock(spec=BuildIndexManager), dump_manager, index_service=seeded_service)
+
+        await job_manager.start()
+        try:
+            job = await job_manager.submit(JOB_TYPE_BACKFILL, date(2025, 9, 10))
+            # The job is marked completed before the refresh; the queue drains only after it
+            await asyncio.wait_for(job_manager.queue.join(), timeout=5)
+        finally:
+            await job_manager.stop()
+
+        assert (await job_manager.get_job(job.id)).status == "completed"
+        history = await seeded_service.get_constituent_history("NVDA", start_date=date(2025, 9, 10))
+        assert [point.date for point in history.history] == [date(2025, 9, 10)]
+
+    def test_unknown_symbol_returns_404(self, seeded_service):
+        app = FastAPI()
+        index_manager = IndexManager(seeded_service, Mock(spec=RedisService))
+        IndexController(index_manager, Mock(spec=BuildIndexManager)).register_routes(app)
+        client = TestClient(app)
+
+        assert client.get("/constituents/ZZZZ/history").status_code == 404
+        response = client.get("/constituents/msft/history", params={"end_date": "2025-09-08"})
+        assert response.status_code == 200
+        assert response.json()["membership_days"] == 1
@@ -90,6 +90,8 @@ class TestIndexManager:
         mock_index_service = Mock()
         mock_redis_service = Mock()
         
+        mock_index_service.get_data_version = AsyncMock(return_value=1)
+        
         mock_redis_service.get_index_performance = AsyncMock(return_value=[{
             "date": "2025-09-10",
             "daily_return_percent": 0.25,
@@ -110,6 +112,8 @@ class TestIndexManager:
         mock_index_service = Mock()
         mock_redis_service = Mock()
         
+        mock_index_service.get_data_version = AsyncMock(return_value=1)
+        
         mock_redis_service.get_index_composition = AsyncMock(return_value=[{
             "date": "2025-09-10",
             "symbol": "AAPL",
@@ -132,6 +136,8 @@ class TestIndexManager:
         mock_index_service = Mock()
         mock_redis_service = Mock()
         
+        mock_index_service.get_data_version = AsyncMock(return_value=1)
+        
         mock_redis_service.get_composition_changes = AsyncMock(return_value=[{
             "date": "2025-09-10",
             "symbol": "NVDA",
@@ -189,16 +195,16 @@ class TestRedisService:
         service.get = AsyncMock(return_value=[{"test": "data"}])
         service.set = AsyncMock(return_value=True)
         
-        result = await service.get_index_performance(date(2025, 9, 10), date(2025, 9, 11))
+        result = await service.get_index_performance(1, date(2025, 9, 10), date(2025, 9, 11))
         assert result == [{"test": "data"}]
         
-        success = await service.set_index_performance(date(2025, 9, 10), date(2025, 9, 11), [{"test": "data"}])
+        success = await service.set_index_performance(1, date(2025, 9, 10), date(2025, 9, 11), [{"test": "data"}])
         assert success is True
         
-        result = await service.get_index_composition(date(2025, 9, 10))
+        result = await service.get_index_composition(1, date(2025, 9, 10))
         assert result == [{"test": "data"}]
         
-        success = await service.set_index_composition(date(2025, 9, 10), [{"test": "data"}])
+        success = await service.set_index_composition(1, date(2025, 9, 10), [{"test": "data"}])
         assert success is True
 
 
@@ -0,0 +1,142 @@
+import asyncio
+from datetime import date, timedelta
+from unittest.mock import Mock, AsyncMock
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.controllers.analytics_controller import AnalyticsController
+from src.dtos.index_result import IndexComposition
+from src.managers.analytics_manager import AnalyticsManager
+from src.models.stock_price_history import StockPriceHistoryCreate
+from src.repositories.analytics_repository import AnalyticsRepository
+from src.services import risk_metrics
+from src.services.analytics_service import AnalyticsService
+from src.services.matrix_codec import decode_matrix
+from src.services.redis_service import RedisService
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA"]
+AS_OF = date(2024, 3, 29)
+
+
+@pytest.fixture
+def seeded_returns(migrated_stock_repository):
+    repository = migrated_stock_repository
+    rng = np.random.default_rng(3)
+    common = rng.normal(0, 0.01, 40)
+    trading_dates = [AS_OF - timedelta(days=offset) for offset in range(39, -1, -1)]
+    stocks = []
+    for day, trading_date in enumerate(trading_dates):
+        for symbol, loading in zip(SYMBOLS + ["XOM"], [1.0, 0.8, -0.5, 0.2]):
+            # NVDA misses two days; XOM trades but is not a constituent on AS_OF
+            if symbol == "NVDA" and day in (30, 35):
+                continue
+            stocks.append(StockPriceHistoryCreate(
+                company_symbol=symbol, company_name=f"{symbol} Inc", last_traded_price=100.0, market_cap=1e9,
+                one_day_return=round((loading * common[day] + rng.normal(0, 0.004)) * 100, 4),
+                created_at=trading_date
+            ))
+    asyncio.run(repository.bulk_insert_stock_data(stocks))
+    asyncio.run(repository.insert_index_composition([
+        IndexComposition(date=AS_OF, symbol=symbol, company_name=f"{symbol} Inc", weight_percent=33.333,
+                         market_cap=1e9, price=100.0, return_percent=0.0)
+        for symbol in SYMBOLS
+    ]))
+    frame = pd.DataFrame(
+        [(stock.created_at, stock.company_symbol, stock.one_day_return / 100) for stock in stocks],
+        columns=["date", "symbol", "daily_return"]
+    ).pivot(index="date", columns="symbol", values="daily_return")
+    return AnalyticsService(AnalyticsRepository(repository.base_repository)), frame
+
+
+class TestPairwiseCovariance:
+
+    def test_matches_pandas_with_missing_days(self):
+        rng = np.random.default_rng(1)
+        matrix = rng.normal(size=(60, 5))
+        matrix[rng.random(matrix.shape) < 0.2] = np.nan
+        matrix[:, 4] = np.nan
+        matrix[3, 4] = 1.0
+
+        covariance, correlation, counts = risk_metrics.pairwise_covariance(matrix, 10)
+
+        frame = pd.DataFrame(matrix)
+        np.testing.assert_allclose(covariance, frame.cov(min_periods=10).to_numpy(), rtol=1e-9, equal_nan=True)
+        np.testing.assert_allclose(correlation, frame.corr(min_periods=10).to_numpy(), rtol=1e-9, equal_nan=True)
+        assert counts[0, 4] == int(~np.isnan(matrix[3, 0]))
+
+
+class TestCovarianceService:
+
+    @pytest.mark.asyncio
+    async def test_matrix_covers_constituents_over_window(self, seeded_returns):
+        service, frame = seeded_returns
+
+        matrices = await service.get_covariance_matrices(AS_OF, 20, 2)
+
+        expected = frame[SYMBOLS].tail(20)
+        assert matrices["symbols"].tolist() == SYMBOLS
+        assert matrices["dates"].astype(object).tolist() == list(expected.index)
+        np.testing.assert_allclose(matrices["covariance"], expected.cov().to_numpy(), rtol=1e-6)
+        np.testing.assert_allclose(matrices["correlation"], expected.corr().to_numpy(), rtol=1e-6)
+        assert matrices["observations"][2, 2] == 18
+        assert matrices["correlation"][0, 2] < 0
+
+    @pytest.mark.asyncio
+    async def test_date_without_composition(self, seeded_returns):
+        service, _ = seeded_returns
+
+        assert await service.get_covariance_matrices(AS_OF - timedelta(days=1), 20, 2) is None
+
+
+class TestCovarianceManager:
+
+    @pytest.mark.asyncio
+    async def test_both_kinds_cached_per_date_and_window(self, seeded_returns):
+        service, frame = seeded_returns
+        cache = {}
+        redis_service = Mock(spec=RedisService)
+        redis_service.get_analytics_payload = AsyncMock(
+            side_effect=lambda kind, version, **params: cache.get((kind, params["date"], params["window"]))
+        )
+        redis_service.set_analytics_payload = AsyncMock(
+            side_effect=lambda kind, version, payload, **params: cache.update({(kind, params["date"], params["window"]): payload})
+        )
+        manager = AnalyticsManager(service, redis_service)
+
+        payload = await manager.get_covariance_matrix(AS_OF, 20, "covariance", 2)
+        service.get_covariance_matrices = AsyncMock()
+        correlation_payload = await manager.get_covariance_matrix(AS_OF, 20, "correlation", 2)
+
+        service.get_covariance_matrices.assert_not_called()
+        assert set(cache) == {("covariance", AS_OF, 20), ("correlation", AS_OF, 20)}
+        symbols, matrix, metadata = decode_matrix(payload)
+        assert symbols == SYMBOLS
+        assert matrix.dtype == np.float32
+        np.testing.assert_allclose(matrix, frame[SYMBOLS].tail(20).cov().to_numpy(), rtol=1e-5)
+        assert metadata["kind"] == "covariance"
+        assert metadata["trading_days"] == "20"
+        assert decode_matrix(correlation_payload)[2]["kind"] == "correlation"
+
+
+class TestCovarianceController:
+
+    def test_arrow_response_and_validation(self):
+        manager = Mock(spec=AnalyticsManager)
+        manager.get_data_version = AsyncMock(return_value=1)
+        manager.get_covariance_matrix = AsyncMock(return_value=b"arrow-bytes")
+        app = FastAPI()
+        AnalyticsController(manager).register_routes(app)
+        client = TestClient(app)
+
+        response = client.get("/analytics/correlation", params={"date": "2024-03-29", "window": 20})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+        assert response.content == b"arrow-bytes"
+        assert "etag" in response.headers
+        manager.get_covariance_matrix.assert_awaited_once_with(date(2024, 3, 29), 20, "correlation", 2)
+
+        assert client.get("/analytics/correlation", params={"date": "2024-03-29", "kind": "beta"}).status_code == 400
+        manager.get_covariance_matrix = AsyncMock(return_value=None)
+        assert client.get("/analytics/correlation", params={"date": "2024-03-29"}).status_code == 404
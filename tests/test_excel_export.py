@@ -0,0 +1,133 @@
+import asyncio
+import io
+import subprocess
+import sys
+import textwrap
+from datetime import date
+from pathlib import Path
+from unittest.mock import Mock, AsyncMock
+import duckdb
+import pytest
+from openpyxl import load_workbook
+from src.managers.index_manager import IndexManager
+from src.repositories.row_stream import StaticRowStream
+from src.services.index_service import IndexService
+from src.services.redis_service import RedisService
+from src.services import xlsx_stream_writer
+from src.services.xlsx_stream_writer import XlsxStreamWriter, ExcelSheet
+from migrations.migration_runner import MigrationRunner
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+EXPORT_RSS_BUDGET_MB = 256
+
+
+def _index_manager(repository):
+    redis_service = Mock(spec=RedisService)
+    redis_service.get_composition_changes = AsyncMock(return_value=None)
+    redis_service.set_composition_changes = AsyncMock(return_value=True)
+    return IndexManager(IndexService(repository), redis_service)
+
+
+class TestXlsxStreamWriter:
+
+    def test_workbook_is_readable(self):
+        stream = StaticRowStream(["date", "symbol", "value"], [(date(2025, 9, 10), "A&B <x>", 1.5), (date(2025, 9, 11), None, 2)], 1)
+
+        payload = b"".join(XlsxStreamWriter().iter_workbook([ExcelSheet("Values", ["Date", "Symbol", "Value"], stream)]))
+
+        sheet = load_workbook(io.BytesIO(payload))["Values"]
+        rows = list(sheet.iter_rows(values_only=True))
+        assert rows[0] == ("Date", "Symbol", "Value")
+        assert rows[1][0].date() == date(2025, 9, 10)
+        assert rows[1][1:] == ("A&B <x>", 1.5)
+        assert rows[2][1:] == (None, 2)
+
+    def test_sheet_rolls_over_at_row_limit(self, monkeypatch):
+        monkeypatch.setattr(xlsx_stream_writer, "EXCEL_MAX_ROWS", 4)
+        stream = StaticRowStream(["n"], [(n,) for n in range(7)], 2)
+
+        payload = b"".join(XlsxStreamWriter().iter_workbook([ExcelSheet("Numbers", ["N"], stream)]))
+
+        workbook = load_workbook(io.BytesIO(payload))
+        assert workbook.sheetnames == ["Numbers", "Numbers (2)", "Numbers (3)"]
+        assert [row[0] for row in workbook["Numbers (3)"].iter_rows(min_row=2, values_only=True)] == [6]
+
+
+class TestExcelExport:
+
+    @pytest.mark.asyncio
+    async def test_export_all_compositions(self, migrated_stock_repository, sample_index_composition, sample_index_performance):
+        next_day = [comp.model_copy(update={"date": date(2025, 9, 11)}) for comp in sample_index_composition]
+        await migrated_stock_repository.insert_index_composition(sample_index_composition + next_day)
+        await migrated_stock_repository.insert_index_performance(sample_index_performance)
+        manager = _index_manager(migrated_stock_repository)
+
+        workbook_stream = await manager.export_to_excel(date(2025, 9, 10), date(2025, 9, 11), include_all_compositions=True)
+
+        workbook = load_workbook(io.BytesIO(b"".join(workbook_stream)))
+        assert workbook.sheetnames == ["Index Performance", "Daily Compositions", "Composition Changes", "Turnover"]
+        assert workbook["Index Performance"].max_row == 3
+        compositions = list(workbook["Daily Compositions"].iter_rows(min_row=2, values_only=True))
+        assert [row[1] for row in compositions] == ["AAPL", "MSFT", "AAPL", "MSFT"]
+
+    @pytest.mark.asyncio
+    async def test_export_latest_composition_only(self, migrated_stock_repository, sample_index_composition):
+        await migrated_stock_repository.insert_index_composition(sample_index_composition)
+        manager = _index_manager(migrated_stock_repository)
+
+        workbook_stream = await manager.export_to_excel(date(2025, 9, 10))
+
+        workbook = load_workbook(io.BytesIO(b"".join(workbook_stream)))
+        assert "Composition 2025-09-10" in workbook.sheetnames
+
+    def test_ten_year_export_peak_rss_within_budget(self, tmp_path):
+        db_path = str(tmp_path / "export_rss.db")
+        asyncio.run(MigrationRunner(db_path=db_path).run_migrations())
+        connection = duckdb.connect(db_path)
+        connection.execute("""
+            INSERT INTO securities (symbol, name, valid_from, valid_to)
+            SELECT 'SYM' || s, 'Company ' || s || ' Holdings Incorporated', DATE '2015-01-01', DATE '2024-12-31'
+            FROM range(500) symbols(s);
+            INSERT INTO index_compositions (date, security_id, weight_percent, market_cap, price, return_percent)
+            SELECT d::DATE, security_id, 0.2, 1e9 + s * 1e6, 100.0 + s, (s % 7) - 3.0
+            FROM generate_series(TIMESTAMP '2015-01-01', TIMESTAMP '2024-12-31', INTERVAL 1 DAY) days(d),
+                 range(500) symbols(s)
+            JOIN securities ON securities.symbol = 'SYM' || s
+            WHERE dayofweek(d) BETWEEN 1 AND 5;
+        """)
+        composition_rows = connection.execute("SELECT COUNT(*) FROM index_compositions").fetchone()[0]
+        connection.close()
+
+        probe = textwrap.dedent(f"""
+            import asyncio, re, resource, sys
+            from datetime import date
+            sys.path.insert(0, {str(REPO_ROOT)!r})
+            from unittest.mock import Mock, AsyncMock
+            from src.repositories.base_repository import BaseRepository
+            from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
+            from src.services.index_service import IndexService
+            from src.services.redis_service import RedisService
+            from src.managers.index_manager import IndexManager
+
+            redis_service = Mock(spec=RedisService)
+            redis_service.get_composition_changes = AsyncMock(return_value=None)
+            redis_service.set_composition_changes = AsyncMock(return_value=True)
+            repository = StockPriceHistoryRepository(BaseRepository(db_path={db_path!r}))
+            manager = IndexManager(IndexService(repository), redis_service)
+
+            stream = asyncio.run(manager.export_to_excel(date(2015, 1, 1), date(2024, 12, 31), include_all_compositions=True))
+            total_bytes = sum(len(chunk) for chunk in stream)
+            try:
+                # VmHWM resets on exec; ru_maxrss would include the parent's peak from the data load
+                with open("/proc/self/status") as status:
+                    peak_rss_kb = int(re.search(r"VmHWM:\\s+(\\d+)", status.read()).group(1))
+            except OSError:
+                peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            print(total_bytes, peak_rss_kb)
+        """)
+        result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+        total_bytes, peak_rss_kb = (int(value) for value in result.stdout.split())
+
+        assert composition_rows == 2609 * 500
+        assert total_bytes > 0
+        assert peak_rss_kb / 1024 < EXPORT_RSS_BUDGET_MB
@@ -0,0 +1,261 @@
+import asyncio
+import io
+import json
+import pytest
+from datetime import date
+from unittest.mock import Mock, AsyncMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.controllers.index_controller import IndexController
+from src.controllers.http_cache import make_etag, etag_matches
+from src.managers.index_manager import IndexManager
+from src.managers.build_index_manager import BuildIndexManager
+from src.services.index_service import IndexService
+from src.services.redis_service import RedisService
+from src.controllers.response_formats import negotiate_format
+
+
+@pytest.fixture
+def controller_client(sample_index_performance, sample_index_composition):
+    index_manager = Mock(spec=IndexManager)
+    index_manager.get_data_version = AsyncMock(return_value=7)
+    index_manager.get_index_performance = AsyncMock(return_value=sample_index_performance)
+    index_manager.get_index_composition = AsyncMock(return_value=sample_index_composition)
+    index_manager.get_composition_changes = AsyncMock(return_value=[])
+    build_index_manager = Mock(spec=BuildIndexManager)
+
+    app = FastAPI()
+    IndexController(index_manager, build_index_manager).register_routes(app)
+    return TestClient(app), index_manager
+
+
+@pytest.fixture
+def streaming_client(migrated_stock_repository, sample_index_performance, sample_index_composition):
+    asyncio.run(migrated_stock_repository.insert_index_performance(sample_index_performance))
+    asyncio.run(migrated_stock_repository.insert_index_composition(sample_index_composition))
+
+    redis_service = Mock(spec=RedisService)
+    redis_service.get_composition_changes = AsyncMock(return_value=None)
+    redis_service.set_composition_changes = AsyncMock(return_value=True)
+    index_manager = IndexManager(IndexService(migrated_stock_repository), redis_service)
+
+    app = FastAPI()
+    IndexController(index_manager, Mock(spec=BuildIndexManager)).register_routes(app)
+    return TestClient(app)
+
+
+class TestConditionalRequests:
+
+    def test_etag_and_cache_control_returned(self, controller_client):
+        client, _ = controller_client
+
+        response = client.get("/index-performance", params={"start_date": "2025-09-10", "end_date": "2025-09-11"})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == make_etag(7, "/index-performance", date(2025, 9, 10), date(2025, 9, 11), "json")
+        # A past range can still be rebuilt, so it is never marked immutable
+        assert response.headers["cache-control"] == "public, no-cache"
+        assert len(response.json()) == 2
+
+    def test_if_none_match_returns_304_without_loading_data(self, controller_client):
+        client, index_manager = controller_client
+        etag = client.get("/index-composition", params={"date": "2025-09-10"}).headers["etag"]
+        index_manager.get_index_composition.reset_mock()
+
+        response = client.get("/index-composition", params={"date": "2025-09-10"}, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        index_manager.get_index_composition.assert_not_called()
+
+    def test_data_version_change_invalidates_etag(self, controller_client):
+        client, index_manager = controller_client
+        params = {"start_date": "2025-09-10", "end_date": "2025-09-11"}
+        etag = client.get("/composition-changes", params=params).headers["etag"]
+        index_manager.get_data_version = AsyncMock(return_value=8)
+
+        response = client.get("/composition-changes", params=params, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_etag_helpers(self):
+        etag = make_etag(1, "/index-composition", date(2025, 9, 10))
+
+        assert etag_matches(f'"other", W/{etag}', etag) is True
+        assert etag_matches("*", etag) is True
+        assert etag_matches(None, etag) is False
+
+
+class TestStreamingFormats:
+
+    def test_negotiate_format(self):
+        assert negotiate_format(None) == "json"
+        assert negotiate_format("application/x-ndjson") == "ndjson"
+        assert negotiate_format("text/csv;q=0.5, application/vnd.apache.arrow.stream") == "arrow"
+        assert negotiate_format("text/html, */*") == "json"
+        assert negotiate_format("application/x-ndjson", "csv") == "csv"
+
+    def test_ndjson_performance_stream(self, streaming_client):
+        response = streaming_client.get(
+            "/index-performance",
+            params={"start_date": "2025-09-10", "end_date": "2025-09-11"},
+            headers={"Accept": "application/x-ndjson"}
+        )
+
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert "etag" in response.headers
+        assert [row["date"] for row in rows] == ["2025-09-10", "2025-09-11"]
+        assert rows[0]["index_value"] == pytest.approx(1002.495)
+
+    def test_csv_composition_stream(self, streaming_client):
+        response = streaming_client.get("/index-composition", params={"date": "2025-09-10", "format": "csv"})
+
+        lines = response.text.splitlines()
+        assert lines[0] == "date,symbol,company_name,weight_percent,market_cap,price,return_percent"
+        assert lines[1].startswith("2025-09-10,AAPL,Apple Inc.,50.0")
+        assert len(lines) == 3
+
+    def test_arrow_performance_stream(self, streaming_client):
+        pa = pytest.importorskip("pyarrow")
+        response = streaming_client.get(
+            "/index-performance",
+            params={"start_date": "2025-09-10", "end_date": "2025-09-11", "format": "arrow"}
+        )
+
+        table = pa.ipc.open_stream(io.BytesIO(response.content)).read_all()
+        assert table.num_rows == 2
+        assert table.column_names[0] == "date"
+
+    def test_empty_arrow_stream_has_schema(self, streaming_client):
+        pa = pytest.importorskip("pyarrow")
+        response = streaming_client.get(
+            "/composition-changes",
+            params={"start_date": "2025-09-10", "end_date": "2025-09-11", "format": "arrow"}
+        )
+
+        table = pa.ipc.open_stream(io.BytesIO(response.content)).read_all()
+        assert table.num_rows == 0
+        assert "change_type" in table.column_names
+
+
+@pytest.fixture
+def batch_client(migrated_stock_repository, sample_index_composition):
+    next_day = [comp.model_copy(update={"date": date(2025, 9, 11)}) for comp in sample_index_composition]
+    asyncio.run(migrated_stock_repository.insert_index_composition(sample_index_composition + next_day))
+
+    cache = {}
+    redis_service = Mock(spec=RedisService)
+    redis_service.get_index_compositions = AsyncMock(
+        side_effect=lambda data_version, dates: {d: cache[data_version, d] for d in dates if (data_version, d) in cache}
+    )
+    redis_service.set_index_compositions = AsyncMock(
+        side_effect=lambda data_version, data: cache.update({(data_version, d): items for d, items in data.items()}) or True
+    )
+    index_service = IndexService(migrated_stock_repository)
+    index_manager = IndexManager(index_service, redis_service)
+
+    app = FastAPI()
+    IndexController(index_manager, Mock(spec=BuildIndexManager)).register_routes(app)
+    return TestClient(app), redis_service, cache
+
+
+class TestBatchCompositions:
+
+    def test_range_returns_all_dates_in_one_call(self, batch_client, migrated_stock_repository):
+        client, redis_service, cache = batch_client
+
+        response = client.get("/index-compositions", params={"start_date": "2025-09-10", "end_date": "2025-09-12"})
+
+        assert response.status_code == 200
+        assert [(row["date"], row["symbol"]) for row in response.json()] == [
+            ("2025-09-10", "AAPL"), ("2025-09-10", "MSFT"), ("2025-09-11", "AAPL"), ("2025-09-11", "MSFT")
+        ]
+        redis_service.get_index_compositions.assert_awaited_once_with(
+            asyncio.run(migrated_stock_repository.get_data_version()), [date(2025, 9, 10), date(2025, 9, 11), date(2025, 9, 12)]
+        )
+        assert {cached_date for _, cached_date in cache} == {date(2025, 9, 10), date(2025, 9, 11)}
+
+    def test_projection_and_symbol_filter(self, batch_client):
+        client, _, _ = batch_client
+
+        response = client.get(
+            "/index-compositions",
+            params=[("dates", "2025-09-11"), ("dates", "2025-09-10"), ("symbols", "msft"), ("fields", "symbol,price")]
+        )
+
+        assert response.json() == [
+            {"date": "2025-09-10", "symbol": "MSFT", "price": 329.15},
+            {"date": "2025-09-11", "symbol": "MSFT", "price": 329.15},
+        ]
+
+    def test_cached_dates_skip_the_database(self, batch_client, migrated_stock_repository):
+        client, _, cache = batch_client
+        client.get("/index-compositions", params={"dates": "2025-09-10"})
+        migrated_stock_repository.connection.execute("DELETE FROM index_compositions WHERE date = '2025-09-10'")
+
+        response = client.get("/index-compositions", params=[("dates", "2025-09-10"), ("dates", "2025-09-11")])
+
+        assert len(response.json()) == 4
+
+    def test_reload_is_not_served_from_the_old_cache_entry(
+        self, batch_client, migrated_stock_repository, sample_index_composition
+    ):
+        client, _, _ = batch_client
+        client.get("/index-compositions", params={"dates": "2025-09-10"})
+        repriced = [comp.model_copy(update={"price": 1.0}) for comp in sample_index_composition]
+        asyncio.run(migrated_stock_repository.insert_index_composition(repriced))
+
+        response = client.get("/index-compositions", params={"dates": "2025-09-10"})
+
+        assert [row["price"] for row in response.json()] == [1.0, 1.0]
+
+    @pytest.mark.parametrize("params", [
+        {},
+        {"start_date": "2025-09-10"},
+        {"start_date": "2025-09-10", "end_date": "2025-09-11", "dates": "2025-09-10"},
+        {"start_date": "2025-09-11", "end_date": "2025-09-10"},
+        {"dates": "2025-09-10", "fields": "symbol,volume"},
+        {"start_date": "2020-01-01", "end_date": "2025-09-10"},
+    ])
+    def test_invalid_requests_rejected(self, batch_client, params):
+        client, _, _ = batch_client
+
+        assert client.get("/index-compositions", params=params).status_code == 400
+
+
+class TestRedisBatchOperations:
+
+    @pytest.mark.asyncio
+    async def test_mget_and_pipelined_set(self):
+        redis_service = RedisService()
+        client = Mock()
+        redis_service._client = client
+        client.mget.return_value = [redis_service.codec.encode([{"symbol": "AAPL"}]), None]
+        pipeline = client.pipeline.return_value
+        pipeline.execute.return_value = [True, True]
+
+        cached = await redis_service.get_index_compositions(4, [date(2025, 9, 10), date(2025, 9, 11)])
+        stored = await redis_service.set_index_compositions(4, {date(2025, 9, 10): [], date(2025, 9, 11): []})
+
+        assert cached == {date(2025, 9, 10): [{"symbol": "AAPL"}]}
+        client.mget.assert_called_once_with([
+            "index_composition:data_version:4:date:2025-09-10", "index_composition:data_version:4:date:2025-09-11"
+        ])
+        client.pipeline.assert_called_once_with(transaction=False)
+        assert pipeline.setex.call_count == 2
+        assert stored is True
+
+
+class TestDataVersion:
+
+    @pytest.mark.asyncio
+    async def test_writes_bump_data_version(self, migrated_stock_repository, sample_index_performance):
+        initial_version = await migrated_stock_repository.get_data_version()
+
+        await migrated_stock_repository.insert_index_performance(sample_index_performance)
+
+        assert await migrated_stock_repository.get_data_version() == initial_version + 1
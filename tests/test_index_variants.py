@@ -0,0 +1,173 @@
+import asyncio
+from datetime import date, timedelta
+from unittest.mock import Mock, AsyncMock
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.controllers.index_variant_controller import IndexVariantController
+from src.dtos.index_definition import IndexDefinition, IndexVariantBuildResult
+from src.managers.build_index_manager import BuildIndexManager
+from src.managers.index_variant_manager import IndexVariantManager
+from src.models.stock_price_history import StockPriceHistoryCreate
+from src.repositories.index_variant_repository import IndexVariantRepository
+from src.services.index_variant_service import IndexVariantService
+
+VARIANTS = [
+    IndexDefinition(index_id="equal_top2", name="Top 2 Equal", top_n=2),
+    IndexDefinition(index_id="cap_top2", name="Top 2 Cap", top_n=2, weighting="market_cap"),
+    IndexDefinition(index_id="equal_top2_monthly", name="Top 2 Monthly", top_n=2, rebalance="monthly"),
+    IndexDefinition(index_id="equal_top2_weekly", name="Top 2 Weekly", top_n=2, rebalance="weekly"),
+]
+
+
+def _trading_days(start, end):
+    days = []
+    current = start
+    while current <= end:
+        if current.weekday() < 5:
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+@pytest.fixture
+def variant_service(migrated_stock_repository):
+    stocks = []
+    for day, trading_date in enumerate(_trading_days(date(2024, 1, 29), date(2024, 2, 16))):
+        # CCC overtakes BBB from 7 February onwards
+        caps = {"AAA": 300.0, "BBB": 200.0, "CCC": 250.0 if trading_date >= date(2024, 2, 7) else 150.0, "DDD": 100.0}
+        for offset, (symbol, cap) in enumerate(caps.items()):
+            stocks.append(StockPriceHistoryCreate(
+                company_symbol=symbol, company_name=f"{symbol} Corp", last_traded_price=10.0 + day,
+                market_cap=cap * 1e9, one_day_return=round((offset + 1) * 0.5 - 1.0 + day * 0.1, 4),
+                created_at=trading_date
+            ))
+    asyncio.run(migrated_stock_repository.bulk_insert_stock_data(stocks))
+    service = IndexVariantService(IndexVariantRepository(migrated_stock_repository.base_repository))
+    for definition in VARIANTS:
+        asyncio.run(service.create_definition(definition))
+    returns = {(stock.created_at, stock.company_symbol): stock.one_day_return for stock in stocks}
+    return service, returns
+
+
+class TestVariantEngine:
+
+    @pytest.mark.asyncio
+    async def test_definitions_are_data(self, variant_service):
+        service, _ = variant_service
+
+        index_ids = [definition.index_id for definition in await service.get_definitions()]
+
+        assert {"equal_top2", "cap_top2", "equal_top2_monthly", "equal_top100_daily", "primary"} <= set(index_ids)
+        assert await service.create_definition(VARIANTS[0]) is False
+
+    @pytest.mark.asyncio
+    async def test_equal_and_market_cap_weights(self, variant_service):
+        service, returns = variant_service
+        result = await service.build_variants(date(2024, 2, 1), date(2024, 2, 16), ["equal_top2", "cap_top2"])
+
+        equal = await service.get_composition("equal_top2", date(2024, 2, 8))
+        cap = await service.get_composition("cap_top2", date(2024, 2, 8))
+        performance = await service.get_performance("equal_top2", date(2024, 2, 1), date(2024, 2, 16))
+
+        assert result.success and result.compositions_built == 2 * 2 * 12
+        assert [(comp.symbol, comp.weight_percent) for comp in equal] == [("AAA", 50.0), ("CCC", 50.0)]
+        assert [comp.weight_percent for comp in cap] == pytest.approx([300 / 550 * 100, 250 / 550 * 100])
+        first_day = (returns[(date(2024, 2, 1), "AAA")] + returns[(date(2024, 2, 1), "BBB")]) / 2
+        assert performance[0].daily_return_percent == pytest.approx(first_day)
+        assert performance[0].index_value == pytest.approx(1000 * (1 + first_day / 100))
+        assert len(performance) == 12
+
+    @pytest.mark.asyncio
+    async def test_monthly_variant_holds_rebalance_members(self, variant_service):
+        service, returns = variant_service
+        await service.build_variants(date(2024, 2, 5), date(2024, 2, 16), ["equal_top2_monthly", "equal_top2"])
+
+        monthly = await service.get_composition("equal_top2_monthly", date(2024, 2, 14))
+        daily = await service.get_composition("equal_top2", date(2024, 2, 14))
+
+        # Selected on 1 February, the first trading day of the month, before the start of the build range
+        assert [comp.symbol for comp in monthly] == ["AAA", "BBB"]
+        assert [comp.symbol for comp in daily] == ["AAA", "CCC"]
+        assert monthly[1].return_percent == pytest.approx(returns[(date(2024, 2, 14), "BBB")])
+        # Held weights drift with returns from the equal weights set on 1 February
+        grown = [1.0, 1.0]
+        for trading_date in _trading_days(date(2024, 2, 1), date(2024, 2, 13)):
+            grown = [weight * (1 + returns[(trading_date, symbol)] / 100) for weight, symbol in zip(grown, ["AAA", "BBB"])]
+        expected = [weight * 100 / sum(grown) for weight in grown]
+        assert [comp.weight_percent for comp in monthly] == pytest.approx(expected)
+        assert monthly[0].weight_percent != pytest.approx(50.0)
+
+    @pytest.mark.asyncio
+    async def test_weekly_variant_reselects_on_mondays(self, variant_service):
+        service, _ = variant_service
+        await service.build_variants(date(2024, 2, 7), date(2024, 2, 16), ["equal_top2_weekly"])
+
+        friday = await service.get_composition("equal_top2_weekly", date(2024, 2, 9))
+        monday = await service.get_composition("equal_top2_weekly", date(2024, 2, 12))
+
+        # Selected on Monday 5 February, before CCC overtook BBB
+        assert [comp.symbol for comp in friday] == ["AAA", "BBB"]
+        assert sum(comp.weight_percent for comp in friday) == pytest.approx(100.0)
+        assert [(comp.symbol, comp.weight_percent) for comp in monday] == [("AAA", 50.0), ("CCC", 50.0)]
+        assert await service.get_composition("equal_top2_weekly", date(2024, 2, 6)) == []
+
+    @pytest.mark.asyncio
+    async def test_rebuild_is_idempotent_and_chains(self, variant_service):
+        service, _ = variant_service
+        await service.build_variants(date(2024, 1, 29), date(2024, 2, 16))
+        full = await service.get_performance("cap_top2", date(2024, 1, 29), date(2024, 2, 16))
+
+        await service.build_variants(date(2024, 2, 8), date(2024, 2, 16), ["cap_top2"])
+        rebuilt = await service.get_performance("cap_top2", date(2024, 1, 29), date(2024, 2, 16))
+        composition = await service.get_composition("cap_top2", date(2024, 2, 9))
+
+        assert [perf.index_value for perf in rebuilt] == pytest.approx([perf.index_value for perf in full])
+        assert len(composition) == 2
+
+
+class TestVariantBuildHook:
+
+    @pytest.mark.asyncio
+    async def test_build_index_rebuilds_variants_after_new_data(self, mock_index_service, mock_index_variant_service):
+        stock_history_service = Mock()
+        stock_history_service.get_stocks_for_date = AsyncMock(return_value=[])
+        stock_history_service.fetch_and_store_top_stocks = AsyncMock(return_value=130)
+        mock_index_service.get_persisted_index_composition = AsyncMock(return_value=[])
+        mock_index_service.get_persisted_index_performance = AsyncMock(return_value=[])
+        mock_index_service.get_index_composition = AsyncMock(return_value=[])
+        variant_service = mock_index_variant_service
+        variant_service.build_variants = AsyncMock(return_value=IndexVariantBuildResult(
+            start_date=date(2025, 9, 8), end_date=date(2025, 9, 9), index_ids=["a"], compositions_built=4, success=True
+        ))
+        manager = BuildIndexManager(mock_index_service, stock_history_service, variant_service)
+
+        await manager.build_index(date(2025, 9, 8), date(2025, 9, 9))
+
+        variant_service.build_variants.assert_awaited_once_with(date(2025, 9, 8), date(2025, 9, 9))
+        # Missing days are fetched at the primary index's size
+        stock_history_service.fetch_and_store_top_stocks.assert_any_await(date(2025, 9, 8), 130)
+
+
+class TestVariantController:
+
+    def _client(self, manager):
+        app = FastAPI()
+        IndexVariantController(manager).register_routes(app)
+        return TestClient(app)
+
+    def test_routes_keyed_by_index_id(self):
+        manager = Mock(spec=IndexVariantManager)
+        manager.get_data_version = AsyncMock(return_value=3)
+        manager.get_definition = AsyncMock(side_effect=lambda index_id: VARIANTS[0] if index_id == "equal_top2" else None)
+        manager.get_performance = AsyncMock(return_value=[])
+        manager.create_definition = AsyncMock(return_value=False)
+        client = self._client(manager)
+
+        assert client.get("/indexes/missing/performance", params={"start_date": "2024-02-01", "end_date": "2024-02-16"}).status_code == 404
+        response = client.get("/indexes/equal_top2/performance", params={"start_date": "2024-02-01", "end_date": "2024-02-16"})
+        assert response.status_code == 200
+        manager.get_performance.assert_awaited_once_with("equal_top2", date(2024, 2, 1), date(2024, 2, 16))
+        assert client.post("/indexes", json=VARIANTS[0].model_dump()).status_code == 409
+        assert client.post("/indexes", json={**VARIANTS[0].model_dump(), "weighting": "price"}).status_code == 422
+        assert client.post("/indexes/build", json={"start_date": "2024-02-01", "index_ids": ["missing"]}).status_code == 404
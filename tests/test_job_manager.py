@@ -0,0 +1,326 @@
+import asyncio
+from datetime import date
+from unittest.mock import Mock, AsyncMock
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.constants import JOB_TYPE_BUILD_INDEX, JOB_TYPE_BACKFILL, JOB_TYPE_MAINTENANCE
+from src.controllers.job_controller import JobController
+from src.dtos.index_result import IndexBuildResult
+from src.dtos.operation_result import OperationResult
+from src.managers.build_index_manager import BuildIndexManager
+from src.managers.index_data_dump_manager import IndexDataDumpManager
+from src.managers.job_manager import JobManager
+from src.models.stock_price_history import StockPriceHistoryCreate
+from src.repositories.job_repository import JobRepository
+from src.services.job_progress import JobProgress, JobCancelledError
+
+
+def _build_result(success=True, error_message=None):
+    return IndexBuildResult(
+        start_date=date(2025, 9, 8),
+        end_date=date(2025, 9, 12),
+        trading_days=5,
+        total_compositions_built=5,
+        success=success,
+        error_message=error_message
+    )
+
+
+@pytest.fixture
+def job_repository(migrated_stock_repository):
+    return JobRepository(migrated_stock_repository.base_repository)
+
+
+@pytest.fixture
+def build_index_manager():
+    manager = Mock(spec=BuildIndexManager)
+
+    async def build_index(start_date, end_date, progress):
+        await progress.start_phase("building_compositions", 5)
+        for _ in range(5):
+            await progress.advance(rows=130)
+        return _build_result()
+
+    manager.build_index = AsyncMock(side_effect=build_index)
+    return manager
+
+
+@pytest.fixture
+def job_manager(job_repository, build_index_manager):
+    return JobManager(job_repository, build_index_manager, Mock(spec=IndexDataDumpManager))
+
+
+async def _wait_for_status(job_manager, job_id, statuses, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        job = await job_manager.get_job(job_id)
+        if job.status in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not reach {statuses}")
+
+
+class TestJobManager:
+
+    @pytest.mark.asyncio
+    async def test_build_job_runs_to_completion(self, job_manager):
+        await job_manager.start()
+        try:
+            job = await job_manager.submit(JOB_TYPE_BUILD_INDEX, date(2025, 9, 8), date(2025, 9, 12))
+            assert job.status == "queued"
+
+            finished = await _wait_for_status(job_manager, job.id, {"completed", "failed"})
+        finally:
+            await job_manager.stop()
+
+        assert finished.status == "completed"
+        assert finished.phase == "building_compositions"
+        assert (finished.dates_done, finished.dates_total, finished.rows_written) == (5, 5, 650)
+        assert finished.started_at is not None and finished.finished_at is not None
+
+    @pytest.mark.asyncio
+    async def test_submit_deduplicates_active_jobs(self, job_manager):
+        first = await job_manager.submit(JOB_TYPE_BUILD_INDEX, date(2025, 9, 8), date(2025, 9, 12))
+        second = await job_manager.submit(JOB_TYPE_BUILD_INDEX, date(2025, 9, 8), date(2025, 9, 12))
+        other_range = await job_manager.submit(JOB_TYPE_BUILD_INDEX, date(2025, 9, 8), date(2025, 9, 9))
+
+        assert second.id == first.id
+        assert other_range.id != first.id
+
+    @pytest.mark.asyncio
+    async def test_concurrent_submissions_queue_one_job(self, job_manager, job_repository):
+        submissions = await asyncio.gather(*[
+            job_manager.submit(JOB_TYPE_BACKFILL, date(2025, 9, 8), date(2025, 9, 12)) for _ in range(8)
+        ])
+
+        assert len({job.id for job in submissions}) == 1
+        assert len(await job_repository.get_unfinished_jobs()) == 1
+
+        # Once the job has finished, the same range can be submitted again
+        await job_repository.mark_finished(submissions[0].id, "completed")
+        again = await job_manager.submit(JOB_TYPE_BACKFILL, date(2025, 9, 8), date(2025, 9, 12))
+        assert again.id != submissions[0].id and again.status == "queued"
+
+    @pytest.mark.asyncio
+    async def test_scheduled_job_with_a_stale_fencing_token_writes_nothing(
+        self, migrated_stock_repository, job_repository, build_index_manager
+    ):
+        async def backfill(start_date, end_date, progress):
+            await migrated_stock_repository.bulk_insert_stock_data([
+                StockPriceHistoryCreate(
+                    company_symbol="AAPL", company_name="Apple Inc", last_traded_price=100.0,
+                    market_cap=3e12, one_day_return=0.5, created_at=start_date
+                )
+            ])
+            return []
+
+        dump_manager = Mock(spec=IndexDataDumpManager)
+        dump_manager.run_backfill = AsyncMock(side_effect=backfill)
+        job_manager = JobManager(job_repository, build_index_manager, dump_manager)
+
+        await job_manager.start()
+        try:
+            # The new leader (token 2) writes first; the stalled one (token 1) then runs its job
+            current = await job_manager.submit(JOB_TYPE_BACKFILL, date(2025, 9, 9), fencing_token=2)
+            current = await _wait_for_status(job_manager, current.id, {"completed", "failed"})
+            stale = await job_manager.submit(JOB_TYPE_BACKFILL, date(2025, 9, 10), fencing_token=1)
+            stale = await _wait_for_status(job_manager, stale.id, {"completed", "failed"})
+        finally:
+            await job_manager.stop()
+
+        assert (current.status, current.fencing_token) == ("completed", 2)
+        assert stale.status == "failed" and "Fencing token 1" in stale.error_message
+        assert await migrated_stock_repository.get_stocks_by_date(date(2025, 9, 10)) == []
+
+    @pytest.mark.asyncio
+    async def test_maintenance_job_archives_then_clusters(self, job_repository, build_index_manager):
+        dump_manager = Mock(spec=IndexDataDumpManager)
+        dump_manager.run_archive = AsyncMock(return_value=OperationResult(
+            success=True, operation="archive_closed_months", date=date(2025, 9, 13), records_processed=40, execution_time_seconds=0.1
+        ))
+        dump_manager.run_stock_data_maintenance = AsyncMock(return_value=OperationResult(
+            success=True, operation="stock_data_maintenance", date=date(2025, 9, 13), records_processed=2, execution_time_seconds=0.1
+        ))
+        job_manager = JobManager(job_repository, build_index_manager, dump_manager)
+
+        await job_manager.start()
+        try:
+            job = await job_manager.submit(JOB_TYPE_MAINTENANCE, date(2025, 9, 13))
+            finished = await _wait_for_status(job_manager, job.id, {"completed", "failed"})
+        finally:
+            await job_manager.stop()
+
+        assert finished.status == "completed"
+        assert (finished.phase, finished.rows_written) == ("clustering", 42)
+        dump_manager.run_archive.assert_awaited_once_with(date(2025, 9, 13))
+        dump_manager.run_stock_data_maintenance.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_build_records_error(self, job_manager, build_index_manager):
+        build_index_manager.build_index = AsyncMock(return_value=_build_result(False, "Data source unavailable"))
+        await job_manager.start()
+        try:
+            job = await job_manager.submit(JOB_TYPE_BUILD_INDEX, date(2025, 9, 8), date(2025, 9, 12))
+            finished = await _wait_for_status(job_manager, job.id, {"completed", "failed"})
+        finally:
+            await job_manager.stop()
+
+        assert finished.status == "failed"
+        assert finished.error_message == "Data source unavailable"
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_job_stops_at_date_boundary(self, job_manager, build_index_manager):
+        started = asyncio.Event()
+
+        async def slow_build(start_date, end_date, progress):
+            await progress.start_phase("building_performance", 100)
+            for _ in range(100):
+                started.set()
+                await asyncio.sleep(0.01)
+                await progress.advance(rows=1)
+            return _build_result()
+
+        build_index_manager.build_index = AsyncMock(side_effect=slow_build)
+        await job_manager.start()
+        try:
+            job = await job_manager.submit(JOB_TYPE_BUILD_INDEX, date(2025, 9, 8), date(2025, 9, 12))
+            await asyncio.wait_for(started.wait(), 5)
+            await job_manager.cancel(job.id)
+            finished = await _wait_for_status(job_manager, job.id, {"completed", "failed", "cancelled"})
+        finally:
+            await job_manager.stop()
+
+        assert finished.status == "cancelled"
+        assert finished.cancel_requested is True
+        assert finished.dates_done < 100
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_job(self, job_manager, build_index_manager):
+        job = await job_manager.submit(JOB_TYPE_BUILD_INDEX, date(2025, 9, 8), date(2025, 9, 12))
+
+        cancelled = await job_manager.cancel(job.id)
+        await job_manager.start()
+        await job_manager.stop()
+
+        assert cancelled.status == "cancelled"
+        build_index_manager.build_index.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_start_requeues_unfinished_jobs(self, job_repository, job_manager):
+        job = await job_manager.submit(JOB_TYPE_BUILD_INDEX, date(2025, 9, 8), date(2025, 9, 12))
+        await job_repository.mark_running(job.id)
+
+        await job_manager.start()
+        try:
+            finished = await _wait_for_status(job_manager, job.id, {"completed", "failed"})
+        finally:
+            await job_manager.stop()
+
+        assert finished.status == "completed"
+
+    @pytest.mark.asyncio
+    async def test_restart_does_not_resume_a_job_cancelled_while_running(
+        self, job_repository, job_manager, build_index_manager
+    ):
+        job = await job_manager.submit(JOB_TYPE_BUILD_INDEX, date(2025, 9, 8), date(2025, 9, 12))
+        # The process crashed after the cancel was requested but before the job stopped
+        await job_repository.mark_running(job.id)
+        await job_repository.request_cancel(job.id)
+
+        restarted = JobManager(job_repository, build_index_manager, Mock(spec=IndexDataDumpManager))
+        await restarted.start()
+        try:
+            await restarted.queue.join()
+        finally:
+            await restarted.stop()
+
+        assert (await restarted.get_job(job.id)).status == "cancelled"
+        build_index_manager.build_index.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_backfill_job_reports_failed_dates(self, job_repository, build_index_manager):
+        dump_manager = Mock(spec=IndexDataDumpManager)
+        dump_manager.run_backfill = AsyncMock(return_value=[
+            OperationResult(success=True, operation="daily_dump", date=date(2025, 9, 8), records_processed=130, execution_time_seconds=0.1),
+            OperationResult(success=False, operation="daily_dump", date=date(2025, 9, 9), records_processed=0, execution_time_seconds=0.1)
+        ])
+        job_manager = JobManager(job_repository, build_index_manager, dump_manager)
+
+        await job_manager.start()
+        try:
+            job = await job_manager.submit(JOB_TYPE_BACKFILL, date(2025, 9, 8), date(2025, 9, 9))
+            finished = await _wait_for_status(job_manager, job.id, {"completed", "failed"})
+        finally:
+            await job_manager.stop()
+
+        assert finished.status == "failed"
+        assert "2025-09-09" in finished.error_message
+
+
+class TestBuildIndexProgress:
+
+    @pytest.mark.asyncio
+    async def test_build_index_reports_phases_and_persists_per_date(self, mock_index_service, mock_index_variant_service):
+        stock_history_service = Mock()
+        stock_history_service.get_stocks_for_date = AsyncMock(return_value=[])
+        mock_index_service.get_persisted_index_composition = AsyncMock(return_value=[])
+        mock_index_service.get_persisted_index_performance = AsyncMock(return_value=[])
+        mock_index_service.get_index_composition = AsyncMock(return_value=[])
+        manager = BuildIndexManager(mock_index_service, stock_history_service, mock_index_variant_service)
+        stock_history_service.fetch_and_store_top_stocks = AsyncMock(return_value=130)
+        phases = []
+
+        async def on_update(progress):
+            phases.append((progress.phase, progress.dates_done, progress.dates_total))
+
+        await manager.build_index(date(2025, 9, 8), date(2025, 9, 9), JobProgress(on_update))
+
+        assert ("fetching_stock_data", 2, 2) in phases
+        assert ("building_compositions", 2, 2) in phases
+        assert ("building_performance", 2, 2) in phases
+        assert phases[-1] == ("building_variants", 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_build_index_propagates_cancellation(self, mock_index_service, mock_index_variant_service):
+        stock_history_service = Mock()
+        stock_history_service.get_stocks_for_date = AsyncMock(return_value=[])
+        stock_history_service.fetch_and_store_top_stocks = AsyncMock(return_value=130)
+        manager = BuildIndexManager(mock_index_service, stock_history_service, mock_index_variant_service)
+        progress = JobProgress()
+        progress.cancel()
+
+        with pytest.raises(JobCancelledError):
+            await manager.build_index(date(2025, 9, 8), date(2025, 9, 9), progress)
+        stock_history_service.fetch_and_store_top_stocks.assert_not_called()
+
+
+class TestJobController:
+
+    def _client(self, job_manager):
+        app = FastAPI()
+        JobController(job_manager).register_routes(app)
+        return TestClient(app)
+
+    def test_submit_returns_accepted(self):
+        job_manager = Mock(spec=JobManager)
+        job_manager.submit = AsyncMock(return_value={
+            "id": "job-1", "job_type": JOB_TYPE_BUILD_INDEX, "start_date": "2025-09-08",
+            "end_date": "2025-09-12", "status": "queued"
+        })
+
+        response = self._client(job_manager).post("/jobs/build-index", json={"start_date": "2025-09-08", "end_date": "2025-09-12"})
+
+        assert response.status_code == 202
+        assert response.json()["id"] == "job-1"
+        job_manager.submit.assert_awaited_once_with(JOB_TYPE_BUILD_INDEX, date(2025, 9, 8), date(2025, 9, 12))
+
+    def test_unknown_job_returns_404(self):
+        job_manager = Mock(spec=JobManager)
+        job_manager.get_job = AsyncMock(return_value=None)
+        job_manager.cancel = AsyncMock(return_value=None)
+        client = self._client(job_manager)
+
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.delete("/jobs/missing").status_code == 404
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
+import pytest
+from src.scheduler.cron_scheduler import CronScheduler
+from src.services.leader_lease import LeaderLease
+from src.services.redis_service import RedisService
+from tests.resp_server import RespServer
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Renews every 50 ms against a 500 ms lease; writes a marker, then checks nobody else wrote in between
+REPLICA = """
+import asyncio, json, os, sys, time
+from src.services.leader_lease import LeaderLease
+from src.services.redis_service import RedisService
+
+port, node_id, seconds, crash_after = int(sys.argv[1]), sys.argv[2], float(sys.argv[3]), float(sys.argv[4])
+redis_service = RedisService()
+redis_service.redis_host, redis_service.redis_port = "127.0.0.1", port
+lease = LeaderLease(redis_service, ttl_seconds=0.5, node_id=node_id)
+client = redis_service.client
+tokens, overlaps, led_since = [], 0, None
+
+async def main():
+    global overlaps, led_since
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if await lease.acquire_or_renew() and await lease.is_current():
+            led_since = led_since or time.monotonic()
+            if lease.fencing_token not in tokens:
+                tokens.append(lease.fencing_token)
+            client.set("scheduled_work", node_id)
+            client.incr(f"work:{lease.fencing_token}")
+            time.sleep(0.01)
+            overlaps += client.get("scheduled_work").decode() != node_id
+            if crash_after and time.monotonic() - led_since > crash_after:
+                print(json.dumps({"tokens": tokens, "overlaps": overlaps}), flush=True)
+                os._exit(1)
+        else:
+            led_since = None
+        await asyncio.sleep(0.05)
+    await lease.release()
+    print(json.dumps({"tokens": tokens, "overlaps": overlaps}), flush=True)
+
+asyncio.run(main())
+"""
+
+
+@pytest.fixture
+def redis_stand_in():
+    server = RespServer().start()
+    yield server
+    server.stop()
+
+
+def _redis_service(server):
+    redis_service = RedisService()
+    redis_service.redis_host, redis_service.redis_port = "127.0.0.1", server.port
+    return redis_service
+
+
+def _replica(server, node_id, seconds, crash_after=0.0):
+    return subprocess.Popen(
+        [sys.executable, "-c", REPLICA, str(server.port), node_id, str(seconds), str(crash_after)],
+        cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+
+
+class TestLeaderLease:
+
+    def test_expired_lease_passes_to_another_node_with_a_larger_token(self, redis_stand_in):
+        first = LeaderLease(_redis_service(redis_stand_in), ttl_seconds=0.2, node_id="first")
+        second = LeaderLease(_redis_service(redis_stand_in), ttl_seconds=0.2, node_id="second")
+
+        assert asyncio.run(first.acquire_or_renew()) and first.fencing_token == 1
+        assert not asyncio.run(second.acquire_or_renew())
+        assert asyncio.run(first.acquire_or_renew()) and asyncio.run(first.is_current())
+
+        # The holder stalls past its TTL and the other node takes over
+        time.sleep(0.3)
+        assert asyncio.run(second.acquire_or_renew()) and second.fencing_token == 2
+        assert not asyncio.run(first.is_current())
+        assert not asyncio.run(first.acquire_or_renew()) and first.fencing_token is None
+
+        # Releasing never removes a lease the node no longer holds
+        asyncio.run(first.release())
+        assert asyncio.run(second.is_current())
+        asyncio.run(second.release())
+        assert asyncio.run(first.acquire_or_renew()) and first.fencing_token == 3
+
+    def test_one_replica_works_at_a_time_and_another_takes_over_after_a_crash(self, redis_stand_in):
+        crashing = _replica(redis_stand_in, "crashing", seconds=10, crash_after=1.0)
+        deadline = time.monotonic() + 10
+        while b"lease:scheduler" not in redis_stand_in.values and time.monotonic() < deadline:
+            time.sleep(0.02)
+        survivors = [_replica(redis_stand_in, f"survivor-{number}", seconds=3) for number in range(2)]
+
+        reports = {}
+        for name, replica in [("crashing", crashing)] + [(f"survivor-{n}", r) for n, r in enumerate(survivors)]:
+            stdout, stderr = replica.communicate(timeout=30)
+            assert stdout, stderr
+            reports[name] = json.loads(stdout)
+
+        assert reports["crashing"]["tokens"] == [1]
+        # Exactly one survivor took over, once, and kept the lease until it released it. Its token is
+        # larger than the crashed node's; racing takeovers may burn tokens, so it need not be 2
+        survivor_tokens = [token for name in reports if name != "crashing" for token in reports[name]["tokens"]]
+        assert len(survivor_tokens) == 1 and survivor_tokens[0] > 1
+        assert all(report["overlaps"] == 0 for report in reports.values())
+        assert {key for key in redis_stand_in.values if key.startswith(b"work:")} == {
+            b"work:1", f"work:{survivor_tokens[0]}".encode()
+        }
+
+    def test_scheduler_runs_scheduled_work_only_while_leading(self, redis_stand_in):
+        calendar = Mock()
+        calendar.is_trading_day.return_value = True
+        schedulers = []
+        for node_id in ("leader", "follower"):
+            job_manager = Mock()
+            job_manager.submit = AsyncMock(return_value=Mock(id=f"{node_id}-job"))
+            lease = LeaderLease(_redis_service(redis_stand_in), ttl_seconds=0.2, node_id=node_id)
+            schedulers.append(CronScheduler(Mock(), job_manager, calendar=calendar, lease=lease))
+        leader, follower = schedulers
+
+        async def run():
+            await leader._renew_lease()
+            await follower._renew_lease()
+            await leader._daily_data_ingestion()
+            await follower._daily_data_ingestion()
+        asyncio.run(run())
+
+        leader.job_manager.submit.assert_awaited_once()
+        # The job carries the lease's token into its writes
+        assert leader.job_manager.submit.await_args.kwargs["fencing_token"] == leader.lease.fencing_token == 1
+        follower.job_manager.submit.assert_not_awaited()
+        assert leader.scheduler.get_job("initial_backfill") is not None
+        assert follower.scheduler.get_job("initial_backfill") is None
+
+        # The leader stops renewing; the follower takes over and catches up with its own backfill
+        time.sleep(0.3)
+        asyncio.run(follower._renew_lease())
+        assert follower.scheduler.get_job("initial_backfill") is not None
+        asyncio.run(leader._daily_data_ingestion())
+        leader.job_manager.submit.assert_awaited_once()
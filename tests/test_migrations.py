@@ -0,0 +1,72 @@
+import asyncio
+import duckdb
+import pytest
+from migrations.migration_runner import MigrationChecksumError, MigrationRunner
+
+
+def _runner(tmp_path, connection=None, **migrations):
+    migrations_dir = tmp_path / "migrations"
+    migrations_dir.mkdir(exist_ok=True)
+    for name, sql in migrations.items():
+        (migrations_dir / f"{name}.sql").write_text(sql)
+    runner = MigrationRunner(db_path=str(tmp_path / "migrated.db"), connection=connection)
+    runner.migrations_dir = migrations_dir
+    return runner
+
+
+def _tables(connection):
+    return [row[0] for row in connection.execute("SELECT table_name FROM duckdb_tables() ORDER BY table_name").fetchall()]
+
+
+class TestMigrationRunner:
+
+    def test_each_migration_runs_once_on_the_shared_connection(self, tmp_path):
+        connection = duckdb.connect(str(tmp_path / "migrated.db"))
+        # Not idempotent: a second run of either file would fail
+        migrations = {"001_a": "CREATE TABLE a (id INTEGER);", "002_b": "CREATE TABLE b (id INTEGER);"}
+
+        assert asyncio.run(_runner(tmp_path, connection, **migrations).run_migrations()) == ["001_a.sql", "002_b.sql"]
+        assert asyncio.run(_runner(tmp_path, connection, **migrations).run_migrations()) == []
+        migrations["003_c"] = "CREATE TABLE c (id INTEGER);"
+        assert asyncio.run(_runner(tmp_path, connection, **migrations).run_migrations()) == ["003_c.sql"]
+
+        # The caller's connection is left open
+        assert _tables(connection) == ["a", "b", "c", "migrations"]
+        assert connection.execute("SELECT COUNT(*) FROM migrations WHERE length(checksum) = 64").fetchone()[0] == 3
+        connection.close()
+
+    def test_failed_migration_rolls_back_and_stops(self, tmp_path):
+        runner = _runner(
+            tmp_path,
+            **{"001_a": "CREATE TABLE a (id INTEGER);",
+               "002_b": "CREATE TABLE b (id INTEGER); INSERT INTO missing VALUES (1);",
+               "003_c": "CREATE TABLE c (id INTEGER);"}
+        )
+
+        with pytest.raises(Exception, match="002_b.sql failed and was rolled back"):
+            asyncio.run(runner.run_migrations())
+
+        connection = duckdb.connect(runner.db_path)
+        assert _tables(connection) == ["a", "migrations"]
+        assert connection.execute("SELECT filename FROM migrations").fetchall() == [("001_a.sql",)]
+        connection.close()
+
+    def test_edited_migration_is_refused(self, tmp_path):
+        asyncio.run(_runner(tmp_path, **{"001_a": "CREATE TABLE a (id INTEGER);"}).run_migrations())
+
+        with pytest.raises(MigrationChecksumError, match="001_a.sql"):
+            asyncio.run(_runner(tmp_path, **{"001_a": "CREATE TABLE a (id BIGINT);"}).run_migrations())
+
+    def test_migrations_recorded_without_checksums_are_adopted(self, tmp_path):
+        connection = duckdb.connect(str(tmp_path / "migrated.db"))
+        # The bookkeeping table as earlier runners left it
+        connection.execute("""
+            CREATE TABLE migrations (filename VARCHAR(255) NOT NULL UNIQUE, executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            CREATE TABLE a (id INTEGER);
+            INSERT INTO migrations (filename) VALUES ('001_a.sql');
+        """)
+        migrations = {"001_a": "CREATE TABLE a (id INTEGER);", "002_b": "CREATE TABLE b (id INTEGER);"}
+
+        assert asyncio.run(_runner(tmp_path, connection, **migrations).run_migrations()) == ["002_b.sql"]
+        assert connection.execute("SELECT COUNT(*) FROM migrations WHERE checksum IS NULL").fetchone()[0] == 0
+        connection.close()
@@ -0,0 +1,246 @@
+import asyncio
+from datetime import date, timedelta
+from unittest.mock import Mock, AsyncMock
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.controllers.analytics_controller import AnalyticsController
+from src.dtos.index_result import IndexComposition, IndexPerformance
+from src.managers.analytics_manager import AnalyticsManager
+from src.models.stock_price_history import StockPriceHistoryCreate
+from src.repositories.analytics_repository import AnalyticsRepository
+from src.services import risk_metrics
+from src.services.analytics_service import AnalyticsService
+from src.services.redis_service import RedisService
+
+
+@pytest.fixture
+def return_series():
+    rng = np.random.default_rng(11)
+    benchmark = rng.normal(0.0004, 0.01, 300)
+    returns = 0.8 * benchmark + rng.normal(0, 0.004, 300)
+    returns[[5, 40]] = np.nan
+    return returns, benchmark
+
+
+class TestRiskMetrics:
+
+    def test_rolling_volatility_matches_pandas(self, return_series):
+        returns, _ = return_series
+
+        actual = risk_metrics.rolling_volatility(returns, 21, 252)
+
+        expected = pd.Series(returns).rolling(21, min_periods=2).std().to_numpy() * np.sqrt(252)
+        np.testing.assert_allclose(actual[20:], expected[20:], rtol=1e-9)
+        assert np.isnan(actual[:20]).all()
+
+    def test_rolling_beta_matches_pandas(self, return_series):
+        returns, benchmark = return_series
+
+        actual = risk_metrics.rolling_beta(returns, benchmark, 63)
+
+        tail = pd.DataFrame({"r": returns[-63:], "b": benchmark[-63:]}).dropna()
+        expected_last = tail["r"].cov(tail["b"]) / tail["b"].var()
+        assert actual[-1] == pytest.approx(expected_last, rel=1e-9)
+        assert actual[-1] == pytest.approx(0.8, abs=0.1)
+
+    def test_rolling_sharpe(self, return_series):
+        returns, _ = return_series
+
+        actual = risk_metrics.rolling_sharpe(returns, 63, 252, 0.02)
+
+        tail = pd.Series(returns[-63:]).dropna() - 0.02 / 252
+        assert actual[-1] == pytest.approx(tail.mean() / tail.std() * np.sqrt(252), rel=1e-9)
+
+    def test_max_drawdown(self):
+        values = np.array([100.0, 110.0, 99.0, 120.0, 90.0, 95.0])
+
+        drawdown, peak, trough = risk_metrics.max_drawdown(values)
+        rolling = risk_metrics.rolling_max_drawdown(values, 3)
+
+        assert drawdown == pytest.approx(90.0 / 120.0 - 1)
+        assert (peak, trough) == (3, 4)
+        assert rolling[2] == pytest.approx(99.0 / 110.0 - 1)
+        assert rolling[5] == pytest.approx(90.0 / 120.0 - 1)
+        assert np.isnan(rolling[:2]).all()
+
+
+    @pytest.mark.parametrize("window", [2, 5, 63, 300])
+    def test_rolling_max_drawdown_matches_each_window(self, return_series, window):
+        _, benchmark = return_series
+        values = 1000.0 * np.cumprod(1.0 + benchmark)
+
+        actual = risk_metrics.rolling_max_drawdown(values, window)
+
+        expected = [
+            risk_metrics.max_drawdown(values[end + 1 - window:end + 1])[0] for end in range(window - 1, len(values))
+        ]
+        np.testing.assert_allclose(actual[window - 1:], expected, rtol=1e-12)
+        assert np.isnan(actual[:window - 1]).all()
+
+@pytest.fixture
+def seeded_analytics(migrated_stock_repository):
+    repository = migrated_stock_repository
+    rng = np.random.default_rng(5)
+    performance, stocks = [], []
+    index_value = 1000.0
+    trading_date = date(2024, 1, 1)
+    while len(performance) < 80:
+        if trading_date.weekday() < 5:
+            daily_return = float(rng.normal(0.05, 1.0))
+            index_value *= 1 + daily_return / 100
+            performance.append(IndexPerformance(
+                date=trading_date, daily_return_percent=daily_return,
+                cumulative_return_percent=(index_value / 1000 - 1) * 100,
+                index_value=index_value, companies_count=2
+            ))
+            stocks.append(StockPriceHistoryCreate(
+                company_symbol="SPY", company_name="SPDR S&P 500", last_traded_price=500.0,
+                market_cap=5e11, one_day_return=daily_return / 2, created_at=trading_date
+            ))
+        trading_date += timedelta(days=1)
+    asyncio.run(repository.insert_index_performance(performance))
+    for stock in stocks:
+        asyncio.run(repository.bulk_insert_stock_data([stock]))
+    return AnalyticsService(AnalyticsRepository(repository.base_repository)), performance
+
+
+class TestAnalyticsService:
+
+    @pytest.mark.asyncio
+    async def test_risk_analytics_over_stored_series(self, seeded_analytics):
+        service, performance = seeded_analytics
+
+        analytics = await service.get_risk_analytics(date(2024, 1, 1), date(2024, 12, 31), [5, 21])
+
+        assert analytics.observations == 80
+        assert analytics.beta == pytest.approx(2.0, rel=1e-3)
+        assert [rolling.window for rolling in analytics.rolling] == [5, 21]
+        assert len(analytics.rolling[1].dates) == len(analytics.rolling[1].beta) == 80 - 20
+        assert analytics.rolling[1].dates[0] == performance[20].date
+        assert analytics.rolling[1].beta[-1] == pytest.approx(2.0, rel=1e-3)
+        values = np.array([perf.index_value for perf in performance])
+        assert analytics.max_drawdown_percent == pytest.approx(risk_metrics.max_drawdown(values)[0] * 100, rel=1e-3)
+
+    @pytest.mark.asyncio
+    async def test_symbol_benchmark_and_empty_range(self, seeded_analytics):
+        service, _ = seeded_analytics
+
+        analytics = await service.get_risk_analytics(date(2024, 1, 1), date(2024, 12, 31), [5], benchmark_symbol="SPY")
+        empty = await service.get_risk_analytics(date(2020, 1, 1), date(2020, 12, 31), [5])
+
+        assert analytics.benchmark == "SPY"
+        assert analytics.beta == pytest.approx(2.0, rel=1e-3)
+        assert empty is None
+
+
+@pytest.fixture
+def seeded_attribution(migrated_stock_repository):
+    repository = migrated_stock_repository
+    rng = np.random.default_rng(9)
+    members = {"AAPL": 0, "MSFT": 0, "NVDA": 0, "TSLA": 0}
+    daily_returns = []
+    compositions = []
+    for day in range(30):
+        trading_date = date(2024, 3, 1) + timedelta(days=day)
+        # Two members per day with TSLA swapping in for NVDA halfway through
+        symbols = ["AAPL", "MSFT", "NVDA"] if day < 15 else ["AAPL", "MSFT", "TSLA"]
+        returns = np.round(rng.normal(0.1, 2.0, len(symbols)), 3)
+        for symbol, return_percent in zip(symbols, returns):
+            members[symbol] += 1
+            compositions.append(IndexComposition(
+                date=trading_date, symbol=symbol, company_name=f"{symbol} Inc", weight_percent=25.0 if symbol != "AAPL" else 50.0,
+                market_cap=1e9, price=100.0, return_percent=float(return_percent)
+            ))
+        daily_returns.append(sum(
+            (0.5 if symbol == "AAPL" else 0.25) * return_percent / 100 for symbol, return_percent in zip(symbols, returns)
+        ))
+    asyncio.run(repository.insert_index_composition(compositions))
+    return AnalyticsService(AnalyticsRepository(repository.base_repository)), np.array(daily_returns), members
+
+
+class TestReturnAttribution:
+
+    @pytest.mark.asyncio
+    async def test_contributions_sum_to_compounded_index_return(self, seeded_attribution):
+        service, daily_returns, members = seeded_attribution
+
+        attribution = await service.get_return_attribution(date(2024, 3, 1), date(2024, 3, 30), 10)
+
+        expected = (np.prod(1 + daily_returns) - 1) * 100
+        assert attribution.index_return_percent == pytest.approx(expected, rel=1e-9)
+        assert attribution.trading_days == 30
+        assert attribution.constituents_count == 4
+        assert sum(c.contribution_percent for c in attribution.top) == pytest.approx(expected, rel=1e-9)
+        assert {c.symbol: c.days_in_index for c in attribution.top} == members
+        aapl = next(c for c in attribution.top if c.symbol == "AAPL")
+        assert aapl.average_weight_percent == pytest.approx(50.0)
+
+    @pytest.mark.asyncio
+    async def test_top_and_bottom_selected_by_contribution(self, seeded_attribution):
+        service, _, _ = seeded_attribution
+
+        full = await service.get_return_attribution(date(2024, 3, 1), date(2024, 3, 30), 10)
+        limited = await service.get_return_attribution(date(2024, 3, 1), date(2024, 3, 30), 1)
+        empty = await service.get_return_attribution(date(2020, 1, 1), date(2020, 1, 31), 1)
+
+        ranked = [c.symbol for c in full.top]
+        contributions = [c.contribution_percent for c in full.top]
+        assert contributions == sorted(contributions, reverse=True)
+        assert [c.symbol for c in full.bottom] == ranked[::-1]
+        assert [c.symbol for c in limited.top] == ranked[:1]
+        assert [c.symbol for c in limited.bottom] == ranked[-1:]
+        assert limited.index_return_percent == pytest.approx(full.index_return_percent)
+        assert empty is None
+
+
+class TestAnalyticsManager:
+
+    @pytest.mark.asyncio
+    async def test_results_cached_per_data_version(self, seeded_analytics):
+        service, _ = seeded_analytics
+        cache = {}
+        redis_service = Mock(spec=RedisService)
+        redis_service.get_analytics = AsyncMock(side_effect=lambda kind, version, **params: cache.get((kind, version)))
+        redis_service.set_analytics = AsyncMock(side_effect=lambda kind, version, data, **params: cache.update({(kind, version): data}))
+        manager = AnalyticsManager(service, redis_service)
+
+        first = await manager.get_risk_analytics(date(2024, 1, 1), date(2024, 12, 31), [21])
+        service.get_risk_analytics = AsyncMock()
+        second = await manager.get_risk_analytics(date(2024, 1, 1), date(2024, 12, 31), [21])
+
+        assert second == first
+        service.get_risk_analytics.assert_not_called()
+        assert list(cache) == [("risk", await service.get_data_version())]
+
+
+class TestAnalyticsController:
+
+    def test_invalid_windows_rejected(self):
+        manager = Mock(spec=AnalyticsManager)
+        manager.get_data_version = AsyncMock(return_value=1)
+        app = FastAPI()
+        AnalyticsController(manager).register_routes(app)
+        client = TestClient(app)
+        params = {"start_date": "2024-01-01", "end_date": "2024-12-31"}
+
+        assert client.get("/analytics/risk", params={**params, "windows": "abc"}).status_code == 400
+        assert client.get("/analytics/risk", params={**params, "windows": "1"}).status_code == 400
+        manager.get_risk_analytics = AsyncMock(return_value=None)
+        assert client.get("/analytics/risk", params={**params, "windows": "21,63"}).status_code == 404
+        manager.get_risk_analytics.assert_awaited_once_with(date(2024, 1, 1), date(2024, 12, 31), [21, 63], 0.0, None)
+
+    def test_attribution_limit_validated(self):
+        manager = Mock(spec=AnalyticsManager)
+        manager.get_data_version = AsyncMock(return_value=1)
+        manager.get_return_attribution = AsyncMock(return_value=None)
+        app = FastAPI()
+        AnalyticsController(manager).register_routes(app)
+        client = TestClient(app)
+        params = {"start_date": "2024-01-01", "end_date": "2024-12-31"}
+
+        assert client.get("/analytics/attribution", params={**params, "limit": 0}).status_code == 422
+        assert client.get("/analytics/attribution", params={**params, "limit": 5}).status_code == 404
+        manager.get_return_attribution.assert_awaited_once_with(date(2024, 1, 1), date(2024, 12, 31), 5)
@@ -0,0 +1,96 @@
+import asyncio
+import shutil
+from datetime import date
+from migrations.migration_runner import MigrationRunner
+from src.models.stock_price_history import StockPriceHistoryCreate
+from src.repositories.base_repository import BaseRepository
+from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
+
+
+def _stock(symbol, name, created_at, market_cap=1e9):
+    return StockPriceHistoryCreate(
+        company_symbol=symbol, company_name=name, last_traded_price=100.0,
+        market_cap=market_cap, one_day_return=1.0, created_at=created_at
+    )
+
+
+def _securities(repository):
+    return repository.connection.execute(
+        "SELECT symbol, name, valid_from, valid_to FROM securities ORDER BY security_id"
+    ).fetchall()
+
+
+class TestSecurities:
+
+    def test_fact_rows_share_one_security_per_symbol_and_name(self, migrated_stock_repository):
+        repository = migrated_stock_repository
+        asyncio.run(repository.bulk_insert_stock_data([_stock("FB", "Facebook Inc", date(2022, 6, 8))]))
+        asyncio.run(repository.bulk_insert_stock_data([_stock("FB", "Facebook Inc", date(2022, 6, 7))]))
+        # Renamed: a new security, while the earlier day keeps its own name
+        asyncio.run(repository.bulk_insert_stock_data([_stock("FB", "Meta Platforms Inc", date(2022, 6, 9))]))
+
+        assert _securities(repository) == [
+            ("FB", "Facebook Inc", date(2022, 6, 7), date(2022, 6, 8)),
+            ("FB", "Meta Platforms Inc", date(2022, 6, 9), date(2022, 6, 9)),
+        ]
+        columns = [row[0] for row in repository.connection.execute("DESCRIBE stock_price_history").fetchall()]
+        assert "company_symbol" not in columns and "company_name" not in columns
+        names = [asyncio.run(repository.get_stocks_by_date(day))[0].company_name for day in (date(2022, 6, 8), date(2022, 6, 9))]
+        assert names == ["Facebook Inc", "Meta Platforms Inc"]
+
+    def test_security_map_reloads_only_for_unknown_ids(self, migrated_stock_repository):
+        repository = migrated_stock_repository
+        securities = repository.base_repository.securities
+        asyncio.run(repository.bulk_insert_stock_data([_stock("AAA", "Alpha", date(2025, 9, 9))]))
+        assert securities.symbol(1) == "AAA"
+
+        reloads = []
+        reload = securities._reload
+        securities._reload = lambda: reloads.append(1) or reload()
+        asyncio.run(repository.get_stocks_by_date(date(2025, 9, 9)))
+        asyncio.run(repository.bulk_insert_stock_data([_stock("BBB", "Beta", date(2025, 9, 10))]))
+        stocks = asyncio.run(repository.get_stocks_by_date(date(2025, 9, 10)))
+
+        assert [stock.company_symbol for stock in stocks] == ["BBB"]
+        assert len(reloads) == 1
+
+    def test_migration_encodes_existing_rows_once(self, tmp_path):
+        db_path = str(tmp_path / "legacy.db")
+        legacy_migrations = tmp_path / "legacy_migrations"
+        legacy_migrations.mkdir()
+        runner = MigrationRunner(db_path=db_path)
+        for migration in sorted(runner.migrations_dir.glob("*.sql")):
+            if migration.name < "011":
+                shutil.copy(migration, legacy_migrations)
+        runner.migrations_dir = legacy_migrations
+        asyncio.run(runner.run_migrations())
+
+        base_repository = BaseRepository(db_path=db_path)
+        base_repository.connection.execute("""
+            INSERT INTO stock_price_history (id, company_symbol, company_name, last_traded_price, market_cap, one_day_return, created_at)
+            VALUES ('a', 'AAPL', 'Apple Inc', 230, 3.4e12, 1.0, DATE '2025-09-09'),
+                   ('b', 'AAPL', 'Apple Inc', 232, 3.5e12, 0.8, DATE '2025-09-10'),
+                   ('c', 'MSFT', 'Microsoft Corp', 500, 3.7e12, -0.5, DATE '2025-09-10');
+            INSERT INTO index_compositions (date, symbol, company_name, weight_percent, market_cap, price, return_percent)
+            VALUES (DATE '2025-09-10', 'AAPL', 'Apple Inc', 50, 3.5e12, 232, 0.8),
+                   (DATE '2025-09-10', 'MSFT', 'Microsoft Corp', 50, 3.7e12, 500, -0.5);
+        """)
+        base_repository.close()
+
+        # The full set of migrations, twice: 011 only runs the first time
+        for _ in range(2):
+            asyncio.run(MigrationRunner(db_path=db_path).run_migrations())
+
+        base_repository = BaseRepository(db_path=db_path)
+        repository = StockPriceHistoryRepository(base_repository)
+        assert _securities(repository) == [
+            ("AAPL", "Apple Inc", date(2025, 9, 9), date(2025, 9, 10)),
+            ("MSFT", "Microsoft Corp", date(2025, 9, 10), date(2025, 9, 10)),
+        ]
+        stocks = asyncio.run(repository.get_stocks_by_date(date(2025, 9, 10)))
+        assert [(stock.id, stock.company_symbol) for stock in stocks] == [("c", "MSFT"), ("b", "AAPL")]
+        members = asyncio.run(repository.get_persisted_index_composition(date(2025, 9, 10)))
+        assert [(member.symbol, member.company_name) for member in members] == [
+            ("MSFT", "Microsoft Corp"), ("AAPL", "Apple Inc")
+        ]
+        base_repository.close()
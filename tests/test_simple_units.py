@@ -88,6 +88,7 @@ class TestIndexManagerSimple:
     async def test_get_index_performance_from_cache(self):
         mock_index_service = Mock()
         mock_redis_service = Mock()
+        mock_index_service.get_data_version = AsyncMock(return_value=1)
         mock_redis_service.get_index_performance = AsyncMock(return_value=[{
             "date": "2025-09-10",
             "daily_return_percent": 0.25,
@@ -106,6 +107,7 @@ class TestIndexManagerSimple:
     async def test_get_index_composition_from_cache(self):
         mock_index_service = Mock()
         mock_redis_service = Mock()
+        mock_index_service.get_data_version = AsyncMock(return_value=1)
         mock_redis_service.get_index_composition = AsyncMock(return_value=[{
             "date": "2025-09-10",
             "symbol": "AAPL",
@@ -0,0 +1,121 @@
+import asyncio
+import glob
+import os
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+from src.dtos.index_result import IndexComposition
+from src.models.stock_price_history import StockPriceHistoryCreate
+from src.repositories.base_repository import BaseRepository
+from src.repositories.stock_price_history_repository import StockPriceHistoryRepository
+from src.services.index_service import IndexService
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _load(repository, target_date, symbols):
+    asyncio.run(repository.bulk_insert_stock_data([
+        StockPriceHistoryCreate(
+            company_symbol=symbol, company_name=f"{symbol} Inc", last_traded_price=100.0,
+            market_cap=1e9 * (rank + 1), one_day_return=0.5, created_at=target_date
+        )
+        for rank, symbol in enumerate(symbols)
+    ]))
+
+
+def _symbols(repository, target_date):
+    return [stock.company_symbol for stock in asyncio.run(repository.get_stocks_by_date(target_date))]
+
+
+class TestDatabaseSnapshot:
+
+    def test_readers_follow_published_data_versions(self, migrated_stock_repository):
+        writer = migrated_stock_repository
+        _load(writer, date(2025, 1, 2), ["AAA", "BBB"])
+        index_service = IndexService(writer)
+        published_version = asyncio.run(index_service.publish_snapshot())
+        assert published_version == asyncio.run(writer.get_data_version())
+        # Nothing written since: nothing to publish
+        assert asyncio.run(index_service.publish_snapshot()) is None
+
+        reader_base = BaseRepository(db_path=writer.base_repository.db_path, read_only=True)
+        reader = StockPriceHistoryRepository(reader_base)
+        assert _symbols(reader, date(2025, 1, 2)) == ["BBB", "AAA"]
+        # The constituent projection is built inside the copy, so readers never need to write it
+        assert asyncio.run(reader.get_projection_version("constituent_history")) == published_version
+        previous_connection = reader.connection
+
+        _load(writer, date(2025, 1, 3), ["AAA", "CCC"])
+        # Unpublished writes stay invisible to readers
+        assert _symbols(reader, date(2025, 1, 3)) == []
+
+        assert asyncio.run(index_service.publish_snapshot()) == published_version + 1
+        assert _symbols(reader, date(2025, 1, 3)) == ["CCC", "AAA"]
+        # The writer's projection was never refreshed, yet the snapshot's matches the data copied with it
+        assert asyncio.run(writer.get_projection_version("constituent_history")) is None
+        assert asyncio.run(reader.get_projection_version("constituent_history")) == published_version + 1
+        assert [row[0] for row in asyncio.run(
+            reader.get_constituent_history("CCC", date(2025, 1, 1), date(2025, 1, 31))
+        )] == [date(2025, 1, 3)]
+        assert reader.connection is not previous_connection
+        # A query already holding the old snapshot can finish on it
+        assert previous_connection.execute("SELECT COUNT(*) FROM stock_price_history;").fetchone()[0] == 2
+
+        # Only the current and previous snapshot files are kept
+        _load(writer, date(2025, 1, 6), ["AAA", "DDD"])
+        asyncio.run(index_service.publish_snapshot())
+        assert len(glob.glob(f"{reader_base.snapshot_path}-*.db")) == 2
+        assert _symbols(reader, date(2025, 1, 6)) == ["DDD", "AAA"]
+        reader_base.close()
+
+    def test_reader_processes_open_the_snapshot_while_the_writer_holds_the_database(self, migrated_stock_repository):
+        writer = migrated_stock_repository
+        _load(writer, date(2025, 1, 2), ["AAA", "BBB"])
+        asyncio.run(IndexService(writer).publish_snapshot())
+
+        code = (
+            "import asyncio, sys; from datetime import date; "
+            "from src.repositories.base_repository import BaseRepository; "
+            "from src.repositories.stock_price_history_repository import StockPriceHistoryRepository; "
+            "repository = StockPriceHistoryRepository(BaseRepository(db_path=sys.argv[1], read_only=True)); "
+            "print(','.join(stock.company_symbol for stock in asyncio.run(repository.get_stocks_by_date(date(2025, 1, 2)))))"
+        )
+        readers = [
+            subprocess.Popen(
+                [sys.executable, "-c", code, writer.base_repository.db_path],
+                cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+            for _ in range(3)
+        ]
+        for reader in readers:
+            stdout, stderr = reader.communicate(timeout=60)
+            assert reader.returncode == 0, stderr
+            assert stdout.strip() == "BBB,AAA"
+
+    def test_reader_app_serves_reads_and_has_no_write_routes(self, migrated_stock_repository):
+        writer = migrated_stock_repository
+        asyncio.run(writer.insert_index_composition([
+            IndexComposition(
+                date=date(2025, 1, 2), symbol=symbol, company_name=f"{symbol} Inc", weight_percent=50.0,
+                market_cap=1e9, price=100.0, return_percent=0.5
+            )
+            for symbol in ["AAA", "BBB"]
+        ]))
+        asyncio.run(IndexService(writer).publish_snapshot())
+
+        code = (
+            "from fastapi.testclient import TestClient; import main; "
+            "client = TestClient(main.app); "
+            "response = client.get('/index-composition', params={'date': '2025-01-02'}); "
+            "print(response.status_code, len(response.json())); "
+            "print(client.post('/export-data', json={'start_date': '2025-01-02'}).status_code); "
+            "print(client.post('/build-index', json={'start_date': '2025-01-02'}).status_code); "
+            "print(client.post('/indexes/build', json={'start_date': '2025-01-02'}).status_code); "
+            "print(any(route.path.startswith('/jobs') for route in main.app.routes))"
+        )
+        env = dict(os.environ, APP_ROLE="reader", DUCKDB_PATH=writer.base_repository.db_path, _="python")
+        env.pop("TESTING", None)
+        result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ["200", "2", "200", "404", "405", "False"]
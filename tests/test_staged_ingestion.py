@@ -0,0 +1,168 @@
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+import pytest
+from src.dtos.index_result import IndexPerformance
+from src.models.stock_price_history import StockPriceHistoryCreate
+from src.repositories.staging import StagingValidationError, StaleFencingTokenError, fencing_token
+from src.services.index_service import IndexService
+from src.services.stock_history_service import StockHistoryService
+
+DAY = date(2025, 9, 10)
+
+
+def _stock(symbol, market_cap, created_at=DAY):
+    return StockPriceHistoryCreate(
+        company_symbol=symbol, company_name=f"{symbol} Inc", last_traded_price=100.0,
+        market_cap=market_cap, one_day_return=0.5, created_at=created_at
+    )
+
+
+def _stored_stocks(repository, target_date=DAY):
+    return {
+        stock.company_symbol: (stock.id, float(stock.market_cap))
+        for stock in asyncio.run(repository.get_stocks_by_date(target_date))
+    }
+
+
+class TestStagedIngestion:
+
+    def test_reload_replaces_the_whole_day(self, migrated_stock_repository):
+        repository = migrated_stock_repository
+        asyncio.run(repository.bulk_insert_stock_data([_stock("AAPL", 3e12), _stock("MSFT", 2e12), _stock("NVDA", 1e12)]))
+        before = _stored_stocks(repository)
+        other_day = [_stock("AAPL", 1e12, created_at=date(2025, 9, 11))]
+        asyncio.run(repository.bulk_insert_stock_data(other_day))
+
+        written = asyncio.run(repository.bulk_insert_stock_data([_stock("AAPL", 4e12), _stock("TSLA", 5e11)]))
+
+        after = _stored_stocks(repository)
+        assert written == 2
+        assert sorted(after) == ["AAPL", "TSLA"]
+        assert after["AAPL"] == (before["AAPL"][0], 4e12)
+        assert list(_stored_stocks(repository, date(2025, 9, 11))) == ["AAPL"]
+
+    def test_rejected_batch_leaves_day_and_version_untouched(self, migrated_stock_repository):
+        repository = migrated_stock_repository
+        asyncio.run(repository.bulk_insert_stock_data([_stock("AAPL", 3e12), _stock("MSFT", 2e12)]))
+        before, version = _stored_stocks(repository), asyncio.run(repository.get_data_version())
+
+        with pytest.raises(StagingValidationError, match="duplicate"):
+            asyncio.run(repository.bulk_insert_stock_data([_stock("AAPL", 1e12), _stock("AAPL", 2e12)]))
+        wiped_out = _stock("MSFT", 2e12).model_copy(update={"one_day_return": -120.0})
+        with pytest.raises(StagingValidationError, match="more than 100%"):
+            asyncio.run(repository.bulk_insert_stock_data([_stock("AAPL", 1e12), wiped_out]))
+
+        assert _stored_stocks(repository) == before
+        assert asyncio.run(repository.get_data_version()) == version
+
+    def test_short_and_shrunken_days_are_rejected(self, migrated_stock_repository):
+        repository = migrated_stock_repository
+        full_day = [_stock(f"S{rank:02d}", 1e12 - rank * 1e9) for rank in range(10)]
+        asyncio.run(repository.bulk_insert_stock_data(full_day, minimum_rows=10))
+        before, version = _stored_stocks(repository), asyncio.run(repository.get_data_version())
+
+        with pytest.raises(StagingValidationError, match="fewer than 10"):
+            asyncio.run(repository.bulk_insert_stock_data(full_day[:9], minimum_rows=10))
+        # Without a minimum, a reload under half the stored day is still a truncated feed
+        with pytest.raises(StagingValidationError, match="drop from 10 to 4 rows"):
+            asyncio.run(repository.bulk_insert_stock_data(full_day[:4]))
+
+        assert _stored_stocks(repository) == before
+        assert asyncio.run(repository.get_data_version()) == version
+        assert asyncio.run(repository.bulk_insert_stock_data(full_day[:5])) == 5
+
+    def test_partial_fetch_accepted_by_the_data_source_is_stored(self, migrated_stock_repository):
+        fetched = [
+            {"symbol": f"S{rank:03d}", "company_name": f"S{rank:03d} Inc", "last_traded_price": 100.0,
+             "market_cap": 1e12 - rank * 1e9, "one_day_return": 0.5}
+            for rank in range(110)
+        ]
+        data_source_service = Mock()
+        data_source_service.get_top_stocks_by_market_cap = AsyncMock(return_value=fetched)
+        service = StockHistoryService(data_source_service=data_source_service, repository=migrated_stock_repository)
+
+        assert asyncio.run(service.fetch_and_store_top_stocks(DAY, 130)) == 110
+        assert len(_stored_stocks(migrated_stock_repository)) == 110
+
+    def test_composition_weights_must_sum_to_100(self, migrated_stock_repository, sample_index_composition):
+        repository = migrated_stock_repository
+        short_weighted = [member.model_copy(update={"weight_percent": 30.0}) for member in sample_index_composition]
+
+        with pytest.raises(StagingValidationError, match="1 dates have weights that do not sum to 100%"):
+            asyncio.run(repository.insert_index_composition(sample_index_composition + [
+                member.model_copy(update={"date": date(2025, 9, 11)}) for member in short_weighted
+            ]))
+        with pytest.raises(StagingValidationError, match="fewer than 3"):
+            asyncio.run(repository.insert_index_composition(sample_index_composition, minimum_rows=3))
+
+        assert asyncio.run(repository.get_persisted_index_composition(DAY)) == []
+
+    def test_stale_fencing_token_is_rejected(self, migrated_stock_repository):
+        repository = migrated_stock_repository
+
+        def load(token, stocks):
+            fencing = fencing_token.set(token)
+            try:
+                return asyncio.run(repository.bulk_insert_stock_data(stocks))
+            finally:
+                fencing_token.reset(fencing)
+
+        assert load(2, [_stock("AAPL", 3e12)]) == 1
+        before, version = _stored_stocks(repository), asyncio.run(repository.get_data_version())
+
+        with pytest.raises(StaleFencingTokenError):
+            load(1, [_stock("MSFT", 2e12)])
+        assert _stored_stocks(repository) == before
+        assert asyncio.run(repository.get_data_version()) == version
+
+        # Unfenced writes, and the current or a newer token, still go through
+        assert load(None, [_stock("MSFT", 2e12)]) == 1
+        assert load(3, [_stock("NVDA", 1e12)]) == 1
+
+    def test_failed_swap_rolls_back_every_step(self, migrated_stock_repository, sample_index_composition):
+        repository = migrated_stock_repository
+        asyncio.run(repository.insert_index_composition(sample_index_composition))
+        updated = sample_index_composition[0].model_dump() | {"weight_percent": 60.0}
+        # NOT NULL is enforced by the target table, after MSFT has been deleted from the day
+        nameless = sample_index_composition[1].model_dump() | {"symbol": "NVDA", "company_name": None, "weight_percent": 40.0}
+
+        with pytest.raises(Exception):
+            asyncio.run(repository.insert_index_composition([updated, nameless]))
+
+        stored = asyncio.run(repository.get_persisted_index_composition(DAY))
+        assert [(member.symbol, member.weight_percent) for member in stored] == [("AAPL", 50.0), ("MSFT", 50.0)]
+
+    def test_index_tables_replace_per_date(self, migrated_stock_repository, sample_index_composition, sample_index_performance):
+        repository = migrated_stock_repository
+        asyncio.run(repository.insert_index_composition(sample_index_composition))
+        asyncio.run(repository.insert_index_performance(sample_index_performance))
+        revised = IndexPerformance(
+            date=DAY, daily_return_percent=0.5, cumulative_return_percent=0.5, index_value=1005.0, companies_count=100
+        )
+
+        asyncio.run(repository.insert_index_composition([sample_index_composition[0].model_copy(update={"weight_percent": 100.0})]))
+        asyncio.run(repository.insert_index_performance([revised]))
+
+        assert [member.symbol for member in asyncio.run(repository.get_persisted_index_composition(DAY))] == ["AAPL"]
+        performance = asyncio.run(repository.get_persisted_index_performance(DAY, date(2025, 9, 11)))
+        assert [(row.date, row.index_value) for row in performance] == [(DAY, 1005.0), (date(2025, 9, 11), 999.71)]
+        with pytest.raises(StagingValidationError, match="index value"):
+            asyncio.run(repository.insert_index_performance([revised.model_copy(update={"index_value": 0.0})]))
+
+    def test_index_rows_upsert_on_natural_keys(self, migrated_stock_repository, sample_index_composition):
+        repository = migrated_stock_repository
+        service = IndexService(repository)
+        asyncio.run(service.persist_index_composition(sample_index_composition))
+        reweighted = [
+            member.model_copy(update={"weight_percent": weight})
+            for member, weight in zip(sample_index_composition, [60.0, 40.0])
+        ]
+
+        asyncio.run(service.persist_index_composition(reweighted))
+
+        rows = repository.connection.execute(
+            "SELECT compositions.id, securities.symbol, compositions.weight_percent FROM index_compositions AS compositions "
+            "JOIN securities ON securities.security_id = compositions.security_id ORDER BY securities.symbol"
+        ).fetchall()
+        assert rows == [(1, "AAPL", 60.0), (2, "MSFT", 40.0)]
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+from src.managers.index_data_dump_manager import IndexDataDumpManager
+from src.models.stock_price_history import StockPriceHistoryCreate
+
+
+def _day(target_date, market_caps):
+    return [
+        StockPriceHistoryCreate(
+            company_symbol=symbol, company_name=f"{symbol} Inc", last_traded_price=100.0,
+            market_cap=market_cap, one_day_return=0.5, created_at=target_date
+        )
+        for symbol, market_cap in market_caps.items()
+    ]
+
+
+def _physical_order(repository):
+    return repository.connection.execute(
+        "SELECT stocks.created_at, securities.symbol FROM stock_price_history AS stocks "
+        "JOIN securities ON securities.security_id = stocks.security_id ORDER BY stocks.rowid"
+    ).fetchall()
+
+
+class TestStockLayout:
+
+    def test_batches_are_appended_in_cluster_order(self, migrated_stock_repository):
+        asyncio.run(migrated_stock_repository.bulk_insert_stock_data(_day(date(2025, 9, 9), {"AAA": 1e9, "BBB": 3e9, "CCC": 2e9})))
+
+        assert _physical_order(migrated_stock_repository) == [
+            (date(2025, 9, 9), "BBB"), (date(2025, 9, 9), "CCC"), (date(2025, 9, 9), "AAA")
+        ]
+        indexes = migrated_stock_repository.connection.execute(
+            "SELECT index_name FROM duckdb_indexes() WHERE table_name = 'stock_price_history'"
+        ).fetchall()
+        assert indexes == []
+
+    def test_maintenance_restores_order_after_backfill_and_updates(self, migrated_stock_repository):
+        repository = migrated_stock_repository
+        asyncio.run(repository.bulk_insert_stock_data(_day(date(2025, 9, 10), {"AAA": 3e9, "BBB": 2e9})))
+        # Backfilled earlier day, then a reload that reverses the 10 September ranking in place
+        asyncio.run(repository.bulk_insert_stock_data(_day(date(2025, 9, 9), {"AAA": 3e9, "BBB": 2e9})))
+        asyncio.run(repository.bulk_insert_stock_data(_day(date(2025, 9, 10), {"AAA": 1e9, "BBB": 2e9})))
+        ids_before = {stock.company_symbol: stock.id for stock in asyncio.run(repository.get_stocks_by_date(date(2025, 9, 10)))}
+
+        assert asyncio.run(repository.cluster_stock_price_history()) == 2
+
+        assert _physical_order(repository) == [
+            (date(2025, 9, 9), "AAA"), (date(2025, 9, 9), "BBB"), (date(2025, 9, 10), "BBB"), (date(2025, 9, 10), "AAA")
+        ]
+        assert asyncio.run(repository.cluster_stock_price_history()) == 0
+        ids_after = {stock.company_symbol: stock.id for stock in asyncio.run(repository.get_stocks_by_date(date(2025, 9, 10)))}
+        assert ids_after == ids_before
+        # The rewritten table keeps its unique key, so reloads still upsert
+        assert asyncio.run(repository.bulk_insert_stock_data(_day(date(2025, 9, 10), {"AAA": 4e9, "BBB": 2e9}))) == 2
+        assert asyncio.run(repository.get_stocks_count_by_date(date(2025, 9, 10))) == 2
+
+    def test_maintenance_reports_failures(self):
+        stock_history_service = Mock()
+        stock_history_service.cluster_stock_data = AsyncMock(side_effect=RuntimeError("write-write conflict"))
+
+        result = asyncio.run(IndexDataDumpManager(stock_history_service, Mock()).run_stock_data_maintenance())
+
+        assert not result.success
+        assert result.operation == "stock_data_maintenance"
+        assert result.error_message == "write-write conflict"
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+import pytest
+from src.constants import JOB_TYPE_BACKFILL
+from src.managers.build_index_manager import BuildIndexManager
+from src.managers.index_data_dump_manager import IndexDataDumpManager
+from src.managers.job_manager import JobManager
+from src.scheduler.cron_scheduler import CronScheduler
+from src.services.trading_calendar import TradingCalendar, nyse_calendar, nyse_early_closes, nyse_holidays
+
+
+class TestNyseCalendar:
+
+    def test_holidays_follow_exchange_rules(self):
+        assert nyse_holidays(2024) == [
+            date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 3, 29), date(2024, 5, 27),
+            date(2024, 6, 19), date(2024, 7, 4), date(2024, 9, 2), date(2024, 11, 28), date(2024, 12, 25),
+        ]
+        # Sunday holidays move to Monday; a Saturday New Year's Day is not observed on the Friday before
+        assert date(2022, 12, 26) in nyse_holidays(2022)
+        assert date(2021, 12, 31) not in nyse_holidays(2021)
+        assert date(2021, 12, 24) in nyse_holidays(2021)
+        assert nyse_early_closes(2024) == [date(2024, 7, 3), date(2024, 11, 29), date(2024, 12, 24)]
+
+    def test_lookups(self):
+        calendar = nyse_calendar()
+
+        assert calendar.count_trading_days(date(2024, 1, 1), date(2024, 12, 31)) == 252
+        assert calendar.count_trading_days(date(2023, 1, 1), date(2023, 12, 31)) == 250
+        assert calendar.next_trading_day(date(2024, 3, 28)) == date(2024, 4, 1)
+        assert calendar.previous_trading_day(date(2024, 1, 16)) == date(2024, 1, 12)
+        assert calendar.trading_days(date(2024, 12, 23), date(2024, 12, 27)) == [
+            date(2024, 12, 23), date(2024, 12, 24), date(2024, 12, 26), date(2024, 12, 27)
+        ]
+        assert not calendar.is_trading_day(date(2012, 10, 29))
+        assert calendar.is_early_close(date(2024, 12, 24)) and not calendar.is_early_close(date(2024, 12, 23))
+        assert calendar.is_holiday(date(2024, 7, 4)) and not calendar.is_holiday(date(2024, 7, 6))
+        with pytest.raises(ValueError):
+            calendar.is_trading_day(date(1960, 1, 4))
+
+
+class TestCalendarCallSites:
+
+    def test_backfill_skips_holidays(self, mock_index_variant_service):
+        stock_history_service = Mock()
+        stock_history_service.fetch_and_store_top_stocks = AsyncMock(return_value=500)
+
+        manager = IndexDataDumpManager(stock_history_service, mock_index_variant_service)
+        results = asyncio.run(manager.run_backfill(date(2024, 11, 27), date(2024, 12, 2)))
+
+        fetched = [call.args for call in stock_history_service.fetch_and_store_top_stocks.await_args_list]
+        # Each day asks for the primary index's top_n
+        assert fetched == [(date(2024, 11, 27), 130), (date(2024, 11, 29), 130), (date(2024, 12, 2), 130)]
+        assert len(results) == 3
+
+    def test_build_index_counts_only_trading_days(self):
+        manager = BuildIndexManager(Mock(), Mock(), Mock())
+
+        assert manager._get_trading_days(date(2024, 7, 1), date(2024, 7, 7)) == [
+            date(2024, 7, 1), date(2024, 7, 2), date(2024, 7, 3), date(2024, 7, 5)
+        ]
+        assert manager._get_previous_trading_day(date(2024, 7, 5)) == date(2024, 7, 3)
+
+    def test_daily_ingestion_skips_holidays(self):
+        today = date.today()
+        job_manager = Mock(spec=JobManager)
+        job_manager.submit = AsyncMock(return_value=Mock(id="job-1"))
+        closed = TradingCalendar(today.year - 1, today.year + 1, [today])
+        open_every_day = TradingCalendar(today.year - 1, today.year + 1, [])
+
+        asyncio.run(CronScheduler(Mock(spec=IndexDataDumpManager), job_manager, closed)._daily_data_ingestion())
+        job_manager.submit.assert_not_awaited()
+
+        asyncio.run(CronScheduler(Mock(spec=IndexDataDumpManager), job_manager, open_every_day)._daily_data_ingestion())
+        expected_calls = 1 if today.weekday() < 5 else 0
+        assert job_manager.submit.await_count == expected_calls
+        if expected_calls:
+            job_manager.submit.assert_awaited_once_with(JOB_TYPE_BACKFILL, today, today, fencing_token=None)
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import date
+from unittest.mock import Mock, AsyncMock
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.controllers.index_controller import IndexController
+from src.dtos.index_result import IndexComposition
+from src.managers.build_index_manager import BuildIndexManager
+from src.managers.index_manager import IndexManager
+from src.services.index_service import IndexService
+from src.services.redis_service import RedisService
+
+
+def _members(target_date, weights):
+    return [
+        IndexComposition(
+            date=target_date, symbol=symbol, company_name=f"{symbol} Inc",
+            weight_percent=weight, market_cap=1e9, price=100.0, return_percent=0.0
+        )
+        for symbol, weight in weights.items()
+    ]
+
+
+@pytest.fixture
+def turnover_service(migrated_stock_repository):
+    days = [
+        (date(2024, 12, 30), {"AAPL": 50.0, "MSFT": 50.0}),
+        (date(2024, 12, 31), {"AAPL": 50.0, "MSFT": 50.0}),
+        # NVDA replaces MSFT across the year boundary
+        (date(2025, 1, 2), {"AAPL": 50.0, "NVDA": 50.0}),
+        # TSLA joins, reweighting to thirds
+        (date(2025, 1, 3), {"AAPL": 33.333, "NVDA": 33.333, "TSLA": 33.334}),
+    ]
+    for target_date, weights in days:
+        asyncio.run(migrated_stock_repository.insert_index_composition(_members(target_date, weights)))
+    return IndexService(migrated_stock_repository)
+
+
+class TestTurnover:
+
+    @pytest.mark.asyncio
+    async def test_daily_turnover_and_cost(self, turnover_service):
+        turnover = await turnover_service.get_turnover(date(2024, 12, 31), date(2025, 1, 3), 10.0, 2)
+
+        assert turnover.dates == [date(2024, 12, 31), date(2025, 1, 2), date(2025, 1, 3)]
+        assert turnover.entered == [0, 1, 1]
+        assert turnover.exited == [0, 1, 0]
+        assert turnover.two_way_percent == pytest.approx([0.0, 100.0, 66.668])
+        assert turnover.one_way_percent == pytest.approx([0.0, 50.0, 33.334])
+        assert turnover.rolling_one_way_percent == pytest.approx([0.0, 50.0, 83.334])
+        assert turnover.cost_percent == pytest.approx([0.0, 0.1, 0.066668])
+        assert turnover.total_cost_percent == pytest.approx(0.166668)
+        assert turnover.average_one_way_percent == pytest.approx(83.334 / 3)
+
+    @pytest.mark.asyncio
+    async def test_first_range_date_uses_prior_index_date(self, turnover_service):
+        turnover = await turnover_service.get_turnover(date(2025, 1, 2), date(2025, 1, 3), 10.0, 2)
+        first_ever = await turnover_service.get_turnover(date(2024, 12, 30), date(2024, 12, 31), 10.0, 2)
+        empty = await turnover_service.get_turnover(date(2020, 1, 1), date(2020, 1, 31), 10.0, 2)
+
+        assert turnover.two_way_percent[0] == pytest.approx(100.0)
+        # The trailing window reaches back before the requested range
+        assert turnover.rolling_one_way_percent == pytest.approx([50.0, 83.334])
+        assert first_ever.dates == [date(2024, 12, 31)]
+        assert empty is None
+
+    @pytest.mark.asyncio
+    async def test_renamed_company_is_not_traded(self, turnover_service):
+        renamed = [
+            member.model_copy(update={"company_name": "AAPL Inc."} if member.symbol == "AAPL" else {})
+            for member in _members(date(2025, 1, 6), {"AAPL": 33.333, "NVDA": 33.333, "TSLA": 33.334})
+        ]
+        await turnover_service.persist_index_composition(renamed)
+
+        turnover = await turnover_service.get_turnover(date(2025, 1, 6), date(2025, 1, 6), 10.0, 1)
+
+        assert (turnover.entered, turnover.exited) == ([0], [0])
+        assert turnover.two_way_percent == pytest.approx([0.0])
+
+    @pytest.mark.asyncio
+    async def test_year_partitioned_stream_matches_single_query(self, turnover_service):
+        turnover = await turnover_service.get_turnover(date(2024, 12, 1), date(2025, 1, 31), 25.0, 3)
+
+        stream = turnover_service.stream_turnover(date(2024, 12, 1), date(2025, 1, 31), 25.0, 3)
+        rows = [row for chunk in stream.iter_chunks() for row in chunk]
+
+        assert len(stream.partition_params) == 2
+        assert [row[0] for row in rows] == turnover.dates
+        assert [row[5] for row in rows] == pytest.approx(turnover.rolling_one_way_percent)
+        assert [row[7] for row in rows] == pytest.approx(turnover.cost_percent)
+
+    @pytest.mark.asyncio
+    async def test_results_cached_per_data_version(self, turnover_service):
+        cache = {}
+        redis_service = Mock(spec=RedisService)
+        redis_service.get_analytics = AsyncMock(side_effect=lambda kind, version, **params: cache.get((kind, version)))
+        redis_service.set_analytics = AsyncMock(side_effect=lambda kind, version, data, **params: cache.update({(kind, version): data}))
+        manager = IndexManager(turnover_service, redis_service)
+
+        first = await manager.get_turnover(date(2024, 12, 31), date(2025, 1, 3))
+        turnover_service.get_turnover = AsyncMock()
+        second = await manager.get_turnover(date(2024, 12, 31), date(2025, 1, 3))
+
+        assert second == first
+        turnover_service.get_turnover.assert_not_called()
+        assert list(cache) == [("turnover", await turnover_service.get_data_version())]
+
+    def test_endpoint_validates_and_404s(self):
+        manager = Mock(spec=IndexManager)
+        manager.get_data_version = AsyncMock(return_value=1)
+        manager.get_turnover = AsyncMock(return_value=None)
+        app = FastAPI()
+        IndexController(manager, Mock(spec=BuildIndexManager)).register_routes(app)
+        client = TestClient(app)
+        params = {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+
+        assert client.get("/turnover", params={**params, "cost_bps": -1}).status_code == 422
+        assert client.get("/turnover", params={**params, "window": 5, "cost_bps": 2.5}).status_code == 404
+        manager.get_turnover.assert_awaited_once_with(date(2025, 1, 1), date(2025, 1, 31), 2.5, 5)
@@ -0,0 +1,161 @@
+import asyncio
+from datetime import date, timedelta
+from unittest.mock import Mock
+import numpy as np
+import pytest
+from src.dtos.index_definition import IndexDefinition
+from src.managers.build_index_manager import BuildIndexManager
+from src.models.stock_price_history import StockPriceHistoryCreate
+from src.services import weight_drift
+from src.repositories.index_variant_repository import IndexVariantRepository
+from src.services.index_service import IndexService
+from src.services.index_variant_service import IndexVariantService
+from src.services.stock_history_service import StockHistoryService
+
+SYMBOLS = ["AAA", "BBB", "CCC", "DDD"]
+
+
+def _trading_days(start, end):
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)
+            if (start + timedelta(days=offset)).weekday() < 5]
+
+
+@pytest.fixture
+def stock_repository(migrated_stock_repository):
+    stocks = []
+    for day, trading_date in enumerate(_trading_days(date(2024, 1, 29), date(2024, 2, 9))):
+        for position, symbol in enumerate(SYMBOLS):
+            stocks.append(StockPriceHistoryCreate(
+                company_symbol=symbol, company_name=f"{symbol} Corp", last_traded_price=10.0 + day,
+                market_cap=(4 - position) * 1e9, one_day_return=round(position * 1.5 - 2.0 + (day % 3) * 0.7, 4),
+                created_at=trading_date
+            ))
+    asyncio.run(migrated_stock_repository.bulk_insert_stock_data(stocks))
+    return migrated_stock_repository
+
+
+def _manager(repository, frequency):
+    # The primary index's rebalance frequency is its index_definitions row
+    repository.base_repository.connection.execute(
+        "UPDATE index_definitions SET rebalance = ? WHERE index_id = 'primary';", [frequency]
+    )
+    stock_history_service = StockHistoryService(data_source_service=Mock(), repository=repository)
+    variant_service = IndexVariantService(IndexVariantRepository(repository.base_repository))
+    return BuildIndexManager(IndexService(repository), stock_history_service, variant_service)
+
+
+def _weights(repository, target_date):
+    composition = asyncio.run(repository.get_persisted_index_composition(target_date))
+    return {comp.symbol: comp.weight_percent for comp in composition}, {comp.symbol: comp.return_percent for comp in composition}
+
+
+class TestDriftedWeights:
+
+    def test_matches_day_by_day_drift(self):
+        rng = np.random.default_rng(3)
+        initial = np.array([40.0, 35.0, 25.0])
+        returns = rng.normal(0, 0.02, (6, 3))
+
+        weights = weight_drift.drifted_weights(initial, returns)
+
+        expected = [initial]
+        for day_returns in returns:
+            grown = expected[-1] * (1 + day_returns)
+            expected.append(grown / grown.sum() * 100)
+        np.testing.assert_allclose(weights, np.array(expected))
+        np.testing.assert_allclose(
+            weight_drift.portfolio_returns(weights[:-1], returns),
+            [(row * day_returns).sum() / 100 for row, day_returns in zip(expected, returns)]
+        )
+
+    def test_rebalance_periods(self):
+        dates = np.array(["2024-01-31", "2024-02-01", "2024-02-02", "2024-02-05"], dtype="datetime64[D]")
+
+        monthly = weight_drift.rebalance_period(dates, "monthly")
+        weekly = weight_drift.rebalance_period(dates, "weekly")
+
+        assert (monthly[1:] != monthly[:-1]).tolist() == [True, False, False]
+        assert (weekly[1:] != weekly[:-1]).tolist() == [False, False, True]
+        with pytest.raises(ValueError):
+            weight_drift.rebalance_period(dates, "hourly")
+
+
+class TestDriftAwareIndexBuild:
+
+    def test_monthly_weights_drift_between_rebalances(self, stock_repository):
+        manager = _manager(stock_repository, "monthly")
+
+        result = asyncio.run(manager.build_index(date(2024, 1, 29), date(2024, 2, 9)))
+
+        assert result.success
+        rebalance_weights, rebalance_returns = _weights(stock_repository, date(2024, 2, 1))
+        next_weights, next_returns = _weights(stock_repository, date(2024, 2, 2))
+        assert rebalance_weights == {symbol: pytest.approx(25.0) for symbol in SYMBOLS}
+        grown = {symbol: 25.0 * (1 + rebalance_returns[symbol] / 100) for symbol in SYMBOLS}
+        assert next_weights == {symbol: pytest.approx(grown[symbol] / sum(grown.values()) * 100) for symbol in SYMBOLS}
+        performance = asyncio.run(stock_repository.get_persisted_index_performance(date(2024, 2, 2), date(2024, 2, 2)))
+        expected_return = sum(next_weights[symbol] * next_returns[symbol] for symbol in SYMBOLS) / 100
+        assert performance[0].daily_return_percent == pytest.approx(expected_return, abs=1e-4)
+
+    def test_incremental_builds_chain_from_persisted_weights(self, stock_repository):
+        manager = _manager(stock_repository, "monthly")
+
+        asyncio.run(manager.build_index(date(2024, 1, 29), date(2024, 2, 5)))
+        asyncio.run(manager.build_index(date(2024, 2, 6), date(2024, 2, 9)))
+        split = _weights(stock_repository, date(2024, 2, 9))[0]
+
+        drift = np.array([25.0] * 4)
+        for trading_date in _trading_days(date(2024, 2, 1), date(2024, 2, 8)):
+            day_returns = np.array([_weights(stock_repository, trading_date)[1][symbol] for symbol in SYMBOLS]) / 100
+            drift = drift * (1 + day_returns)
+            drift = drift / drift.sum() * 100
+        assert split == {symbol: pytest.approx(value) for symbol, value in zip(SYMBOLS, drift)}
+
+    def test_drift_between_rebalances_is_not_turnover(self, stock_repository):
+        asyncio.run(_manager(stock_repository, "weekly").build_index(date(2024, 1, 29), date(2024, 2, 9)))
+
+        turnover = asyncio.run(IndexService(stock_repository).get_turnover(date(2024, 1, 30), date(2024, 2, 9), 10.0, 1))
+
+        by_date = dict(zip(turnover.dates, turnover.two_way_percent))
+        rebalances = {date(2024, 2, 5)}
+        assert all(by_date[day] == pytest.approx(0.0, abs=1e-9) for day in by_date if day not in rebalances)
+        # Trading drifted weights back to equal weight on the Monday rebalance
+        assert by_date[date(2024, 2, 5)] > 0.01
+        assert turnover.total_cost_percent == pytest.approx(by_date[date(2024, 2, 5)] * 10.0 / 10000)
+
+    def test_daily_rebalance_keeps_equal_weights(self, stock_repository):
+        asyncio.run(_manager(stock_repository, "daily").build_index(date(2024, 2, 5), date(2024, 2, 9)))
+
+        for trading_date in _trading_days(date(2024, 2, 5), date(2024, 2, 9)):
+            assert _weights(stock_repository, trading_date)[0] == {symbol: pytest.approx(25.0) for symbol in SYMBOLS}
+
+    def test_primary_definition_row_drives_the_build(self, stock_repository):
+        stock_repository.base_repository.connection.execute(
+            "UPDATE index_definitions SET top_n = 2, weighting = 'market_cap', rebalance = 'weekly' WHERE index_id = 'primary';"
+        )
+        variant_service = IndexVariantService(IndexVariantRepository(stock_repository.base_repository))
+        manager = BuildIndexManager(
+            IndexService(stock_repository), StockHistoryService(data_source_service=Mock(), repository=stock_repository),
+            variant_service
+        )
+
+        asyncio.run(manager.build_index(date(2024, 2, 5), date(2024, 2, 9)))
+
+        monday, _ = _weights(stock_repository, date(2024, 2, 5))
+        friday, _ = _weights(stock_repository, date(2024, 2, 9))
+        assert monday == {"AAA": pytest.approx(400 / 7), "BBB": pytest.approx(300 / 7)}
+        assert set(friday) == {"AAA", "BBB"} and sum(friday.values()) == pytest.approx(100.0)
+        assert friday["AAA"] != pytest.approx(400 / 7)
+
+    def test_build_fails_without_a_primary_definition(self, stock_repository):
+        manager = _manager(stock_repository, "daily")
+        stock_repository.base_repository.connection.execute("DELETE FROM index_definitions WHERE index_id = 'primary';")
+
+        result = asyncio.run(manager.build_index(date(2024, 2, 5), date(2024, 2, 9)))
+
+        assert not result.success and "primary" in result.error_message
+        assert _weights(stock_repository, date(2024, 2, 5))[0] == {}
+
+    def test_unknown_frequency_is_rejected(self):
+        with pytest.raises(ValueError):
+            IndexDefinition(index_id="primary", name="Primary", top_n=130, rebalance="hourly")